@@ -23,125 +23,447 @@ size_t _data_size_lut[] = {
     [DTYPE_U32] = sizeof(uint32_t),
 };
 
-/* Wait for buffer to have space available
- * @param buf Buffer to wait on
- * @param timeout_us Timeout in microseconds (0 = wait indefinitely)
- * @return Bp_EC_OK if space available, Bp_EC_TIMEOUT on timeout, Bp_EC_STOPPED
- * if buffer stopped
+/* Hint to the CPU that we are in a spin-wait loop */
+static inline void bb_cpu_relax(void)
+{
+#if defined(__x86_64__) || defined(__i386__)
+  __builtin_ia32_pause();
+#elif defined(__aarch64__)
+  __asm__ __volatile__("yield");
+#else
+  atomic_signal_fence(memory_order_seq_cst);
+#endif
+}
+
+/* consumer.tail_state: a producer may only drop the oldest batch while the
+ * consumer is not reading it. Whichever side moves the state off
+ * BB_TAIL_FREE first has the tail until it puts it back. */
+enum { BB_TAIL_FREE, BB_TAIL_READING, BB_TAIL_DROPPING };
+
+/* Consumer: hold off drops until bb_tail_unpin(). A drop in progress is only
+ * a few stores, so it is waited out. Pinning twice is harmless. */
+static inline void bb_tail_pin(Batch_buff_t *buff)
+{
+  unsigned state = BB_TAIL_FREE;
+  while (!atomic_compare_exchange_weak(&buff->consumer.tail_state, &state,
+                                       BB_TAIL_READING) &&
+         state != BB_TAIL_READING) {
+    bb_cpu_relax();
+    state = BB_TAIL_FREE;
+  }
+}
+
+static inline void bb_tail_unpin(Batch_buff_t *buff)
+{
+  atomic_store_explicit(&buff->consumer.tail_state, BB_TAIL_FREE,
+                        memory_order_release);
+}
+
+/* Condition being waited on. 'read_pos' == NULL means the producer is waiting
+ * for a free slot, otherwise a consumer is waiting for the slot at 'read_pos'
+ * (the tail for ordinary reads, the share cursor for zero-copy fan-out) to be
+ * published. */
+static inline bool bb_wait_ready(const Batch_buff_t *buff,
+                                 _Atomic size_t *read_pos)
+{
+  if (read_pos == NULL) {
+    if (buff->multi_producer) {
+      size_t claim = atomic_load(&buff->producer.claim);
+      return ((claim + 1) & bb_modulo_mask(buff)) !=
+             atomic_load(&buff->consumer.tail);
+    }
+    return !bb_isfull(buff);
+  }
+  return atomic_load(&buff->producer.head) != atomic_load(read_pos);
+}
+
+/* Busy-wait phase. Returns true when the caller should stop waiting: the
+ * condition holds, the buffer was stopped or a force return is pending.
+ * Returns false when the spin budget is exhausted (max_spins == 0 spins until
+ * the timeout), with *ec set to Bp_EC_TIMEOUT if the deadline has passed. */
+static bool bb_spin_wait(Batch_buff_t *buff, _Atomic size_t *read_pos,
+                         _Atomic bool *force, size_t max_spins,
+                         long long deadline_ns, Bp_EC *ec)
+{
+  for (size_t i = 0; max_spins == 0 || i < max_spins; i++) {
+    if (bb_wait_ready(buff, read_pos) || !atomic_load(&buff->running) ||
+        atomic_load(force)) {
+      return true;
+    }
+    /* Reading the clock is cheap (vDSO) but not free - sample it sparsely */
+    if (deadline_ns > 0 && (i & 0x3f) == 0x3f &&
+        now_ns(CLOCK_REALTIME) >= deadline_ns) {
+      *ec = Bp_EC_TIMEOUT;
+      return false;
+    }
+    bb_cpu_relax();
+  }
+  return false;
+}
+
+/* Wait for the producer (read_pos == NULL) or consumer side of the buffer to
+ * become ready, according to the buffer's wait strategy.
+ *
+ * Parking uses a waiter-counter handshake with bb_wake(): the waiter
+ * registers in 'waiters' before its final check of the condition, and the
+ * waker publishes its index update before reading 'waiters'. One of the two is
+ * therefore guaranteed to see the other, so wakers can skip the mutex and the
+ * condvar syscall entirely whenever nobody is parked.
  */
-Bp_EC bb_await_notfull(Batch_buff_t *buff, long long timeout_us)
+static Bp_EC bb_await(Batch_buff_t *buff, _Atomic size_t *read_pos,
+                      long long timeout_us)
 {
+  const bool producer = (read_pos == NULL);
+  pthread_cond_t *cond = producer ? &buff->not_full : &buff->not_empty;
+  _Atomic unsigned *waiters =
+      producer ? &buff->waiters_not_full : &buff->waiters_not_empty;
+  _Atomic bool *force =
+      producer ? &buff->force_return_head : &buff->force_return_tail;
+  Bp_EC *force_code =
+      producer ? &buff->force_return_head_code : &buff->force_return_tail_code;
   Bp_EC ec = Bp_EC_OK;
-  pthread_mutex_lock(&buff->mutex);
 
-  /* Calculate absolute timeout once, before the loop */
-  struct timespec abs_timeout;
+  /* Calculate absolute timeout once, before waiting */
+  long long deadline_ns = 0;
   if (timeout_us > 0) {
-    abs_timeout = future_ts(timeout_us * 1000, CLOCK_REALTIME);
-    /* DEBUG: Uncomment to debug timeout issues
-    long long now = now_ns(CLOCK_REALTIME);
-    long long abs_ns = abs_timeout.tv_sec * 1000000000LL + abs_timeout.tv_nsec;
-    fprintf(stderr, "bb_await_notfull: timeout_us=%lld, wait_ns=%lld,
-    current_time=%lld, abs_time=%lld\n", timeout_us, abs_ns - now, now, abs_ns);
-    */
-  }
-
-  while (bb_isfull(buff) && atomic_load(&buff->running) &&
-         !atomic_load(&buff->force_return_head)) {
-    if (timeout_us == 0) {
-      // Wait indefinitely
-      pthread_cond_wait(&buff->not_full, &buff->mutex);
-    } else {
-      int ret =
-          pthread_cond_timedwait(&buff->not_full, &buff->mutex, &abs_timeout);
-      if (ret != 0) {
-        /* ETIMEDOUT or other error - treat as timeout for safety */
+    deadline_ns = now_ns(CLOCK_REALTIME) + timeout_us * 1000;
+  }
+
+  bool done = false;
+  if (buff->wait_strategy == WAIT_STRATEGY_SPIN) {
+    done = bb_spin_wait(buff, read_pos, force, 0, deadline_ns, &ec);
+  } else if (buff->wait_strategy == WAIT_STRATEGY_SPIN_PARK) {
+    done =
+        bb_spin_wait(buff, read_pos, force, buff->spin_count, deadline_ns, &ec);
+  }
+
+  if (!done && ec == Bp_EC_OK) {
+    struct timespec abs_timeout = ts_from_ns(deadline_ns);
+
+    pthread_mutex_lock(&buff->mutex);
+    atomic_fetch_add(waiters, 1);
+
+    while (!bb_wait_ready(buff, read_pos) && atomic_load(&buff->running) &&
+           !atomic_load(force)) {
+      int ret = 0;
+      if (timeout_us == 0) {
+        // Wait indefinitely
+        ret = pthread_cond_wait(cond, &buff->mutex);
+      } else {
+        ret = pthread_cond_timedwait(cond, &buff->mutex, &abs_timeout);
+      }
+      if (ret == ETIMEDOUT) {
         ec = Bp_EC_TIMEOUT;
         break;
+      } else if (ret != 0) {
+        /* Some other error occurred - treat as timeout for safety */
+        ec = Bp_EC_PTHREAD_UNKOWN;
+        break;
       }
-      /* Continue looping on spurious wakeup (ret == 0 but condition still true)
-       */
+      /* Continue looping on spurious wakeup (ret == 0 but condition still
+       * true) */
     }
+
+    atomic_fetch_sub(waiters, 1);
+    pthread_mutex_unlock(&buff->mutex);
   }
 
-  /* Check if we were forced to return */
-  if (atomic_load(&buff->force_return_head)) {
-    ec = buff->force_return_head_code;
-    atomic_store(&buff->force_return_head, false); /* Clear flag */
+  /* Check if we were forced to return (clears the flag). With several
+   * producers the request targets all of them, so it stays set until the
+   * buffer is restarted. */
+  if (producer && buff->multi_producer) {
+    if (atomic_load(force)) {
+      ec = *force_code;
+    }
+  } else if (atomic_exchange(force, false)) {
+    ec = *force_code;
   }
 
-  /* Check why we exited the loop */
+  /* Check why we stopped waiting */
   if (ec == Bp_EC_OK && !atomic_load(&buff->running)) {
     ec = Bp_EC_STOPPED;
   }
 
-  pthread_mutex_unlock(&buff->mutex);
   return ec;
 }
 
-Bp_EC bb_await_notempty(Batch_buff_t *buff, long long timeout_us)
+/* Wake a thread parked in bb_await(), if there is one. Must be called after
+ * the index update that satisfies its condition has been stored. */
+static inline void bb_wake(Batch_buff_t *buff, pthread_cond_t *cond,
+                           _Atomic unsigned *waiters)
 {
-  Bp_EC ec = Bp_EC_OK;
+  /* Order the index store before the waiter check (pairs with the
+   * registration in bb_await) */
+  atomic_thread_fence(memory_order_seq_cst);
+
+  bool space = (cond == &buff->not_full);
+  Bb_ready_fn ready = atomic_load_explicit(
+      space ? &buff->on_not_full : &buff->on_not_empty, memory_order_acquire);
+  if (ready != NULL) {
+    ready(space ? buff->on_not_full_ctx : buff->on_not_empty_ctx, buff);
+  }
+
+  if (likely(atomic_load_explicit(waiters, memory_order_relaxed) == 0)) {
+    return;
+  }
   pthread_mutex_lock(&buff->mutex);
+  if (buff->multi_producer) {
+    /* Freed space may satisfy more than one parked producer */
+    pthread_cond_broadcast(cond);
+  } else {
+    pthread_cond_signal(cond);
+  }
+  pthread_mutex_unlock(&buff->mutex);
+}
 
-  /* Calculate absolute timeout once, before the loop */
-  struct timespec abs_timeout;
-  if (timeout_us > 0) {
-    abs_timeout = future_ts(timeout_us * 1000, CLOCK_REALTIME);
+/* Multi-producer claims held by the calling thread, one entry per buffer it
+ * is currently writing to. See BB_MAX_THREAD_CLAIMS. */
+
+typedef struct {
+  Batch_buff_t *buff;
+  size_t start; /* First claimed slot (unmasked) */
+  size_t count; /* Claimed slots not yet submitted */
+  Bp_EC ec;     /* Claim failure, reported by the next submit */
+} Bb_claim_t;
+
+static __thread Bb_claim_t bb_thread_claims[BB_MAX_THREAD_CLAIMS];
+
+static Bb_claim_t *bb_find_claim(Batch_buff_t *buff, bool create)
+{
+  Bb_claim_t *unused = NULL;
+  for (size_t i = 0; i < BB_MAX_THREAD_CLAIMS; i++) {
+    if (bb_thread_claims[i].buff == buff) {
+      return &bb_thread_claims[i];
+    }
+    if (unused == NULL && bb_thread_claims[i].buff == NULL) {
+      unused = &bb_thread_claims[i];
+    }
+  }
+  if (!create || unused == NULL) {
+    return NULL;
   }
+  unused->buff = buff;
+  unused->count = 0;
+  unused->ec = Bp_EC_OK;
+  return unused;
+}
 
-  while (bb_isempy(buff) && atomic_load(&buff->running) &&
-         !atomic_load(&buff->force_return_tail)) {
-    int ret = 0;
-    if (timeout_us == 0) {
-      // Wait indefinitely
-      ret = pthread_cond_wait(&buff->not_empty, &buff->mutex);
-    } else {
-      ret =
-          pthread_cond_timedwait(&buff->not_empty, &buff->mutex, &abs_timeout);
+/* Claim up to 'n' consecutive slots, waiting for at least one to be free
+ * unless 'wait' is false, when a full ring gives Bp_EC_NOSPACE.
+ * producer.claim is a free-running counter rather than a masked index, so a
+ * stale compare-exchange cannot succeed after the ring has wrapped. */
+static Bp_EC bb_mpsc_claim(Batch_buff_t *buff, size_t n, long long timeout_us,
+                           bool wait, Bb_claim_t *claim)
+{
+  const size_t mask = bb_modulo_mask(buff);
+  size_t start =
+      atomic_load_explicit(&buff->producer.claim, memory_order_relaxed);
+
+  for (;;) {
+    size_t tail =
+        atomic_load_explicit(&buff->consumer.tail, memory_order_acquire);
+    size_t space = (tail + mask - start) & mask;
+    if (space == 0) {
+      if (!wait) {
+        return Bp_EC_NOSPACE;
+      }
+      Bp_EC rc = bb_await(buff, NULL, timeout_us);
+      if (rc != Bp_EC_OK) {
+        return rc;
+      }
+      start = atomic_load_explicit(&buff->producer.claim, memory_order_relaxed);
+      continue;
     }
-    if (ret == ETIMEDOUT) {
-      ec = Bp_EC_TIMEOUT;
-      break;
-    } else if (ret != 0) {
-      /* Some other error occurred - treat as timeout for safety */
-      ec = Bp_EC_PTHREAD_UNKOWN;
+
+    size_t count = n < space ? n : space;
+    if (atomic_compare_exchange_weak_explicit(
+            &buff->producer.claim, &start, start + count, memory_order_acq_rel,
+            memory_order_relaxed)) {
+      claim->start = start;
+      claim->count = count;
+      return Bp_EC_OK;
+    }
+  }
+}
+
+/* Advance the head over every leading slot flagged ready. Any producer may do
+ * this on behalf of the others; clearing the ready flag decides which thread
+ * moves the head past a slot. */
+static void bb_mpsc_publish(Batch_buff_t *buff)
+{
+  size_t head = atomic_load(&buff->producer.head);
+  bool moved = false;
+
+  for (;;) {
+    unsigned char ready = 1;
+    if (!atomic_compare_exchange_strong(&buff->claim_ready[head], &ready, 0)) {
       break;
     }
-    /* Continue looping on spurious wakeup (ret == 0 but condition still true)
-     */
+    head = (head + 1) & bb_modulo_mask(buff);
+    atomic_store(&buff->producer.head, head);
+    moved = true;
   }
 
-  /* Check if we were forced to return */
-  if (atomic_load(&buff->force_return_tail)) {
-    ec = buff->force_return_tail_code;
-    atomic_store(&buff->force_return_tail, false); /* Clear flag */
+  if (moved) {
+    bb_wake(buff, &buff->not_empty, &buff->waiters_not_empty);
   }
+}
 
-  /* Check why we exited the loop */
-  if (ec == Bp_EC_OK && !atomic_load(&buff->running)) {
-    ec = Bp_EC_STOPPED;
+/* Why the calling thread holds no claim on a buffer: it claimed nothing, or
+ * it could not, holding claims on too many others */
+static Bp_EC bb_no_claim_error(void)
+{
+  for (size_t i = 0; i < BB_MAX_THREAD_CLAIMS; i++) {
+    if (bb_thread_claims[i].buff == NULL) {
+      return Bp_EC_NO_SPACE;
+    }
   }
+  return Bp_EC_CLAIM_LIMIT;
+}
 
-  pthread_mutex_unlock(&buff->mutex);
-  return ec;
+/* Submit the first 'n' slots of the calling thread's claim */
+static Bp_EC bb_mpsc_commit(Batch_buff_t *buff, size_t n)
+{
+  Bb_claim_t *claim = bb_find_claim(buff, false);
+  if (claim == NULL) {
+    return bb_no_claim_error();
+  }
+  if (claim->ec != Bp_EC_OK) {
+    Bp_EC rc = claim->ec;
+    claim->buff = NULL;
+    return rc;
+  }
+  if (n > claim->count) {
+    return Bp_EC_NO_SPACE;
+  }
+
+  for (size_t i = 0; i < n; i++) {
+    atomic_store(&buff->claim_ready[(claim->start + i) & bb_modulo_mask(buff)],
+                 1);
+  }
+  claim->start += n;
+  claim->count -= n;
+  if (claim->count == 0) {
+    claim->buff = NULL;
+  }
+  atomic_fetch_add(&buff->producer.total_batches, n);
+
+  bb_mpsc_publish(buff);
+
+  return Bp_EC_OK;
 }
 
-/* Get the oldest consumable data batch. Doesn't change head or tail idx.
- * Returns NULL on timeout. */
-Batch_t *bb_get_tail(Batch_buff_t *buff, unsigned long timeout_us, Bp_EC *err)
+/* Slot 'offset' of the calling thread's claim, claiming one if needed */
+Batch_t *bb_claimed_head(Batch_buff_t *buff, size_t offset)
 {
-  /* Fast path - check if data available without locks */
-  if (!bb_isempy_lockfree(buff)) {
-    size_t idx = bb_get_tail_idx(buff);
-    /* Memory fence ensures we see the batch data written by producer */
-    atomic_thread_fence(memory_order_acquire);
-    *err = Bp_EC_OK;
-    return &buff->batch_ring[idx];
+  Bb_claim_t *claim = bb_find_claim(buff, true);
+  if (claim == NULL) {
+    return &buff->claim_failed;
+  }
+  if (claim->count == 0 && claim->ec == Bp_EC_OK) {
+    claim->ec = bb_mpsc_claim(buff, 1, 0, true, claim);
   }
+  if (claim->ec != Bp_EC_OK || offset >= claim->count) {
+    return &buff->claim_failed;
+  }
+  return &buff->batch_ring[(claim->start + offset) & bb_modulo_mask(buff)];
+}
+
+/* Wait for buffer to have space available
+ * @param buf Buffer to wait on
+ * @param timeout_us Timeout in microseconds (0 = wait indefinitely)
+ * @return Bp_EC_OK if space available, Bp_EC_TIMEOUT on timeout, Bp_EC_STOPPED
+ * if buffer stopped
+ */
+Bp_EC bb_await_notfull(Batch_buff_t *buff, long long timeout_us)
+{
+  return bb_await(buff, NULL, timeout_us);
+}
 
-  /* Slow path - wait for data */
-  Bp_EC rc = bb_await_notempty(buff, timeout_us);
+Bp_EC bb_await_notempty(Batch_buff_t *buff, long long timeout_us)
+{
+  return bb_await(buff, &buff->consumer.tail, timeout_us);
+}
+
+/* Storage owned by slot 'idx' (as opposed to data borrowed from elsewhere) */
+static inline void *bb_slot_data(Batch_buff_t *buff, size_t idx)
+{
+  return (char *) buff->data_ring +
+         (bb_batch_size(buff) * bb_getdatawidth(buff->dtype) * idx);
+}
+
+/* Drop one reference on a shared slot. The last reference advances the tail
+ * over every leading slot which has been fully released. */
+static void bb_share_release(Batch_buff_t *origin, size_t slot)
+{
+  if (atomic_fetch_sub_explicit(&origin->share_refs[slot], 1,
+                                memory_order_acq_rel) != 1) {
+    return;
+  }
+
+  /* Several downstream consumers may finish concurrently and out of order,
+   * the mutex serialises the tail scan. */
+  pthread_mutex_lock(&origin->mutex);
+  size_t tail = atomic_load(&origin->consumer.tail);
+  size_t cursor = atomic_load(&origin->consumer.share_cursor);
+  while (tail != cursor && atomic_load(&origin->share_refs[tail]) == 0) {
+    tail = (tail + 1) & bb_modulo_mask(origin);
+  }
+  atomic_store_explicit(&origin->consumer.tail, tail, memory_order_release);
+  if (origin->multi_producer) {
+    pthread_cond_broadcast(&origin->not_full);
+  } else {
+    pthread_cond_signal(&origin->not_full);
+  }
+  pthread_mutex_unlock(&origin->mutex);
+
+  Bb_ready_fn ready =
+      atomic_load_explicit(&origin->on_not_full, memory_order_acquire);
+  if (ready != NULL) {
+    ready(origin->on_not_full_ctx, origin);
+  }
+}
+
+/* Detach borrowed data from a slot, returning it to its own storage */
+static void bb_unshare(Batch_buff_t *buff, size_t idx)
+{
+  Batch_t *batch = &buff->batch_ring[idx];
+  Batch_buff_t *origin = batch->share_origin;
+  size_t slot = batch->share_slot;
+
+  batch->data = bb_slot_data(buff, idx);
+  batch->share_origin = NULL;
+  bb_share_release(origin, slot);
+}
+
+/* Wait until the buffer is not empty, then pin the tail. The oldest batch
+ * can be dropped by the producer until it is pinned, which on a one batch
+ * ring may leave the buffer empty again. */
+static Bp_EC bb_await_pinned(Batch_buff_t *buff, unsigned long timeout_us)
+{
+  while (true) {
+    if (bb_isempy_lockfree(buff)) {
+      Bp_EC rc = bb_await_notempty(buff, timeout_us);
+      if (rc != Bp_EC_OK) {
+        return rc;
+      }
+    }
+    bb_tail_pin(buff);
+    if (!bb_isempy_lockfree(buff)) {
+      /* Memory fence ensures we see the batch data written by producer */
+      atomic_thread_fence(memory_order_acquire);
+      return Bp_EC_OK;
+    }
+    bb_tail_unpin(buff);
+  }
+}
+
+/* Get the oldest consumable data batch. Doesn't change head or tail idx, but
+ * keeps the producer from dropping the batch until bb_del_tail().
+ * Returns NULL on timeout. */
+Batch_t *bb_get_tail(Batch_buff_t *buff, unsigned long timeout_us, Bp_EC *err)
+{
+  Bp_EC rc = bb_await_pinned(buff, timeout_us);
   if (err != NULL) {
     *err = rc;
   }
@@ -166,20 +488,72 @@ Bp_EC bb_del_tail(Batch_buff_t *buff)
 
   if (current_tail == current_head) {
     /* Buffer is empty - deletion isn't possible. */
+    bb_tail_unpin(buff);
     return Bp_EC_BUFFER_EMPTY;
   }
 
+  /* Return borrowed data before the slot becomes writable again */
+  if (unlikely(buff->batch_ring[current_tail].share_origin != NULL)) {
+    bb_unshare(buff, current_tail);
+  }
+
   /* Not empty, increment tail */
   size_t new_tail = (current_tail + 1) & bb_modulo_mask(buff);
   atomic_store_explicit(&buff->consumer.tail, new_tail, memory_order_release);
+  bb_tail_unpin(buff);
 
-  /* Signal producer that buffer isn't full. Mutex does not need to be aquired
-   * for this step given SPSC*/
-  pthread_cond_signal(&buff->not_full);
+  /* Signal producer that buffer isn't full (no-op unless it is parked) */
+  bb_wake(buff, &buff->not_full, &buff->waiters_not_full);
 
   return Bp_EC_OK;
 }
 
+/* Drop the oldest batch from the producer side, unless the consumer is
+ * reading it. Caller holds the mutex. */
+static Bp_EC bb_drop_tail_locked(Batch_buff_t *buff)
+{
+  unsigned state = BB_TAIL_FREE;
+  if (!atomic_compare_exchange_strong(&buff->consumer.tail_state, &state,
+                                      BB_TAIL_DROPPING)) {
+    return Bp_EC_NO_SPACE;
+  }
+  /* The consumer may have taken it before the tail was ours */
+  if (bb_isempy(buff)) {
+    bb_tail_unpin(buff);
+    return Bp_EC_BUFFER_EMPTY;
+  }
+  size_t old_tail = atomic_load(&buff->consumer.tail);
+  if (atomic_load(&buff->share_refs[old_tail]) != 0) {
+    bb_tail_unpin(buff);
+    return Bp_EC_NO_SPACE;
+  }
+  if (buff->batch_ring[old_tail].share_origin != NULL) {
+    bb_unshare(buff, old_tail);
+  }
+
+  /* Force tail advance */
+  size_t new_tail = (old_tail + 1) & bb_modulo_mask(buff);
+  atomic_compare_exchange_strong(&buff->consumer.share_cursor, &old_tail,
+                                 new_tail);
+  atomic_store(&buff->consumer.tail, new_tail);
+  atomic_fetch_add(&buff->consumer.dropped_by_producer, 1);
+  bb_tail_unpin(buff);
+
+  /* Wake consumer if blocked */
+  pthread_cond_signal(&buff->not_empty);
+  return Bp_EC_OK;
+}
+
+/* Drop the oldest batch on behalf of the producer, as OVERFLOW_DROP_TAIL
+ * does when the buffer is full. */
+Bp_EC bb_drop_tail(Batch_buff_t *buff)
+{
+  pthread_mutex_lock(&buff->mutex);
+  Bp_EC rc = bb_drop_tail_locked(buff);
+  pthread_mutex_unlock(&buff->mutex);
+  return rc;
+}
+
 /* Submit new batch - lock-free implementation for SPSC scenario.
  *
  * Dropping behaviour:
@@ -193,6 +567,12 @@ Bp_EC bb_del_tail(Batch_buff_t *buff)
  */
 Bp_EC bb_submit(Batch_buff_t *buff, unsigned long timeout_us)
 {
+  if (buff->multi_producer) {
+    /* Any wait happened when the slot was claimed */
+    (void) bb_claimed_head(buff, 0);
+    return bb_mpsc_commit(buff, 1);
+  }
+
   /* Fast path - check if full without locks */
   size_t current_head =
       atomic_load_explicit(&buff->producer.head, memory_order_relaxed);
@@ -214,15 +594,12 @@ Bp_EC bb_submit(Batch_buff_t *buff, unsigned long timeout_us)
       pthread_mutex_lock(&buff->mutex);
 
       /* Re-check under lock */
-      if (bb_isfull(buff)) {
-        /* Force tail advance */
-        size_t new_tail =
-            (atomic_load(&buff->consumer.tail) + 1) & bb_modulo_mask(buff);
-        atomic_store(&buff->consumer.tail, new_tail);
-        atomic_fetch_add(&buff->consumer.dropped_by_producer, 1);
-
-        /* Wake consumer if blocked */
-        pthread_cond_signal(&buff->not_empty);
+      if (bb_isfull(buff) && bb_drop_tail_locked(buff) == Bp_EC_NO_SPACE) {
+        /* The consumer is reading the oldest batch, or it is still
+         * referenced downstream - drop the new one */
+        atomic_fetch_add(&buff->producer.dropped_batches, 1);
+        pthread_mutex_unlock(&buff->mutex);
+        return Bp_EC_OK;
       }
 
       pthread_mutex_unlock(&buff->mutex);
@@ -241,7 +618,274 @@ Bp_EC bb_submit(Batch_buff_t *buff, unsigned long timeout_us)
   atomic_store_explicit(&buff->producer.head, next_head, memory_order_release);
   atomic_fetch_add(&buff->producer.total_batches, 1);
 
-  pthread_cond_signal(&buff->not_empty);
+  bb_wake(buff, &buff->not_empty, &buff->waiters_not_empty);
+
+  return Bp_EC_OK;
+}
+
+/* bb_reserve_n(), or bb_try_reserve_n() if 'wait' is false */
+static size_t bb_reserve(Batch_buff_t *buff, size_t n, unsigned long timeout_us,
+                         bool wait, Bp_EC *err)
+{
+  Bp_EC rc = Bp_EC_OK;
+
+  if (buff->multi_producer) {
+    Bb_claim_t *claim = bb_find_claim(buff, true);
+    rc = claim != NULL ? claim->ec : Bp_EC_CLAIM_LIMIT;
+    if (rc == Bp_EC_OK && claim->count == 0 && n > 0) {
+      rc = bb_mpsc_claim(buff, n, timeout_us, wait, claim);
+    }
+    if (err != NULL) {
+      *err = rc;
+    }
+    if (rc != Bp_EC_OK || claim->count == 0) {
+      if (claim != NULL) {
+        claim->buff = NULL;
+      }
+      return 0;
+    }
+    return n < claim->count ? n : claim->count;
+  }
+
+  size_t space = bb_space(buff);
+
+  if (space == 0 && buff->overflow_behaviour == OVERFLOW_BLOCK) {
+    if (wait) {
+      rc = bb_await_notfull(buff, timeout_us);
+      space = bb_space(buff);
+    } else {
+      rc = Bp_EC_NOSPACE;
+    }
+  }
+  if (err != NULL) {
+    *err = rc;
+  }
+  if (rc != Bp_EC_OK || n == 0) {
+    return 0;
+  }
+
+  /* Only the consumer frees slots, so the space seen here cannot shrink */
+  return space == 0 ? 1 : (n < space ? n : space);
+}
+
+/* Reserve up to 'n' consecutive slots starting at the head. Blocks (subject
+ * to 'timeout_us') until at least one slot is free. Returns the number of
+ * slots reserved, or 0 with *err set on failure.
+ *
+ * In the dropping overflow modes this never blocks. When the buffer is full a
+ * single slot is reserved and bb_commit_n() applies the usual drop policy.
+ */
+size_t bb_reserve_n(Batch_buff_t *buff, size_t n, unsigned long timeout_us,
+                    Bp_EC *err)
+{
+  return bb_reserve(buff, n, timeout_us, true, err);
+}
+
+/* As bb_reserve_n(), but fails at once with Bp_EC_NOSPACE where that would
+ * wait */
+size_t bb_try_reserve_n(Batch_buff_t *buff, size_t n, Bp_EC *err)
+{
+  return bb_reserve(buff, n, 0, false, err);
+}
+
+/* Publish the first 'n' reserved slots with a single head store, a single
+ * update of the statistics and at most one wakeup. */
+Bp_EC bb_commit_n(Batch_buff_t *buff, size_t n, unsigned long timeout_us)
+{
+  if (n == 0) {
+    return Bp_EC_OK;
+  }
+  if (buff->multi_producer) {
+    return bb_mpsc_commit(buff, n);
+  }
+
+  size_t space = bb_space(buff);
+  if (n > space) {
+    /* Full buffer in a dropping mode - bb_reserve_n() handed out one slot */
+    if (n == 1 && buff->overflow_behaviour != OVERFLOW_BLOCK) {
+      return bb_submit(buff, timeout_us);
+    }
+    return Bp_EC_NO_SPACE;
+  }
+
+  size_t current_head =
+      atomic_load_explicit(&buff->producer.head, memory_order_relaxed);
+  atomic_store_explicit(&buff->producer.head,
+                        (current_head + n) & bb_modulo_mask(buff),
+                        memory_order_release);
+  atomic_fetch_add(&buff->producer.total_batches, n);
+
+  bb_wake(buff, &buff->not_empty, &buff->waiters_not_empty);
+
+  return Bp_EC_OK;
+}
+
+/* Make up to 'n' of the oldest batches available to the consumer. Blocks
+ * (subject to 'timeout_us') until at least one batch is present. Returns the
+ * number of batches available, or 0 with *err set on failure. */
+size_t bb_peek_n(Batch_buff_t *buff, size_t n, unsigned long timeout_us,
+                 Bp_EC *err)
+{
+  Bp_EC rc = bb_await_pinned(buff, timeout_us);
+  if (err != NULL) {
+    *err = rc;
+  }
+  if (rc != Bp_EC_OK) {
+    return 0;
+  }
+  if (n == 0) {
+    bb_tail_unpin(buff);
+    return 0;
+  }
+
+  size_t available = bb_occupancy_lockfree(buff);
+  return n < available ? n : available;
+}
+
+/* Retire the 'n' oldest batches with a single tail store and at most one
+ * wakeup. Fails if fewer than 'n' batches are present. */
+Bp_EC bb_release_n(Batch_buff_t *buff, size_t n)
+{
+  if (n == 0) {
+    return Bp_EC_OK;
+  }
+
+  size_t current_head =
+      atomic_load_explicit(&buff->producer.head, memory_order_acquire);
+  size_t current_tail =
+      atomic_load_explicit(&buff->consumer.tail, memory_order_relaxed);
+  size_t mask = bb_modulo_mask(buff);
+
+  if (((current_head - current_tail) & mask) < n) {
+    bb_tail_unpin(buff);
+    return Bp_EC_BUFFER_EMPTY;
+  }
+
+  /* Return borrowed data before the slots become writable again */
+  for (size_t i = 0; i < n; i++) {
+    size_t idx = (current_tail + i) & mask;
+    if (unlikely(buff->batch_ring[idx].share_origin != NULL)) {
+      bb_unshare(buff, idx);
+    }
+  }
+
+  atomic_store_explicit(&buff->consumer.tail, (current_tail + n) & mask,
+                        memory_order_release);
+  bb_tail_unpin(buff);
+
+  /* Signal producer that buffer isn't full (no-op unless it is parked) */
+  bb_wake(buff, &buff->not_full, &buff->waiters_not_full);
+
+  return Bp_EC_OK;
+}
+
+/* Get the next batch which has not yet been shared. The slot is not released
+ * until bb_share_done() and every downstream bb_del_tail() have been called.
+ * Returns NULL on timeout. */
+Batch_t *bb_share_next(Batch_buff_t *buff, unsigned long timeout_us, Bp_EC *err)
+{
+  while (true) {
+    size_t cursor = atomic_load_explicit(&buff->consumer.share_cursor,
+                                         memory_order_relaxed);
+    if (cursor ==
+        atomic_load_explicit(&buff->producer.head, memory_order_acquire)) {
+      Bp_EC rc = bb_await(buff, &buff->consumer.share_cursor, timeout_us);
+      if (rc != Bp_EC_OK) {
+        if (err != NULL) {
+          *err = rc;
+        }
+        return NULL;
+      }
+    }
+
+    /* Unshared, the batch at the tail can be dropped until pinned, which
+     * also moves the cursor */
+    bb_tail_pin(buff);
+    cursor = atomic_load(&buff->consumer.share_cursor);
+    if (cursor !=
+        atomic_load_explicit(&buff->producer.head, memory_order_acquire)) {
+      if (err != NULL) {
+        *err = Bp_EC_OK;
+      }
+      /* The caller holds one reference until bb_share_done() */
+      atomic_store_explicit(&buff->share_refs[cursor], 1, memory_order_relaxed);
+      return &buff->batch_ring[cursor];
+    }
+    bb_tail_unpin(buff);
+  }
+}
+
+/* Publish the current shared batch of 'origin' on 'dst' without copying the
+ * sample data. */
+Bp_EC bb_share_submit(Batch_buff_t *dst, Batch_buff_t *origin,
+                      unsigned long timeout_us)
+{
+  if (!dst || !origin) {
+    return Bp_EC_NULL_BUFF;
+  }
+  if (dst->dtype != origin->dtype) {
+    return Bp_EC_DTYPE_MISMATCH;
+  }
+  if (dst->batch_capacity_expo != origin->batch_capacity_expo) {
+    return Bp_EC_CAPACITY_MISMATCH;
+  }
+
+  size_t slot = atomic_load_explicit(&origin->consumer.share_cursor,
+                                     memory_order_relaxed);
+  Batch_t *src = &origin->batch_ring[slot];
+
+  Batch_t *out = bb_get_head(dst);
+  if (unlikely(out == &dst->claim_failed)) {
+    return bb_submit(dst, timeout_us); /* Reports the failed claim */
+  }
+  size_t idx = out - dst->batch_ring;
+
+  /* A previously dropped (DROP_HEAD) shared batch may still occupy the slot */
+  if (out->share_origin != NULL) {
+    bb_unshare(dst, idx);
+  }
+
+  out->head = src->head;
+  out->t_ns = src->t_ns;
+  out->period_ns = src->period_ns;
+  out->batch_id = src->batch_id;
+  out->ec = src->ec;
+  out->meta = src->meta;
+  out->data = src->data;
+  out->share_origin = origin;
+  out->share_slot = slot;
+  atomic_fetch_add_explicit(&origin->share_refs[slot], 1, memory_order_relaxed);
+
+  Bp_EC rc = bb_submit(dst, timeout_us);
+
+  /* Head did not move: the batch was rejected or dropped */
+  if (rc != Bp_EC_OK || (!dst->multi_producer && bb_get_head_idx(dst) == idx)) {
+    bb_unshare(dst, idx);
+  }
+
+  return rc;
+}
+
+/* Drop the caller's reference on the current shared batch and advance to the
+ * next one. */
+Bp_EC bb_share_done(Batch_buff_t *buff)
+{
+  size_t cursor =
+      atomic_load_explicit(&buff->consumer.share_cursor, memory_order_relaxed);
+
+  if (cursor ==
+      atomic_load_explicit(&buff->producer.head, memory_order_acquire)) {
+    bb_tail_unpin(buff);
+    return Bp_EC_BUFFER_EMPTY;
+  }
+
+  /* Cursor must move first so the release scan covers this slot */
+  atomic_store_explicit(&buff->consumer.share_cursor,
+                        (cursor + 1) & bb_modulo_mask(buff),
+                        memory_order_release);
+  bb_share_release(buff, cursor);
+  /* The reference counts protect the slot from here on */
+  bb_tail_unpin(buff);
 
   return Bp_EC_OK;
 }
@@ -275,6 +919,15 @@ Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config)
   if (config.overflow_behaviour > OVERFLOW_MAX) {
     return Bp_EC_INVALID_CONFIG;
   }
+
+  if (config.wait_strategy >= WAIT_STRATEGY_MAX) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  /* Dropping needs a single producer to own the head */
+  if (config.multi_producer && config.overflow_behaviour != OVERFLOW_BLOCK) {
+    return Bp_EC_INVALID_CONFIG;
+  }
   /* Clear the structure */
   memset(buff, 0, sizeof(Batch_buff_t));
 
@@ -287,6 +940,10 @@ Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config)
   buff->ring_capacity_expo = config.ring_capacity_expo;
   buff->batch_capacity_expo = config.batch_capacity_expo;
   buff->overflow_behaviour = config.overflow_behaviour;
+  buff->wait_strategy = config.wait_strategy;
+  buff->spin_count =
+      config.spin_count > 0 ? config.spin_count : BB_DEFAULT_SPIN_COUNT;
+  buff->multi_producer = config.multi_producer;
 
   /* Calculate sizes */
   size_t ring_capacity = 1UL << config.ring_capacity_expo;
@@ -299,15 +956,41 @@ Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config)
     return Bp_EC_MALLOC_FAIL;
   }
 
-  buff->data_ring = calloc(ring_capacity * batch_capacity, data_width);
+  /* Multi-producer buffers get one extra batch of storage for claim_failed */
+  size_t n_data_batches = ring_capacity + (config.multi_producer ? 1 : 0);
+  buff->data_ring = calloc(n_data_batches * batch_capacity, data_width);
   if (!buff->data_ring) {
     free(buff->batch_ring);
     buff->batch_ring = NULL;
     return Bp_EC_MALLOC_FAIL;
   }
 
+  buff->share_refs = calloc(ring_capacity, sizeof(*buff->share_refs));
+  if (!buff->share_refs) {
+    free(buff->data_ring);
+    free(buff->batch_ring);
+    buff->data_ring = NULL;
+    buff->batch_ring = NULL;
+    return Bp_EC_MALLOC_FAIL;
+  }
+
+  if (config.multi_producer) {
+    buff->claim_ready = calloc(ring_capacity, sizeof(*buff->claim_ready));
+    if (!buff->claim_ready) {
+      free(buff->share_refs);
+      free(buff->data_ring);
+      free(buff->batch_ring);
+      buff->share_refs = NULL;
+      buff->data_ring = NULL;
+      buff->batch_ring = NULL;
+      return Bp_EC_MALLOC_FAIL;
+    }
+  }
+
   /* Initialize synchronization primitives */
   if (pthread_mutex_init(&buff->mutex, NULL) != 0) {
+    free(buff->claim_ready);
+    free(buff->share_refs);
     free(buff->data_ring);
     free(buff->batch_ring);
     return Bp_EC_MUTEX_INIT_FAIL;
@@ -315,6 +998,8 @@ Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config)
 
   if (pthread_cond_init(&buff->not_empty, NULL) != 0) {
     pthread_mutex_destroy(&buff->mutex);
+    free(buff->claim_ready);
+    free(buff->share_refs);
     free(buff->data_ring);
     free(buff->batch_ring);
     return Bp_EC_COND_INIT_FAIL;
@@ -323,6 +1008,8 @@ Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config)
   if (pthread_cond_init(&buff->not_full, NULL) != 0) {
     pthread_cond_destroy(&buff->not_empty);
     pthread_mutex_destroy(&buff->mutex);
+    free(buff->claim_ready);
+    free(buff->share_refs);
     free(buff->data_ring);
     free(buff->batch_ring);
     return Bp_EC_COND_INIT_FAIL;
@@ -334,6 +1021,14 @@ Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config)
   atomic_store(&buff->producer.total_batches, 0);
   atomic_store(&buff->producer.dropped_batches, 0);
   atomic_store(&buff->consumer.dropped_by_producer, 0);
+  atomic_store(&buff->consumer.share_cursor, 0);
+  atomic_store(&buff->consumer.tail_state, BB_TAIL_FREE);
+  atomic_store(&buff->producer.claim, 0);
+  atomic_store(&buff->n_producers, 0);
+  atomic_store(&buff->on_not_empty, NULL);
+  atomic_store(&buff->on_not_full, NULL);
+  atomic_store(&buff->waiters_not_empty, 0);
+  atomic_store(&buff->waiters_not_full, 0);
   atomic_store(&buff->running, true);
 
   /* Initialize force return fields */
@@ -349,6 +1044,9 @@ Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config)
     buff->batch_ring[i].data =
         (char *) buff->data_ring + (bb_batch_size(buff) * data_width * i);
   }
+  if (config.multi_producer) {
+    buff->claim_failed.data = bb_slot_data(buff, ring_capacity);
+  }
 
   return Bp_EC_OK;
 }
@@ -395,6 +1093,16 @@ Bp_EC bb_deinit(Batch_buff_t *buff)
     buff->batch_ring = NULL;
   }
 
+  if (buff->share_refs) {
+    free(buff->share_refs);
+    buff->share_refs = NULL;
+  }
+
+  if (buff->claim_ready) {
+    free(buff->claim_ready);
+    buff->claim_ready = NULL;
+  }
+
   /* Clear the structure */
   memset(buff, 0, sizeof(Batch_buff_t));
 
@@ -411,6 +1119,10 @@ Bp_EC bb_start(Batch_buff_t *buff)
     return Bp_EC_NULL_FILTER;
   }
 
+  /* A forced return on a multi-producer buffer is sticky until restart */
+  if (buff->multi_producer) {
+    atomic_store(&buff->force_return_head, false);
+  }
   atomic_store(&buff->running, true);
   return Bp_EC_OK;
 }
@@ -452,7 +1164,11 @@ Bp_EC bb_force_return_head(Batch_buff_t *buff, Bp_EC return_code)
   pthread_mutex_lock(&buff->mutex);
   buff->force_return_head_code = return_code;
   atomic_store(&buff->force_return_head, true);
-  pthread_cond_signal(&buff->not_full); /* Wake producer if waiting */
+  if (buff->multi_producer) {
+    pthread_cond_broadcast(&buff->not_full); /* Wake every producer */
+  } else {
+    pthread_cond_signal(&buff->not_full); /* Wake producer if waiting */
+  }
   pthread_mutex_unlock(&buff->mutex);
 
   return Bp_EC_OK;
@@ -24,6 +24,9 @@ typedef enum _SampleType {
   DTYPE_MAX,
 } SampleDtype_t;
 
+/* OVERFLOW_DROP_TAIL never takes a batch from under the consumer: while it
+ * is reading the oldest (or that batch is still referenced downstream), a
+ * full buffer drops the new batch instead, as OVERFLOW_DROP_HEAD does. */
 typedef enum _OverflowBehaviour {
   OVERFLOW_BLOCK = 0,  // Block when buffer is full (default/current behavior)
   OVERFLOW_DROP_HEAD = 1,  // Drop new samples when buffer is full
@@ -31,11 +34,25 @@ typedef enum _OverflowBehaviour {
   OVERFLOW_MAX
 } OverflowBehaviour_t;
 
+/* How a blocked producer/consumer waits for the other side */
+typedef enum _WaitStrategy {
+  WAIT_STRATEGY_PARK = 0,   // Sleep on a condvar immediately (default)
+  WAIT_STRATEGY_SPIN_PARK,  // Spin for spin_count polls, then sleep
+  WAIT_STRATEGY_SPIN,       // Never sleep - lowest latency, burns a core
+  WAIT_STRATEGY_MAX
+} WaitStrategy_t;
+
+/* Default number of polls before a SPIN_PARK waiter sleeps */
+#define BB_DEFAULT_SPIN_COUNT 1024
+
 typedef struct _BatchBuffer_config {
   SampleDtype_t dtype;
   size_t batch_capacity_expo;
   size_t ring_capacity_expo;
   OverflowBehaviour_t overflow_behaviour;
+  WaitStrategy_t wait_strategy;
+  size_t spin_count;   /* SPIN_PARK polls before sleeping (0 = default) */
+  bool multi_producer; /* Allow several producers (MPSC), OVERFLOW_BLOCK only */
 } BatchBuffer_config;
 
 extern size_t _data_size_lut[DTYPE_MAX];
@@ -90,10 +107,24 @@ typedef struct _Batch {
    * all data types.
    */
   void *data;
+
+  /* Zero-copy sharing: non-NULL when 'data' is borrowed from slot
+   * 'share_slot' of another buffer (see bb_share_submit). The reference is
+   * dropped, and 'data' restored to this slot's own storage, by bb_del_tail.
+   */
+  struct _Bp_BatchBuffer *share_origin;
+  size_t share_slot;
 } Batch_t;
 
 #define BATCH_GET_SAMPLE_U32(batch, idx) (((uint32_t *) (batch)->data) + (idx))
 
+struct _Bp_BatchBuffer;
+
+/* Readiness notification for tasks that are not parked on a condvar (see
+ * scheduler.h). Called after the head (on_not_empty) or tail (on_not_full)
+ * has moved. */
+typedef void (*Bb_ready_fn)(void *ctx, struct _Bp_BatchBuffer *buff);
+
 typedef struct _Bp_BatchBuffer {
   /* Existing synchronization and storage */
   char name[32]; /* e.g., "filter1.input[0]" */
@@ -116,6 +147,7 @@ typedef struct _Bp_BatchBuffer {
     _Atomic uint64_t total_batches;   /* Total batches submitted */
     _Atomic uint64_t dropped_batches; /* Dropped due to overflow */
     uint64_t blocked_time_ns;         /* Time spent blocking */
+    _Atomic size_t claim; /* Multi-producer: next slot to claim (>= head) */
   } producer __attribute__((aligned(64)));
 
   /* Consumer-only fields - modified only by consumer thread */
@@ -123,6 +155,10 @@ typedef struct _Bp_BatchBuffer {
     _Atomic size_t tail; /* Next slot to read */
     _Atomic uint64_t
         dropped_by_producer; /* Batches dropped by producer in DROP_TAIL mode */
+    _Atomic size_t share_cursor; /* Next slot to share (tail <= cursor <= head)
+                                  */
+    _Atomic unsigned tail_state; /* Consumer reading the oldest batches, or
+                                    the producer dropping one (BB_TAIL_*) */
   } consumer __attribute__((aligned(64)));
 
   /* Shared fields - accessed by both threads but only on slow path */
@@ -135,6 +171,13 @@ typedef struct _Bp_BatchBuffer {
   pthread_cond_t not_full;
   _Atomic bool running;
 
+  /* Waiting strategy. Threads parked on a condvar register in the waiter
+   * counts so that the submit/delete fast paths only signal when needed. */
+  WaitStrategy_t wait_strategy;
+  size_t spin_count;
+  _Atomic unsigned waiters_not_empty;
+  _Atomic unsigned waiters_not_full;
+
   /* Force return mechanism for clean filter stopping */
   _Atomic bool force_return_head; /* Force producer to return */
   _Atomic bool force_return_tail; /* Force consumer to return */
@@ -142,6 +185,26 @@ typedef struct _Bp_BatchBuffer {
   Bp_EC force_return_tail_code;   /* Error code for consumer */
 
   OverflowBehaviour_t overflow_behaviour;
+
+  /* Zero-copy sharing state */
+  _Atomic unsigned *share_refs; /* Outstanding references per slot */
+  bool consumer_mutates; /* Consumer writes batch data in place - downstream
+                            of a fan-out it must receive a private copy */
+
+  /* Multi-producer (MPSC) state. Producers claim slots by advancing
+   * producer.claim, fill them, and flag them ready. The head is moved over
+   * ready slots strictly in order, so the consumer side is unchanged. */
+  bool multi_producer;
+  _Atomic unsigned char *claim_ready; /* Per slot: filled, awaiting head */
+  Batch_t claim_failed;         /* Handed out when a claim cannot be made */
+  _Atomic unsigned n_producers; /* Filters connected as producers */
+
+  /* Readiness hooks. Set the context before the function; clearing the
+   * function detaches the hook. */
+  _Atomic Bb_ready_fn on_not_empty;
+  void *on_not_empty_ctx;
+  _Atomic Bb_ready_fn on_not_full;
+  void *on_not_full_ctx;
 } Batch_buff_t;
 
 static inline size_t bb_get_tail_idx(Batch_buff_t *buff)
@@ -209,6 +272,19 @@ static inline bool bb_isfull(const Batch_buff_t *buff)
   return ((head + 1) & bb_modulo_mask(buff)) == tail;
 }
 
+/* Whether a producer can submit without waiting (any producer, for a
+ * multi-producer buffer) */
+static inline bool bb_has_space(const Batch_buff_t *buff)
+{
+  size_t head =
+      buff->multi_producer
+          ? atomic_load_explicit(&buff->producer.claim, memory_order_relaxed)
+          : atomic_load_explicit(&buff->producer.head, memory_order_relaxed);
+  size_t tail =
+      atomic_load_explicit(&buff->consumer.tail, memory_order_acquire);
+  return ((head + 1) & bb_modulo_mask(buff)) != tail;
+}
+
 static inline size_t bb_space(const Batch_buff_t *buf)
 {
   size_t head = atomic_load_explicit(&buf->producer.head, memory_order_relaxed);
@@ -225,6 +301,16 @@ static inline size_t bb_occupancy(const Batch_buff_t *buf)
   return (head + capacity - tail) & (capacity - 1);
 }
 
+/* Occupancy as seen by the consumer */
+static inline size_t bb_occupancy_lockfree(const Batch_buff_t *buf)
+{
+  /* Acquire ensures the submitted batches are visible before reading them */
+  size_t head = atomic_load_explicit(&buf->producer.head, memory_order_acquire);
+  size_t tail = atomic_load_explicit(&buf->consumer.tail, memory_order_relaxed);
+  size_t capacity = 1u << buf->ring_capacity_expo;
+  return (head + capacity - tail) & (capacity - 1);
+}
+
 /* Wait for buffer to have space available
  * @param buf Buffer to wait on
  * @param timeout_us Timeout in microseconds (0 = wait indefinitely)
@@ -235,6 +321,22 @@ Bp_EC bb_await_notfull(Batch_buff_t *buff, long long timeout);
 
 Bp_EC bb_await_notempty(Batch_buff_t *buff, long long timeout);
 
+/* Most multi-producer buffers one thread can hold unsubmitted claims on at
+ * once. Claims belong to the thread that made them: a claim must be submitted
+ * by that thread, so a scheduled step submits what it claims before it
+ * returns. */
+#define BB_MAX_THREAD_CLAIMS 16
+
+/* Multi-producer counterpart of bb_get_head(): slot 'offset' of the calling
+ * thread's claim, claiming one slot (blocking until one is free) if the thread
+ * holds none. A claim is held until it is submitted. If no slot can be claimed
+ * (buffer stopped, forced return) a scratch batch is returned and the next
+ * bb_submit() reports the error: Bp_EC_CLAIM_LIMIT if the thread already
+ * holds claims on BB_MAX_THREAD_CLAIMS other buffers. bb_reserve_n() fails
+ * at once with the same error. */
+__attribute__((returns_nonnull)) Batch_t *bb_claimed_head(Batch_buff_t *buff,
+                                                          size_t offset);
+
 /* Get the active batch. Doesn't change head or tail idx.
  * This function NEVER returns NULL - it returns a pointer to an element
  * in the pre-allocated ring buffer.
@@ -242,6 +344,9 @@ Bp_EC bb_await_notempty(Batch_buff_t *buff, long long timeout);
 __attribute__((returns_nonnull)) static inline Batch_t *bb_get_head(
     Batch_buff_t *buff)
 {
+  if (buff->multi_producer) {
+    return bb_claimed_head(buff, 0);
+  }
   size_t idx = bb_get_head_idx(buff);
   return &buff->batch_ring[idx];
 }
@@ -263,6 +368,84 @@ Bp_EC bb_del_tail(Batch_buff_t *buff);
  */
 Bp_EC bb_submit(Batch_buff_t *buff, unsigned long timeout_us);
 
+/* Producer side: drop the oldest unconsumed batch, as OVERFLOW_DROP_TAIL does
+ * on a full buffer, whatever the buffer's overflow behaviour. Returns
+ * Bp_EC_BUFFER_EMPTY if there is none, or Bp_EC_NO_SPACE if the consumer is
+ * reading it (from bb_get_tail() to bb_del_tail(), bb_peek_n() to
+ * bb_release_n() or bb_share_next() to bb_share_done()) or it is still
+ * referenced downstream (see bb_share_submit). Counted in
+ * consumer.dropped_by_producer. Single-producer buffers only. */
+Bp_EC bb_drop_tail(Batch_buff_t *buff);
+
+/* Bulk transfer.
+ * Producers and consumers handling several batches per wakeup can amortise
+ * the index update, statistics and condvar signal over the whole burst:
+ *   - bb_reserve_n() returns how many slots (<= n) may be written, starting
+ *     at the head. Fill them via bb_get_head_at(buff, 0 .. count-1).
+ *   - bb_commit_n() publishes the first n of them in one step.
+ *   - bb_peek_n() returns how many batches (<= n) may be read, starting at
+ *     the tail. Read them via bb_get_tail_at(buff, 0 .. count-1).
+ *   - bb_release_n() retires the oldest n of them in one step.
+ * A commit or release may cover fewer slots than were reserved or peeked.
+ */
+size_t bb_reserve_n(Batch_buff_t *buff, size_t n, unsigned long timeout_us,
+                    Bp_EC *err);
+
+/* Never waits: returns 0 with Bp_EC_NOSPACE where bb_reserve_n() would block,
+ * e.g. when another producer took the last free slot of a shared buffer.
+ * For scheduler steps, which must not block. */
+size_t bb_try_reserve_n(Batch_buff_t *buff, size_t n, Bp_EC *err);
+
+Bp_EC bb_commit_n(Batch_buff_t *buff, size_t n, unsigned long timeout_us);
+
+size_t bb_peek_n(Batch_buff_t *buff, size_t n, unsigned long timeout_us,
+                 Bp_EC *err);
+
+Bp_EC bb_release_n(Batch_buff_t *buff, size_t n);
+
+/* Slot 'offset' places past the head. Never returns NULL. */
+__attribute__((returns_nonnull)) static inline Batch_t *bb_get_head_at(
+    Batch_buff_t *buff, size_t offset)
+{
+  if (buff->multi_producer) {
+    return bb_claimed_head(buff, offset);
+  }
+  size_t idx = (bb_get_head_idx(buff) + offset) & bb_modulo_mask(buff);
+  return &buff->batch_ring[idx];
+}
+
+/* Batch 'offset' places past the tail. Only valid for offsets below the count
+ * returned by bb_peek_n(). */
+static inline Batch_t *bb_get_tail_at(Batch_buff_t *buff, size_t offset)
+{
+  size_t idx = (bb_get_tail_idx(buff) + offset) & bb_modulo_mask(buff);
+  return &buff->batch_ring[idx];
+}
+
+/* Zero-copy fan-out.
+ * A consumer distributing each batch to several downstream buffers can hand
+ * out references to the batch data instead of copying it:
+ *   - bb_share_next() replaces bb_get_tail(). It returns the next batch that
+ *     has not yet been shared, which may lie ahead of the tail.
+ *   - bb_share_submit() publishes that batch on 'dst' with its data pointer
+ *     aliasing the origin slot, and takes a reference on the slot.
+ *   - bb_share_done() replaces bb_del_tail(). It drops the caller's own
+ *     reference and moves on to the next batch.
+ * The origin slot is returned to the producer once the last downstream
+ * consumer has called bb_del_tail() on its copy of the batch. Slots are
+ * released strictly in order so the ring stays contiguous.
+ *
+ * Shared data is read-only. Consumers which modify input data in place must
+ * set consumer_mutates on their buffer so that fan-out filters copy instead.
+ */
+Batch_t *bb_share_next(Batch_buff_t *buff, unsigned long timeout_us,
+                       Bp_EC *err);
+
+Bp_EC bb_share_submit(Batch_buff_t *dst, Batch_buff_t *origin,
+                      unsigned long timeout_us);
+
+Bp_EC bb_share_done(Batch_buff_t *buff);
+
 /* Buffer allocation and lifecycle management */
 Bp_EC bb_init(Batch_buff_t *buff, const char *name, BatchBuffer_config config);
 
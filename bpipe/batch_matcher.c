@@ -50,25 +50,23 @@ static Bp_EC batch_matcher_stop(Filter_t* self)
 
 static Bp_EC batch_matcher_deinit(Filter_t* self)
 {
-  BatchMatcher_t* bm = (BatchMatcher_t*) self;
-
-  // Free accumulator
-  if (bm->accumulator != NULL) {
-    free(bm->accumulator);
-    bm->accumulator = NULL;
-  }
-
   // Do default deinit actions
   for (int i = 0; i < self->n_input_buffers; i++) {
-    Bp_EC rc = bb_deinit(self->input_buffers[i]);
-    if (rc != Bp_EC_OK) {
-      return rc;
+    if (self->input_buffers[i]) {
+      Bp_EC rc = bb_deinit(self->input_buffers[i]);
+      if (rc != Bp_EC_OK) {
+        return rc;
+      }
+      free(self->input_buffers[i]);
+      self->input_buffers[i] = NULL;
     }
   }
 
   // Destroy mutex
   pthread_mutex_destroy(&self->filter_mutex);
 
+  self->filt_type = FILT_T_NDEF;
+
   return Bp_EC_OK;
 }
 
@@ -80,19 +78,12 @@ static Bp_EC batch_matcher_get_stats(Filter_t* self, void* stats_out)
     return Bp_EC_NULL_POINTER;
   }
 
-  // Custom stats structure
-  typedef struct {
-    Filt_metrics base;
-    uint64_t samples_processed;
-    uint64_t batches_matched;
-    uint64_t samples_skipped;
-  } BatchMatcherStats;
-
-  BatchMatcherStats* stats = (BatchMatcherStats*) stats_out;
+  BatchMatcher_stats_t* stats = (BatchMatcher_stats_t*) stats_out;
   stats->base = self->metrics;
   stats->samples_processed = bm->samples_processed;
   stats->batches_matched = bm->batches_matched;
   stats->samples_skipped = bm->samples_skipped;
+  stats->batches_forwarded = bm->batches_forwarded;
 
   return Bp_EC_OK;
 }
@@ -112,9 +103,11 @@ static Bp_EC batch_matcher_describe(Filter_t* self, char* buffer,
            "  Batch period: %lu ns\n"
            "  Samples processed: %lu\n"
            "  Batches matched: %lu\n"
+           "  Batches forwarded whole: %lu\n"
            "  Samples skipped: %lu",
            self->name, bm->output_batch_samples, bm->batch_period_ns,
-           bm->samples_processed, bm->batches_matched, bm->samples_skipped);
+           bm->samples_processed, bm->batches_matched, bm->batches_forwarded,
+           bm->samples_skipped);
 
   return Bp_EC_OK;
 }
@@ -153,13 +146,13 @@ Bp_EC batch_matcher_init(BatchMatcher_t* matcher, BatchMatcher_config_t config)
   matcher->period_ns = 0;
   matcher->batch_period_ns = 0;
   matcher->next_boundary_ns = 0;
-  matcher->accumulator = NULL;
-  matcher->accumulator_capacity = 0;
   matcher->accumulated = 0;
   matcher->data_width = bb_getdatawidth(config.buff_config.dtype);
+  matcher->handoff = false;
   matcher->samples_processed = 0;
   matcher->batches_matched = 0;
   matcher->samples_skipped = 0;
+  matcher->batches_forwarded = 0;
 
   // Set input constraints
   prop_constraints_from_buffer_append(&matcher->base, &config.buff_config,
@@ -182,6 +175,37 @@ Bp_EC batch_matcher_init(BatchMatcher_t* matcher, BatchMatcher_config_t config)
   return Bp_EC_OK;
 }
 
+/* Forward an input batch that is already a whole output batch, without
+ * going through the sample loop. */
+static Bp_EC batch_matcher_forward(BatchMatcher_t* bm, Batch_t* input)
+{
+  Filter_t* f = &bm->base;
+  Bp_EC err;
+
+  input->batch_id = bm->batches_matched;
+  if (bm->handoff) {
+    err = bb_share_submit(f->sinks[0], f->input_buffers[0], f->timeout_us);
+  } else {
+    Batch_t* output = bb_get_head(f->sinks[0]);
+    memcpy(output->data, input->data, input->head * bm->data_width);
+    output->t_ns = input->t_ns;
+    output->period_ns = input->period_ns;
+    output->head = input->head;
+    output->batch_id = input->batch_id;
+    output->ec = Bp_EC_OK;
+    err = bb_submit(f->sinks[0], f->timeout_us);
+  }
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  bm->batches_matched++;
+  bm->batches_forwarded++;
+  bm->samples_processed += input->head;
+  bm->next_boundary_ns += bm->batch_period_ns;
+  return Bp_EC_OK;
+}
+
 void* batch_matcher_worker(void* arg)
 {
   BatchMatcher_t* bm = (BatchMatcher_t*) arg;
@@ -198,13 +222,19 @@ void* batch_matcher_worker(void* arg)
   }
 
   Bp_EC err = Bp_EC_OK;
+  Batch_buff_t* in = f->input_buffers[0];
   Batch_t* input_batch = NULL;
   Batch_t* output_batch = NULL;
   bool first_batch = true;
 
   while (f->running) {
-    // Get input batch
-    input_batch = bb_get_tail(f->input_buffers[0], f->timeout_us, &err);
+    // Get input batch. Batches are read through the sharing interface so
+    // that aligned ones can be handed on without a copy.
+    input_batch = bb_share_next(in, f->timeout_us, &err);
+    if (err == Bp_EC_OK && input_batch->ec == Bp_EC_COMPLETE) {
+      bb_share_done(in);
+      err = Bp_EC_COMPLETE;
+    }
     if (err != Bp_EC_OK) {
       if (err == Bp_EC_TIMEOUT) {
         continue;
@@ -235,7 +265,7 @@ void* batch_matcher_worker(void* arg)
 
       // Validate period_ns
       if (bm->period_ns == 0) {
-        bb_del_tail(f->input_buffers[0]);
+        bb_share_done(in);
         f->worker_err_info.ec = Bp_EC_INVALID_CONFIG;
         f->worker_err_info.err_msg =
             "BatchMatcher requires regular sampling (period_ns > 0)";
@@ -249,7 +279,7 @@ void* batch_matcher_worker(void* arg)
       // Validate phase alignment
       uint64_t phase_offset = input_batch->t_ns % bm->period_ns;
       if (phase_offset != 0) {
-        bb_del_tail(f->input_buffers[0]);
+        bb_share_done(in);
         f->worker_err_info.ec = Bp_EC_PHASE_ERROR;
         f->worker_err_info.err_msg =
             "Input has non-integer sample phase. "
@@ -263,28 +293,34 @@ void* batch_matcher_worker(void* arg)
 
       bm->batch_period_ns = bm->period_ns * bm->output_batch_samples;
 
-      // Align to t=0 (or nearest batch boundary before first sample)
-      bm->next_boundary_ns = 0;
-      while (bm->next_boundary_ns + bm->batch_period_ns <= input_batch->t_ns) {
-        bm->next_boundary_ns += bm->batch_period_ns;
-      }
+      // Align to the first batch boundary (multiple of the batch period from
+      // t=0) at or after the first sample; earlier samples are skipped
+      bm->next_boundary_ns = (input_batch->t_ns + bm->batch_period_ns - 1) /
+                             bm->batch_period_ns * bm->batch_period_ns;
 
-      // Allocate accumulator
-      bm->accumulator_capacity = bm->output_batch_samples * bm->data_width;
-      bm->accumulator = malloc(bm->accumulator_capacity);
-      if (bm->accumulator == NULL) {
-        bb_del_tail(f->input_buffers[0]);
-        f->worker_err_info.ec = Bp_EC_MALLOC_FAIL;
-        f->worker_err_info.function = __FUNCTION__;
-        f->worker_err_info.filename = __FILE__;
-        f->worker_err_info.line_no = __LINE__;
-        f->running = false;
-        return NULL;
-      }
+      // Aligned batches can be handed on by reference if the sink has the
+      // same slot size and does not write to its input
+      Batch_buff_t* sink = f->sinks[0];
+      bm->handoff = sink->dtype == in->dtype &&
+                    sink->batch_capacity_expo == in->batch_capacity_expo &&
+                    !sink->consumer_mutates;
 
       first_batch = false;
     }
 
+    // Fast path: a full input batch starting on the next boundary, with no
+    // output batch part filled, is itself the next output batch
+    if (output_batch == NULL && input_batch->head == bm->output_batch_samples &&
+        input_batch->t_ns == bm->next_boundary_ns) {
+      err = batch_matcher_forward(bm, input_batch);
+      bb_share_done(in);
+      if (err == Bp_EC_STOPPED || err == Bp_EC_FILTER_STOPPING) {
+        break;
+      }
+      BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
+      continue;
+    }
+
     // Process input batch
     size_t input_samples = input_batch->head;
     size_t input_idx = 0;
@@ -303,7 +339,7 @@ void* batch_matcher_worker(void* arg)
       if (output_batch == NULL) {
         output_batch = bb_get_head(f->sinks[0]);
         if (output_batch == NULL) {
-          bb_del_tail(f->input_buffers[0]);
+          bb_share_done(in);
           BP_WORKER_ASSERT(f, false, Bp_EC_NOSPACE);
         }
 
@@ -315,11 +351,11 @@ void* batch_matcher_worker(void* arg)
         bm->accumulated = 0;
       }
 
-      // Copy samples to accumulator
+      // Copy samples into the output batch
       size_t samples_to_copy = input_samples - input_idx;
-      size_t space_in_accumulator = bm->output_batch_samples - bm->accumulated;
-      if (samples_to_copy > space_in_accumulator) {
-        samples_to_copy = space_in_accumulator;
+      size_t space_in_output = bm->output_batch_samples - bm->accumulated;
+      if (samples_to_copy > space_in_output) {
+        samples_to_copy = space_in_output;
       }
 
       // Check if we'll cross a boundary
@@ -354,13 +390,7 @@ void* batch_matcher_worker(void* arg)
     }
 
     // Release input batch
-    bb_del_tail(f->input_buffers[0]);
-  }
-
-  // Cleanup
-  if (bm->accumulator != NULL) {
-    free(bm->accumulator);
-    bm->accumulator = NULL;
+    bb_share_done(in);
   }
 
   return NULL;
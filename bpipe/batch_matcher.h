@@ -9,6 +9,15 @@ typedef struct _BatchMatcher_config_t {
   BatchBuffer_config buff_config;  // For input buffer only
 } BatchMatcher_config_t;
 
+/* Filled in by filt_get_stats() */
+typedef struct _BatchMatcher_stats_t {
+  Filt_metrics base;
+  uint64_t samples_processed;
+  uint64_t batches_matched;
+  uint64_t samples_skipped;
+  uint64_t batches_forwarded;  // Passed through whole, see handoff
+} BatchMatcher_stats_t;
+
 typedef struct _BatchMatcher_t {
   Filter_t base;
 
@@ -21,16 +30,21 @@ typedef struct _BatchMatcher_t {
   uint64_t batch_period_ns;   // period_ns * output_batch_samples
   uint64_t next_boundary_ns;  // Next output batch start time
 
-  // Accumulation
-  void* accumulator;            // Building current output batch
-  size_t accumulator_capacity;  // Allocated size of accumulator
-  size_t accumulated;           // Samples in accumulator
-  size_t data_width;            // Size of each sample
+  // Output batch being filled
+  size_t accumulated;  // Samples in the current output batch
+  size_t data_width;   // Size of each sample
+
+  // Aligned fast path. An input batch which is full and starts on the next
+  // boundary is already an output batch, and is forwarded whole: by
+  // reference when the sink can share the input's slots (decided once, on
+  // the first batch), otherwise with a single copy.
+  bool handoff;
 
   // Statistics
   uint64_t samples_processed;
   uint64_t batches_matched;
   uint64_t samples_skipped;  // Before first boundary
+  uint64_t batches_forwarded;
 } BatchMatcher_t;
 
 // Filter operations
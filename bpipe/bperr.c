@@ -55,4 +55,5 @@ char err_lut[Bp_EC_MAX][100] = {
     ERR_LUT_ENTRY(INVALID_PRECISION),
     ERR_LUT_ENTRY(FILTER_STOPPING),
     ERR_LUT_ENTRY(PROPERTY_MISMATCH),
+    ERR_LUT_ENTRY(CLAIM_LIMIT),
 };
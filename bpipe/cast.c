@@ -0,0 +1,232 @@
+#include "cast.h"
+#include <stdbool.h>
+#include <stdio.h>
+#include <string.h>
+#include "batch_buffer.h"
+#include "kernels.h"
+#include "utils.h"
+
+static bool cast_dtype_supported(SampleDtype_t dtype)
+{
+  return dtype == DTYPE_FLOAT || dtype == DTYPE_I32 || dtype == DTYPE_U32;
+}
+
+/* Convert n samples from 'in_dtype' to the filter's output type */
+static void cast_apply(const Cast_filt_t* f, SampleDtype_t in_dtype,
+                       const void* in, void* out, size_t n)
+{
+  const SampleDtype_t out_dtype = f->out_dtype;
+
+  if (in_dtype == out_dtype) {
+    if (in_dtype == DTYPE_FLOAT && f->scale != 1.0f) {
+      kern_scale_f32((const float*) in, (float*) out, n, f->scale);
+    } else {
+      memcpy(out, in, n * bb_getdatawidth(in_dtype));
+    }
+  } else if (in_dtype == DTYPE_FLOAT) {
+    if (out_dtype == DTYPE_I32) {
+      kern_cast_f32_i32((const float*) in, (int32_t*) out, n, f->scale);
+    } else {
+      kern_cast_f32_u32((const float*) in, (uint32_t*) out, n, f->scale);
+    }
+  } else if (out_dtype == DTYPE_FLOAT) {
+    if (in_dtype == DTYPE_I32) {
+      kern_cast_i32_f32((const int32_t*) in, (float*) out, n, f->scale);
+    } else {
+      kern_cast_u32_f32((const uint32_t*) in, (float*) out, n, f->scale);
+    }
+  } else if (!f->saturate) {
+    memcpy(out, in, n * sizeof(int32_t));  // Same bits, other type
+  } else if (in_dtype == DTYPE_I32) {
+    // [0, INT32_MAX] is the range the two types share
+    kern_clip_i32((const int32_t*) in, (int32_t*) out, n, 0, INT32_MAX);
+  } else {
+    kern_clip_u32((const uint32_t*) in, (uint32_t*) out, n, 0, INT32_MAX);
+  }
+}
+
+static void* cast_worker(void* arg)
+{
+  Cast_filt_t* f = (Cast_filt_t*) arg;
+  Batch_buff_t* in = f->base.input_buffers[0];
+  Batch_buff_t* sink = f->base.sinks[0];
+  Batch_t *input = NULL, *output = NULL;
+  Bp_EC err = Bp_EC_OK;
+  bool complete = false;
+
+  BP_WORKER_ASSERT(&f->base, sink != NULL, Bp_EC_NO_SINK);
+  BP_WORKER_ASSERT(&f->base, sink->dtype == f->out_dtype,
+                   Bp_EC_DTYPE_MISMATCH);
+
+  const size_t in_width = bb_getdatawidth(in->dtype);
+  const size_t out_width = bb_getdatawidth(sink->dtype);
+  const size_t batch_size = bb_batch_size(sink);
+
+  while (atomic_load(&f->base.running)) {
+    // Get new input batch if needed
+    if (!input || f->input_consumed >= input->head) {
+      if (input) {
+        err = bb_del_tail(in);
+        if (err != Bp_EC_OK) break;
+      }
+
+      input = bb_get_tail(in, f->base.timeout_us, &err);
+      if (!input) {
+        if (err == Bp_EC_TIMEOUT) {
+          continue;  // Normal timeout, keep waiting for data
+        }
+        break;
+      }
+      f->input_consumed = 0;
+
+      if (input->ec == Bp_EC_COMPLETE) {
+        complete = true;
+        break;
+      }
+    }
+
+    // Get new output batch if needed
+    if (!output) {
+      output = bb_get_head(sink);
+      if (!output) {
+        err = Bp_EC_GET_HEAD_NULL;
+        break;
+      }
+      output->head = 0;
+      output->ec = Bp_EC_OK;
+    }
+
+    size_t n = MIN(input->head - f->input_consumed, batch_size - output->head);
+    if (n > 0) {
+      if (output->head == 0) {  // First samples in this batch
+        output->t_ns =
+            input->t_ns + (long long) f->input_consumed * input->period_ns;
+        output->period_ns = input->period_ns;
+      }
+      cast_apply(f, in->dtype,
+                 (const char*) input->data + f->input_consumed * in_width,
+                 (char*) output->data + output->head * out_width, n);
+      f->input_consumed += n;
+      output->head += n;
+      f->base.metrics.samples_processed += n;
+    }
+
+    // Submit output if batch is full
+    if (output->head >= batch_size) {
+      err = bb_submit(sink, f->base.timeout_us);
+      if (err != Bp_EC_OK) break;
+      output = NULL;
+      f->base.metrics.n_batches++;
+    }
+  }
+
+  // Flush the partial batch, then pass completion downstream
+  if (output && output->head > 0 &&
+      bb_submit(sink, f->base.timeout_us) == Bp_EC_OK) {
+    f->base.metrics.n_batches++;
+  }
+  if (complete) {
+    bb_del_tail(in);
+    Batch_t* done = bb_get_head(sink);
+    if (done != NULL) {
+      done->head = 0;
+      done->ec = Bp_EC_COMPLETE;
+      bb_submit(sink, f->base.timeout_us);
+    }
+    return NULL;
+  }
+
+  if (err != Bp_EC_OK && err != Bp_EC_STOPPED && err != Bp_EC_TIMEOUT) {
+    f->base.worker_err_info.ec = err;
+    atomic_store(&f->base.running, false);  // Stop filter on error
+  }
+
+  return NULL;
+}
+
+static Bp_EC cast_describe(Filter_t* self, char* buffer, size_t buffer_size)
+{
+  Cast_filt_t* f = (Cast_filt_t*) self;
+
+  if (buffer == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  snprintf(buffer, buffer_size,
+           "Cast Filter: %s\n"
+           "  Input dtype: %d\n"
+           "  Output dtype: %d\n"
+           "  Scale: %g\n"
+           "  Saturate: %s\n"
+           "  Kernels: %s\n"
+           "  Running: %s\n"
+           "  Batches processed: %zu",
+           self->name, self->input_buffers[0]->dtype, f->out_dtype,
+           (double) f->scale, f->saturate ? "true" : "false",
+           kern_isa_name(kern_ops()->isa), self->running ? "true" : "false",
+           self->metrics.n_batches);
+
+  return Bp_EC_OK;
+}
+
+Bp_EC cast_init(Cast_filt_t* f, Cast_config_t config)
+{
+  if (f == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+  if (!cast_dtype_supported(config.buff_config.dtype) ||
+      !cast_dtype_supported(config.out_dtype)) {
+    return Bp_EC_TYPE_ERROR;
+  }
+
+  float scale = config.scale == 0.0f ? 1.0f : config.scale;
+  bool has_float = config.buff_config.dtype == DTYPE_FLOAT ||
+                   config.out_dtype == DTYPE_FLOAT;
+  if (scale != scale || (!has_float && scale != 1.0f)) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  Core_filt_config_t core_config = {
+      .name = config.name,
+      .filt_type = FILT_T_CAST,
+      .size = sizeof(Cast_filt_t),
+      .n_inputs = 1,
+      .max_supported_sinks = 1,
+      .buff_config = config.buff_config,
+      .timeout_us = config.timeout_us,
+      .worker = cast_worker,
+  };
+
+  Bp_EC err = filt_init(&f->base, core_config);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  f->out_dtype = config.out_dtype;
+  f->scale = scale;
+  f->saturate = config.saturate;
+  f->input_consumed = 0;
+
+  f->base.ops.describe = cast_describe;
+
+  // Input constraints come from the buffer; accepts partial batches
+  prop_constraints_from_buffer_append(&f->base, &config.buff_config, true);
+
+  // The one filter whose output type differs from its input type
+  SampleDtype_t out_dtype = config.out_dtype;
+  prop_append_behavior(&f->base, PROP_DATA_TYPE, BEHAVIOR_OP_SET, &out_dtype,
+                       OUTPUT_ALL);
+  prop_append_behavior(&f->base, PROP_SAMPLE_PERIOD_NS, BEHAVIOR_OP_PRESERVE,
+                       NULL, OUTPUT_ALL);
+
+  uint32_t min_batch = 1;
+  uint32_t max_batch = 1U << config.buff_config.batch_capacity_expo;
+  prop_append_behavior(&f->base, PROP_MIN_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &min_batch, OUTPUT_ALL);
+  prop_append_behavior(&f->base, PROP_MAX_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &max_batch, OUTPUT_ALL);
+
+  f->base.output_properties[0] = prop_propagate(NULL, 0, &f->base.contract, 0);
+
+  return Bp_EC_OK;
+}
@@ -0,0 +1,41 @@
+#ifndef CAST_H
+#define CAST_H
+
+#include <stdbool.h>
+#include "bperr.h"
+#include "core.h"
+
+/* Type conversion filter (FILT_T_CAST).
+ *
+ * Converts every sample from the input buffer's dtype to 'out_dtype', for
+ * any pair of DTYPE_FLOAT, DTYPE_I32 and DTYPE_U32, using the conversion
+ * kernels in kernels.h. The sink must be of 'out_dtype'.
+ *
+ * Conversions to or from float multiply by 'scale' on the way (ADC counts
+ * to volts and back, say): out = in * scale, with the product formed in
+ * float. Float to integer rounds to nearest and always saturates, with NaN
+ * giving 0. Between I32 and U32 'saturate' clamps to the output range;
+ * otherwise the bits are kept as they are (two's complement wrap). Integer
+ * to integer casts take no scale.
+ */
+
+typedef struct _Cast_config_t {
+  const char* name;
+  BatchBuffer_config buff_config;  // Input buffer; its dtype is the input type
+  SampleDtype_t out_dtype;
+  float scale;    // 0 is taken as 1
+  bool saturate;  // I32 <-> U32 only: clamp instead of wrapping
+  long timeout_us;
+} Cast_config_t;
+
+typedef struct _Cast_filt_t {
+  Filter_t base;
+  SampleDtype_t out_dtype;
+  float scale;
+  bool saturate;
+  size_t input_consumed;  // Samples used from the current input batch
+} Cast_filt_t;
+
+Bp_EC cast_init(Cast_filt_t* f, Cast_config_t config);
+
+#endif /* CAST_H */
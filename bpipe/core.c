@@ -4,6 +4,7 @@
 #include "batch_buffer.h"
 #include "batch_matcher.h"
 #include "bperr.h"
+#include "scheduler.h"
 #define _GNU_SOURCE /* See feature_test_macros(7) */  // NOLINT(bugprone-reserved-identifier)
 #include <pthread.h>
 
@@ -60,20 +61,32 @@ static Bp_EC default_sink_connect(Filter_t* self, size_t output_port,
   }
 
   // Type checking: If filter has input buffers, check type compatibility
-  // This assumes that filters with inputs should output the same type
+  // This assumes that filters with inputs should output the same type, unless
+  // they declare another one in their output properties (e.g. a cast)
   if (self->n_input_buffers > 0 && self->input_buffers[0] != NULL) {
-    if (sink->dtype != self->input_buffers[0]->dtype) {
+    SampleDtype_t out_dtype = self->input_buffers[0]->dtype;
+    if (output_port < MAX_OUTPUTS) {
+      prop_get_dtype(&self->output_properties[output_port], &out_dtype);
+    }
+    if (sink->dtype != out_dtype) {
       pthread_mutex_unlock(&self->filter_mutex);
       return Bp_EC_DTYPE_MISMATCH;
     }
   }
 
+  // Only multi-producer buffers may be written by more than one filter
+  if (!sink->multi_producer && atomic_load(&sink->n_producers) > 0) {
+    pthread_mutex_unlock(&self->filter_mutex);
+    return Bp_EC_CONNECTION_OCCUPIED;
+  }
+
   // Note: Property validation should be done at a higher level where we have
   // access to both the source and destination filters. For now, we skip
   // property validation here.
 
   self->sinks[output_port] = sink;
   self->n_sinks++;
+  atomic_fetch_add(&sink->n_producers, 1);
 
   // Special handling for BatchMatcher auto-detection
   if (self->filt_type == FILT_T_BATCH_MATCHER && output_port == 0) {
@@ -228,10 +241,12 @@ Bp_EC filt_init(Filter_t* f, Core_filt_config_t config)
   }
   f->n_input_buffers = config.n_inputs;
 
-  if (config.worker == NULL) {
+  /* Filters with a step function may run on a scheduler only */
+  if (config.worker == NULL && config.step == NULL) {
     return Bp_EC_INVALID_CONFIG_WORKER;
   }
   f->worker = config.worker;
+  f->step = config.step;
 
   // Allocate and initialize input buffers
   for (int i = 0; i < config.n_inputs; i++) {
@@ -255,6 +270,7 @@ Bp_EC filt_init(Filter_t* f, Core_filt_config_t config)
       }
       return rc;
     }
+    f->input_buffers[i]->consumer_mutates = config.mutates_input;
   }
 
   // Initialize remaining pointers to NULL
@@ -383,6 +399,7 @@ Bp_EC filt_sink_disconnect(Filter_t* f, size_t sink_idx)
   pthread_mutex_lock(&f->filter_mutex);
 
   if (f->sinks[sink_idx] != NULL) {
+    atomic_fetch_sub(&f->sinks[sink_idx]->n_producers, 1);
     f->sinks[sink_idx] = NULL;
     f->n_sinks--;
   }
@@ -414,6 +431,16 @@ Bp_EC filt_start(Filter_t* f)
     return Bp_EC_ALREADY_RUNNING;
   }
 
+  // Scheduled filters run as tasks on the scheduler's worker pool
+  if (f->sched_task != NULL) {
+    for (int i = 0; i < f->n_input_buffers; i++) {
+      if (f->input_buffers[i] && f->input_buffers[i]->multi_producer) {
+        bb_start(f->input_buffers[i]);
+      }
+    }
+    return sched_filter_start(f);
+  }
+
   // If no worker thread, just mark as running and return
   if (f->worker == NULL) {
     f->running = true;
@@ -422,6 +449,13 @@ Bp_EC filt_start(Filter_t* f)
 
   f->running = true;
 
+  // Re-arm shared inputs - a forced return from the last stop is sticky
+  for (int i = 0; i < f->n_input_buffers; i++) {
+    if (f->input_buffers[i] && f->input_buffers[i]->multi_producer) {
+      bb_start(f->input_buffers[i]);
+    }
+  }
+
   if (pthread_create(&f->worker_thread, NULL, f->worker, (void*) f) != 0) {
     f->running = false;
     return Bp_EC_THREAD_CREATE_FAIL;
@@ -461,9 +495,16 @@ Bp_EC filt_stop(Filter_t* f)
     }
   }
 
-  // Force return on output buffers to wake up this filter if blocked
+  // A scheduled step never blocks - just wait for it to return
+  if (f->sched_task != NULL) {
+    return sched_filter_stop(f);
+  }
+
+  // Force return on output buffers to wake up this filter if blocked. A shared
+  // (multi-producer) sink is skipped: forcing it would stop every producer,
+  // and this filter is released as soon as the consumer drains or stops.
   for (int i = 0; i < f->n_sinks; i++) {
-    if (f->sinks[i] != NULL) {
+    if (f->sinks[i] != NULL && !f->sinks[i]->multi_producer) {
       bb_force_return_head(f->sinks[i], Bp_EC_FILTER_STOPPING);
     }
   }
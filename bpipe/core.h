@@ -38,19 +38,21 @@ typedef enum _CORE_FILT_T {
                      samples.*/
   FILT_T_MATCHED_PASSTHROUGH,
   FILT_T_CAST,             /* Convert one type into another */
-  FILT_T_MAP_STATE = 1,    /* Function will be passed a state scratchpad */
+  FILT_T_MAP_STATE,        /* Function will be passed a state scratchpad */
   FILT_T_MAP_MP,           /* Map will be applied to batches in paralel.*/
   FILT_T_SIMO_TEE,         /* Map a single input to multiple consumers */
   FILT_T_MIMO_SYNCRONISER, /* Produce batches aligned to the same sample times
                             */
   FILT_T_MISO_ELEMENTWISE, /* Map multiple inputs to a single ouptput, assumes
                               time alignment. */
-  FILT_T_OVERLAP_BATCHES,  /* Used to create repeating regions at the start of
-                              the batch. Used for batched convolution.*/
+  FILT_T_OVERLAP_BATCHES,  /* Batched (FIR) convolution; the region repeated
+                              between batches is held by the filter */
   FILT_T_BATCH_MATCHER,  /* Matches batch sizes and zeros phase for element-wise
                             ops */
   FILT_T_SAMPLE_ALIGNER, /* Corrects phase offset in regular data to align to
                             sample grid */
+  FILT_T_RESAMPLER,      /* Rational (L/M) sample rate conversion */
+  FILT_T_RATE_LIMIT,     /* Paces batches to a samples/s or batches/s budget */
   FILT_T_PIPELINE,       /* Container for filter DAGs */
   FILT_T_MAX,            /* Overflow guard. */
 } CORE_FILT_T;
@@ -107,6 +109,20 @@ typedef struct _FilterOps {
  */
 typedef void *(Worker_t) (void *);
 
+/* Run-to-yield entry point used by the cooperative scheduler (scheduler.h).
+ * A step must never block. It handles at most SCHED_STEP_BATCHES batches and
+ * returns:
+ *   Bp_EC_OK       - progress was made, run again when a worker is free
+ *   Bp_EC_NOINPUT  - waiting for an input batch
+ *   Bp_EC_NOSPACE  - waiting for space in an output buffer
+ *   Bp_EC_COMPLETE - end of stream, the filter stops
+ *   anything else  - error, recorded in worker_err_info and the filter stops
+ */
+typedef Bp_EC(Step_t)(struct _Filter_t *self);
+
+/* Batches a step should handle before yielding to other filters */
+#define SCHED_STEP_BATCHES 16
+
 typedef struct _Core_filt_config_t {
   const char *name;
   CORE_FILT_T filt_type;
@@ -117,11 +133,17 @@ typedef struct _Core_filt_config_t {
   BatchBuffer_config buff_config;
   long timeout_us;
   Worker_t *worker;
+  Step_t *step;        // optional, lets the filter run on a scheduler
+  bool mutates_input;  // worker writes into input batches in place, so
+                       // fan-out filters must hand it a private copy
 } Core_filt_config_t;
 
 typedef struct _Filt_metrics {
   size_t n_batches;
   size_t samples_processed;
+  // Scheduled filters only, updated by whichever pool thread ran the step
+  _Atomic uint64_t run_time_ns;  // Time spent in step()
+  _Atomic size_t n_runs;         // Number of step() calls
 } Filt_metrics;
 
 typedef struct _Filter_t {
@@ -130,6 +152,8 @@ typedef struct _Filter_t {
   CORE_FILT_T filt_type;
   atomic_bool running;
   Worker_t *worker;
+  Step_t *step;                    // Non-blocking worker for the scheduler
+  struct _Sched_task *sched_task;  // Set while owned by a scheduler
   Err_info worker_err_info;
   Filt_metrics metrics;
   unsigned long timeout_us;
@@ -0,0 +1,138 @@
+#define _POSIX_C_SOURCE 200809L  // For mkstemp and fdopen
+#include "csv_index.h"
+#include <stdbool.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+
+#define INDEX_MAGIC "BPCSVIX1"
+#define INDEX_MAGIC_SIZE 8
+
+Bp_EC csv_index_append(CsvIndex_t* index, const CsvIndexEntry_t* entry)
+{
+  if (index->n_entries == index->capacity) {
+    size_t capacity = index->capacity ? 2 * index->capacity : 256;
+    CsvIndexEntry_t* entries =
+        realloc(index->entries, capacity * sizeof(CsvIndexEntry_t));
+    if (!entries) {
+      return Bp_EC_MALLOC_FAIL;
+    }
+    index->entries = entries;
+    index->capacity = capacity;
+  }
+
+  index->entries[index->n_entries++] = *entry;
+  return Bp_EC_OK;
+}
+
+const CsvIndexEntry_t* csv_index_seek(const CsvIndex_t* index, uint64_t t_ns)
+{
+  // Entries [0, lo) are before t_ns, [hi, n) are not
+  size_t lo = 0;
+  size_t hi = index->n_entries;
+  while (lo < hi) {
+    size_t mid = lo + (hi - lo) / 2;
+    if (index->entries[mid].t_ns < t_ns) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo > 0 ? &index->entries[lo - 1] : NULL;
+}
+
+Bp_EC csv_index_save(const CsvIndex_t* index, const char* path)
+{
+  // A unique name beside 'path', so sources saving at once do not collide
+  size_t path_len = strlen(path);
+  char* tmp_path = malloc(path_len + sizeof(".XXXXXX"));
+  if (!tmp_path) {
+    return Bp_EC_MALLOC_FAIL;
+  }
+  memcpy(tmp_path, path, path_len);
+  memcpy(tmp_path + path_len, ".XXXXXX", sizeof(".XXXXXX"));
+
+  int fd = mkstemp(tmp_path);
+  if (fd < 0) {
+    free(tmp_path);
+    return Bp_EC_INVALID_DATA;
+  }
+  FILE* f = fdopen(fd, "wb");
+  if (!f) {
+    close(fd);
+    remove(tmp_path);
+    free(tmp_path);
+    return Bp_EC_INVALID_DATA;
+  }
+
+  uint64_t n_entries = index->n_entries;
+  bool ok = fwrite(INDEX_MAGIC, INDEX_MAGIC_SIZE, 1, f) == 1 &&
+            fwrite(&index->key, sizeof(CsvIndexKey_t), 1, f) == 1 &&
+            fwrite(&n_entries, sizeof(n_entries), 1, f) == 1 &&
+            (index->n_entries == 0 ||
+             fwrite(index->entries, sizeof(CsvIndexEntry_t), index->n_entries,
+                    f) == index->n_entries);
+  ok = fclose(f) == 0 && ok;
+  ok = ok && rename(tmp_path, path) == 0;
+
+  if (!ok) {
+    remove(tmp_path);
+  }
+  free(tmp_path);
+  return ok ? Bp_EC_OK : Bp_EC_INVALID_DATA;
+}
+
+Bp_EC csv_index_load(CsvIndex_t* index, const char* path,
+                     const CsvIndexKey_t* key)
+{
+  FILE* f = fopen(path, "rb");
+  if (!f) {
+    return Bp_EC_INVALID_DATA;
+  }
+
+  char magic[INDEX_MAGIC_SIZE];
+  CsvIndexKey_t saved_key;
+  uint64_t n_entries;
+  Bp_EC err = Bp_EC_INVALID_DATA;
+
+  if (fread(magic, INDEX_MAGIC_SIZE, 1, f) != 1 ||
+      memcmp(magic, INDEX_MAGIC, INDEX_MAGIC_SIZE) != 0 ||
+      fread(&saved_key, sizeof(saved_key), 1, f) != 1 ||
+      memcmp(&saved_key, key, sizeof(saved_key)) != 0 ||
+      fread(&n_entries, sizeof(n_entries), 1, f) != 1 ||
+      n_entries > SIZE_MAX / sizeof(CsvIndexEntry_t)) {
+    fclose(f);
+    return err;
+  }
+
+  CsvIndexEntry_t* entries =
+      malloc(n_entries ? n_entries * sizeof(*entries) : sizeof(*entries));
+  if (!entries) {
+    fclose(f);
+    return Bp_EC_MALLOC_FAIL;
+  }
+  // Anything after the entries means the file is not what was written
+  if (fread(entries, sizeof(*entries), n_entries, f) == n_entries &&
+      fgetc(f) == EOF) {
+    csv_index_free(index);
+    index->key = *key;
+    index->entries = entries;
+    index->n_entries = n_entries;
+    index->capacity = n_entries;
+    err = Bp_EC_OK;
+  } else {
+    free(entries);
+  }
+
+  fclose(f);
+  return err;
+}
+
+void csv_index_free(CsvIndex_t* index)
+{
+  free(index->entries);
+  index->entries = NULL;
+  index->n_entries = 0;
+  index->capacity = 0;
+}
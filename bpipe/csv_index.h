@@ -0,0 +1,58 @@
+#ifndef CSV_INDEX_H
+#define CSV_INDEX_H
+
+#include <stddef.h>
+#include <stdint.h>
+#include "bperr.h"
+
+/* Sparse timestamp index of a CSV file, for the CSV source to seek by time.
+ *
+ * An entry is kept about every 'stride' lines: the timestamp of the row
+ * starting there, its byte offset, and how many lines come before it. The
+ * rows are taken to be in timestamp order, so a binary search gives the
+ * entry to scan from for any time, and the scan is at most a stride long.
+ *
+ * An index is saved next to its file in the host's byte order. It records
+ * the file's size and modification time and what the rows were split on, so
+ * a saved index that no longer matches is not loaded.
+ */
+
+typedef struct _CsvIndexEntry_t {
+  uint64_t t_ns;
+  uint64_t offset;  // Start of the row in the file
+  uint64_t line;    // Lines before it, the header included
+} CsvIndexEntry_t;
+
+/* What an index was built from */
+typedef struct _CsvIndexKey_t {
+  uint64_t file_size;
+  int64_t mtime_ns;
+  uint64_t stride;
+  uint64_t ts_column;
+  uint64_t delimiter;
+} CsvIndexKey_t;
+
+typedef struct _CsvIndex_t {
+  CsvIndexKey_t key;
+  CsvIndexEntry_t* entries;
+  size_t n_entries;
+  size_t capacity;
+} CsvIndex_t;
+
+Bp_EC csv_index_append(CsvIndex_t* index, const CsvIndexEntry_t* entry);
+
+/* The last entry before t_ns, from which to scan for the first row at or
+ * after it. NULL if there is none: the scan then starts at the first row. */
+const CsvIndexEntry_t* csv_index_seek(const CsvIndex_t* index, uint64_t t_ns);
+
+/* Saving writes a uniquely named temporary file beside 'path' and renames it
+ * over 'path', so concurrent saves of the same index each land whole, the
+ * last one winning. Loading fails with Bp_EC_INVALID_DATA for a missing,
+ * damaged or stale index, and then leaves 'index' as it was. */
+Bp_EC csv_index_save(const CsvIndex_t* index, const char* path);
+Bp_EC csv_index_load(CsvIndex_t* index, const char* path,
+                     const CsvIndexKey_t* key);
+
+void csv_index_free(CsvIndex_t* index);
+
+#endif /* CSV_INDEX_H */
@@ -0,0 +1,204 @@
+#include "csv_parse.h"
+#include <math.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+#define MAX_MANTISSA_DIGITS 19  // Always fit a uint64_t
+#define EXACT_MANTISSA (1ULL << 53)
+#define MAX_EXACT_EXPONENT 22  // 1e22 is the largest exact power of ten
+// Enough for strtod to round any double correctly, given a sticky digit
+#define MAX_STRTOD_DIGITS 800
+#define MAX_STRTOD_EXPONENT 100000
+
+static const double exact_pow10[MAX_EXACT_EXPONENT + 1] = {
+    1e0,  1e1,  1e2,  1e3,  1e4,  1e5,  1e6,  1e7,  1e8,  1e9,  1e10, 1e11,
+    1e12, 1e13, 1e14, 1e15, 1e16, 1e17, 1e18, 1e19, 1e20, 1e21, 1e22,
+};
+
+static const char* skip_blanks(const char* p, const char* end)
+{
+  while (p < end && (*p == ' ' || *p == '\t')) p++;
+  return p;
+}
+
+static const char* trim_blanks(const char* begin, const char* end)
+{
+  while (end > begin && (end[-1] == ' ' || end[-1] == '\t')) end--;
+  return end;
+}
+
+static bool is_digit(char c) { return (unsigned) (c - '0') < 10; }
+
+/* Case-insensitive match of the whole of [p, end) against lower case 'word' */
+static bool matches_word(const char* p, const char* end, const char* word)
+{
+  for (; *word != '\0'; p++, word++) {
+    if (p == end || (*p | 0x20) != *word) return false;
+  }
+  return p == end;
+}
+
+/* Digits only, no sign. Fails on overflow. */
+static bool parse_digits(const char* p, const char* end, uint64_t* out)
+{
+  if (p == end) return false;
+
+  uint64_t value = 0;
+  for (; p < end; p++) {
+    if (!is_digit(*p)) return false;
+    unsigned d = (unsigned) (*p - '0');
+    if (value > (UINT64_MAX - d) / 10) return false;
+    value = value * 10 + d;
+  }
+  *out = value;
+  return true;
+}
+
+bool csv_parse_u64(const char* begin, const char* end, uint64_t* out)
+{
+  const char* p = skip_blanks(begin, end);
+  end = trim_blanks(p, end);
+  if (p < end && *p == '+') p++;
+  return parse_digits(p, end, out);
+}
+
+bool csv_parse_i64(const char* begin, const char* end, int64_t* out)
+{
+  const char* p = skip_blanks(begin, end);
+  end = trim_blanks(p, end);
+  bool negative = false;
+  if (p < end && (*p == '+' || *p == '-')) {
+    negative = *p == '-';
+    p++;
+  }
+
+  uint64_t magnitude;
+  if (!parse_digits(p, end, &magnitude)) return false;
+  if (negative) {
+    if (magnitude > (uint64_t) INT64_MAX + 1) return false;
+    *out = magnitude == (uint64_t) INT64_MAX + 1 ? INT64_MIN
+                                                 : -(int64_t) magnitude;
+  } else {
+    if (magnitude > INT64_MAX) return false;
+    *out = (int64_t) magnitude;
+  }
+  return true;
+}
+
+/* The digits in [p, end), less any '.', times 10^exponent, by strtod on a
+ * NUL terminated copy. The copy has no decimal point, so the locale does not
+ * matter. Digits past MAX_STRTOD_DIGITS are too small to change the rounding,
+ * other than in breaking a tie, so they are kept as one nonzero digit. */
+static double strtod_digits(const char* p, const char* end, long long exponent)
+{
+  char buf[MAX_STRTOD_DIGITS + 16];
+  size_t n = 0;
+  bool sticky = false;
+
+  for (; p < end; p++) {
+    if (*p == '.' || (n == 0 && *p == '0')) continue;
+    if (n < MAX_STRTOD_DIGITS) {
+      buf[n++] = *p;
+    } else {
+      exponent++;
+      sticky = sticky || *p != '0';
+    }
+  }
+  if (sticky) {
+    buf[n++] = '1';
+    exponent--;
+  }
+
+  if (exponent > MAX_STRTOD_EXPONENT) exponent = MAX_STRTOD_EXPONENT;
+  if (exponent < -MAX_STRTOD_EXPONENT) exponent = -MAX_STRTOD_EXPONENT;
+  snprintf(buf + n, sizeof(buf) - n, "e%lld", exponent);
+  return strtod(buf, NULL);
+}
+
+bool csv_parse_f64(const char* begin, const char* end, double* out)
+{
+  const char* p = skip_blanks(begin, end);
+  end = trim_blanks(p, end);
+  bool negative = false;
+  if (p < end && (*p == '+' || *p == '-')) {
+    negative = *p == '-';
+    p++;
+  }
+
+  if (p < end && !is_digit(*p) && *p != '.') {
+    double special;
+    if (matches_word(p, end, "inf") || matches_word(p, end, "infinity")) {
+      special = INFINITY;
+    } else if (matches_word(p, end, "nan")) {
+      special = NAN;
+    } else {
+      return false;
+    }
+    *out = negative ? -special : special;
+    return true;
+  }
+
+  // Significant digits go into the mantissa, and the decimal point and any
+  // digits that do not fit move the exponent
+  const char* digits = p;
+  uint64_t mantissa = 0;
+  int n_digits = 0;
+  int exponent = 0;
+  long long n_fraction = 0;
+  bool any_digits = false;
+
+  for (; p < end && is_digit(*p); p++) {
+    any_digits = true;
+    if (n_digits < MAX_MANTISSA_DIGITS) {
+      mantissa = mantissa * 10 + (uint64_t) (*p - '0');
+      n_digits += mantissa != 0;
+    } else {
+      exponent++;
+    }
+  }
+  if (p < end && *p == '.') {
+    for (p++; p < end && is_digit(*p); p++) {
+      any_digits = true;
+      n_fraction++;
+      if (n_digits < MAX_MANTISSA_DIGITS) {
+        mantissa = mantissa * 10 + (uint64_t) (*p - '0');
+        n_digits += mantissa != 0;
+        exponent--;
+      }
+    }
+  }
+  if (!any_digits) return false;
+  const char* digits_end = p;
+
+  int e = 0;
+  if (p < end && (*p == 'e' || *p == 'E')) {
+    p++;
+    bool negative_exp = false;
+    if (p < end && (*p == '+' || *p == '-')) {
+      negative_exp = *p == '-';
+      p++;
+    }
+    if (p == end) return false;
+    for (; p < end && is_digit(*p); p++) {
+      if (e < MAX_STRTOD_EXPONENT) e = e * 10 + (*p - '0');
+    }
+    e = negative_exp ? -e : e;
+    exponent += e;
+  }
+  if (p != end) return false;
+
+  double value;
+  if (mantissa == 0) {
+    value = 0.0;
+  } else if (mantissa <= EXACT_MANTISSA && exponent >= -MAX_EXACT_EXPONENT &&
+             exponent <= MAX_EXACT_EXPONENT) {
+    // Both operands are exact, so one IEEE operation rounds correctly
+    value = exponent >= 0 ? (double) mantissa * exact_pow10[exponent]
+                          : (double) mantissa / exact_pow10[-exponent];
+  } else {
+    value = strtod_digits(digits, digits_end, (long long) e - n_fraction);
+  }
+
+  *out = negative ? -value : value;
+  return true;
+}
@@ -0,0 +1,27 @@
+#ifndef CSV_PARSE_H
+#define CSV_PARSE_H
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+/* Number parsing for the CSV source.
+ *
+ * Each parser converts the whole of the byte range [begin, end), which need
+ * not be NUL terminated, and returns false if it is not a number of that
+ * type. Blanks (space and tab) are allowed either side. The parsers ignore
+ * the locale: the decimal separator is always '.'.
+ *
+ * csv_parse_f64 accepts what strtod does for decimal input: an optional
+ * sign, digits with an optional '.', an optional exponent, and inf, infinity
+ * and nan in any case, and rounds as it does. Up to 15 significant digits
+ * with a decimal exponent within +-22, which covers logged sensor data, are
+ * converted directly; anything else goes through strtod. Hexadecimal floats
+ * are not accepted.
+ */
+
+bool csv_parse_u64(const char* begin, const char* end, uint64_t* out);
+bool csv_parse_i64(const char* begin, const char* end, int64_t* out);
+bool csv_parse_f64(const char* begin, const char* end, double* out);
+
+#endif /* CSV_PARSE_H */
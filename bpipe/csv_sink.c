@@ -115,61 +115,77 @@ static void* csv_sink_worker(void* arg)
     write_csv_header(sink);
   }
 
+  Batch_buff_t* in = sink->base.input_buffers[0];
+
+  // Get data type info
+  size_t data_width = bb_getdatawidth(in->dtype);
+  BP_WORKER_ASSERT(&sink->base, data_width > 0, Bp_EC_UNSUPPORTED_TYPE);
+
   while (atomic_load(&sink->base.running)) {
-    // Get input batch
-    Batch_t* input =
-        bb_get_tail(sink->base.input_buffers[0], sink->base.timeout_us, &err);
-    if (!input) {
+    // Drain every batch that is ready in one pass
+    size_t n_ready =
+        bb_peek_n(in, bb_n_batches(in), sink->base.timeout_us, &err);
+    if (n_ready == 0) {
       if (err == Bp_EC_TIMEOUT) continue;
       if (err == Bp_EC_STOPPED) break;
       break;  // Real error
     }
 
-    // Check for completion
-    if (input->ec == Bp_EC_COMPLETE) {
-      bb_del_tail(sink->base.input_buffers[0]);
-      atomic_store(&sink->base.running, false);  // Stop the filter
-      break;
-    }
+    size_t n_done = 0;
+    bool complete = false;
+    for (; n_done < n_ready; n_done++) {
+      Batch_t* input = bb_get_tail_at(in, n_done);
 
-    // Validate input
-    BP_WORKER_ASSERT(&sink->base, input->ec == Bp_EC_OK, input->ec);
+      // Check for completion
+      if (input->ec == Bp_EC_COMPLETE) {
+        n_done++;
+        complete = true;
+        break;
+      }
 
-    // Get data type info
-    size_t data_width = bb_getdatawidth(sink->base.input_buffers[0]->dtype);
-    BP_WORKER_ASSERT(&sink->base, data_width > 0, Bp_EC_UNSUPPORTED_TYPE);
+      // Validate input
+      if (input->ec != Bp_EC_OK) {
+        bb_release_n(in, n_done);
+        BP_WORKER_ASSERT(&sink->base, false, input->ec);
+      }
 
-    // Process batch data
-    size_t samples = input->head;
-    for (size_t i = 0; i < samples; i++) {
-      // Calculate timestamp for this sample
-      uint64_t sample_time_ns = input->t_ns + i * input->period_ns;
+      // Process batch data
+      size_t samples = input->head;
+      for (size_t i = 0; i < samples; i++) {
+        // Calculate timestamp for this sample
+        uint64_t sample_time_ns = input->t_ns + i * input->period_ns;
 
-      // Calculate data pointer
-      char* data_ptr = ((char*) input->data) + i * data_width;
+        // Calculate data pointer
+        char* data_ptr = ((char*) input->data) + i * data_width;
 
-      // Format and write the CSV line
-      format_csv_line(sink, sample_time_ns, data_ptr);
+        // Format and write the CSV line
+        format_csv_line(sink, sample_time_ns, data_ptr);
 
-      // Check file size limit
-      if (sink->max_file_size_bytes > 0 &&
-          sink->bytes_written >= sink->max_file_size_bytes) {
-        bb_del_tail(sink->base.input_buffers[0]);
-        BP_WORKER_ASSERT(&sink->base, false, Bp_EC_FILE_FULL);
+        // Check file size limit
+        if (sink->max_file_size_bytes > 0 &&
+            sink->bytes_written >= sink->max_file_size_bytes) {
+          bb_release_n(in, n_done + 1);
+          BP_WORKER_ASSERT(&sink->base, false, Bp_EC_FILE_FULL);
+        }
       }
+
+      // Update metrics
+      sink->samples_written += samples;
+      sink->batches_processed++;
+      sink->base.metrics.samples_processed += samples;
+      sink->base.metrics.n_batches++;
     }
 
-    // Flush after each batch for data integrity
+    // Flush once per drained run for data integrity
     fflush(sink->file);
 
-    // Update metrics
-    sink->samples_written += samples;
-    sink->batches_processed++;
-    sink->base.metrics.samples_processed += samples;
-    sink->base.metrics.n_batches++;
+    // Release input batches
+    bb_release_n(in, n_done);
 
-    // Release input batch
-    bb_del_tail(sink->base.input_buffers[0]);
+    if (complete) {
+      atomic_store(&sink->base.running, false);  // Stop the filter
+      break;
+    }
   }
 
   // Close output file
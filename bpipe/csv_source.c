@@ -1,14 +1,21 @@
-#define _GNU_SOURCE  // For strdup // NOLINT(bugprone-reserved-identifier)
+#define _GNU_SOURCE  // For strndup // NOLINT(bugprone-reserved-identifier)
 #include "csv_source.h"
 #include <assert.h>
 #include <errno.h>
+#include <fcntl.h>
 #include <math.h>
 #include <stdlib.h>
 #include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#include "csv_parse.h"
 #include "properties.h"
 #include "utils.h"
 
-#define LINE_BUFFER_SIZE 4096
+// Longest line accepted, excluding the newline. Lines are parsed in place so
+// this is a sanity check on the input rather than a buffer size.
+#define MAX_LINE_LENGTH 4094
 
 // Define specific error codes using existing ones
 #define Bp_EC_FILE_NOT_FOUND Bp_EC_INVALID_CONFIG
@@ -28,9 +35,14 @@
  * - Multi-threaded parsing for large files
  */
 
+// A field of the current line, in the mapped file
+typedef struct {
+  const char* begin;
+  const char* end;
+} CsvField_t;
+
 static Bp_EC parse_header(CsvSource_t* self);
-static Bp_EC parse_line(CsvSource_t* self, char* line, uint64_t* timestamp,
-                        double* values);
+static Bp_EC csvsource_seek_window(CsvSource_t* self, const struct stat* st);
 static void* csvsource_worker(void* arg);
 static Bp_EC csvsource_describe(Filter_t* self, char* buffer, size_t size);
 static Bp_EC csvsource_get_stats(Filter_t* self, void* stats);
@@ -51,6 +63,12 @@ Bp_EC csvsource_init(CsvSource_t* self, CsvSource_config_t config)
       config.regular_threshold_ns ? config.regular_threshold_ns : 1000;
   self->loop = config.loop;
   self->skip_invalid = config.skip_invalid;
+  self->n_parse_threads = config.n_parse_threads;
+  self->chunk_bytes = config.chunk_bytes ? config.chunk_bytes : 1 << 20;
+  self->loop_cache_bytes = config.loop_cache_bytes;
+  self->start_ns = config.start_ns;
+  self->end_ns = config.end_ns;
+  self->index_stride = config.index_stride;
 
   // Store file path
   self->file_path = strdup(config.file_path);
@@ -65,7 +83,8 @@ Bp_EC csvsource_init(CsvSource_t* self, CsvSource_config_t config)
   }
   self->n_data_columns = i;
 
-  if (self->n_data_columns == 0) {
+  if (self->n_data_columns == 0 ||
+      (self->end_ns > 0 && self->end_ns < self->start_ns)) {
     free(self->file_path);
     return Bp_EC_INVALID_CONFIG;
   }
@@ -75,8 +94,8 @@ Bp_EC csvsource_init(CsvSource_t* self, CsvSource_config_t config)
     self->data_column_indices[i] = -1;
   }
 
-  self->file = fopen(config.file_path, "r");
-  if (!self->file) {
+  int fd = open(config.file_path, O_RDONLY);
+  if (fd < 0) {
     free(self->file_path);
     if (errno == ENOENT) {
       return Bp_EC_FILE_NOT_FOUND;
@@ -86,16 +105,29 @@ Bp_EC csvsource_init(CsvSource_t* self, CsvSource_config_t config)
     return Bp_EC_IO_ERROR;
   }
 
-  self->line_buffer_size = LINE_BUFFER_SIZE;
-  self->line_buffer = malloc(self->line_buffer_size);
-  if (!self->line_buffer) {
-    fclose(self->file);
+  // Map the whole file; the mapping outlives the descriptor. An empty file
+  // cannot be mapped, and is simply one with nothing to read.
+  struct stat st;
+  if (fstat(fd, &st) != 0) {
+    close(fd);
     free(self->file_path);
-    return Bp_EC_MALLOC_FAIL;
+    return Bp_EC_IO_ERROR;
+  }
+  self->map_size = (size_t) st.st_size;
+  if (self->map_size > 0) {
+    void* map = mmap(NULL, self->map_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    if (map == MAP_FAILED) {
+      close(fd);
+      free(self->file_path);
+      return Bp_EC_IO_ERROR;
+    }
+    madvise(map, self->map_size, MADV_SEQUENTIAL);
+    self->map = map;
   }
+  close(fd);
+  self->data_end = self->map_size;
 
-  // No longer need timestamp_buffer or data_accumulation_buffer
-  // We write directly to batches now
+  // Samples are parsed straight into the output batches, see store_row()
 
   if (self->has_header) {
     Bp_EC err = parse_header(self);
@@ -105,6 +137,35 @@ Bp_EC csvsource_init(CsvSource_t* self, CsvSource_config_t config)
     }
   }
 
+  if (self->start_ns > 0 || self->end_ns > 0 || self->index_stride > 0) {
+    Bp_EC err = csvsource_seek_window(self, &st);
+    if (err != Bp_EC_OK) {
+      csvsource_destroy(self);
+      return err;
+    }
+  }
+
+  // Two chunks per parse thread keeps each busy while the worker batches
+  if (self->n_parse_threads > 0) {
+    self->n_chunks = 2 * self->n_parse_threads;
+    self->parse_threads = calloc(self->n_parse_threads, sizeof(pthread_t));
+    self->chunks = calloc(self->n_chunks, sizeof(CsvChunk_t));
+    if (!self->parse_threads || !self->chunks) {
+      csvsource_destroy(self);
+      return Bp_EC_MALLOC_FAIL;
+    }
+    if (pthread_mutex_init(&self->chunk_lock, NULL) != 0) {
+      csvsource_destroy(self);
+      return Bp_EC_MUTEX_INIT_FAIL;
+    }
+    if (pthread_cond_init(&self->chunk_progress, NULL) != 0) {
+      pthread_mutex_destroy(&self->chunk_lock);
+      csvsource_destroy(self);
+      return Bp_EC_COND_INIT_FAIL;
+    }
+    self->chunk_sync_ready = true;
+  }
+
   // Create dummy buffer config for unused input buffers
   // Since this is a source filter (n_inputs = 0), this config is never used
   BatchBuffer_config dummy_buff_config = {
@@ -163,70 +224,94 @@ Bp_EC csvsource_init(CsvSource_t* self, CsvSource_config_t config)
   return Bp_EC_OK;
 }
 
-static Bp_EC parse_header(CsvSource_t* self)
+/* Take the line starting at *offset in map[0, limit) and move *offset past
+ * it. The line excludes its newline and a carriage return before that.
+ * Returns false at the limit. */
+static bool next_line(const char* map, size_t limit, size_t* offset,
+                      const char** line, const char** eol)
 {
-  if (!fgets(self->line_buffer, self->line_buffer_size, self->file)) {
-    return Bp_EC_INVALID_DATA;
+  if (*offset >= limit) {
+    return false;
   }
 
-  // Check if header line was truncated
-  size_t len = strlen(self->line_buffer);
-  if (len > 0 && self->line_buffer[len - 1] != '\n' && !feof(self->file)) {
-    return Bp_EC_INVALID_DATA;
-  }
+  const char* begin = map + *offset;
+  const char* end = map + limit;
+  const char* newline = memchr(begin, '\n', (size_t) (end - begin));
+  const char* line_end = newline ? newline : end;
 
-  self->current_line = 1;
-  if (len > 0 && self->line_buffer[len - 1] == '\n') {
-    self->line_buffer[len - 1] = '\0';
+  *offset = newline ? (size_t) (newline + 1 - map) : limit;
+  if (line_end > begin && line_end[-1] == '\r') {
+    line_end--;
   }
 
-  size_t n_columns = 0;
-  char* header_copy = strdup(self->line_buffer);
-  if (!header_copy) {
-    return Bp_EC_MALLOC_FAIL;
+  *line = begin;
+  *eol = line_end;
+  return true;
+}
+
+/* Split [line, eol) at the delimiter into at most max_fields fields, the
+ * last of which runs to the end of the line. Returns the number found. */
+static size_t split_fields(const char* line, const char* eol, char delimiter,
+                           CsvField_t* fields, size_t max_fields)
+{
+  size_t n_fields = 0;
+  const char* p = line;
+
+  while (n_fields < max_fields) {
+    const char* d = memchr(p, delimiter, (size_t) (eol - p));
+    fields[n_fields].begin = p;
+    fields[n_fields].end = d ? d : eol;
+    n_fields++;
+    if (!d) {
+      break;
+    }
+    p = d + 1;
   }
 
-  char* token = strtok(header_copy, &self->delimiter);
-  while (token != NULL && n_columns < BP_CSV_MAX_COLUMNS) {
-    n_columns++;
-    token = strtok(NULL, &self->delimiter);
+  return n_fields;
+}
+
+static Bp_EC parse_header(CsvSource_t* self)
+{
+  const char* line;
+  const char* eol;
+  if (!next_line(self->map, self->map_size, &self->read_offset, &line, &eol) ||
+      eol - line > MAX_LINE_LENGTH) {
+    return Bp_EC_INVALID_DATA;
   }
 
+  self->current_line = 1;
+  self->data_offset = self->read_offset;
+
+  CsvField_t fields[BP_CSV_MAX_COLUMNS];
+  size_t n_columns =
+      split_fields(line, eol, self->delimiter, fields, BP_CSV_MAX_COLUMNS);
+
   self->n_header_columns = n_columns;
-  if (n_columns > 0) {
-    self->header_names = (char**) calloc(n_columns, sizeof(char*));
-    if (!self->header_names) {
-      free(header_copy);
-      return Bp_EC_MALLOC_FAIL;
-    }
-  } else {
-    self->header_names = NULL;
+  self->header_names = (char**) calloc(n_columns, sizeof(char*));
+  if (!self->header_names) {
+    return Bp_EC_MALLOC_FAIL;
   }
 
-  size_t header_len = strlen(self->line_buffer);
-  memcpy(header_copy, self->line_buffer, header_len + 1);
-  token = strtok(header_copy, &self->delimiter);
-  int col_idx = 0;
-
-  while (token != NULL && col_idx < n_columns) {
-    self->header_names[col_idx] = strdup(token);
+  for (size_t col_idx = 0; col_idx < n_columns; col_idx++) {
+    const CsvField_t* field = &fields[col_idx];
+    char* name = strndup(field->begin, (size_t) (field->end - field->begin));
+    if (!name) {
+      return Bp_EC_MALLOC_FAIL;
+    }
+    self->header_names[col_idx] = name;
 
-    if (strcmp(token, self->ts_column_name) == 0) {
-      self->ts_column_index = col_idx;
+    if (strcmp(name, self->ts_column_name) == 0) {
+      self->ts_column_index = (int) col_idx;
     }
 
     for (size_t i = 0; i < self->n_data_columns; i++) {
-      if (strcmp(token, self->data_column_names[i]) == 0) {
-        self->data_column_indices[i] = col_idx;
+      if (strcmp(name, self->data_column_names[i]) == 0) {
+        self->data_column_indices[i] = (int) col_idx;
       }
     }
-
-    token = strtok(NULL, &self->delimiter);
-    col_idx++;
   }
 
-  free(header_copy);
-
   if (self->ts_column_index == -1) {
     return Bp_EC_COLUMN_NOT_FOUND;
   }
@@ -237,63 +322,95 @@ static Bp_EC parse_header(CsvSource_t* self)
     }
   }
 
+  // Rows are only scanned as far as the last column read, and the columns
+  // before it that nothing reads are stepped over
+  self->field_actions[self->ts_column_index] |= CSV_FIELD_TIMESTAMP;
+  self->n_scan_fields = (size_t) self->ts_column_index + 1;
+  for (size_t i = 0; i < self->n_data_columns; i++) {
+    size_t col_idx = (size_t) self->data_column_indices[i];
+    self->field_actions[col_idx] |= CSV_FIELD_DATA;
+    if (col_idx + 1 > self->n_scan_fields) {
+      self->n_scan_fields = col_idx + 1;
+    }
+  }
+
   return Bp_EC_OK;
 }
 
-static Bp_EC parse_line(CsvSource_t* self, char* line, uint64_t* timestamp,
-                        double* values)
+/* Parse a field into slot 'idx' of a sample array of the store's dtype.
+ * Integer outputs take integers directly, and truncate anything else as a
+ * cast from the parsed double would. */
+static bool store_float(const char* begin, const char* end, void* data,
+                        size_t idx)
 {
-  size_t len = strlen(line);
-  if (len > 0 && line[len - 1] == '\n') {
-    line[len - 1] = '\0';
+  double value;
+  if (!csv_parse_f64(begin, end, &value)) {
+    return false;
   }
+  ((float*) data)[idx] = (float) value;
+  return true;
+}
 
-  char* line_copy = strdup(line);
-  if (!line_copy) {
-    return Bp_EC_MALLOC_FAIL;
+static bool store_i32(const char* begin, const char* end, void* data,
+                      size_t idx)
+{
+  int64_t integer;
+  double value;
+  if (csv_parse_i64(begin, end, &integer)) {
+    ((int32_t*) data)[idx] = (int32_t) integer;
+    return true;
   }
-
-  memset(self->parse_buffer, 0, sizeof(self->parse_buffer));
-
-  char* token = strtok(line_copy, &self->delimiter);
-  int col_idx = 0;
-
-  while (token != NULL && col_idx < self->n_header_columns) {
-    if (col_idx == self->ts_column_index) {
-      char* endptr;
-      errno = 0;
-      *timestamp = strtoull(token, &endptr, 10);
-      if (errno != 0 || *endptr != '\0') {
-        free(line_copy);
-        return Bp_EC_INVALID_DATA;
-      }
-    } else {
-      char* endptr;
-      errno = 0;
-      self->parse_buffer[col_idx] = strtod(token, &endptr);
-      if (errno != 0 || *endptr != '\0') {
-        free(line_copy);
-        return Bp_EC_INVALID_DATA;
-      }
-    }
-
-    token = strtok(NULL, &self->delimiter);
-    col_idx++;
+  if (!csv_parse_f64(begin, end, &value)) {
+    return false;
   }
+  ((int32_t*) data)[idx] = (int32_t) value;
+  return true;
+}
 
-  // When n_data_columns == 0, values is NULL but loop doesn't execute
-  for (size_t i = 0; i < self->n_data_columns; i++) {
-    // NOLINTNEXTLINE(clang-analyzer-core.NullDereference)
-    values[i] = self->parse_buffer[self->data_column_indices[i]];
+static bool store_u32(const char* begin, const char* end, void* data,
+                      size_t idx)
+{
+  int64_t integer;
+  double value;
+  if (csv_parse_i64(begin, end, &integer)) {
+    ((uint32_t*) data)[idx] = (uint32_t) integer;
+    return true;
   }
+  if (!csv_parse_f64(begin, end, &value)) {
+    return false;
+  }
+  ((uint32_t*) data)[idx] = (uint32_t) value;
+  return true;
+}
 
-  free(line_copy);
-  return Bp_EC_OK;
+static bool store_nothing(const char* begin, const char* end, void* data,
+                          size_t idx)
+{
+  (void) begin;
+  (void) end;
+  (void) data;
+  (void) idx;
+  return true;
+}
+
+static CsvStoreField_fcn store_field_for(SampleDtype_t dtype)
+{
+  switch (dtype) {
+    case DTYPE_FLOAT:
+      return store_float;
+    case DTYPE_I32:
+      return store_i32;
+    case DTYPE_U32:
+      return store_u32;
+    default:
+      return store_nothing;
+  }
 }
 
 // Define the batch state structure
 typedef struct {
   Batch_t* batches[BP_CSV_MAX_COLUMNS];  // Current batch for each column
+  void* data[BP_CSV_MAX_COLUMNS];        // Their sample arrays
   uint64_t batch_start_time;
   uint64_t expected_delta;
   bool delta_established;
@@ -359,15 +476,16 @@ static Bp_EC submit_and_get_new_batches(CsvSource_t* self, BatchState* state)
     state->batches[col] = bb_get_head(self->base.sinks[col]);
     assert(state->batches[col] != NULL);  // bb_get_head never returns NULL
     state->batches[col]->head = 0;
+    state->data[col] = state->batches[col]->data;
   }
 
   state->delta_established = false;
   return Bp_EC_OK;
 }
 
-// Helper to write sample directly to batches
-static void write_sample_to_batches(CsvSource_t* self, BatchState* state,
-                                    uint64_t timestamp, const double* values)
+// Helper to add the sample parsed into the next slot of each batch
+static void commit_sample_to_batches(CsvSource_t* self, BatchState* state,
+                                     uint64_t timestamp)
 {
   // bb_get_head() returns pointer to pre-allocated buffer
   size_t idx =
@@ -383,112 +501,587 @@ static void write_sample_to_batches(CsvSource_t* self, BatchState* state,
     state->delta_established = true;
   }
 
-  // Write value to each column's batch at current tail position
+  // Increment head (write position) for each column's batch
   for (size_t col = 0; col < self->n_data_columns; col++) {
-    Batch_t* batch = state->batches[col];
+    state->batches[col]->head++;
+  }
+}
+
+/* Find the fields of a row that are read, by header column, and parse its
+ * timestamp. The scan stops at the last column read; fields nobody reads
+ * are only stepped over. */
+static Bp_EC split_row(const CsvSource_t* self, const char* line,
+                       const char* eol, CsvField_t* fields, uint64_t* timestamp)
+{
+  if (self->n_scan_fields == 0) {
+    return Bp_EC_FORMAT_ERROR;  // No header, so no column is known
+  }
+
+  const char* p = line;
+  size_t col_idx = 0;
 
-    switch (self->base.sinks[col]->dtype) {
-      case DTYPE_FLOAT:
-        ((float*) batch->data)[idx] =
-            (float) values[col];  // NOLINT(clang-analyzer-core.NullDereference)
-        break;
-      case DTYPE_I32:
-        ((int32_t*) batch->data)[idx] = (int32_t)
-            values[col];  // NOLINT(clang-analyzer-core.NullDereference)
-        break;
-      case DTYPE_U32:
-        ((uint32_t*) batch->data)[idx] = (uint32_t)
-            values[col];  // NOLINT(clang-analyzer-core.NullDereference)
-        break;
-      default:
-        break;
+  for (;;) {
+    const char* d = memchr(p, self->delimiter, (size_t) (eol - p));
+    if (self->field_actions[col_idx] != CSV_FIELD_SKIP) {
+      fields[col_idx].begin = p;
+      fields[col_idx].end = d ? d : eol;
+    }
+    if (++col_idx == self->n_scan_fields) {
+      break;
+    }
+    if (!d) {
+      return Bp_EC_FORMAT_ERROR;  // Too few fields
     }
+    p = d + 1;
+  }
 
-    // Increment head (write position) for this batch
-    batch->head++;
+  const CsvField_t* ts_field = &fields[self->ts_column_index];
+  if (!csv_parse_u64(ts_field->begin, ts_field->end, timestamp)) {
+    return Bp_EC_PARSE_ERROR;
   }
+  return Bp_EC_OK;
 }
 
-static void* csvsource_worker(void* arg)
+/* Parse a row's data fields into slot 'idx' of each column's array */
+static Bp_EC store_row(const CsvSource_t* self, const CsvField_t* fields,
+                       void* const* data, size_t idx)
 {
-  CsvSource_t* self = (CsvSource_t*) arg;
+  for (size_t col = 0; col < self->n_data_columns; col++) {
+    const CsvField_t* field = &fields[self->data_column_indices[col]];
+    if (!self->store_fields[col](field->begin, field->end, data[col], idx)) {
+      return Bp_EC_PARSE_ERROR;
+    }
+  }
+  return Bp_EC_OK;
+}
 
-  // Validate we have the correct number of sinks connected
-  for (size_t i = 0; i < self->n_data_columns; i++) {
-    BP_WORKER_ASSERT(&self->base, self->base.sinks[i] != NULL, Bp_EC_NO_SINK);
+/* Parse one row straight into the next slot of each column's batch, first
+ * starting new batches if the row's timestamp does not continue the current
+ * ones. The slot is only added to the batches once every field has parsed,
+ * so a bad row leaves them as they were. */
+static Bp_EC parse_row(CsvSource_t* self, BatchState* state, const char* line,
+                       const char* eol, CsvField_t* fields)
+{
+  uint64_t timestamp;
+  Bp_EC err = split_row(self, line, eol, fields, &timestamp);
+  if (err != Bp_EC_OK) {
+    return err;
   }
 
-  // Validate all sinks have the same batch capacity
-  if (self->n_data_columns > 1) {
-    uint8_t expected_capacity_expo = self->base.sinks[0]->batch_capacity_expo;
-    for (size_t i = 1; i < self->n_data_columns; i++) {
-      BP_WORKER_ASSERT(
-          &self->base,
-          self->base.sinks[i]->batch_capacity_expo == expected_capacity_expo,
-          Bp_EC_INVALID_CONFIG);
+  // Check if we need new batches before writing this sample
+  if (need_new_batches(self, state, timestamp)) {
+    err = submit_and_get_new_batches(self, state);
+    if (err != Bp_EC_OK) {
+      return err;
+    }
+  }
+
+  err = store_row(self, fields, state->data, state->batches[0]->head);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  commit_sample_to_batches(self, state, timestamp);
+  return Bp_EC_OK;
+}
+
+/* Index the file: an entry for the first row, then for the first row that
+ * parses after every index_stride lines */
+static Bp_EC build_index(CsvSource_t* self)
+{
+  CsvField_t fields[BP_CSV_MAX_COLUMNS];
+  size_t offset = self->data_offset;
+  size_t row_offset = offset;
+  size_t n_lines = self->current_line;
+  size_t since_entry = self->index_stride;
+  const char* line;
+  const char* eol;
+
+  while (next_line(self->map, self->map_size, &offset, &line, &eol)) {
+    uint64_t timestamp;
+    if (since_entry >= self->index_stride && line != eol &&
+        eol - line <= MAX_LINE_LENGTH &&
+        split_row(self, line, eol, fields, &timestamp) == Bp_EC_OK) {
+      CsvIndexEntry_t entry = {
+          .t_ns = timestamp, .offset = row_offset, .line = n_lines};
+      Bp_EC err = csv_index_append(&self->index, &entry);
+      if (err != Bp_EC_OK) {
+        return err;
+      }
+      since_entry = 0;
     }
+    since_entry++;
+    n_lines++;
+    row_offset = offset;
   }
 
-  double* value_buffer = NULL;
-  if (self->n_data_columns > 0) {
-    value_buffer = malloc(self->n_data_columns * sizeof(double));
-    BP_WORKER_ASSERT(&self->base, value_buffer != NULL, Bp_EC_MALLOC_FAIL);
+  return Bp_EC_OK;
+}
+
+/* Load the index saved with the file, or build one and try to save it. A
+ * file that cannot be written next to the data is no reason to fail. */
+static Bp_EC open_index(CsvSource_t* self, const struct stat* st)
+{
+  CsvIndexKey_t key = {.file_size = (uint64_t) st->st_size,
+                       .mtime_ns = (int64_t) st->st_mtim.tv_sec * 1000000000 +
+                                   st->st_mtim.tv_nsec,
+                       .stride = self->index_stride,
+                       .ts_column = (uint64_t) self->ts_column_index,
+                       .delimiter = (uint64_t) (unsigned char) self->delimiter};
+
+  size_t path_len = strlen(self->file_path);
+  char* index_path = malloc(path_len + sizeof(".idx"));
+  if (!index_path) {
+    return Bp_EC_MALLOC_FAIL;
+  }
+  memcpy(index_path, self->file_path, path_len);
+  memcpy(index_path + path_len, ".idx", sizeof(".idx"));
+
+  Bp_EC err = csv_index_load(&self->index, index_path, &key);
+  self->index_loaded = err == Bp_EC_OK;
+  if (!self->index_loaded) {
+    self->index.key = key;
+    err = build_index(self);
+    if (err == Bp_EC_OK) {
+      csv_index_save(&self->index, index_path);
+    }
   }
 
-  BatchState state = {0};
+  free(index_path);
+  return err;
+}
+
+/* Find the first row at or after t_ns, scanning from the index entry before
+ * it, if there is one, or else from the first row. Sets where the row
+ * starts, or the end of the file, and the lines before it. Rows that do not
+ * parse are passed over. */
+static void seek_time(const CsvSource_t* self, uint64_t t_ns, size_t* offset,
+                      size_t* n_lines)
+{
+  CsvField_t fields[BP_CSV_MAX_COLUMNS];
+  size_t next = self->data_offset;
+  size_t lines = self->current_line;
+  const char* line;
+  const char* eol;
+
+  const CsvIndexEntry_t* entry = csv_index_seek(&self->index, t_ns);
+  if (entry && entry->offset > next) {
+    next = entry->offset;
+    lines = entry->line;
+  }
+
+  size_t row = next;
+  while (next_line(self->map, self->map_size, &next, &line, &eol)) {
+    uint64_t timestamp;
+    if (line != eol && eol - line <= MAX_LINE_LENGTH &&
+        split_row(self, line, eol, fields, &timestamp) == Bp_EC_OK &&
+        timestamp >= t_ns) {
+      break;
+    }
+    lines++;
+    row = next;
+  }
+
+  *offset = row;
+  *n_lines = lines;
+}
+
+/* Narrow the rows read to the time window, with the seek index if there is
+ * one: a binary search, then a scan of at most index_stride lines, for each
+ * end of the window */
+static Bp_EC csvsource_seek_window(CsvSource_t* self, const struct stat* st)
+{
+  if (self->index_stride > 0) {
+    Bp_EC err = open_index(self, st);
+    if (err != Bp_EC_OK) {
+      return err;
+    }
+  }
+
+  // The end first, as the start moves the first row read
+  if (self->end_ns > 0 && self->end_ns < UINT64_MAX) {
+    size_t n_lines;
+    seek_time(self, self->end_ns + 1, &self->data_end, &n_lines);
+  }
+  if (self->start_ns > 0) {
+    seek_time(self, self->start_ns, &self->data_offset, &self->current_line);
+    self->read_offset = self->data_offset;
+  }
+
+  return Bp_EC_OK;
+}
+
+/* Read and batch rows on the worker thread, until the end of the file or a
+ * stop */
+static Bp_EC csvsource_read(CsvSource_t* self, BatchState* state)
+{
+  CsvField_t fields[BP_CSV_MAX_COLUMNS];
 
   while (atomic_load(&self->base.running)) {
-    if (!fgets(self->line_buffer, self->line_buffer_size, self->file)) {
-      if (feof(self->file)) {
-        if (self->loop) {
-          fseek(self->file, 0, SEEK_SET);
-          if (self->has_header) {
-            fgets(self->line_buffer, self->line_buffer_size, self->file);
-          }
-          continue;
-        } else {
-          break;  // Exit loop to submit any remaining data
-        }
-      } else {
-        free(value_buffer);
-        BP_WORKER_ASSERT(&self->base, false, Bp_EC_INVALID_DATA);
+    const char* line;
+    const char* eol;
+    if (!next_line(self->map, self->data_end, &self->read_offset, &line,
+                   &eol)) {
+      // Go back to the first row, unless there are none to go back to
+      if (self->loop && self->data_end > self->data_offset) {
+        self->read_offset = self->data_offset;
+        continue;
       }
+      break;
     }
 
-    // Check if line was truncated (no newline and not EOF)
-    size_t len = strlen(self->line_buffer);
-    if (len > 0 && self->line_buffer[len - 1] != '\n' && !feof(self->file)) {
-      free(value_buffer);
-      BP_WORKER_ASSERT(&self->base, false, Bp_EC_INVALID_DATA);
+    if (eol - line > MAX_LINE_LENGTH) {
+      return Bp_EC_INVALID_DATA;
     }
 
     self->current_line++;
+    if (line == eol) {
+      continue;  // Blank line
+    }
 
-    uint64_t timestamp;
-    Bp_EC err = parse_line(self, self->line_buffer, &timestamp, value_buffer);
+    Bp_EC err = parse_row(self, state, line, eol, fields);
+    if (err != Bp_EC_OK && !self->skip_invalid) {
+      return err;
+    }
+  }
+
+  return Bp_EC_OK;
+}
 
+/* Make room for 'capacity' rows in a chunk's arrays */
+static bool reserve_chunk(const CsvSource_t* self, CsvChunk_t* chunk,
+                          size_t capacity)
+{
+  uint64_t* timestamps =
+      realloc(chunk->timestamps, capacity * sizeof(uint64_t));
+  if (!timestamps) {
+    return false;
+  }
+  chunk->timestamps = timestamps;
+
+  for (size_t col = 0; col < self->n_data_columns; col++) {
+    size_t width = bb_getdatawidth(self->base.sinks[col]->dtype);
+    void* column = realloc(chunk->columns[col], capacity * width);
+    if (!column) {
+      return false;
+    }
+    chunk->columns[col] = column;
+  }
+
+  chunk->capacity = capacity;
+  return true;
+}
+
+static void free_chunk(const CsvSource_t* self, CsvChunk_t* chunk)
+{
+  free(chunk->timestamps);
+  chunk->timestamps = NULL;
+  for (size_t col = 0; col < self->n_data_columns; col++) {
+    free(chunk->columns[col]);
+    chunk->columns[col] = NULL;
+  }
+  chunk->capacity = 0;
+}
+
+/* Parse a chunk's rows into its arrays. Invalid rows are dropped with
+ * skip_invalid, and otherwise end the chunk with the reason in chunk->ec. */
+static void parse_chunk(const CsvSource_t* self, CsvChunk_t* chunk)
+{
+  CsvField_t fields[BP_CSV_MAX_COLUMNS];
+  size_t offset = chunk->begin;
+  const char* line;
+  const char* eol;
+
+  chunk->n_rows = 0;
+  chunk->n_lines = 0;
+  chunk->ec = Bp_EC_OK;
+
+  while (next_line(self->map, chunk->end, &offset, &line, &eol)) {
+    if (eol - line > MAX_LINE_LENGTH) {
+      chunk->ec = Bp_EC_INVALID_DATA;
+      return;
+    }
+
+    chunk->n_lines++;
+    if (line == eol) {
+      continue;  // Blank line
+    }
+
+    if (chunk->n_rows == chunk->capacity &&
+        !reserve_chunk(self, chunk,
+                       chunk->capacity ? 2 * chunk->capacity : 1024)) {
+      chunk->ec = Bp_EC_MALLOC_FAIL;
+      return;
+    }
+
+    uint64_t timestamp;
+    Bp_EC err = split_row(self, line, eol, fields, &timestamp);
+    if (err == Bp_EC_OK) {
+      err = store_row(self, fields, chunk->columns, chunk->n_rows);
+    }
     if (err != Bp_EC_OK) {
       if (self->skip_invalid) {
         continue;
-      } else {
-        free(value_buffer);
-        BP_WORKER_ASSERT(&self->base, false, err);
       }
+      chunk->ec = err;
+      return;
     }
+    chunk->timestamps[chunk->n_rows++] = timestamp;
+  }
+}
+
+/* Copy rows [first, last) of a chunk into the current batches, where they
+ * are the last samples added */
+static void copy_rows(const CsvSource_t* self, const BatchState* state,
+                      const CsvChunk_t* chunk, const size_t* widths,
+                      size_t first, size_t last)
+{
+  size_t idx = state->batches[0]->head - (last - first);
+  for (size_t col = 0; col < self->n_data_columns; col++) {
+    memcpy((char*) state->data[col] + idx * widths[col],
+           (const char*) chunk->columns[col] + first * widths[col],
+           (last - first) * widths[col]);
+  }
+}
 
-    // Check if we need new batches before writing this sample
-    // NOLINTNEXTLINE(clang-analyzer-core.CallAndMessage)
-    if (need_new_batches(self, &state, timestamp)) {
-      Bp_EC submit_err = submit_and_get_new_batches(self, &state);
-      if (submit_err != Bp_EC_OK) {
-        free(value_buffer);
-        BP_WORKER_ASSERT(&self->base, false, submit_err);
+/* Batch a parsed chunk's rows exactly as if they had been read on the
+ * worker, then report how its parsing ended. The rows going into each batch
+ * are copied in one block per column. Stops between batches on a stop. */
+static Bp_EC batch_chunk(CsvSource_t* self, BatchState* state,
+                         const CsvChunk_t* chunk)
+{
+  size_t widths[BP_CSV_MAX_COLUMNS];
+  for (size_t col = 0; col < self->n_data_columns; col++) {
+    widths[col] = bb_getdatawidth(self->base.sinks[col]->dtype);
+  }
+
+  size_t first = 0;  // First row not copied yet
+  for (size_t row = 0; row < chunk->n_rows; row++) {
+    uint64_t timestamp = chunk->timestamps[row];
+    if (need_new_batches(self, state, timestamp)) {
+      if (row > first) {
+        copy_rows(self, state, chunk, widths, first, row);
+        first = row;
+      }
+      if (!atomic_load(&self->base.running)) {
+        return Bp_EC_OK;
       }
+      Bp_EC err = submit_and_get_new_batches(self, state);
+      if (err != Bp_EC_OK) {
+        return err;
+      }
+    }
+    commit_sample_to_batches(self, state, timestamp);
+  }
+  if (chunk->n_rows > first) {
+    copy_rows(self, state, chunk, widths, first, chunk->n_rows);
+  }
+
+  self->current_line += chunk->n_lines;
+  return chunk->ec;
+}
+
+/* Claim the next chunk: chunk_bytes on from next_offset, extended to the end
+ * of that line. In loop mode the last chunk is followed by the first rows
+ * again. Called with chunk_lock held. */
+static void claim_chunk(CsvSource_t* self, CsvChunk_t* chunk)
+{
+  size_t begin = self->next_offset;
+  size_t end = self->data_end;
+
+  if (self->data_end - begin > self->chunk_bytes) {
+    size_t from = begin + self->chunk_bytes - 1;
+    const char* newline = memchr(self->map + from, '\n', self->data_end - from);
+    if (newline) {
+      end = (size_t) (newline + 1 - self->map);
+    }
+  }
+
+  self->next_chunk++;
+  chunk->begin = begin;
+  chunk->end = end;
+  chunk->ready = false;
+
+  self->next_offset = end;
+  if (end == self->data_end) {
+    if (self->loop && self->data_end > self->data_offset) {
+      self->next_offset = self->data_offset;
+    } else {
+      self->all_claimed = true;
+    }
+  }
+}
+
+/* Body of the parse threads: claim and parse chunks while the ring has room
+ * and there is file left */
+static void* csvsource_parse_helper(void* arg)
+{
+  CsvSource_t* self = (CsvSource_t*) arg;
+
+  pthread_mutex_lock(&self->chunk_lock);
+  while (!self->pool_stop && !self->all_claimed) {
+    if (self->next_chunk - self->chunks_consumed >= self->n_chunks) {
+      pthread_cond_wait(&self->chunk_progress, &self->chunk_lock);
+      continue;
+    }
+
+    CsvChunk_t* chunk = &self->chunks[self->next_chunk % self->n_chunks];
+    claim_chunk(self, chunk);
+
+    pthread_mutex_unlock(&self->chunk_lock);
+    parse_chunk(self, chunk);
+    pthread_mutex_lock(&self->chunk_lock);
+
+    chunk->ready = true;
+    pthread_cond_broadcast(&self->chunk_progress);
+  }
+  pthread_mutex_unlock(&self->chunk_lock);
+
+  return NULL;
+}
+
+/* Read with the parse threads, batching their chunks in file order on the
+ * worker. Batching is the same code, run on the same rows in the same order,
+ * as when reading on the worker alone, so batch boundaries and timing
+ * detection do not depend on where the chunks were cut. */
+static Bp_EC csvsource_read_parallel(CsvSource_t* self, BatchState* state)
+{
+  size_t start = self->read_offset;
+  if (start >= self->data_end && self->loop &&
+      self->data_end > self->data_offset) {
+    start = self->data_offset;
+  }
+
+  pthread_mutex_lock(&self->chunk_lock);
+  self->next_chunk = 0;
+  self->next_offset = start;
+  self->all_claimed = start >= self->data_end;
+  self->chunks_consumed = 0;
+  self->pool_stop = false;
+  for (size_t i = 0; i < self->n_chunks; i++) {
+    self->chunks[i].ready = false;
+  }
+  pthread_mutex_unlock(&self->chunk_lock);
+
+  size_t n_helpers = 0;
+  while (n_helpers < self->n_parse_threads &&
+         pthread_create(&self->parse_threads[n_helpers], NULL,
+                        csvsource_parse_helper, self) == 0) {
+    n_helpers++;
+  }
+
+  Bp_EC err = n_helpers > 0 ? Bp_EC_OK : Bp_EC_THREAD_CREATE_FAIL;
+
+  pthread_mutex_lock(&self->chunk_lock);
+  while (err == Bp_EC_OK && atomic_load(&self->base.running)) {
+    CsvChunk_t* chunk = &self->chunks[self->chunks_consumed % self->n_chunks];
+    if (self->chunks_consumed == self->next_chunk && self->all_claimed) {
+      break;  // End of file
+    }
+    if (self->chunks_consumed == self->next_chunk || !chunk->ready) {
+      pthread_cond_wait(&self->chunk_progress, &self->chunk_lock);
+      continue;
+    }
+
+    pthread_mutex_unlock(&self->chunk_lock);
+    err = batch_chunk(self, state, chunk);
+    pthread_mutex_lock(&self->chunk_lock);
+
+    self->read_offset = chunk->end;
+    chunk->ready = false;
+    self->chunks_consumed++;
+    pthread_cond_broadcast(&self->chunk_progress);
+  }
+  self->pool_stop = true;
+  pthread_cond_broadcast(&self->chunk_progress);
+  pthread_mutex_unlock(&self->chunk_lock);
+
+  for (size_t i = 0; i < n_helpers; i++) {
+    pthread_join(self->parse_threads[i], NULL);
+  }
+
+  return err;
+}
+
+/* Parse the rows read into 'cache', if they fit in loop_cache_bytes.
+ * Every line is counted as a row, so the check errs on the safe side. */
+static bool csvsource_fill_cache(CsvSource_t* self)
+{
+  size_t row_bytes = sizeof(uint64_t);
+  for (size_t col = 0; col < self->n_data_columns; col++) {
+    row_bytes += bb_getdatawidth(self->base.sinks[col]->dtype);
+  }
+
+  size_t n_lines = 0;
+  size_t offset = self->data_offset;
+  const char* line;
+  const char* eol;
+  while (next_line(self->map, self->data_end, &offset, &line, &eol)) {
+    n_lines++;
+  }
+  if (n_lines == 0 || n_lines > self->loop_cache_bytes / row_bytes ||
+      !reserve_chunk(self, &self->cache, n_lines)) {
+    free_chunk(self, &self->cache);
+    return false;
+  }
+
+  self->cache.begin = self->data_offset;
+  self->cache.end = self->data_end;
+  parse_chunk(self, &self->cache);
+  return true;
+}
+
+/* Loop mode from memory: batch the parsed file over and over, as reading it
+ * again would. Ends if the file has no valid rows to repeat. */
+static Bp_EC csvsource_replay(CsvSource_t* self, BatchState* state)
+{
+  while (atomic_load(&self->base.running)) {
+    Bp_EC err = batch_chunk(self, state, &self->cache);
+    if (err != Bp_EC_OK || self->cache.n_rows == 0) {
+      return err;
+    }
+  }
+  return Bp_EC_OK;
+}
+
+static void* csvsource_worker(void* arg)
+{
+  CsvSource_t* self = (CsvSource_t*) arg;
+
+  // Validate we have the correct number of sinks connected
+  for (size_t i = 0; i < self->n_data_columns; i++) {
+    BP_WORKER_ASSERT(&self->base, self->base.sinks[i] != NULL, Bp_EC_NO_SINK);
+  }
+
+  // Validate all sinks have the same batch capacity
+  if (self->n_data_columns > 1) {
+    uint8_t expected_capacity_expo = self->base.sinks[0]->batch_capacity_expo;
+    for (size_t i = 1; i < self->n_data_columns; i++) {
+      BP_WORKER_ASSERT(
+          &self->base,
+          self->base.sinks[i]->batch_capacity_expo == expected_capacity_expo,
+          Bp_EC_INVALID_CONFIG);
     }
+  }
+
+  for (size_t col = 0; col < self->n_data_columns; col++) {
+    self->store_fields[col] = store_field_for(self->base.sinks[col]->dtype);
+  }
 
-    // Write sample directly to all column batches
-    write_sample_to_batches(self, &state, timestamp, value_buffer);
+  if (self->loop && self->loop_cache_bytes > 0 && !self->cached) {
+    self->cached = csvsource_fill_cache(self);
+  }
+
+  BatchState state = {0};
+  Bp_EC err;
+  if (self->cached) {
+    err = csvsource_replay(self, &state);
+  } else if (self->n_parse_threads > 0) {
+    err = csvsource_read_parallel(self, &state);
+  } else {
+    err = csvsource_read(self, &state);
   }
+  BP_WORKER_ASSERT(&self->base, err == Bp_EC_OK, err);
 
   // Submit any remaining samples
   if (state.batches[0] && state.batches[0]->head > 0) {
@@ -519,8 +1112,6 @@ static void* csvsource_worker(void* arg)
     }
   }
 
-  free(value_buffer);
-
   // Set error code if stopped cleanly (Bp_EC_OK is 0)
   if (self->base.worker_err_info.ec == Bp_EC_OK) {
     self->base.worker_err_info.ec = Bp_EC_STOPPED;
@@ -533,9 +1124,9 @@ void csvsource_destroy(CsvSource_t* self)
 {
   if (!self) return;
 
-  if (self->file) {
-    fclose(self->file);
-    self->file = NULL;
+  if (self->map) {
+    munmap((void*) self->map, self->map_size);
+    self->map = NULL;
   }
 
   if (self->file_path) {
@@ -543,12 +1134,23 @@ void csvsource_destroy(CsvSource_t* self)
     self->file_path = NULL;
   }
 
-  if (self->line_buffer) {
-    free(self->line_buffer);
-    self->line_buffer = NULL;
+  if (self->chunks) {
+    for (size_t i = 0; i < self->n_chunks; i++) {
+      free_chunk(self, &self->chunks[i]);
+    }
+    free(self->chunks);
+    self->chunks = NULL;
+  }
+  free_chunk(self, &self->cache);
+  self->cached = false;
+  csv_index_free(&self->index);
+  free(self->parse_threads);
+  self->parse_threads = NULL;
+  if (self->chunk_sync_ready) {
+    pthread_cond_destroy(&self->chunk_progress);
+    pthread_mutex_destroy(&self->chunk_lock);
+    self->chunk_sync_ready = false;
   }
-
-  // No longer need to free timestamp_buffer or data_accumulation_buffer
 
   if (self->header_names) {
     for (size_t i = 0; i < self->n_header_columns; i++) {
@@ -586,16 +1188,41 @@ static Bp_EC csvsource_describe(Filter_t* self, char* buffer, size_t size)
                         i < source->n_data_columns - 1 ? ", " : "\n");
   }
 
-  snprintf(buffer + written, size - written, "  Regular timing: %s\n",
-           source->detect_regular_timing ? "enabled" : "disabled");
+  written +=
+      snprintf(buffer + written, size - written, "  Regular timing: %s\n",
+               source->detect_regular_timing ? "enabled" : "disabled");
   if (source->is_regular) {
-    snprintf(buffer + written, size - written, "  Detected period: %lu ns\n",
-             source->detected_period_ns);
+    written +=
+        snprintf(buffer + written, size - written,
+                 "  Detected period: %lu ns\n", source->detected_period_ns);
+  }
+  written += snprintf(buffer + written, size - written, "  Loop mode: %s\n",
+                      source->loop ? "enabled" : "disabled");
+  written += snprintf(buffer + written, size - written, "  Skip invalid: %s\n",
+                      source->skip_invalid ? "yes" : "no");
+  if (source->n_parse_threads > 0) {
+    written += snprintf(buffer + written, size - written,
+                        "  Parse threads: %zu, %zu byte chunks\n",
+                        source->n_parse_threads, source->chunk_bytes);
+  }
+  if (source->loop && source->loop_cache_bytes > 0) {
+    written += snprintf(
+        buffer + written, size - written, "  Loop cache: up to %zu bytes, %s\n",
+        source->loop_cache_bytes,
+        source->cached ? "replaying from memory" : "not in use");
+  }
+  if (source->start_ns > 0 || source->end_ns > 0) {
+    written += snprintf(buffer + written, size - written,
+                        "  Window: %llu to %llu ns\n",
+                        (unsigned long long) source->start_ns,
+                        (unsigned long long) source->end_ns);
+  }
+  if (source->index_stride > 0) {
+    snprintf(buffer + written, size - written,
+             "  Seek index: %zu entries every %zu lines, %s\n",
+             source->index.n_entries, source->index_stride,
+             source->index_loaded ? "loaded" : "built");
   }
-  snprintf(buffer + written, size - written, "  Loop mode: %s\n",
-           source->loop ? "enabled" : "disabled");
-  snprintf(buffer + written, size - written, "  Skip invalid: %s\n",
-           source->skip_invalid ? "yes" : "no");
 
   return Bp_EC_OK;
 }
@@ -1,8 +1,10 @@
 #ifndef CSV_SOURCE_H
 #define CSV_SOURCE_H
 
+#include <pthread.h>
 #include <stdio.h>
 #include "core.h"
+#include "csv_index.h"
 
 #define BP_CSV_MAX_COLUMNS 64
 
@@ -21,23 +23,75 @@ typedef struct _CsvSource_config_t {
   bool loop;
   bool skip_invalid;
   long timeout_us;
+
+  // Parallel parsing: the file is cut into newline aligned chunks of about
+  // chunk_bytes, which n_parse_threads helpers parse ahead of the worker.
+  // The worker batches them in file order. 0 threads = parse on the worker.
+  size_t n_parse_threads;
+  size_t chunk_bytes;  // 0 = 1 MiB
+
+  // Loop mode: parse the file once and replay the parsed rows from memory,
+  // if they fit in loop_cache_bytes. 0 = re-parse the file every pass.
+  size_t loop_cache_bytes;
+
+  // Time window: the rows from the first at or after start_ns up to the
+  // last at or before end_ns (0 = to the end of the file). Loop mode
+  // replays the window. The rows must be in timestamp order.
+  uint64_t start_ns;
+  uint64_t end_ns;
+  // Seek index for the window, an entry about every index_stride lines,
+  // kept in "<file_path>.idx". 0 = no index: the window is found by a scan.
+  size_t index_stride;
 } CsvSource_config_t;
 
+/* Rows of one chunk, parsed by a helper thread into an array per column in
+ * the dtype of that column's sink */
+typedef struct _CsvChunk_t {
+  size_t begin;  // Byte range in the file, whole lines
+  size_t end;
+  bool ready;     // Parsed, waiting to be batched
+  size_t n_rows;  // Valid rows parsed
+  size_t n_lines;
+  // Not OK if parsing stopped at an invalid row, after n_rows good ones
+  Bp_EC ec;
+  size_t capacity;  // Rows allocated
+  uint64_t* timestamps;
+  void* columns[BP_CSV_MAX_COLUMNS];
+} CsvChunk_t;
+
+/* What the row scan does with each header column, resolved once from the
+ * header. The timestamp may also be a data column. */
+typedef enum _CsvFieldAction_e {
+  CSV_FIELD_SKIP = 0,  // Stepped over, never converted
+  CSV_FIELD_TIMESTAMP = 1 << 0,
+  CSV_FIELD_DATA = 1 << 1,
+} CsvFieldAction_e;
+
+/* Parse [begin, end) into slot 'idx' of a sample array, false if invalid */
+typedef bool (*CsvStoreField_fcn)(const char* begin, const char* end,
+                                  void* data, size_t idx);
+
 typedef struct _CsvSource_t {
   Filter_t base;
 
-  FILE* file;
+  // The file is mapped read only and parsed in place
+  const char* map;
+  size_t map_size;
+  size_t data_offset;  // First row read, after the header
+  size_t data_end;     // Past the last row read
+  size_t read_offset;  // Start of the next line to parse
   char* file_path;
-  char* line_buffer;
-  size_t line_buffer_size;
 
   int ts_column_index;
   int data_column_indices[BP_CSV_MAX_COLUMNS];
   size_t n_data_columns;
   char** header_names;
   size_t n_header_columns;
+  uint8_t field_actions[BP_CSV_MAX_COLUMNS];  // CsvFieldAction_e flags
+  size_t n_scan_fields;  // Fields a row is scanned to, the last one read
+  // Per data column, for its sink's dtype. Set when the worker starts.
+  CsvStoreField_fcn store_fields[BP_CSV_MAX_COLUMNS];
 
-  double parse_buffer[BP_CSV_MAX_COLUMNS];
   size_t current_line;
 
   bool is_regular;
@@ -57,6 +111,33 @@ typedef struct _CsvSource_t {
   bool loop;
   bool skip_invalid;
 
+  // Parallel parsing, see csvsource_read_parallel(). Chunks go round a
+  // ring of n_chunks slots; 'chunk_lock' protects the ring and counters.
+  size_t n_parse_threads;
+  size_t chunk_bytes;
+  pthread_t* parse_threads;
+  CsvChunk_t* chunks;
+  size_t n_chunks;
+  pthread_mutex_t chunk_lock;
+  pthread_cond_t chunk_progress;
+  bool chunk_sync_ready;   // chunk_lock and chunk_progress initialised
+  size_t next_chunk;       // Sequence number of the next chunk to claim
+  size_t next_offset;      // Where it starts
+  bool all_claimed;        // The end of the file has been claimed
+  size_t chunks_consumed;  // Chunks batched by the worker
+  bool pool_stop;
+
+  // Loop replay, see csvsource_replay(). The whole file, parsed.
+  size_t loop_cache_bytes;
+  CsvChunk_t cache;
+  bool cached;
+
+  // Time window, see csvsource_seek_window()
+  uint64_t start_ns;
+  uint64_t end_ns;
+  size_t index_stride;
+  CsvIndex_t index;
+  bool index_loaded;  // From the sidecar file, rather than built
 } CsvSource_t;
 
 Bp_EC csvsource_init(CsvSource_t* self, CsvSource_config_t config);
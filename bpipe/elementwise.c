@@ -0,0 +1,281 @@
+#include "elementwise.h"
+#include <stdbool.h>
+#include <stdio.h>
+#include "batch_buffer.h"
+#include "utils.h"
+
+static bool ew_is_comparison(Kern_binop_t op)
+{
+  return op >= KERN_EQ && op <= KERN_GE;
+}
+
+/* out = a op b over n samples of the given type */
+static void ew_apply(Kern_binop_t op, SampleDtype_t dtype, const void* a,
+                     const void* b, void* out, size_t n)
+{
+  switch (dtype) {
+    case DTYPE_FLOAT:
+      kern_binop_f32(op, (const float*) a, (const float*) b, (float*) out, n);
+      break;
+    case DTYPE_I32:
+      kern_binop_i32(op, (const int32_t*) a, (const int32_t*) b,
+                     (int32_t*) out, n);
+      break;
+    case DTYPE_U32:
+      kern_binop_u32(op, (const uint32_t*) a, (const uint32_t*) b,
+                     (uint32_t*) out, n);
+      break;
+    default:
+      break;
+  }
+}
+
+/* Record why the worker failed */
+static void ew_fail(Elementwise_filt_t* f, Bp_EC err, const char* msg)
+{
+  f->base.worker_err_info.ec = err;
+  f->base.worker_err_info.err_msg = msg;
+}
+
+/* Samples of 'f's inputs must line up: same period, and the same timestamp
+ * for the next unconsumed sample of each */
+static bool ew_inputs_aligned(Elementwise_filt_t* f, Batch_t** inputs)
+{
+  const unsigned period_ns = inputs[0]->period_ns;
+  if (period_ns == 0) {
+    return true;  // No timing to check - aligned by position
+  }
+  const long long t_ns = inputs[0]->t_ns +
+                         (long long) f->input_consumed[0] * period_ns;
+  for (int i = 1; i < f->base.n_input_buffers; i++) {
+    if (inputs[i]->period_ns != period_ns ||
+        inputs[i]->t_ns + (long long) f->input_consumed[i] * period_ns !=
+            t_ns) {
+      return false;
+    }
+  }
+  return true;
+}
+
+static void* elementwise_worker(void* arg)
+{
+  Elementwise_filt_t* f = (Elementwise_filt_t*) arg;
+  Filter_t* base = &f->base;
+  Batch_buff_t* sink = base->sinks[0];
+  Batch_t* inputs[MAX_INPUTS] = {NULL};
+  Batch_t* output = NULL;
+  Bp_EC err = Bp_EC_OK;
+
+  const SampleDtype_t dtype = base->input_buffers[0]->dtype;
+  if (!sink || sink->dtype != dtype) {
+    ew_fail(f, Bp_EC_DTYPE_MISMATCH, "Sink dtype must match the inputs");
+    atomic_store(&base->running, false);
+    return NULL;
+  }
+
+  const size_t data_width = bb_getdatawidth(dtype);
+  const size_t batch_size = bb_batch_size(sink);
+  const int n_inputs = base->n_input_buffers;
+  bool complete = false;
+
+  while (atomic_load(&base->running)) {
+    // Hold a tail batch from every input; keep the ones we have on timeout.
+    // A timed out input doesn't stop us polling the rest, as any of them may
+    // be the one that completes the stream.
+    bool have_all = true;
+    for (int i = 0; i < n_inputs; i++) {
+      if (inputs[i] != NULL) continue;
+      inputs[i] = bb_get_tail(base->input_buffers[i], base->timeout_us, &err);
+      if (inputs[i] == NULL) {
+        have_all = false;
+        if (err != Bp_EC_TIMEOUT) break;
+        err = Bp_EC_OK;
+        continue;
+      }
+      f->input_consumed[i] = 0;
+      if (inputs[i]->ec == Bp_EC_COMPLETE) {
+        complete = true;
+      }
+    }
+    if (err != Bp_EC_OK || complete) break;
+    if (!have_all) continue;
+
+    if (!ew_inputs_aligned(f, inputs)) {
+      err = Bp_EC_PHASE_ERROR;
+      ew_fail(f, err, "Inputs are not time aligned. Use BatchMatcher.");
+      break;
+    }
+
+    if (output == NULL) {
+      output = bb_get_head(sink);
+      if (output == NULL) {
+        err = Bp_EC_GET_HEAD_NULL;
+        ew_fail(f, err, NULL);
+        break;
+      }
+      output->head = 0;
+      output->ec = Bp_EC_OK;
+    }
+
+    // Samples every input can supply, up to the space in the output batch
+    size_t n = batch_size - output->head;
+    for (int i = 0; i < n_inputs; i++) {
+      n = MIN(n, inputs[i]->head - f->input_consumed[i]);
+    }
+
+    if (n > 0) {
+      if (output->head == 0) {
+        output->t_ns = inputs[0]->t_ns +
+                       (long long) f->input_consumed[0] * inputs[0]->period_ns;
+        output->period_ns = inputs[0]->period_ns;
+      }
+
+      // Fold left, accumulating in the output batch itself
+      void* out = (char*) output->data + output->head * data_width;
+      for (int i = 1; i < n_inputs; i++) {
+        const void* acc =
+            i == 1 ? (const char*) inputs[0]->data +
+                         f->input_consumed[0] * data_width
+                   : out;
+        ew_apply(f->op, dtype, acc,
+                 (const char*) inputs[i]->data +
+                     f->input_consumed[i] * data_width,
+                 out, n);
+      }
+
+      for (int i = 0; i < n_inputs; i++) {
+        f->input_consumed[i] += n;
+      }
+      output->head += n;
+      base->metrics.samples_processed += n;
+    }
+
+    // Release exhausted inputs
+    for (int i = 0; i < n_inputs && err == Bp_EC_OK; i++) {
+      if (f->input_consumed[i] >= inputs[i]->head) {
+        err = bb_del_tail(base->input_buffers[i]);
+        inputs[i] = NULL;
+      }
+    }
+    if (err != Bp_EC_OK) break;
+
+    if (output->head >= batch_size) {
+      err = bb_submit(sink, base->timeout_us);
+      if (err != Bp_EC_OK) break;
+      output = NULL;
+      base->metrics.n_batches++;
+    }
+  }
+
+  // Flush the partial batch, then pass completion downstream
+  if (output != NULL && output->head > 0 &&
+      bb_submit(sink, base->timeout_us) == Bp_EC_OK) {
+    base->metrics.n_batches++;
+  }
+  if (complete) {
+    for (int i = 0; i < n_inputs; i++) {
+      if (inputs[i] != NULL && inputs[i]->ec == Bp_EC_COMPLETE) {
+        bb_del_tail(base->input_buffers[i]);
+      }
+    }
+    Batch_t* done = bb_get_head(sink);
+    if (done != NULL) {
+      done->head = 0;
+      done->ec = Bp_EC_COMPLETE;
+      bb_submit(sink, base->timeout_us);
+    }
+    return NULL;
+  }
+
+  if (err != Bp_EC_OK && err != Bp_EC_STOPPED &&
+      err != Bp_EC_FILTER_STOPPING) {
+    if (base->worker_err_info.ec == Bp_EC_OK) {
+      ew_fail(f, err, NULL);
+    }
+    atomic_store(&base->running, false);  // Stop filter on error
+  }
+
+  return NULL;
+}
+
+static Bp_EC elementwise_describe(Filter_t* self, char* buffer,
+                                  size_t buffer_size)
+{
+  Elementwise_filt_t* f = (Elementwise_filt_t*) self;
+
+  if (buffer == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  snprintf(buffer, buffer_size,
+           "Elementwise Filter: %s\n"
+           "  Operation: %s\n"
+           "  Inputs: %d\n"
+           "  Input dtype: %d\n"
+           "  Kernels: %s\n"
+           "  Running: %s\n"
+           "  Batches processed: %zu",
+           self->name, kern_binop_name(f->op), self->n_input_buffers,
+           self->input_buffers[0]->dtype, kern_isa_name(kern_ops()->isa),
+           self->running ? "true" : "false", self->metrics.n_batches);
+
+  return Bp_EC_OK;
+}
+
+Bp_EC elementwise_init(Elementwise_filt_t* f, Elementwise_config_t config)
+{
+  if (f == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+  if (config.n_inputs < 2 || config.n_inputs > MAX_INPUTS ||
+      config.op < 0 || config.op >= KERN_BINOP_MAX ||
+      (ew_is_comparison(config.op) && config.n_inputs != 2)) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  if (config.buff_config.dtype != DTYPE_FLOAT &&
+      config.buff_config.dtype != DTYPE_I32 &&
+      config.buff_config.dtype != DTYPE_U32) {
+    return Bp_EC_TYPE_ERROR;
+  }
+
+  Core_filt_config_t core_config = {
+      .name = config.name,
+      .filt_type = FILT_T_MISO_ELEMENTWISE,
+      .size = sizeof(Elementwise_filt_t),
+      .n_inputs = config.n_inputs,
+      .max_supported_sinks = 1,
+      .buff_config = config.buff_config,
+      .timeout_us = config.timeout_us,
+      .worker = elementwise_worker,
+  };
+
+  Bp_EC err = filt_init(&f->base, core_config);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  f->op = config.op;
+  for (int i = 0; i < MAX_INPUTS; i++) {
+    f->input_consumed[i] = 0;
+  }
+
+  f->base.ops.describe = elementwise_describe;
+
+  // Accepts any batch size and writes partial batches, like Map
+  prop_constraints_from_buffer_append(&f->base, &config.buff_config, true);
+
+  SampleDtype_t dtype = config.buff_config.dtype;
+  prop_append_behavior(&f->base, PROP_DATA_TYPE, BEHAVIOR_OP_SET, &dtype,
+                       OUTPUT_ALL);
+  prop_append_behavior(&f->base, PROP_SAMPLE_PERIOD_NS, BEHAVIOR_OP_PRESERVE,
+                       NULL, OUTPUT_ALL);
+
+  uint32_t min_batch = 1;
+  uint32_t max_batch = 1U << config.buff_config.batch_capacity_expo;
+  prop_append_behavior(&f->base, PROP_MIN_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &min_batch, OUTPUT_ALL);
+  prop_append_behavior(&f->base, PROP_MAX_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &max_batch, OUTPUT_ALL);
+
+  return Bp_EC_OK;
+}
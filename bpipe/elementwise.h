@@ -0,0 +1,42 @@
+#ifndef ELEMENTWISE_H
+#define ELEMENTWISE_H
+
+#include "bperr.h"
+#include "core.h"
+#include "kernels.h"
+
+/* N-input element-wise filter (FILT_T_MISO_ELEMENTWISE).
+ *
+ * out[i] = in0[i] op in1[i] op ... op inN-1[i], folded left to right, using
+ * the vectorised binary kernels in kernels.h. Samples are read straight from
+ * each input's tail batch and written straight into the sink's head batch;
+ * nothing is staged in between. Input batches may be any size: each call
+ * covers the samples every input still has, up to the space left in the
+ * output batch.
+ *
+ * Inputs must be time aligned, as BatchMatcher outputs are. With a known
+ * sample period, every input must share it and the next sample of every
+ * input must have the same timestamp, otherwise the worker fails with
+ * Bp_EC_PHASE_ERROR. The stream ends at the first input to complete.
+ *
+ * Comparisons (KERN_EQ ... KERN_GE) give 1 or 0 in the sample type and take
+ * exactly two inputs.
+ */
+
+typedef struct _Elementwise_config_t {
+  const char* name;
+  BatchBuffer_config buff_config;  // Used for every input buffer
+  size_t n_inputs;                 // 2 to MAX_INPUTS
+  Kern_binop_t op;
+  long timeout_us;
+} Elementwise_config_t;
+
+typedef struct _Elementwise_filt_t {
+  Filter_t base;
+  Kern_binop_t op;
+  size_t input_consumed[MAX_INPUTS];  // Samples used from each tail batch
+} Elementwise_filt_t;
+
+Bp_EC elementwise_init(Elementwise_filt_t* f, Elementwise_config_t config);
+
+#endif /* ELEMENTWISE_H */
@@ -0,0 +1,104 @@
+#include "fft.h"
+#include <math.h>
+#include <stdlib.h>
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+Bp_EC fft_plan_init(Fft_plan_t* plan, size_t n)
+{
+  if (plan == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+  if (n < 2 || (n & (n - 1)) != 0) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  plan->n = n;
+  plan->twiddle = malloc(n * sizeof(float));  // n / 2 complex
+  plan->bitrev = malloc(n * sizeof(size_t));
+  if (plan->twiddle == NULL || plan->bitrev == NULL) {
+    fft_plan_deinit(plan);
+    return Bp_EC_MALLOC_FAIL;
+  }
+
+  // Twiddles in double, so large sizes don't accumulate rounding
+  for (size_t k = 0; k < n / 2; k++) {
+    double a = -2.0 * M_PI * (double) k / (double) n;
+    plan->twiddle[2 * k] = (float) cos(a);
+    plan->twiddle[2 * k + 1] = (float) sin(a);
+  }
+
+  unsigned bits = 0;
+  while ((1UL << bits) < n) {
+    bits++;
+  }
+  for (size_t i = 0; i < n; i++) {
+    size_t r = 0;
+    for (unsigned b = 0; b < bits; b++) {
+      r |= ((i >> b) & 1U) << (bits - 1 - b);
+    }
+    plan->bitrev[i] = r;
+  }
+
+  return Bp_EC_OK;
+}
+
+void fft_plan_deinit(Fft_plan_t* plan)
+{
+  if (plan == NULL) {
+    return;
+  }
+  free(plan->twiddle);
+  plan->twiddle = NULL;
+  free(plan->bitrev);
+  plan->bitrev = NULL;
+  plan->n = 0;
+}
+
+/* Iterative decimation in time; 'sign' is -1 forward, +1 inverse */
+static void fft_transform(const Fft_plan_t* plan, float* data, float sign)
+{
+  const size_t n = plan->n;
+
+  for (size_t i = 0; i < n; i++) {
+    size_t j = plan->bitrev[i];
+    if (i < j) {
+      float re = data[2 * i], im = data[2 * i + 1];
+      data[2 * i] = data[2 * j];
+      data[2 * i + 1] = data[2 * j + 1];
+      data[2 * j] = re;
+      data[2 * j + 1] = im;
+    }
+  }
+
+  // Butterflies in memory order, so each pass streams through the data
+  for (size_t len = 2; len <= n; len <<= 1) {
+    const size_t half = len / 2, step = n / len;
+    for (size_t i = 0; i < n; i += len) {
+      float* a = data + 2 * i;
+      float* b = data + 2 * (i + half);
+      for (size_t k = 0; k < half; k++) {
+        const float wr = plan->twiddle[2 * k * step];
+        const float wi = -sign * plan->twiddle[2 * k * step + 1];
+        float tr = wr * b[2 * k] - wi * b[2 * k + 1];
+        float ti = wr * b[2 * k + 1] + wi * b[2 * k];
+        b[2 * k] = a[2 * k] - tr;
+        b[2 * k + 1] = a[2 * k + 1] - ti;
+        a[2 * k] += tr;
+        a[2 * k + 1] += ti;
+      }
+    }
+  }
+}
+
+void fft_forward(const Fft_plan_t* plan, float* data)
+{
+  fft_transform(plan, data, -1.0f);
+}
+
+void fft_inverse(const Fft_plan_t* plan, float* data)
+{
+  fft_transform(plan, data, 1.0f);
+}
@@ -0,0 +1,29 @@
+#ifndef FFT_H
+#define FFT_H
+
+#include <stddef.h>
+#include "bperr.h"
+
+/* In-place radix-2 FFT over interleaved complex floats (re, im, re, ...).
+ *
+ * A plan holds the twiddle factors and bit reversal table for one size, so
+ * the transforms themselves never allocate. Sizes are powers of two; the
+ * convolution users pick their block size, so nothing needs other radices.
+ */
+
+typedef struct _Fft_plan_t {
+  size_t n;        // Points, a power of two
+  float* twiddle;  // n / 2 complex: exp(-2 pi i k / n)
+  size_t* bitrev;  // Bit reversed index of each point
+} Fft_plan_t;
+
+Bp_EC fft_plan_init(Fft_plan_t* plan, size_t n);
+void fft_plan_deinit(Fft_plan_t* plan);
+
+/* X[k] = sum_j x[j] exp(-2 pi i j k / n) */
+void fft_forward(const Fft_plan_t* plan, float* data);
+
+/* Unscaled inverse: fft_inverse(fft_forward(x)) is n * x */
+void fft_inverse(const Fft_plan_t* plan, float* data);
+
+#endif /* FFT_H */
@@ -0,0 +1,437 @@
+#include "fir.h"
+#include <stdbool.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "batch_buffer.h"
+#include "kernels.h"
+#include "utils.h"
+
+/* Room in the current output batch, starting one at 't_ns' if needed */
+static float* fir_reserve(Fir_filt_t* f, Batch_t** output, long long t_ns,
+                          size_t* room)
+{
+  Batch_buff_t* sink = f->base.sinks[0];
+
+  if (*output == NULL) {
+    *output = bb_get_head(sink);
+    if (*output == NULL) {
+      return NULL;
+    }
+    (*output)->head = 0;
+    (*output)->t_ns = t_ns;
+    (*output)->period_ns = f->period_ns;
+    (*output)->ec = Bp_EC_OK;
+  }
+
+  *room = bb_batch_size(sink) - (*output)->head;
+  return (float*) (*output)->data + (*output)->head;
+}
+
+/* Account for 'n' samples written after fir_reserve, submitting when full */
+static Bp_EC fir_commit(Fir_filt_t* f, Batch_t** output, size_t n)
+{
+  (*output)->head += n;
+  if ((*output)->head < bb_batch_size(f->base.sinks[0])) {
+    return Bp_EC_OK;
+  }
+
+  Bp_EC err = bb_submit(f->base.sinks[0], f->base.timeout_us);
+  if (err == Bp_EC_OK) {
+    f->base.metrics.n_batches++;
+  }
+  *output = NULL;
+  return err;
+}
+
+/* Direct form. Outputs whose taps reach back past the batch are read from
+ * the history joined to the head of the batch, the rest straight from it. */
+static Bp_EC fir_direct(Fir_filt_t* f, Batch_t** output, const Batch_t* input)
+{
+  const size_t overlap = f->taps - 1;
+  const size_t n = input->head;
+  const float* x = (const float*) input->data;
+  const size_t joined = MIN(n, overlap);
+
+  memcpy(f->line + overlap, x, joined * sizeof(float));
+
+  size_t i = 0;
+  while (i < n) {
+    size_t room;
+    float* dst = fir_reserve(
+        f, output, input->t_ns + (long long) i * input->period_ns, &room);
+    if (dst == NULL) {
+      return Bp_EC_GET_HEAD_NULL;
+    }
+
+    size_t count = MIN(room, n - i);
+    if (i < joined) {
+      count = MIN(count, joined - i);
+      kern_fir_f32(f->line + i, f->coeffs, f->taps, dst, count);
+    } else {
+      kern_fir_f32(x + i - overlap, f->coeffs, f->taps, dst, count);
+    }
+    i += count;
+
+    Bp_EC err = fir_commit(f, output, count);
+    if (err != Bp_EC_OK) {
+      return err;
+    }
+  }
+
+  // Keep the newest taps - 1 inputs
+  if (n >= overlap) {
+    memcpy(f->line, x + n - overlap, overlap * sizeof(float));
+  } else {
+    memmove(f->line, f->line + n, overlap * sizeof(float));
+  }
+  return Bp_EC_OK;
+}
+
+/* Two blocks go through each transform: the line holds 2 * N - (taps - 1)
+ * samples, block A at line[0] and block B one step (N - taps + 1) later.
+ * The kernel is real, so convolving A + iB gives A * h in the real part and
+ * B * h in the imaginary part, at the cost of one complex transform pair. */
+static inline size_t fir_step(const Fir_filt_t* f)
+{
+  return f->fft.n - (f->taps - 1);
+}
+
+/* Convolve both blocks and emit the first 'n' valid outputs, then slide the
+ * last taps - 1 samples down to overlap the next pair */
+static Bp_EC fir_run_blocks(Fir_filt_t* f, Batch_t** output, size_t n)
+{
+  const size_t N = f->fft.n, overlap = f->taps - 1, step = fir_step(f);
+  float* w = f->work;
+
+  for (size_t k = 0; k < N; k++) {
+    w[2 * k] = f->line[k];
+    w[2 * k + 1] = f->line[step + k];
+  }
+  fft_forward(&f->fft, w);
+  for (size_t k = 0; k < N; k++) {
+    const float hr = f->spectrum[2 * k], hi = f->spectrum[2 * k + 1];
+    const float xr = w[2 * k], xi = w[2 * k + 1];
+    w[2 * k] = xr * hr - xi * hi;
+    w[2 * k + 1] = xr * hi + xi * hr;
+  }
+  fft_inverse(&f->fft, w);
+
+  // Each block's first taps - 1 results wrapped around and are discarded;
+  // output i is A's for i < step, then B's
+  size_t i = 0;
+  while (i < n) {
+    size_t room;
+    float* dst = fir_reserve(
+        f, output, f->block_t_ns + (long long) i * f->period_ns, &room);
+    if (dst == NULL) {
+      return Bp_EC_GET_HEAD_NULL;
+    }
+    size_t count = MIN(room, n - i);
+    for (size_t k = 0; k < count; k++) {
+      size_t j = i + k;
+      dst[k] =
+          j < step ? w[2 * (overlap + j)] : w[2 * (overlap + j - step) + 1];
+    }
+    i += count;
+
+    Bp_EC err = fir_commit(f, output, count);
+    if (err != Bp_EC_OK) {
+      return err;
+    }
+  }
+
+  memmove(f->line, f->line + 2 * step, overlap * sizeof(float));
+  f->line_fill = overlap;
+  return Bp_EC_OK;
+}
+
+/* Overlap-save: append the batch to the line, running each pair of blocks
+ * that fills it */
+static Bp_EC fir_overlap_save(Fir_filt_t* f, Batch_t** output,
+                              const Batch_t* input)
+{
+  const size_t overlap = f->taps - 1, size = overlap + 2 * fir_step(f);
+  const float* x = (const float*) input->data;
+
+  size_t i = 0;
+  while (i < input->head) {
+    if (f->line_fill == overlap) {
+      f->block_t_ns = input->t_ns + (long long) i * input->period_ns;
+    }
+    size_t count = MIN(size - f->line_fill, input->head - i);
+    memcpy(f->line + f->line_fill, x + i, count * sizeof(float));
+    f->line_fill += count;
+    i += count;
+
+    if (f->line_fill == size) {
+      Bp_EC err = fir_run_blocks(f, output, size - overlap);
+      if (err != Bp_EC_OK) {
+        return err;
+      }
+    }
+  }
+  return Bp_EC_OK;
+}
+
+/* Run the partial line left at the end of the stream, zero padded */
+static Bp_EC fir_flush(Fir_filt_t* f, Batch_t** output)
+{
+  const size_t overlap = f->taps - 1, size = overlap + 2 * fir_step(f);
+  if (f->method != FIR_METHOD_FFT || f->line_fill == overlap) {
+    return Bp_EC_OK;
+  }
+
+  size_t n = f->line_fill - overlap;
+  memset(f->line + f->line_fill, 0, (size - f->line_fill) * sizeof(float));
+  return fir_run_blocks(f, output, n);
+}
+
+static void* fir_worker(void* arg)
+{
+  Fir_filt_t* f = (Fir_filt_t*) arg;
+  Batch_buff_t* in = f->base.input_buffers[0];
+  Batch_buff_t* sink = f->base.sinks[0];
+  Batch_t* output = NULL;
+  Bp_EC err = Bp_EC_OK;
+  bool complete = false;
+
+  BP_WORKER_ASSERT(&f->base, sink != NULL, Bp_EC_NO_SINK);
+  BP_WORKER_ASSERT(&f->base, sink->dtype == DTYPE_FLOAT, Bp_EC_DTYPE_MISMATCH);
+
+  while (atomic_load(&f->base.running)) {
+    Batch_t* input = bb_get_tail(in, f->base.timeout_us, &err);
+    if (!input) {
+      if (err == Bp_EC_TIMEOUT) {
+        continue;  // Normal timeout, keep waiting for data
+      }
+      break;
+    }
+    if (input->ec == Bp_EC_COMPLETE) {
+      complete = true;
+      break;
+    }
+
+    if (input->head > 0) {
+      f->period_ns = (unsigned) input->period_ns;
+      if (f->method == FIR_METHOD_DIRECT) {
+        err = fir_direct(f, &output, input);
+      } else {
+        err = fir_overlap_save(f, &output, input);
+      }
+      if (err != Bp_EC_OK) break;
+      f->base.metrics.samples_processed += input->head;
+    }
+
+    err = bb_del_tail(in);
+    if (err != Bp_EC_OK) break;
+  }
+
+  if (complete) {
+    bb_del_tail(in);
+    err = fir_flush(f, &output);
+  }
+
+  // Flush the partial batch, then pass completion downstream
+  if (output && output->head > 0 &&
+      bb_submit(sink, f->base.timeout_us) == Bp_EC_OK) {
+    f->base.metrics.n_batches++;
+  }
+  if (complete && err == Bp_EC_OK) {
+    Batch_t* done = bb_get_head(sink);
+    if (done != NULL) {
+      done->head = 0;
+      done->ec = Bp_EC_COMPLETE;
+      bb_submit(sink, f->base.timeout_us);
+    }
+    return NULL;
+  }
+
+  if (err != Bp_EC_OK && err != Bp_EC_STOPPED && err != Bp_EC_TIMEOUT) {
+    f->base.worker_err_info.ec = err;
+    atomic_store(&f->base.running, false);  // Stop filter on error
+  }
+
+  return NULL;
+}
+
+static Bp_EC fir_describe(Filter_t* self, char* buffer, size_t buffer_size)
+{
+  Fir_filt_t* f = (Fir_filt_t*) self;
+
+  if (buffer == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  snprintf(buffer, buffer_size,
+           "FIR Filter: %s\n"
+           "  Taps: %zu\n"
+           "  Method: %s (FFT size %zu)\n"
+           "  Running: %s\n"
+           "  Batches processed: %zu",
+           self->name, f->taps,
+           f->method == FIR_METHOD_FFT ? "overlap-save" : "direct", f->fft.n,
+           self->running ? "true" : "false", self->metrics.n_batches);
+
+  return Bp_EC_OK;
+}
+
+static Bp_EC fir_deinit(Filter_t* self)
+{
+  Fir_filt_t* f = (Fir_filt_t*) self;
+
+  free(f->coeffs);
+  f->coeffs = NULL;
+  free(f->line);
+  f->line = NULL;
+  free(f->spectrum);
+  f->spectrum = NULL;
+  free(f->work);
+  f->work = NULL;
+  fft_plan_deinit(&f->fft);
+
+  // Do default deinit actions
+  for (int i = 0; i < self->n_input_buffers; i++) {
+    if (self->input_buffers[i]) {
+      bb_deinit(self->input_buffers[i]);
+      free(self->input_buffers[i]);
+      self->input_buffers[i] = NULL;
+    }
+  }
+
+  // Destroy mutex
+  pthread_mutex_destroy(&self->filter_mutex);
+
+  self->filt_type = FILT_T_NDEF;
+
+  return Bp_EC_OK;
+}
+
+/* Allocate the line, plan the transform and take the kernel's spectrum */
+static Bp_EC fir_fft_setup(Fir_filt_t* f, const float* h, size_t fft_size)
+{
+  Bp_EC err = fft_plan_init(&f->fft, fft_size);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  f->line = calloc(2 * fft_size - (f->taps - 1), sizeof(float));
+  f->spectrum = calloc(2 * fft_size, sizeof(float));
+  f->work = calloc(2 * fft_size, sizeof(float));
+  if (f->line == NULL || f->spectrum == NULL || f->work == NULL) {
+    return Bp_EC_MALLOC_FAIL;
+  }
+
+  // The inverse transform is unscaled, so fold 1 / fft_size in here
+  for (size_t j = 0; j < f->taps; j++) {
+    f->spectrum[2 * j] = h[j] / (float) fft_size;
+  }
+  fft_forward(&f->fft, f->spectrum);
+  f->line_fill = f->taps - 1;
+  return Bp_EC_OK;
+}
+
+Bp_EC fir_init(Fir_filt_t* f, Fir_config_t config)
+{
+  if (f == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+  if (config.buff_config.dtype != DTYPE_FLOAT) {
+    return Bp_EC_TYPE_ERROR;
+  }
+  if (config.coeffs == NULL || config.n_taps == 0 ||
+      config.n_taps > FIR_MAX_TAPS) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  FirMethod_e method = config.method;
+  if (method == FIR_METHOD_AUTO) {
+    method = config.n_taps > FIR_DIRECT_MAX_TAPS ? FIR_METHOD_FFT
+                                                 : FIR_METHOD_DIRECT;
+  }
+  size_t fft_size = config.fft_size;
+  if (method == FIR_METHOD_FFT) {
+    if (fft_size == 0) {
+      fft_size = 2;
+      while (fft_size < 4 * config.n_taps) {
+        fft_size <<= 1;
+      }
+    }
+    if ((fft_size & (fft_size - 1)) != 0 || fft_size < 2 * config.n_taps) {
+      return Bp_EC_INVALID_CONFIG;
+    }
+  }
+
+  Core_filt_config_t core_config = {
+      .name = config.name,
+      .filt_type = FILT_T_OVERLAP_BATCHES,
+      .size = sizeof(Fir_filt_t),
+      .n_inputs = 1,
+      .max_supported_sinks = 1,
+      .buff_config = config.buff_config,
+      .timeout_us = config.timeout_us,
+      .worker = fir_worker,
+  };
+
+  Bp_EC err = filt_init(&f->base, core_config);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  f->method = method;
+  f->taps = config.n_taps;
+  f->coeffs = NULL;
+  f->line = NULL;
+  f->line_fill = 0;
+  f->block_t_ns = 0;
+  f->period_ns = 0;
+  f->fft = (Fft_plan_t){0};
+  f->spectrum = NULL;
+  f->work = NULL;
+
+  f->base.ops.deinit = fir_deinit;
+  f->base.ops.describe = fir_describe;
+
+  // Coefficients, history and transforms are set up here, so the worker
+  // never allocates
+  f->coeffs = malloc(f->taps * sizeof(float));
+  if (f->coeffs == NULL) {
+    fir_deinit(&f->base);
+    return Bp_EC_MALLOC_FAIL;
+  }
+  for (size_t j = 0; j < f->taps; j++) {
+    f->coeffs[j] = config.coeffs[f->taps - 1 - j];
+  }
+
+  if (method == FIR_METHOD_FFT) {
+    err = fir_fft_setup(f, config.coeffs, fft_size);
+  } else {
+    // History plus room to join up to taps - 1 samples of the next batch
+    f->line = calloc(2 * f->taps, sizeof(float));
+    err = f->line != NULL ? Bp_EC_OK : Bp_EC_MALLOC_FAIL;
+  }
+  if (err != Bp_EC_OK) {
+    fir_deinit(&f->base);
+    return err;
+  }
+
+  // Input constraints come from the buffer; accepts partial batches
+  prop_constraints_from_buffer_append(&f->base, &config.buff_config, true);
+
+  SampleDtype_t dtype = DTYPE_FLOAT;
+  prop_append_behavior(&f->base, PROP_DATA_TYPE, BEHAVIOR_OP_SET, &dtype,
+                       OUTPUT_ALL);
+  prop_append_behavior(&f->base, PROP_SAMPLE_PERIOD_NS, BEHAVIOR_OP_PRESERVE,
+                       NULL, OUTPUT_ALL);
+
+  uint32_t min_batch = 1;
+  uint32_t max_batch = 1U << config.buff_config.batch_capacity_expo;
+  prop_append_behavior(&f->base, PROP_MIN_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &min_batch, OUTPUT_ALL);
+  prop_append_behavior(&f->base, PROP_MAX_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &max_batch, OUTPUT_ALL);
+
+  f->base.output_properties[0] = prop_propagate(NULL, 0, &f->base.contract, 0);
+
+  return Bp_EC_OK;
+}
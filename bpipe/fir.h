@@ -0,0 +1,62 @@
+#ifndef FIR_H
+#define FIR_H
+
+#include <stdint.h>
+#include "bperr.h"
+#include "core.h"
+#include "fft.h"
+
+/* FIR filter (FILT_T_OVERLAP_BATCHES).
+ *
+ * Convolves a float stream with a fixed kernel, y[n] = sum_j h[j] x[n - j].
+ * Short kernels run in direct form through kern_fir_f32. Long ones use FFT
+ * overlap-save: each block of fft_size samples repeats the last taps - 1
+ * of the one before and yields fft_size - taps + 1 outputs, at a cost per
+ * output that grows with log(fft_size) rather than with the tap count. As
+ * the samples are real, two blocks share each complex transform. Either
+ * way the overlap is kept inside the filter, so input batches are consumed
+ * once and never re-sent or joined with their neighbours.
+ *
+ * The filter is causal: output n carries the timestamp of input n, and the
+ * samples before the first input are taken as zero. There is one output per
+ * input. Overlap-save releases outputs a block pair at a time, so its
+ * latency is up to two blocks; the rest is flushed on completion.
+ */
+
+#define FIR_MAX_TAPS 65536
+#define FIR_DIRECT_MAX_TAPS 128  // FIR_METHOD_AUTO switches to FFT above
+
+typedef enum _FirMethod_e {
+  FIR_METHOD_AUTO = 0,  // Direct up to FIR_DIRECT_MAX_TAPS, FFT above
+  FIR_METHOD_DIRECT,
+  FIR_METHOD_FFT,
+} FirMethod_e;
+
+typedef struct _Fir_config_t {
+  const char* name;
+  BatchBuffer_config buff_config;  // Input and output are DTYPE_FLOAT
+  const float* coeffs;             // h[0] first, copied at init
+  size_t n_taps;
+  FirMethod_e method;
+  size_t fft_size;  // Power of two >= 2 * n_taps, 0 = 4 * n_taps rounded up
+  long timeout_us;
+} Fir_config_t;
+
+typedef struct _Fir_filt_t {
+  Filter_t base;
+  FirMethod_e method;  // DIRECT or FFT once initialised
+  size_t taps;
+  float* coeffs;     // Reversed, oldest sample first, as kern_fir_f32 takes
+  float* line;       // Direct: taps - 1 history then as many joined inputs
+                     // FFT: two blocks, the first taps - 1 being the overlap
+  size_t line_fill;  // FFT: samples in the line, overlap included
+  long long block_t_ns;  // FFT: time of the first new sample in the line
+  unsigned period_ns;    // Of the latest input
+  Fft_plan_t fft;
+  float* spectrum;  // FFT: kernel transform scaled by 1 / fft_size
+  float* work;      // FFT: fft_size complex
+} Fir_filt_t;
+
+Bp_EC fir_init(Fir_filt_t* f, Fir_config_t config);
+
+#endif /* FIR_H */
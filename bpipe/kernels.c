@@ -0,0 +1,759 @@
+#include "kernels.h"
+#include <math.h>
+#include <pthread.h>
+#include <stdbool.h>
+#include <string.h>
+#include "kernels_impl.h"
+
+/* =============================================================================
+ * Scalar references
+ * =============================================================================
+ */
+
+void kern_scale_f32_scalar(const float *in, float *out, size_t n, float k)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] * k;
+  }
+}
+
+void kern_offset_f32_scalar(const float *in, float *out, size_t n, float b)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] + b;
+  }
+}
+
+void kern_affine_f32_scalar(const float *in, float *out, size_t n, float a,
+                            float b)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] * a + b;
+  }
+}
+
+/* Written as max-then-min so NaN passes through and lo > hi gives hi, as
+ * the vector min/max instructions do */
+void kern_clip_f32_scalar(const float *in, float *out, size_t n, float lo,
+                          float hi)
+{
+  for (size_t i = 0; i < n; i++) {
+    float x = in[i] < lo ? lo : in[i];
+    out[i] = x > hi ? hi : x;
+  }
+}
+
+void kern_abs_f32_scalar(const float *in, float *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = fabsf(in[i]);
+  }
+}
+
+void kern_square_f32_scalar(const float *in, float *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] * in[i];
+  }
+}
+
+void kern_sqrt_f32_scalar(const float *in, float *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = sqrtf(in[i]);
+  }
+}
+
+void kern_log10_f32_scalar(const float *in, float *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = log10f(in[i]);
+  }
+}
+
+/* Signed arithmetic is done unsigned so overflow wraps instead of being
+ * undefined */
+void kern_scale_i32_scalar(const int32_t *in, int32_t *out, size_t n, int32_t k)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = (int32_t) ((uint32_t) in[i] * (uint32_t) k);
+  }
+}
+
+void kern_offset_i32_scalar(const int32_t *in, int32_t *out, size_t n,
+                            int32_t b)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = (int32_t) ((uint32_t) in[i] + (uint32_t) b);
+  }
+}
+
+void kern_affine_i32_scalar(const int32_t *in, int32_t *out, size_t n,
+                            int32_t a, int32_t b)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = (int32_t) ((uint32_t) in[i] * (uint32_t) a + (uint32_t) b);
+  }
+}
+
+void kern_clip_i32_scalar(const int32_t *in, int32_t *out, size_t n, int32_t lo,
+                          int32_t hi)
+{
+  for (size_t i = 0; i < n; i++) {
+    int32_t x = in[i] < lo ? lo : in[i];
+    out[i] = x > hi ? hi : x;
+  }
+}
+
+void kern_abs_i32_scalar(const int32_t *in, int32_t *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] < 0 ? (int32_t) (0u - (uint32_t) in[i]) : in[i];
+  }
+}
+
+void kern_square_i32_scalar(const int32_t *in, int32_t *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = (int32_t) ((uint32_t) in[i] * (uint32_t) in[i]);
+  }
+}
+
+/* Exact: every 32 bit integer is representable as a double */
+void kern_sqrt_i32_scalar(const int32_t *in, int32_t *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] > 0 ? (int32_t) sqrt((double) in[i]) : 0;
+  }
+}
+
+void kern_scale_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                           uint32_t k)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] * k;
+  }
+}
+
+void kern_offset_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                            uint32_t b)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] + b;
+  }
+}
+
+void kern_affine_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                            uint32_t a, uint32_t b)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] * a + b;
+  }
+}
+
+void kern_clip_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                          uint32_t lo, uint32_t hi)
+{
+  for (size_t i = 0; i < n; i++) {
+    uint32_t x = in[i] < lo ? lo : in[i];
+    out[i] = x > hi ? hi : x;
+  }
+}
+
+void kern_square_u32_scalar(const uint32_t *in, uint32_t *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = in[i] * in[i];
+  }
+}
+
+void kern_sqrt_u32_scalar(const uint32_t *in, uint32_t *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = (uint32_t) sqrt((double) in[i]);
+  }
+}
+
+void kern_cast_i32_f32_scalar(const int32_t *in, float *out, size_t n, float k)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = (float) in[i] * k;
+  }
+}
+
+void kern_cast_u32_f32_scalar(const uint32_t *in, float *out, size_t n, float k)
+{
+  for (size_t i = 0; i < n; i++) {
+    out[i] = (float) in[i] * k;
+  }
+}
+
+/* rintf() rounds in the current mode, as the vector conversions do. The
+ * range checks are on the rounded value, so they are exact. */
+void kern_cast_f32_i32_scalar(const float *in, int32_t *out, size_t n, float k)
+{
+  for (size_t i = 0; i < n; i++) {
+    float x = rintf(in[i] * k);
+    if (x != x) {
+      out[i] = 0;
+    } else if (x >= 2147483648.0f) {
+      out[i] = INT32_MAX;
+    } else if (x <= -2147483648.0f) {
+      out[i] = INT32_MIN;
+    } else {
+      out[i] = (int32_t) x;
+    }
+  }
+}
+
+void kern_cast_f32_u32_scalar(const float *in, uint32_t *out, size_t n, float k)
+{
+  for (size_t i = 0; i < n; i++) {
+    float x = rintf(in[i] * k);
+    if (!(x > 0.0f)) {
+      out[i] = 0;  // Negative, zero or NaN
+    } else if (x >= 4294967296.0f) {
+      out[i] = UINT32_MAX;
+    } else {
+      out[i] = (uint32_t) x;
+    }
+  }
+}
+
+void kern_fir_f32_scalar(const float *in, const float *c, size_t taps,
+                         float *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    float acc = c[0] * in[i];
+    for (size_t j = 1; j < taps; j++) {
+      acc += c[j] * in[i + j];
+    }
+    out[i] = acc;
+  }
+}
+
+/* Oscillators. Each body sees the phase of one sample as p. The sine folds
+ * the phase into [-pi/2, pi/2] with sin(pi - x) = sin(x), which is exact in
+ * wrapping integer arithmetic, then evaluates its polynomial there. */
+static float kern_osc_sine(uint32_t p)
+{
+  uint32_t q = p + 0x40000000u < 0x80000000u ? p : 0x80000000u - p;
+  float x = (float) (int32_t) q * KERN_OSC_RAD;
+  float x2 = x * x;
+  float s = KERN_OSC_S13;
+  s = s * x2 + KERN_OSC_S11;
+  s = s * x2 + KERN_OSC_S9;
+  s = s * x2 + KERN_OSC_S7;
+  s = s * x2 + KERN_OSC_S5;
+  s = s * x2 + KERN_OSC_S3;
+  return x + x * x2 * s;
+}
+
+#define KERN_SCALAR_OSC(name, expr)                                   \
+  static void kern_osc_##name##_scalar(uint32_t phase, uint32_t step, \
+                                       float *out, size_t n)          \
+  {                                                                   \
+    for (size_t i = 0; i < n; i++) {                                  \
+      uint32_t p = phase + (uint32_t) i * step;                       \
+      out[i] = (expr);                                                \
+    }                                                                 \
+  }
+
+// The triangle folds the second half cycle back onto the first with ~p
+KERN_SCALAR_OSC(sine, kern_osc_sine(p))
+KERN_SCALAR_OSC(square, p < 0x80000000u ? 1.0f : -1.0f)
+KERN_SCALAR_OSC(saw, (float) (int32_t) (p - 0x80000000u) * 0x1p-31f)
+KERN_SCALAR_OSC(triangle, (float) (int32_t) (p < ~p ? p : ~p) * 0x1p-30f - 1.0f)
+
+const Kern_osc_f32_t kern_osc_f32_scalar[KERN_WAVE_MAX] = {
+    [KERN_WAVE_SINE] = kern_osc_sine_scalar,
+    [KERN_WAVE_SQUARE] = kern_osc_square_scalar,
+    [KERN_WAVE_SAW] = kern_osc_saw_scalar,
+    [KERN_WAVE_TRIANGLE] = kern_osc_triangle_scalar,
+};
+
+/* Noise. Stream k of the generator is column k of the state. */
+static uint32_t kern_rotl(uint32_t x, int k)
+{
+  return (x << k) | (x >> (32 - k));
+}
+
+static uint32_t kern_xoshiro_next(Kern_rng_t *rng, size_t k)
+{
+  uint32_t s0 = rng->s[0][k], s1 = rng->s[1][k];
+  uint32_t s2 = rng->s[2][k], s3 = rng->s[3][k];
+  const uint32_t result = kern_rotl(s0 + s3, 7) + s0;
+  const uint32_t t = s1 << 9;
+
+  s2 ^= s0;
+  s3 ^= s1;
+  s1 ^= s2;
+  s0 ^= s3;
+  s2 ^= t;
+  s3 = kern_rotl(s3, 11);
+
+  rng->s[0][k] = s0;
+  rng->s[1][k] = s1;
+  rng->s[2][k] = s2;
+  rng->s[3][k] = s3;
+  return result;
+}
+
+/* Natural log of u in (0, 1], from its exponent and mantissa bits */
+static float kern_gauss_ln(float u)
+{
+  uint32_t bits;
+  memcpy(&bits, &u, sizeof(bits));
+  float e = (float) ((int32_t) (bits >> 23) - 127);
+  bits = (bits & 0x7fffffu) | 0x3f800000u;
+  float m;
+  memcpy(&m, &bits, sizeof(m));
+  if (!(m < KERN_GAUSS_SQRT2)) {
+    m = m * 0.5f;
+    e = e + 1.0f;
+  }
+
+  float t = (m - 1.0f) / (m + 1.0f);
+  float t2 = t * t;
+  float a = KERN_GAUSS_A9;
+  a = a * t2 + KERN_GAUSS_A7;
+  a = a * t2 + KERN_GAUSS_A5;
+  a = a * t2 + KERN_GAUSS_A3;
+  a = a * t2 + 1.0f;
+  return e * KERN_GAUSS_LN2 + 2.0f * t * a;
+}
+
+/* Box-Muller from a 24 bit uniform in (0, 1] and a 32 bit phase */
+void kern_gauss_f32_scalar(Kern_rng_t *rng, float *out, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    const size_t k = i % KERN_RNG_LANES;
+    uint32_t x = kern_xoshiro_next(rng, k);
+    uint32_t y = kern_xoshiro_next(rng, k);
+    float u = (float) (int32_t) ((x >> 8) + 1) * 0x1p-24f;
+    float r = sqrtf(-2.0f * kern_gauss_ln(u));
+    out[i] = r * kern_osc_sine(y);
+  }
+}
+
+void kern_rng_seed(Kern_rng_t *rng, uint64_t seed)
+{
+  for (size_t k = 0; k < KERN_RNG_LANES; k++) {
+    for (size_t j = 0; j < 4; j += 2) {
+      // splitmix64
+      uint64_t z = (seed += 0x9e3779b97f4a7c15ULL);
+      z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+      z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+      z ^= z >> 31;
+      rng->s[j][k] = (uint32_t) z;
+      rng->s[j + 1][k] = (uint32_t) (z >> 32);
+    }
+  }
+}
+
+/* Kellet's refined filter, with the input scaled by 1 / 3.0525, the gain
+ * it has from white to pink */
+void kern_pink_f32(Kern_pink_t *state, const float *in, float *out, size_t n)
+{
+  float b0 = state->b[0], b1 = state->b[1], b2 = state->b[2];
+  float b3 = state->b[3], b4 = state->b[4], b5 = state->b[5];
+  float b6 = state->b[6];
+
+  for (size_t i = 0; i < n; i++) {
+    const float w = in[i] * 0.327597f;
+    b0 = 0.99886f * b0 + w * 0.0555179f;
+    b1 = 0.99332f * b1 + w * 0.0750759f;
+    b2 = 0.96900f * b2 + w * 0.1538520f;
+    b3 = 0.86650f * b3 + w * 0.3104856f;
+    b4 = 0.55000f * b4 + w * 0.5329522f;
+    b5 = -0.7616f * b5 - w * 0.0168980f;
+    out[i] = b0 + b1 + b2 + b3 + b4 + b5 + b6 + w * 0.5362f;
+    b6 = w * 0.115926f;
+  }
+
+  state->b[0] = b0;
+  state->b[1] = b1;
+  state->b[2] = b2;
+  state->b[3] = b3;
+  state->b[4] = b4;
+  state->b[5] = b5;
+  state->b[6] = b6;
+}
+
+/* Binary operations. Each body sees the operands as x and y; both are read
+ * before out[i] is written, so out may alias a or b. */
+#define KERN_SCALAR_BINOP(name, T, expr)                                     \
+  static void kern_##name##_scalar(const T *a, const T *b, T *out, size_t n) \
+  {                                                                          \
+    for (size_t i = 0; i < n; i++) {                                         \
+      T x = a[i], y = b[i];                                                  \
+      out[i] = (expr);                                                       \
+    }                                                                        \
+  }
+
+KERN_SCALAR_BINOP(add_f32, float, x + y)
+KERN_SCALAR_BINOP(sub_f32, float, x - y)
+KERN_SCALAR_BINOP(mul_f32, float, (x * y))
+KERN_SCALAR_BINOP(div_f32, float, x / y)
+KERN_SCALAR_BINOP(min_f32, float, x < y ? x : y)
+KERN_SCALAR_BINOP(max_f32, float, x > y ? x : y)
+KERN_SCALAR_BINOP(eq_f32, float, x == y ? 1.0f : 0.0f)
+KERN_SCALAR_BINOP(ne_f32, float, x != y ? 1.0f : 0.0f)
+KERN_SCALAR_BINOP(lt_f32, float, x < y ? 1.0f : 0.0f)
+KERN_SCALAR_BINOP(le_f32, float, x <= y ? 1.0f : 0.0f)
+KERN_SCALAR_BINOP(gt_f32, float, x > y ? 1.0f : 0.0f)
+KERN_SCALAR_BINOP(ge_f32, float, x >= y ? 1.0f : 0.0f)
+
+KERN_SCALAR_BINOP(add_i32, int32_t, (int32_t) ((uint32_t) x + (uint32_t) y))
+KERN_SCALAR_BINOP(sub_i32, int32_t, (int32_t) ((uint32_t) x - (uint32_t) y))
+KERN_SCALAR_BINOP(mul_i32, int32_t, (int32_t) ((uint32_t) x * (uint32_t) y))
+// INT32_MIN / -1 wraps to INT32_MIN rather than trapping
+KERN_SCALAR_BINOP(div_i32, int32_t,
+                  y == 0    ? 0
+                  : y == -1 ? (int32_t) (0u - (uint32_t) x)
+                            : x / y)
+KERN_SCALAR_BINOP(min_i32, int32_t, x < y ? x : y)
+KERN_SCALAR_BINOP(max_i32, int32_t, x > y ? x : y)
+KERN_SCALAR_BINOP(eq_i32, int32_t, x == y)
+KERN_SCALAR_BINOP(ne_i32, int32_t, x != y)
+KERN_SCALAR_BINOP(lt_i32, int32_t, x < y)
+KERN_SCALAR_BINOP(le_i32, int32_t, x <= y)
+KERN_SCALAR_BINOP(gt_i32, int32_t, x > y)
+KERN_SCALAR_BINOP(ge_i32, int32_t, x >= y)
+
+KERN_SCALAR_BINOP(add_u32, uint32_t, x + y)
+KERN_SCALAR_BINOP(sub_u32, uint32_t, x - y)
+KERN_SCALAR_BINOP(mul_u32, uint32_t, (x * y))
+KERN_SCALAR_BINOP(div_u32, uint32_t, y == 0 ? 0 : x / y)
+KERN_SCALAR_BINOP(min_u32, uint32_t, x < y ? x : y)
+KERN_SCALAR_BINOP(max_u32, uint32_t, x > y ? x : y)
+KERN_SCALAR_BINOP(eq_u32, uint32_t, x == y)
+KERN_SCALAR_BINOP(ne_u32, uint32_t, x != y)
+KERN_SCALAR_BINOP(lt_u32, uint32_t, x < y)
+KERN_SCALAR_BINOP(le_u32, uint32_t, x <= y)
+KERN_SCALAR_BINOP(gt_u32, uint32_t, x > y)
+KERN_SCALAR_BINOP(ge_u32, uint32_t, x >= y)
+
+#define KERN_BINOP_TABLE(type)               \
+  {                                          \
+      [KERN_ADD] = kern_add_##type##_scalar, \
+      [KERN_SUB] = kern_sub_##type##_scalar, \
+      [KERN_MUL] = kern_mul_##type##_scalar, \
+      [KERN_DIV] = kern_div_##type##_scalar, \
+      [KERN_MIN] = kern_min_##type##_scalar, \
+      [KERN_MAX] = kern_max_##type##_scalar, \
+      [KERN_EQ] = kern_eq_##type##_scalar,   \
+      [KERN_NE] = kern_ne_##type##_scalar,   \
+      [KERN_LT] = kern_lt_##type##_scalar,   \
+      [KERN_LE] = kern_le_##type##_scalar,   \
+      [KERN_GT] = kern_gt_##type##_scalar,   \
+      [KERN_GE] = kern_ge_##type##_scalar,   \
+  }
+
+const Kern_binop_f32_t kern_binop_f32_scalar[KERN_BINOP_MAX] =
+    KERN_BINOP_TABLE(f32);
+const Kern_binop_i32_t kern_binop_i32_scalar[KERN_BINOP_MAX] =
+    KERN_BINOP_TABLE(i32);
+const Kern_binop_u32_t kern_binop_u32_scalar[KERN_BINOP_MAX] =
+    KERN_BINOP_TABLE(u32);
+
+void kern_fill_scalar(Kern_ops_t *ops)
+{
+  ops->isa = KERN_ISA_SCALAR;
+
+  ops->scale_f32 = kern_scale_f32_scalar;
+  ops->offset_f32 = kern_offset_f32_scalar;
+  ops->affine_f32 = kern_affine_f32_scalar;
+  ops->clip_f32 = kern_clip_f32_scalar;
+  ops->abs_f32 = kern_abs_f32_scalar;
+  ops->square_f32 = kern_square_f32_scalar;
+  ops->sqrt_f32 = kern_sqrt_f32_scalar;
+  ops->log10_f32 = kern_log10_f32_scalar;
+
+  ops->scale_i32 = kern_scale_i32_scalar;
+  ops->offset_i32 = kern_offset_i32_scalar;
+  ops->affine_i32 = kern_affine_i32_scalar;
+  ops->clip_i32 = kern_clip_i32_scalar;
+  ops->abs_i32 = kern_abs_i32_scalar;
+  ops->square_i32 = kern_square_i32_scalar;
+  ops->sqrt_i32 = kern_sqrt_i32_scalar;
+
+  ops->scale_u32 = kern_scale_u32_scalar;
+  ops->offset_u32 = kern_offset_u32_scalar;
+  ops->affine_u32 = kern_affine_u32_scalar;
+  ops->clip_u32 = kern_clip_u32_scalar;
+  ops->square_u32 = kern_square_u32_scalar;
+  ops->sqrt_u32 = kern_sqrt_u32_scalar;
+
+  ops->cast_i32_f32 = kern_cast_i32_f32_scalar;
+  ops->cast_u32_f32 = kern_cast_u32_f32_scalar;
+  ops->cast_f32_i32 = kern_cast_f32_i32_scalar;
+  ops->cast_f32_u32 = kern_cast_f32_u32_scalar;
+
+  ops->fir_f32 = kern_fir_f32_scalar;
+  ops->gauss_f32 = kern_gauss_f32_scalar;
+
+  for (int op = 0; op < KERN_BINOP_MAX; op++) {
+    ops->binop_f32[op] = kern_binop_f32_scalar[op];
+    ops->binop_i32[op] = kern_binop_i32_scalar[op];
+    ops->binop_u32[op] = kern_binop_u32_scalar[op];
+  }
+  for (int wave = 0; wave < KERN_WAVE_MAX; wave++) {
+    ops->osc_f32[wave] = kern_osc_f32_scalar[wave];
+  }
+}
+
+/* =============================================================================
+ * Dispatch
+ * =============================================================================
+ */
+
+static Kern_ops_t kern_tables[KERN_ISA_MAX];
+static bool kern_supported[KERN_ISA_MAX];
+static const Kern_ops_t *kern_best;
+static pthread_once_t kern_once = PTHREAD_ONCE_INIT;
+
+static const char *const kern_isa_names[KERN_ISA_MAX] = {
+    [KERN_ISA_SCALAR] = "scalar",
+    [KERN_ISA_SSE2] = "sse2",
+    [KERN_ISA_AVX2] = "avx2",
+    [KERN_ISA_AVX512] = "avx512",
+};
+
+static const char *const kern_binop_names[KERN_BINOP_MAX] = {
+    [KERN_ADD] = "add", [KERN_SUB] = "sub", [KERN_MUL] = "mul",
+    [KERN_DIV] = "div", [KERN_MIN] = "min", [KERN_MAX] = "max",
+    [KERN_EQ] = "eq",   [KERN_NE] = "ne",   [KERN_LT] = "lt",
+    [KERN_LE] = "le",   [KERN_GT] = "gt",   [KERN_GE] = "ge",
+};
+
+/* Probe the CPU (CPUID, and XGETBV for the OS saving the wide registers)
+ * and build a table per supported ISA */
+static void kern_select(void)
+{
+  kern_fill_scalar(&kern_tables[KERN_ISA_SCALAR]);
+  kern_supported[KERN_ISA_SCALAR] = true;
+
+#if KERN_X86
+  __builtin_cpu_init();
+  if (__builtin_cpu_supports("sse2")) {
+    kern_fill_sse2(&kern_tables[KERN_ISA_SSE2]);
+    kern_supported[KERN_ISA_SSE2] = true;
+  }
+  if (__builtin_cpu_supports("avx2")) {
+    kern_fill_avx2(&kern_tables[KERN_ISA_AVX2]);
+    kern_supported[KERN_ISA_AVX2] = true;
+  }
+  if (__builtin_cpu_supports("avx512f")) {
+    kern_fill_avx512(&kern_tables[KERN_ISA_AVX512]);
+    kern_supported[KERN_ISA_AVX512] = true;
+  }
+#endif
+
+  for (int isa = KERN_ISA_MAX - 1; isa >= 0; isa--) {
+    if (kern_supported[isa]) {
+      kern_best = &kern_tables[isa];
+      break;
+    }
+  }
+}
+
+const Kern_ops_t *kern_ops(void)
+{
+  pthread_once(&kern_once, kern_select);
+  return kern_best;
+}
+
+const Kern_ops_t *kern_ops_for(Kern_isa_t isa)
+{
+  if (isa < 0 || isa >= KERN_ISA_MAX) {
+    return NULL;
+  }
+  pthread_once(&kern_once, kern_select);
+  return kern_supported[isa] ? &kern_tables[isa] : NULL;
+}
+
+const char *kern_isa_name(Kern_isa_t isa)
+{
+  if (isa < 0 || isa >= KERN_ISA_MAX) {
+    return "unknown";
+  }
+  return kern_isa_names[isa];
+}
+
+const char *kern_binop_name(Kern_binop_t op)
+{
+  if (op < 0 || op >= KERN_BINOP_MAX) {
+    return "unknown";
+  }
+  return kern_binop_names[op];
+}
+
+/* =============================================================================
+ * Dispatched entry points
+ * =============================================================================
+ */
+
+void kern_scale_f32(const float *in, float *out, size_t n, float k)
+{
+  kern_ops()->scale_f32(in, out, n, k);
+}
+
+void kern_offset_f32(const float *in, float *out, size_t n, float b)
+{
+  kern_ops()->offset_f32(in, out, n, b);
+}
+
+void kern_affine_f32(const float *in, float *out, size_t n, float a, float b)
+{
+  kern_ops()->affine_f32(in, out, n, a, b);
+}
+
+void kern_clip_f32(const float *in, float *out, size_t n, float lo, float hi)
+{
+  kern_ops()->clip_f32(in, out, n, lo, hi);
+}
+
+void kern_abs_f32(const float *in, float *out, size_t n)
+{
+  kern_ops()->abs_f32(in, out, n);
+}
+
+void kern_square_f32(const float *in, float *out, size_t n)
+{
+  kern_ops()->square_f32(in, out, n);
+}
+
+void kern_sqrt_f32(const float *in, float *out, size_t n)
+{
+  kern_ops()->sqrt_f32(in, out, n);
+}
+
+void kern_log10_f32(const float *in, float *out, size_t n)
+{
+  kern_ops()->log10_f32(in, out, n);
+}
+
+void kern_scale_i32(const int32_t *in, int32_t *out, size_t n, int32_t k)
+{
+  kern_ops()->scale_i32(in, out, n, k);
+}
+
+void kern_offset_i32(const int32_t *in, int32_t *out, size_t n, int32_t b)
+{
+  kern_ops()->offset_i32(in, out, n, b);
+}
+
+void kern_affine_i32(const int32_t *in, int32_t *out, size_t n, int32_t a,
+                     int32_t b)
+{
+  kern_ops()->affine_i32(in, out, n, a, b);
+}
+
+void kern_clip_i32(const int32_t *in, int32_t *out, size_t n, int32_t lo,
+                   int32_t hi)
+{
+  kern_ops()->clip_i32(in, out, n, lo, hi);
+}
+
+void kern_abs_i32(const int32_t *in, int32_t *out, size_t n)
+{
+  kern_ops()->abs_i32(in, out, n);
+}
+
+void kern_square_i32(const int32_t *in, int32_t *out, size_t n)
+{
+  kern_ops()->square_i32(in, out, n);
+}
+
+void kern_sqrt_i32(const int32_t *in, int32_t *out, size_t n)
+{
+  kern_ops()->sqrt_i32(in, out, n);
+}
+
+void kern_scale_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t k)
+{
+  kern_ops()->scale_u32(in, out, n, k);
+}
+
+void kern_offset_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t b)
+{
+  kern_ops()->offset_u32(in, out, n, b);
+}
+
+void kern_affine_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t a,
+                     uint32_t b)
+{
+  kern_ops()->affine_u32(in, out, n, a, b);
+}
+
+void kern_clip_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t lo,
+                   uint32_t hi)
+{
+  kern_ops()->clip_u32(in, out, n, lo, hi);
+}
+
+void kern_square_u32(const uint32_t *in, uint32_t *out, size_t n)
+{
+  kern_ops()->square_u32(in, out, n);
+}
+
+void kern_sqrt_u32(const uint32_t *in, uint32_t *out, size_t n)
+{
+  kern_ops()->sqrt_u32(in, out, n);
+}
+
+void kern_cast_i32_f32(const int32_t *in, float *out, size_t n, float k)
+{
+  kern_ops()->cast_i32_f32(in, out, n, k);
+}
+
+void kern_cast_u32_f32(const uint32_t *in, float *out, size_t n, float k)
+{
+  kern_ops()->cast_u32_f32(in, out, n, k);
+}
+
+void kern_cast_f32_i32(const float *in, int32_t *out, size_t n, float k)
+{
+  kern_ops()->cast_f32_i32(in, out, n, k);
+}
+
+void kern_cast_f32_u32(const float *in, uint32_t *out, size_t n, float k)
+{
+  kern_ops()->cast_f32_u32(in, out, n, k);
+}
+
+void kern_fir_f32(const float *in, const float *c, size_t taps, float *out,
+                  size_t n)
+{
+  kern_ops()->fir_f32(in, c, taps, out, n);
+}
+
+void kern_osc_f32(Kern_wave_t wave, uint32_t phase, uint32_t step, float *out,
+                  size_t n)
+{
+  kern_ops()->osc_f32[wave](phase, step, out, n);
+}
+
+void kern_gauss_f32(Kern_rng_t *rng, float *out, size_t n)
+{
+  kern_ops()->gauss_f32(rng, out, n);
+}
+
+void kern_binop_f32(Kern_binop_t op, const float *a, const float *b, float *out,
+                    size_t n)
+{
+  kern_ops()->binop_f32[op](a, b, out, n);
+}
+
+void kern_binop_i32(Kern_binop_t op, const int32_t *a, const int32_t *b,
+                    int32_t *out, size_t n)
+{
+  kern_ops()->binop_i32[op](a, b, out, n);
+}
+
+void kern_binop_u32(Kern_binop_t op, const uint32_t *a, const uint32_t *b,
+                    uint32_t *out, size_t n)
+{
+  kern_ops()->binop_u32[op](a, b, out, n);
+}
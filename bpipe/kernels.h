@@ -0,0 +1,216 @@
+#ifndef KERNELS_H
+#define KERNELS_H
+
+#include <stddef.h>
+#include <stdint.h>
+#include "bperr.h"
+
+/* Vectorised sample kernels.
+ *
+ * Every kernel exists as a portable scalar reference and, on x86, as SSE2,
+ * AVX2 and AVX-512 variants. The widest variant the CPU supports is selected
+ * once, on first use, and the kern_* wrappers below call through that table.
+ * Input and output may alias exactly (in-place) but must not otherwise
+ * overlap. No alignment is required.
+ *
+ * Float kernels give bit-identical results to the scalar reference, except
+ * log10 which is accurate to a few ulp. Integer arithmetic wraps (two's
+ * complement); integer sqrt is floor(sqrt(x)), with negative inputs giving 0.
+ */
+
+/* Binary operations, out[i] = a[i] op b[i]. min/max return b[i] when either
+ * operand is NaN, as MINPS/MAXPS do. Comparisons give 1 where true and 0
+ * where false, in the operand type. Integer division truncates, and a zero
+ * divisor gives 0; it has no vector instruction so it is scalar everywhere. */
+typedef enum _Kern_binop_t {
+  KERN_ADD = 0,
+  KERN_SUB,
+  KERN_MUL,
+  KERN_DIV,
+  KERN_MIN,
+  KERN_MAX,
+  KERN_EQ,
+  KERN_NE,
+  KERN_LT,
+  KERN_LE,
+  KERN_GT,
+  KERN_GE,
+  KERN_BINOP_MAX,
+} Kern_binop_t;
+
+typedef void (*Kern_binop_f32_t)(const float *a, const float *b, float *out,
+                                 size_t n);
+typedef void (*Kern_binop_i32_t)(const int32_t *a, const int32_t *b,
+                                 int32_t *out, size_t n);
+typedef void (*Kern_binop_u32_t)(const uint32_t *a, const uint32_t *b,
+                                 uint32_t *out, size_t n);
+
+/* Conversions, out[i] = in[i] * k in the output type. The product is formed
+ * in float. Float to integer rounds to nearest (ties to even) and saturates
+ * to the output range, with NaN giving 0. Integer to float rounds to nearest,
+ * as a C cast does. */
+
+/* FIR filtering, out[i] = c[0] * in[i] + c[1] * in[i + 1] + ... summed in
+ * tap order, so 'in' holds n + taps - 1 samples. taps is at least 1. 'out'
+ * may alias 'in' exactly. */
+
+/* Oscillators, out[i] = wave(phase + i * step) in [-1, 1]. Phase is a
+ * 32 bit fraction of a cycle that wraps, so it never loses precision; every
+ * wave starts its cycle at phase 0 as sin() does (the saw and triangle at
+ * -1). The sine is a polynomial good to about 2e-7, and the phase is
+ * quantised to 2^-32 of a cycle. */
+typedef enum _Kern_wave_t {
+  KERN_WAVE_SINE = 0,
+  KERN_WAVE_SQUARE,
+  KERN_WAVE_SAW,
+  KERN_WAVE_TRIANGLE,
+  KERN_WAVE_MAX,
+} Kern_wave_t;
+
+typedef void (*Kern_osc_f32_t)(uint32_t phase, uint32_t step, float *out,
+                               size_t n);
+
+/* Gaussian noise with zero mean and unit variance, by Box-Muller from
+ * KERN_RNG_LANES independent xoshiro128++ streams: out[i] comes from stream
+ * i % KERN_RNG_LANES, each stream stepping twice per sample. Every ISA
+ * gives the same samples for the same seed and call sizes. Tails are cut
+ * at 5.8 sigma. */
+#define KERN_RNG_LANES 16
+
+typedef struct _Kern_rng_t {
+  uint32_t s[4][KERN_RNG_LANES];  // Stream k's state is s[0..3][k]
+} Kern_rng_t;
+
+/* Pink (1/f) noise: Paul Kellet's filter, scaled to turn unit variance
+ * white noise into unit variance pink. A recursion, so it is scalar. */
+typedef struct _Kern_pink_t {
+  float b[7];
+} Kern_pink_t;
+
+typedef enum _Kern_isa_t {
+  KERN_ISA_SCALAR = 0,
+  KERN_ISA_SSE2,
+  KERN_ISA_AVX2,
+  KERN_ISA_AVX512,
+  KERN_ISA_MAX,
+} Kern_isa_t;
+
+typedef struct _Kern_ops_t {
+  Kern_isa_t isa;
+
+  void (*scale_f32)(const float *in, float *out, size_t n, float k);
+  void (*offset_f32)(const float *in, float *out, size_t n, float b);
+  void (*affine_f32)(const float *in, float *out, size_t n, float a, float b);
+  void (*clip_f32)(const float *in, float *out, size_t n, float lo, float hi);
+  void (*abs_f32)(const float *in, float *out, size_t n);
+  void (*square_f32)(const float *in, float *out, size_t n);
+  void (*sqrt_f32)(const float *in, float *out, size_t n);
+  void (*log10_f32)(const float *in, float *out, size_t n);
+
+  void (*scale_i32)(const int32_t *in, int32_t *out, size_t n, int32_t k);
+  void (*offset_i32)(const int32_t *in, int32_t *out, size_t n, int32_t b);
+  void (*affine_i32)(const int32_t *in, int32_t *out, size_t n, int32_t a,
+                     int32_t b);
+  void (*clip_i32)(const int32_t *in, int32_t *out, size_t n, int32_t lo,
+                   int32_t hi);
+  void (*abs_i32)(const int32_t *in, int32_t *out, size_t n);
+  void (*square_i32)(const int32_t *in, int32_t *out, size_t n);
+  void (*sqrt_i32)(const int32_t *in, int32_t *out, size_t n);
+
+  void (*scale_u32)(const uint32_t *in, uint32_t *out, size_t n, uint32_t k);
+  void (*offset_u32)(const uint32_t *in, uint32_t *out, size_t n, uint32_t b);
+  void (*affine_u32)(const uint32_t *in, uint32_t *out, size_t n, uint32_t a,
+                     uint32_t b);
+  void (*clip_u32)(const uint32_t *in, uint32_t *out, size_t n, uint32_t lo,
+                   uint32_t hi);
+  void (*square_u32)(const uint32_t *in, uint32_t *out, size_t n);
+  void (*sqrt_u32)(const uint32_t *in, uint32_t *out, size_t n);
+
+  void (*cast_i32_f32)(const int32_t *in, float *out, size_t n, float k);
+  void (*cast_u32_f32)(const uint32_t *in, float *out, size_t n, float k);
+  void (*cast_f32_i32)(const float *in, int32_t *out, size_t n, float k);
+  void (*cast_f32_u32)(const float *in, uint32_t *out, size_t n, float k);
+
+  void (*fir_f32)(const float *in, const float *c, size_t taps, float *out,
+                  size_t n);
+
+  // Indexed by Kern_binop_t
+  Kern_binop_f32_t binop_f32[KERN_BINOP_MAX];
+  Kern_binop_i32_t binop_i32[KERN_BINOP_MAX];
+  Kern_binop_u32_t binop_u32[KERN_BINOP_MAX];
+
+  void (*gauss_f32)(Kern_rng_t *rng, float *out, size_t n);
+
+  // Indexed by Kern_wave_t
+  Kern_osc_f32_t osc_f32[KERN_WAVE_MAX];
+} Kern_ops_t;
+
+/* Kernels for the best ISA this CPU supports */
+const Kern_ops_t *kern_ops(void);
+
+/* Kernels for a specific ISA, or NULL if the CPU or build lacks it. Used to
+ * test and benchmark each variant against the scalar reference. */
+const Kern_ops_t *kern_ops_for(Kern_isa_t isa);
+
+const char *kern_isa_name(Kern_isa_t isa);
+
+/* Name of a binary operation ("add", "ge", ...), or "unknown" */
+const char *kern_binop_name(Kern_binop_t op);
+
+/* Dispatched kernels. n is in samples. */
+void kern_scale_f32(const float *in, float *out, size_t n, float k);
+void kern_offset_f32(const float *in, float *out, size_t n, float b);
+void kern_affine_f32(const float *in, float *out, size_t n, float a, float b);
+void kern_clip_f32(const float *in, float *out, size_t n, float lo, float hi);
+void kern_abs_f32(const float *in, float *out, size_t n);
+void kern_square_f32(const float *in, float *out, size_t n);
+void kern_sqrt_f32(const float *in, float *out, size_t n);
+void kern_log10_f32(const float *in, float *out, size_t n);
+
+void kern_scale_i32(const int32_t *in, int32_t *out, size_t n, int32_t k);
+void kern_offset_i32(const int32_t *in, int32_t *out, size_t n, int32_t b);
+void kern_affine_i32(const int32_t *in, int32_t *out, size_t n, int32_t a,
+                     int32_t b);
+void kern_clip_i32(const int32_t *in, int32_t *out, size_t n, int32_t lo,
+                   int32_t hi);
+void kern_abs_i32(const int32_t *in, int32_t *out, size_t n);
+void kern_square_i32(const int32_t *in, int32_t *out, size_t n);
+void kern_sqrt_i32(const int32_t *in, int32_t *out, size_t n);
+
+void kern_scale_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t k);
+void kern_offset_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t b);
+void kern_affine_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t a,
+                     uint32_t b);
+void kern_clip_u32(const uint32_t *in, uint32_t *out, size_t n, uint32_t lo,
+                   uint32_t hi);
+void kern_square_u32(const uint32_t *in, uint32_t *out, size_t n);
+void kern_sqrt_u32(const uint32_t *in, uint32_t *out, size_t n);
+
+void kern_cast_i32_f32(const int32_t *in, float *out, size_t n, float k);
+void kern_cast_u32_f32(const uint32_t *in, float *out, size_t n, float k);
+void kern_cast_f32_i32(const float *in, int32_t *out, size_t n, float k);
+void kern_cast_f32_u32(const float *in, uint32_t *out, size_t n, float k);
+
+void kern_fir_f32(const float *in, const float *c, size_t taps, float *out,
+                  size_t n);
+
+/* Dispatched oscillator */
+void kern_osc_f32(Kern_wave_t wave, uint32_t phase, uint32_t step, float *out,
+                  size_t n);
+
+/* Seed every noise stream from one value, via splitmix64 */
+void kern_rng_seed(Kern_rng_t *rng, uint64_t seed);
+void kern_gauss_f32(Kern_rng_t *rng, float *out, size_t n);
+
+/* 'state' starts zeroed. 'out' may alias 'in' exactly. */
+void kern_pink_f32(Kern_pink_t *state, const float *in, float *out, size_t n);
+
+/* Dispatched binary operations. 'out' may alias 'a' or 'b' exactly. */
+void kern_binop_f32(Kern_binop_t op, const float *a, const float *b, float *out,
+                    size_t n);
+void kern_binop_i32(Kern_binop_t op, const int32_t *a, const int32_t *b,
+                    int32_t *out, size_t n);
+void kern_binop_u32(Kern_binop_t op, const uint32_t *a, const uint32_t *b,
+                    uint32_t *out, size_t n);
+
+#endif /* KERNELS_H */
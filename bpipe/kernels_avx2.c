@@ -0,0 +1,114 @@
+/* AVX2 kernels: 8 lanes */
+#include "kernels_impl.h"
+
+#if KERN_X86
+
+#include <float.h>
+#include <immintrin.h>
+
+#define KERN_SUFFIX avx2
+#define KERN_ISA KERN_ISA_AVX2
+#define KERN_TARGET __attribute__((target("avx2")))
+#define KERN_W 8
+
+#define VF __m256
+#define VI __m256i
+
+#define vf_loadu(p) _mm256_loadu_ps(p)
+#define vf_storeu(p, v) _mm256_storeu_ps((p), (v))
+#define vf_set1(x) _mm256_set1_ps(x)
+#define vf_add(a, b) _mm256_add_ps((a), (b))
+#define vf_sub(a, b) _mm256_sub_ps((a), (b))
+#define vf_mul(a, b) _mm256_mul_ps((a), (b))
+#define vf_div(a, b) _mm256_div_ps((a), (b))
+#define vf_min(a, b) _mm256_min_ps((a), (b))
+#define vf_max(a, b) _mm256_max_ps((a), (b))
+#define vf_sqrt(a) _mm256_sqrt_ps(a)
+#define vf_abs(a) \
+  _mm256_and_ps((a), _mm256_castsi256_ps(_mm256_set1_epi32(0x7fffffff)))
+#define vf_as_vi(a) _mm256_castps_si256(a)
+#define vi_as_vf(a) _mm256_castsi256_ps(a)
+#define vf_from_i32(a) _mm256_cvtepi32_ps(a)
+#define vf_to_i32(a) _mm256_cvtps_epi32(a)
+#define vf_lt_select(a, b, t, f) \
+  _mm256_blendv_ps((f), (t), _mm256_cmp_ps((a), (b), _CMP_LT_OQ))
+#define vf_ge_select_i32(a, b, t, f) \
+  _mm256_blendv_epi8((f), (t),       \
+                     _mm256_castps_si256(_mm256_cmp_ps((a), (b), _CMP_GE_OQ)))
+#define vf_cmp01(a, b, pred) \
+  _mm256_and_ps(_mm256_cmp_ps((a), (b), (pred)), _mm256_set1_ps(1.0f))
+#define vf_cmpeq(a, b) vf_cmp01((a), (b), _CMP_EQ_OQ)
+#define vf_cmplt(a, b) vf_cmp01((a), (b), _CMP_LT_OQ)
+#define vf_cmple(a, b) vf_cmp01((a), (b), _CMP_LE_OQ)
+
+#define vi_loadu(p) _mm256_loadu_si256((const __m256i *) (p))
+#define vi_storeu(p, v) _mm256_storeu_si256((__m256i *) (p), (v))
+#define vi_set1(x) _mm256_set1_epi32(x)
+#define vi_add(a, b) _mm256_add_epi32((a), (b))
+#define vi_sub(a, b) _mm256_sub_epi32((a), (b))
+#define vi_and(a, b) _mm256_and_si256((a), (b))
+#define vi_or(a, b) _mm256_or_si256((a), (b))
+#define vi_xor(a, b) _mm256_xor_si256((a), (b))
+#define vi_slli(a, n) _mm256_slli_epi32((a), (n))
+#define vi_srli(a, n) _mm256_srli_epi32((a), (n))
+#define vi_cmpeq(a, b) _mm256_srli_epi32(_mm256_cmpeq_epi32((a), (b)), 31)
+#define vi_cmplt_i32(a, b) _mm256_srli_epi32(_mm256_cmpgt_epi32((b), (a)), 31)
+#define vi_mullo(a, b) _mm256_mullo_epi32((a), (b))
+#define vi_min_i32(a, b) _mm256_min_epi32((a), (b))
+#define vi_max_i32(a, b) _mm256_max_epi32((a), (b))
+#define vi_min_u32(a, b) _mm256_min_epu32((a), (b))
+#define vi_max_u32(a, b) _mm256_max_epu32((a), (b))
+#define vi_abs_i32(a) _mm256_abs_epi32(a)
+
+#define vi_sqrt_i32 avx2_sqrt_epi32
+#define vi_sqrt_u32 avx2_sqrt_epu32
+#define vf_any_special avx2_any_special_ps
+#define vi_cmplt_u32 avx2_cmplt_epu32
+
+static inline KERN_TARGET int avx2_any_special_ps(__m256 x)
+{
+  __m256 ok =
+      _mm256_and_ps(_mm256_cmp_ps(x, _mm256_set1_ps(FLT_MIN), _CMP_GE_OQ),
+                    _mm256_cmp_ps(x, _mm256_set1_ps(FLT_MAX), _CMP_LE_OQ));
+  return _mm256_movemask_ps(ok) != 0xff;
+}
+
+/* Unsigned compares are signed compares with the sign bit flipped */
+static inline KERN_TARGET __m256i avx2_cmplt_epu32(__m256i a, __m256i b)
+{
+  const __m256i bias = _mm256_set1_epi32(INT32_MIN);
+  __m256i lt =
+      _mm256_cmpgt_epi32(_mm256_xor_si256(b, bias), _mm256_xor_si256(a, bias));
+  return _mm256_srli_epi32(lt, 31);
+}
+
+/* floor(sqrt()) of four doubles per half; results are at most 65535 */
+static inline KERN_TARGET __m256i avx2_sqrt_halves(__m256d lo, __m256d hi)
+{
+  __m128i r_lo = _mm256_cvttpd_epi32(_mm256_sqrt_pd(lo));
+  __m128i r_hi = _mm256_cvttpd_epi32(_mm256_sqrt_pd(hi));
+  return _mm256_inserti128_si256(_mm256_castsi128_si256(r_lo), r_hi, 1);
+}
+
+static inline KERN_TARGET __m256i avx2_sqrt_epi32(__m256i a)
+{
+  a = _mm256_max_epi32(a, _mm256_setzero_si256());
+  return avx2_sqrt_halves(_mm256_cvtepi32_pd(_mm256_castsi256_si128(a)),
+                          _mm256_cvtepi32_pd(_mm256_extracti128_si256(a, 1)));
+}
+
+static inline KERN_TARGET __m256i avx2_sqrt_epu32(__m256i a)
+{
+  // Convert as signed with the sign bit flipped, then add 2^31 back
+  const __m256d two31 = _mm256_set1_pd(2147483648.0);
+  a = _mm256_xor_si256(a, _mm256_set1_epi32(INT32_MIN));
+  __m256d lo =
+      _mm256_add_pd(_mm256_cvtepi32_pd(_mm256_castsi256_si128(a)), two31);
+  __m256d hi =
+      _mm256_add_pd(_mm256_cvtepi32_pd(_mm256_extracti128_si256(a, 1)), two31);
+  return avx2_sqrt_halves(lo, hi);
+}
+
+#include "kernels_simd.h"
+
+#endif /* KERN_X86 */
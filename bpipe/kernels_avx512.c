@@ -0,0 +1,98 @@
+/* AVX-512 kernels: 16 lanes, AVX-512F only */
+#include "kernels_impl.h"
+
+#if KERN_X86
+
+#include <float.h>
+#include <immintrin.h>
+
+#define KERN_SUFFIX avx512
+#define KERN_ISA KERN_ISA_AVX512
+#define KERN_TARGET __attribute__((target("avx512f")))
+#define KERN_W 16
+
+#define VF __m512
+#define VI __m512i
+
+#define vf_loadu(p) _mm512_loadu_ps(p)
+#define vf_storeu(p, v) _mm512_storeu_ps((p), (v))
+#define vf_set1(x) _mm512_set1_ps(x)
+#define vf_add(a, b) _mm512_add_ps((a), (b))
+#define vf_sub(a, b) _mm512_sub_ps((a), (b))
+#define vf_mul(a, b) _mm512_mul_ps((a), (b))
+#define vf_div(a, b) _mm512_div_ps((a), (b))
+#define vf_min(a, b) _mm512_min_ps((a), (b))
+#define vf_max(a, b) _mm512_max_ps((a), (b))
+#define vf_sqrt(a) _mm512_sqrt_ps(a)
+// _mm512_and_ps needs AVX-512DQ, so mask the sign bit as integers
+#define vf_abs(a)      \
+  _mm512_castsi512_ps( \
+      _mm512_and_si512(_mm512_castps_si512(a), _mm512_set1_epi32(0x7fffffff)))
+#define vf_as_vi(a) _mm512_castps_si512(a)
+#define vi_as_vf(a) _mm512_castsi512_ps(a)
+#define vf_from_i32(a) _mm512_cvtepi32_ps(a)
+#define vf_to_i32(a) _mm512_cvtps_epi32(a)
+#define vf_lt_select(a, b, t, f) \
+  _mm512_mask_blend_ps(_mm512_cmp_ps_mask((a), (b), _CMP_LT_OQ), (f), (t))
+#define vf_ge_select_i32(a, b, t, f) \
+  _mm512_mask_blend_epi32(_mm512_cmp_ps_mask((a), (b), _CMP_GE_OQ), (f), (t))
+#define vf_cmp01(a, b, pred)                                \
+  _mm512_maskz_mov_ps(_mm512_cmp_ps_mask((a), (b), (pred)), \
+                      _mm512_set1_ps(1.0f))
+#define vf_cmpeq(a, b) vf_cmp01((a), (b), _CMP_EQ_OQ)
+#define vf_cmplt(a, b) vf_cmp01((a), (b), _CMP_LT_OQ)
+#define vf_cmple(a, b) vf_cmp01((a), (b), _CMP_LE_OQ)
+#define vf_any_special(x)                                          \
+  ((_mm512_cmp_ps_mask((x), _mm512_set1_ps(FLT_MIN), _CMP_GE_OQ) & \
+    _mm512_cmp_ps_mask((x), _mm512_set1_ps(FLT_MAX), _CMP_LE_OQ)) != 0xffff)
+
+#define vi_loadu(p) _mm512_loadu_si512((const void *) (p))
+#define vi_storeu(p, v) _mm512_storeu_si512((void *) (p), (v))
+#define vi_set1(x) _mm512_set1_epi32(x)
+#define vi_add(a, b) _mm512_add_epi32((a), (b))
+#define vi_sub(a, b) _mm512_sub_epi32((a), (b))
+#define vi_and(a, b) _mm512_and_si512((a), (b))
+#define vi_or(a, b) _mm512_or_si512((a), (b))
+#define vi_xor(a, b) _mm512_xor_si512((a), (b))
+#define vi_slli(a, n) _mm512_slli_epi32((a), (n))
+#define vi_srli(a, n) _mm512_srli_epi32((a), (n))
+#define vi_mullo(a, b) _mm512_mullo_epi32((a), (b))
+#define vi_min_i32(a, b) _mm512_min_epi32((a), (b))
+#define vi_max_i32(a, b) _mm512_max_epi32((a), (b))
+#define vi_min_u32(a, b) _mm512_min_epu32((a), (b))
+#define vi_max_u32(a, b) _mm512_max_epu32((a), (b))
+#define vi_abs_i32(a) _mm512_abs_epi32(a)
+#define vi_cmp01(mask) _mm512_maskz_mov_epi32((mask), _mm512_set1_epi32(1))
+#define vi_cmpeq(a, b) vi_cmp01(_mm512_cmpeq_epi32_mask((a), (b)))
+#define vi_cmplt_i32(a, b) vi_cmp01(_mm512_cmplt_epi32_mask((a), (b)))
+#define vi_cmplt_u32(a, b) vi_cmp01(_mm512_cmplt_epu32_mask((a), (b)))
+
+#define vi_sqrt_i32 avx512_sqrt_epi32
+#define vi_sqrt_u32 avx512_sqrt_epu32
+
+/* floor(sqrt()) of eight doubles per half; results are at most 65535 */
+static inline KERN_TARGET __m512i avx512_sqrt_halves(__m512d lo, __m512d hi)
+{
+  __m256i r_lo = _mm512_cvttpd_epi32(_mm512_sqrt_pd(lo));
+  __m256i r_hi = _mm512_cvttpd_epi32(_mm512_sqrt_pd(hi));
+  return _mm512_inserti64x4(_mm512_castsi256_si512(r_lo), r_hi, 1);
+}
+
+static inline KERN_TARGET __m512i avx512_sqrt_epi32(__m512i a)
+{
+  a = _mm512_max_epi32(a, _mm512_setzero_si512());
+  return avx512_sqrt_halves(
+      _mm512_cvtepi32_pd(_mm512_castsi512_si256(a)),
+      _mm512_cvtepi32_pd(_mm512_extracti64x4_epi64(a, 1)));
+}
+
+static inline KERN_TARGET __m512i avx512_sqrt_epu32(__m512i a)
+{
+  return avx512_sqrt_halves(
+      _mm512_cvtepu32_pd(_mm512_castsi512_si256(a)),
+      _mm512_cvtepu32_pd(_mm512_extracti64x4_epi64(a, 1)));
+}
+
+#include "kernels_simd.h"
+
+#endif /* KERN_X86 */
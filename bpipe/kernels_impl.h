@@ -0,0 +1,100 @@
+#ifndef KERNELS_IMPL_H
+#define KERNELS_IMPL_H
+
+/* Internal to the kernel library: shared by kernels.c and the per-ISA
+ * translation units. */
+
+#include "kernels.h"
+
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__))
+#define KERN_X86 1
+#else
+#define KERN_X86 0
+#endif
+
+/* Scalar references. The vector kernels use them for the last n % width
+ * samples, and for lanes needing special-case handling. */
+void kern_scale_f32_scalar(const float *in, float *out, size_t n, float k);
+void kern_offset_f32_scalar(const float *in, float *out, size_t n, float b);
+void kern_affine_f32_scalar(const float *in, float *out, size_t n, float a,
+                            float b);
+void kern_clip_f32_scalar(const float *in, float *out, size_t n, float lo,
+                          float hi);
+void kern_abs_f32_scalar(const float *in, float *out, size_t n);
+void kern_square_f32_scalar(const float *in, float *out, size_t n);
+void kern_sqrt_f32_scalar(const float *in, float *out, size_t n);
+void kern_log10_f32_scalar(const float *in, float *out, size_t n);
+
+void kern_scale_i32_scalar(const int32_t *in, int32_t *out, size_t n,
+                           int32_t k);
+void kern_offset_i32_scalar(const int32_t *in, int32_t *out, size_t n,
+                            int32_t b);
+void kern_affine_i32_scalar(const int32_t *in, int32_t *out, size_t n,
+                            int32_t a, int32_t b);
+void kern_clip_i32_scalar(const int32_t *in, int32_t *out, size_t n, int32_t lo,
+                          int32_t hi);
+void kern_abs_i32_scalar(const int32_t *in, int32_t *out, size_t n);
+void kern_square_i32_scalar(const int32_t *in, int32_t *out, size_t n);
+void kern_sqrt_i32_scalar(const int32_t *in, int32_t *out, size_t n);
+
+void kern_scale_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                           uint32_t k);
+void kern_offset_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                            uint32_t b);
+void kern_affine_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                            uint32_t a, uint32_t b);
+void kern_clip_u32_scalar(const uint32_t *in, uint32_t *out, size_t n,
+                          uint32_t lo, uint32_t hi);
+void kern_square_u32_scalar(const uint32_t *in, uint32_t *out, size_t n);
+void kern_sqrt_u32_scalar(const uint32_t *in, uint32_t *out, size_t n);
+
+void kern_cast_i32_f32_scalar(const int32_t *in, float *out, size_t n, float k);
+void kern_cast_u32_f32_scalar(const uint32_t *in, float *out, size_t n,
+                              float k);
+void kern_cast_f32_i32_scalar(const float *in, int32_t *out, size_t n, float k);
+void kern_cast_f32_u32_scalar(const float *in, uint32_t *out, size_t n,
+                              float k);
+
+void kern_fir_f32_scalar(const float *in, const float *c, size_t taps,
+                         float *out, size_t n);
+
+/* Sine oscillator constants: pi / 2^31 turns a signed 32 bit phase into
+ * radians, and the odd Taylor coefficients to x^13 are within float
+ * rounding of sin on [-pi/2, pi/2] */
+#define KERN_OSC_RAD 0x1.921fb6p-30f
+#define KERN_OSC_S3 (-1.0f / 6.0f)
+#define KERN_OSC_S5 (1.0f / 120.0f)
+#define KERN_OSC_S7 (-1.0f / 5040.0f)
+#define KERN_OSC_S9 (1.0f / 362880.0f)
+#define KERN_OSC_S11 (-1.0f / 39916800.0f)
+#define KERN_OSC_S13 (1.0f / 6227020800.0f)
+
+/* Gaussian noise constants: ln(u) = e ln 2 + 2 atanh((m - 1) / (m + 1)),
+ * with m in [sqrt(1/2), sqrt(2)) and the atanh series to t^9 */
+#define KERN_GAUSS_LN2 0.693147182f
+#define KERN_GAUSS_SQRT2 1.41421354f
+#define KERN_GAUSS_A3 (1.0f / 3.0f)
+#define KERN_GAUSS_A5 (1.0f / 5.0f)
+#define KERN_GAUSS_A7 (1.0f / 7.0f)
+#define KERN_GAUSS_A9 (1.0f / 9.0f)
+
+void kern_gauss_f32_scalar(Kern_rng_t *rng, float *out, size_t n);
+
+/* Scalar references for the oscillators, indexed by Kern_wave_t */
+extern const Kern_osc_f32_t kern_osc_f32_scalar[KERN_WAVE_MAX];
+
+/* Scalar references for the binary operations, indexed by Kern_binop_t */
+extern const Kern_binop_f32_t kern_binop_f32_scalar[KERN_BINOP_MAX];
+extern const Kern_binop_i32_t kern_binop_i32_scalar[KERN_BINOP_MAX];
+extern const Kern_binop_u32_t kern_binop_u32_scalar[KERN_BINOP_MAX];
+
+/* Fill 'ops' with one ISA's kernels. Only call the x86 variants once the CPU
+ * is known to support them. */
+void kern_fill_scalar(Kern_ops_t *ops);
+#if KERN_X86
+void kern_fill_sse2(Kern_ops_t *ops);
+void kern_fill_avx2(Kern_ops_t *ops);
+void kern_fill_avx512(Kern_ops_t *ops);
+#endif
+
+#endif /* KERNELS_IMPL_H */
@@ -0,0 +1,678 @@
+/* Vector kernel bodies, shared by every x86 ISA.
+ *
+ * Not a normal header: each kernels_<isa>.c defines the ISA's vector
+ * vocabulary below and then includes this file once, which emits that ISA's
+ * kernels and its kern_fill_<isa>() function.
+ *
+ *   KERN_SUFFIX, KERN_ISA, KERN_TARGET, KERN_W (lanes per vector)
+ *   VF, VI                      float and int32 vector types
+ *   vf_loadu/storeu/set1/add/sub/mul/div/min/max/sqrt/abs
+ *   vf_cmpeq/cmplt/cmple(a, b)  1.0f where true, 0.0f where false (ordered)
+ *   vf_lt_select(a, b, t, f)    a < b ? t : f, per lane
+ *   vf_any_special(x)           non-zero if any lane is not a positive,
+ *                               normal, finite float
+ *   vf_as_vi/vi_as_vf           bit casts
+ *   vf_from_i32                 int32 to float conversion
+ *   vf_to_i32                   float to int32, rounding to nearest;
+ *                               INT32_MIN when out of range or NaN
+ *   vf_ge_select_i32(a, b, t, f)  a >= b ? t : f per lane, for int vectors
+ *                               t and f (false for NaN)
+ *   vi_loadu/storeu/set1/add/sub/and/or/xor/slli/srli/mullo
+ *   vi_min_i32/max_i32/min_u32/max_u32/abs_i32/sqrt_i32/sqrt_u32
+ *   vi_cmpeq/cmplt_i32/cmplt_u32(a, b)  1 where true, 0 where false
+ *
+ * min(a, b) and max(a, b) must return b when either lane is NaN, as
+ * MINPS/MAXPS do.
+ */
+
+#define KERN_PASTE_(a, b) a##_##b
+#define KERN_PASTE(a, b) KERN_PASTE_(a, b)
+#define KERN_FN(name) KERN_PASTE(name, KERN_SUFFIX)
+
+/* -------------------------------------------------------------------------
+ * Float
+ * ------------------------------------------------------------------------- */
+
+static KERN_TARGET void KERN_FN(scale_f32)(const float *in, float *out,
+                                           size_t n, float k)
+{
+  const VF vk = vf_set1(k);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vf_storeu(out + i, vf_mul(vf_loadu(in + i), vk));
+  }
+  kern_scale_f32_scalar(in + i, out + i, n - i, k);
+}
+
+static KERN_TARGET void KERN_FN(offset_f32)(const float *in, float *out,
+                                            size_t n, float b)
+{
+  const VF vb = vf_set1(b);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vf_storeu(out + i, vf_add(vf_loadu(in + i), vb));
+  }
+  kern_offset_f32_scalar(in + i, out + i, n - i, b);
+}
+
+/* Multiply then add, not FMA, to round exactly like the scalar reference */
+static KERN_TARGET void KERN_FN(affine_f32)(const float *in, float *out,
+                                            size_t n, float a, float b)
+{
+  const VF va = vf_set1(a);
+  const VF vb = vf_set1(b);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vf_storeu(out + i, vf_add(vf_mul(vf_loadu(in + i), va), vb));
+  }
+  kern_affine_f32_scalar(in + i, out + i, n - i, a, b);
+}
+
+static KERN_TARGET void KERN_FN(clip_f32)(const float *in, float *out, size_t n,
+                                          float lo, float hi)
+{
+  const VF vlo = vf_set1(lo);
+  const VF vhi = vf_set1(hi);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    // Sample as the second operand, so a NaN sample passes through
+    vf_storeu(out + i, vf_min(vhi, vf_max(vlo, vf_loadu(in + i))));
+  }
+  kern_clip_f32_scalar(in + i, out + i, n - i, lo, hi);
+}
+
+static KERN_TARGET void KERN_FN(abs_f32)(const float *in, float *out, size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vf_storeu(out + i, vf_abs(vf_loadu(in + i)));
+  }
+  kern_abs_f32_scalar(in + i, out + i, n - i);
+}
+
+static KERN_TARGET void KERN_FN(square_f32)(const float *in, float *out,
+                                            size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    VF x = vf_loadu(in + i);
+    vf_storeu(out + i, vf_mul(x, x));
+  }
+  kern_square_f32_scalar(in + i, out + i, n - i);
+}
+
+static KERN_TARGET void KERN_FN(sqrt_f32)(const float *in, float *out, size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vf_storeu(out + i, vf_sqrt(vf_loadu(in + i)));
+  }
+  kern_sqrt_f32_scalar(in + i, out + i, n - i);
+}
+
+/* log10(x) for positive, normal, finite x (Cephes logf polynomial) */
+static inline KERN_TARGET VF KERN_FN(vf_log10)(VF x)
+{
+  const VF one = vf_set1(1.0f);
+  const VF sqrt_half = vf_set1(0.707106781186547524f);
+
+  // x = m * 2^e with m in [0.5, 1)
+  VI bits = vf_as_vi(x);
+  VI e_bits = vi_sub(vi_srli(bits, 23), vi_set1(0x7e));
+  VF m =
+      vi_as_vf(vi_or(vi_and(bits, vi_set1(0x007fffff)), vi_set1(0x3f000000)));
+  VF e = vf_from_i32(e_bits);
+
+  // Use m in [sqrt(0.5), sqrt(2)) so that m - 1 is centred on zero
+  e = vf_lt_select(m, sqrt_half, vf_sub(e, one), e);
+  m = vf_add(vf_sub(m, one), vf_lt_select(m, sqrt_half, m, vf_set1(0.0f)));
+
+  VF z = vf_mul(m, m);
+  VF y = vf_set1(7.0376836292e-2f);
+  y = vf_add(vf_mul(y, m), vf_set1(-1.1514610310e-1f));
+  y = vf_add(vf_mul(y, m), vf_set1(1.1676998740e-1f));
+  y = vf_add(vf_mul(y, m), vf_set1(-1.2420140846e-1f));
+  y = vf_add(vf_mul(y, m), vf_set1(1.4249322787e-1f));
+  y = vf_add(vf_mul(y, m), vf_set1(-1.6668057665e-1f));
+  y = vf_add(vf_mul(y, m), vf_set1(2.0000714765e-1f));
+  y = vf_add(vf_mul(y, m), vf_set1(-2.4999993993e-1f));
+  y = vf_add(vf_mul(y, m), vf_set1(3.3333331174e-1f));
+  y = vf_mul(vf_mul(y, m), z);
+
+  // ln(x) = ln(m) + e * ln(2), with ln(2) split for precision
+  y = vf_add(y, vf_mul(e, vf_set1(-2.12194440e-4f)));
+  y = vf_sub(y, vf_mul(z, vf_set1(0.5f)));
+  VF ln = vf_add(vf_add(m, y), vf_mul(e, vf_set1(0.693359375f)));
+
+  return vf_mul(ln, vf_set1(0.434294481903251827651f));
+}
+
+static KERN_TARGET void KERN_FN(log10_f32)(const float *in, float *out,
+                                           size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    VF x = vf_loadu(in + i);
+    if (vf_any_special(x)) {
+      // Zero, negative, subnormal, inf or NaN somewhere: let libm decide
+      kern_log10_f32_scalar(in + i, out + i, KERN_W);
+    } else {
+      vf_storeu(out + i, KERN_FN(vf_log10)(x));
+    }
+  }
+  kern_log10_f32_scalar(in + i, out + i, n - i);
+}
+
+/* -------------------------------------------------------------------------
+ * Signed 32 bit
+ * ------------------------------------------------------------------------- */
+
+static KERN_TARGET void KERN_FN(scale_i32)(const int32_t *in, int32_t *out,
+                                           size_t n, int32_t k)
+{
+  const VI vk = vi_set1(k);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_mullo(vi_loadu(in + i), vk));
+  }
+  kern_scale_i32_scalar(in + i, out + i, n - i, k);
+}
+
+static KERN_TARGET void KERN_FN(offset_i32)(const int32_t *in, int32_t *out,
+                                            size_t n, int32_t b)
+{
+  const VI vb = vi_set1(b);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_add(vi_loadu(in + i), vb));
+  }
+  kern_offset_i32_scalar(in + i, out + i, n - i, b);
+}
+
+static KERN_TARGET void KERN_FN(affine_i32)(const int32_t *in, int32_t *out,
+                                            size_t n, int32_t a, int32_t b)
+{
+  const VI va = vi_set1(a);
+  const VI vb = vi_set1(b);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_add(vi_mullo(vi_loadu(in + i), va), vb));
+  }
+  kern_affine_i32_scalar(in + i, out + i, n - i, a, b);
+}
+
+static KERN_TARGET void KERN_FN(clip_i32)(const int32_t *in, int32_t *out,
+                                          size_t n, int32_t lo, int32_t hi)
+{
+  const VI vlo = vi_set1(lo);
+  const VI vhi = vi_set1(hi);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_min_i32(vi_max_i32(vi_loadu(in + i), vlo), vhi));
+  }
+  kern_clip_i32_scalar(in + i, out + i, n - i, lo, hi);
+}
+
+static KERN_TARGET void KERN_FN(abs_i32)(const int32_t *in, int32_t *out,
+                                         size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_abs_i32(vi_loadu(in + i)));
+  }
+  kern_abs_i32_scalar(in + i, out + i, n - i);
+}
+
+static KERN_TARGET void KERN_FN(square_i32)(const int32_t *in, int32_t *out,
+                                            size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    VI x = vi_loadu(in + i);
+    vi_storeu(out + i, vi_mullo(x, x));
+  }
+  kern_square_i32_scalar(in + i, out + i, n - i);
+}
+
+static KERN_TARGET void KERN_FN(sqrt_i32)(const int32_t *in, int32_t *out,
+                                          size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_sqrt_i32(vi_loadu(in + i)));
+  }
+  kern_sqrt_i32_scalar(in + i, out + i, n - i);
+}
+
+/* -------------------------------------------------------------------------
+ * Unsigned 32 bit. Wrapping add and multiply are sign agnostic.
+ * ------------------------------------------------------------------------- */
+
+static KERN_TARGET void KERN_FN(scale_u32)(const uint32_t *in, uint32_t *out,
+                                           size_t n, uint32_t k)
+{
+  const VI vk = vi_set1((int32_t) k);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_mullo(vi_loadu(in + i), vk));
+  }
+  kern_scale_u32_scalar(in + i, out + i, n - i, k);
+}
+
+static KERN_TARGET void KERN_FN(offset_u32)(const uint32_t *in, uint32_t *out,
+                                            size_t n, uint32_t b)
+{
+  const VI vb = vi_set1((int32_t) b);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_add(vi_loadu(in + i), vb));
+  }
+  kern_offset_u32_scalar(in + i, out + i, n - i, b);
+}
+
+static KERN_TARGET void KERN_FN(affine_u32)(const uint32_t *in, uint32_t *out,
+                                            size_t n, uint32_t a, uint32_t b)
+{
+  const VI va = vi_set1((int32_t) a);
+  const VI vb = vi_set1((int32_t) b);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_add(vi_mullo(vi_loadu(in + i), va), vb));
+  }
+  kern_affine_u32_scalar(in + i, out + i, n - i, a, b);
+}
+
+static KERN_TARGET void KERN_FN(clip_u32)(const uint32_t *in, uint32_t *out,
+                                          size_t n, uint32_t lo, uint32_t hi)
+{
+  const VI vlo = vi_set1((int32_t) lo);
+  const VI vhi = vi_set1((int32_t) hi);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_min_u32(vi_max_u32(vi_loadu(in + i), vlo), vhi));
+  }
+  kern_clip_u32_scalar(in + i, out + i, n - i, lo, hi);
+}
+
+static KERN_TARGET void KERN_FN(square_u32)(const uint32_t *in, uint32_t *out,
+                                            size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    VI x = vi_loadu(in + i);
+    vi_storeu(out + i, vi_mullo(x, x));
+  }
+  kern_square_u32_scalar(in + i, out + i, n - i);
+}
+
+static KERN_TARGET void KERN_FN(sqrt_u32)(const uint32_t *in, uint32_t *out,
+                                          size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vi_storeu(out + i, vi_sqrt_u32(vi_loadu(in + i)));
+  }
+  kern_sqrt_u32_scalar(in + i, out + i, n - i);
+}
+
+/* -------------------------------------------------------------------------
+ * Conversions
+ * ------------------------------------------------------------------------- */
+
+static KERN_TARGET void KERN_FN(cast_i32_f32)(const int32_t *in, float *out,
+                                              size_t n, float k)
+{
+  const VF vk = vf_set1(k);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    vf_storeu(out + i, vf_mul(vf_from_i32(vi_loadu(in + i)), vk));
+  }
+  kern_cast_i32_f32_scalar(in + i, out + i, n - i, k);
+}
+
+/* Both 16 bit halves convert exactly, so the one rounding is in the add and
+ * matches a direct conversion */
+static KERN_TARGET void KERN_FN(cast_u32_f32)(const uint32_t *in, float *out,
+                                              size_t n, float k)
+{
+  const VF vk = vf_set1(k);
+  const VF two16 = vf_set1(65536.0f);
+  const VI lo_mask = vi_set1(0xffff);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    VI x = vi_loadu(in + i);
+    VF hi = vf_mul(vf_from_i32(vi_srli(x, 16)), two16);
+    VF lo = vf_from_i32(vi_and(x, lo_mask));
+    vf_storeu(out + i, vf_mul(vf_add(hi, lo), vk));
+  }
+  kern_cast_u32_f32_scalar(in + i, out + i, n - i, k);
+}
+
+static KERN_TARGET void KERN_FN(cast_f32_i32)(const float *in, int32_t *out,
+                                              size_t n, float k)
+{
+  const VF vk = vf_set1(k);
+  const VF two31 = vf_set1(2147483648.0f);
+  const VI vmax = vi_set1(INT32_MAX);
+  const VI zero = vi_set1(0);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    // Below range already converts to INT32_MIN; x >= x is false for NaN
+    VF x = vf_mul(vf_loadu(in + i), vk);
+    VI r = vf_ge_select_i32(x, two31, vmax, vf_to_i32(x));
+    vi_storeu(out + i, vf_ge_select_i32(x, x, r, zero));
+  }
+  kern_cast_f32_i32_scalar(in + i, out + i, n - i, k);
+}
+
+/* [2^31, 2^32) converts as signed after subtracting 2^31, which is exact
+ * there, and adding it back */
+static KERN_TARGET void KERN_FN(cast_f32_u32)(const float *in, uint32_t *out,
+                                              size_t n, float k)
+{
+  const VF vk = vf_set1(k);
+  const VF two31 = vf_set1(2147483648.0f);
+  const VF two32 = vf_set1(4294967296.0f);
+  const VI bias = vi_set1(INT32_MIN);
+  const VI vmax = vi_set1(-1);  // UINT32_MAX
+  const VI zero = vi_set1(0);
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    VF x = vf_mul(vf_loadu(in + i), vk);
+    VI lo = vi_max_i32(vf_to_i32(x), zero);  // Negative and NaN give 0
+    VI hi = vi_add(vf_to_i32(vf_sub(x, two31)), bias);
+    VI r = vf_ge_select_i32(x, two31, hi, lo);
+    vi_storeu(out + i, vf_ge_select_i32(x, two32, vmax, r));
+  }
+  kern_cast_f32_u32_scalar(in + i, out + i, n - i, k);
+}
+
+/* -------------------------------------------------------------------------
+ * Filters
+ * ------------------------------------------------------------------------- */
+
+/* One vector of outputs at a time, each tap broadcast across it. The store
+ * follows every load it depends on, so out may alias in. */
+static KERN_TARGET void KERN_FN(fir_f32)(const float *in, const float *c,
+                                         size_t taps, float *out, size_t n)
+{
+  size_t i = 0;
+  for (; i + KERN_W <= n; i += KERN_W) {
+    VF acc = vf_mul(vf_set1(c[0]), vf_loadu(in + i));
+    for (size_t j = 1; j < taps; j++) {
+      acc = vf_add(acc, vf_mul(vf_set1(c[j]), vf_loadu(in + i + j)));
+    }
+    vf_storeu(out + i, acc);
+  }
+  kern_fir_f32_scalar(in + i, c, taps, out + i, n - i);
+}
+
+/* -------------------------------------------------------------------------
+ * Oscillators. Each lane steps its own phase by KERN_W samples; the phase
+ * arithmetic wraps, so lanes never drift from the scalar phase.
+ * ------------------------------------------------------------------------- */
+
+static const int32_t kern_osc_lanes[16] = {0, 1, 2,  3,  4,  5,  6,  7,
+                                           8, 9, 10, 11, 12, 13, 14, 15};
+
+/* Folds as the scalar reference does, selecting with all ones or all zeros
+ * masks made from the 1 / 0 comparison */
+static inline KERN_TARGET VF KERN_FN(vf_osc_sine)(VI p)
+{
+  const VI one = vi_set1(1);
+  VI in_range =
+      vi_cmplt_u32(vi_add(p, vi_set1(0x40000000)), vi_set1(INT32_MIN));
+  VI folded = vi_sub(vi_set1(INT32_MIN), p);
+  VI q = vi_or(vi_and(p, vi_sub(vi_set1(0), in_range)),
+               vi_and(folded, vi_sub(in_range, one)));
+
+  VF x = vf_mul(vf_from_i32(q), vf_set1(KERN_OSC_RAD));
+  VF x2 = vf_mul(x, x);
+  VF s = vf_set1(KERN_OSC_S13);
+  s = vf_add(vf_mul(s, x2), vf_set1(KERN_OSC_S11));
+  s = vf_add(vf_mul(s, x2), vf_set1(KERN_OSC_S9));
+  s = vf_add(vf_mul(s, x2), vf_set1(KERN_OSC_S7));
+  s = vf_add(vf_mul(s, x2), vf_set1(KERN_OSC_S5));
+  s = vf_add(vf_mul(s, x2), vf_set1(KERN_OSC_S3));
+  return vf_add(x, vf_mul(vf_mul(x, x2), s));
+}
+
+/* The sign bit of the phase is the half cycle; OR it into 1.0f */
+static inline KERN_TARGET VF KERN_FN(vf_osc_square)(VI p)
+{
+  return vi_as_vf(
+      vi_or(vi_and(p, vi_set1(INT32_MIN)), vf_as_vi(vf_set1(1.0f))));
+}
+
+static inline KERN_TARGET VF KERN_FN(vf_osc_saw)(VI p)
+{
+  return vf_mul(vf_from_i32(vi_sub(p, vi_set1(INT32_MIN))), vf_set1(0x1p-31f));
+}
+
+static inline KERN_TARGET VF KERN_FN(vf_osc_triangle)(VI p)
+{
+  VI q = vi_min_u32(p, vi_sub(vi_set1(-1), p));  // min(p, ~p)
+  return vf_sub(vf_mul(vf_from_i32(q), vf_set1(0x1p-30f)), vf_set1(1.0f));
+}
+
+#define KERN_OSC(name, wave)                                                 \
+  static KERN_TARGET void KERN_FN(osc_##name)(uint32_t phase, uint32_t step, \
+                                              float *out, size_t n)          \
+  {                                                                          \
+    const VI vstep = vi_set1((int32_t) (step * KERN_W));                     \
+    VI p =                                                                   \
+        vi_add(vi_set1((int32_t) phase),                                     \
+               vi_mullo(vi_loadu(kern_osc_lanes), vi_set1((int32_t) step))); \
+    size_t i = 0;                                                            \
+    for (; i + KERN_W <= n; i += KERN_W) {                                   \
+      vf_storeu(out + i, KERN_FN(vf_osc_##name)(p));                         \
+      p = vi_add(p, vstep);                                                  \
+    }                                                                        \
+    kern_osc_f32_scalar[wave](phase + (uint32_t) i * step, step, out + i,    \
+                              n - i);                                        \
+  }
+
+KERN_OSC(sine, KERN_WAVE_SINE)
+KERN_OSC(square, KERN_WAVE_SQUARE)
+KERN_OSC(saw, KERN_WAVE_SAW)
+KERN_OSC(triangle, KERN_WAVE_TRIANGLE)
+
+/* -------------------------------------------------------------------------
+ * Noise. Each vector holds KERN_W of the streams, and walks the output in
+ * steps of KERN_RNG_LANES; the scalar reference does the partial last row.
+ * ------------------------------------------------------------------------- */
+
+static inline KERN_TARGET VI KERN_FN(vi_rotl)(VI x, int k)
+{
+  return vi_or(vi_slli(x, k), vi_srli(x, 32 - k));
+}
+
+static inline KERN_TARGET VI KERN_FN(vi_xoshiro_next)(VI *s0, VI *s1, VI *s2,
+                                                      VI *s3)
+{
+  const VI result = vi_add(KERN_FN(vi_rotl)(vi_add(*s0, *s3), 7), *s0);
+  const VI t = vi_slli(*s1, 9);
+
+  *s2 = vi_xor(*s2, *s0);
+  *s3 = vi_xor(*s3, *s1);
+  *s1 = vi_xor(*s1, *s2);
+  *s0 = vi_xor(*s0, *s3);
+  *s2 = vi_xor(*s2, t);
+  *s3 = KERN_FN(vi_rotl)(*s3, 11);
+  return result;
+}
+
+static inline KERN_TARGET VF KERN_FN(vf_gauss_ln)(VF u)
+{
+  const VF one = vf_set1(1.0f);
+  VI bits = vf_as_vi(u);
+  VF e = vf_from_i32(vi_sub(vi_srli(bits, 23), vi_set1(127)));
+  VF m = vi_as_vf(vi_or(vi_and(bits, vi_set1(0x7fffff)), vi_set1(0x3f800000)));
+  const VF sqrt2 = vf_set1(KERN_GAUSS_SQRT2);
+  e = vf_lt_select(m, sqrt2, e, vf_add(e, one));
+  m = vf_lt_select(m, sqrt2, m, vf_mul(m, vf_set1(0.5f)));
+
+  VF t = vf_div(vf_sub(m, one), vf_add(m, one));
+  VF t2 = vf_mul(t, t);
+  VF a = vf_set1(KERN_GAUSS_A9);
+  a = vf_add(vf_mul(a, t2), vf_set1(KERN_GAUSS_A7));
+  a = vf_add(vf_mul(a, t2), vf_set1(KERN_GAUSS_A5));
+  a = vf_add(vf_mul(a, t2), vf_set1(KERN_GAUSS_A3));
+  a = vf_add(vf_mul(a, t2), one);
+  return vf_add(vf_mul(e, vf_set1(KERN_GAUSS_LN2)),
+                vf_mul(vf_mul(vf_set1(2.0f), t), a));
+}
+
+static KERN_TARGET void KERN_FN(gauss_f32)(Kern_rng_t *rng, float *out,
+                                           size_t n)
+{
+  const size_t n_rows = n - n % KERN_RNG_LANES;
+  for (size_t k = 0; k < KERN_RNG_LANES; k += KERN_W) {
+    VI s0 = vi_loadu(&rng->s[0][k]);
+    VI s1 = vi_loadu(&rng->s[1][k]);
+    VI s2 = vi_loadu(&rng->s[2][k]);
+    VI s3 = vi_loadu(&rng->s[3][k]);
+    for (size_t i = k; i < n_rows; i += KERN_RNG_LANES) {
+      VI x = KERN_FN(vi_xoshiro_next)(&s0, &s1, &s2, &s3);
+      VI y = KERN_FN(vi_xoshiro_next)(&s0, &s1, &s2, &s3);
+      VF u = vf_mul(vf_from_i32(vi_add(vi_srli(x, 8), vi_set1(1))),
+                    vf_set1(0x1p-24f));
+      VF r = vf_sqrt(vf_mul(vf_set1(-2.0f), KERN_FN(vf_gauss_ln)(u)));
+      vf_storeu(out + i, vf_mul(r, KERN_FN(vf_osc_sine)(y)));
+    }
+    vi_storeu(&rng->s[0][k], s0);
+    vi_storeu(&rng->s[1][k], s1);
+    vi_storeu(&rng->s[2][k], s2);
+    vi_storeu(&rng->s[3][k], s3);
+  }
+  kern_gauss_f32_scalar(rng, out + n_rows, n - n_rows);
+}
+
+/* -------------------------------------------------------------------------
+ * Binary operations. Each expression sees one vector of each operand as x
+ * and y; both are loaded before the store, so out may alias a or b.
+ * ------------------------------------------------------------------------- */
+
+#define KERN_BINOP(name, T, V, load, store, tail, expr)                 \
+  static KERN_TARGET void KERN_FN(name)(const T *a, const T *b, T *out, \
+                                        size_t n)                       \
+  {                                                                     \
+    size_t i = 0;                                                       \
+    for (; i + KERN_W <= n; i += KERN_W) {                              \
+      V x = load(a + i);                                                \
+      V y = load(b + i);                                                \
+      store(out + i, (expr));                                           \
+    }                                                                   \
+    tail(a + i, b + i, out + i, n - i);                                 \
+  }
+
+#define KERN_BINOP_F32(name, op, expr)                   \
+  KERN_BINOP(name##_f32, float, VF, vf_loadu, vf_storeu, \
+             kern_binop_f32_scalar[op], expr)
+#define KERN_BINOP_I32(name, op, expr)                     \
+  KERN_BINOP(name##_i32, int32_t, VI, vi_loadu, vi_storeu, \
+             kern_binop_i32_scalar[op], expr)
+#define KERN_BINOP_U32(name, op, expr)                      \
+  KERN_BINOP(name##_u32, uint32_t, VI, vi_loadu, vi_storeu, \
+             kern_binop_u32_scalar[op], expr)
+
+// x != y is !(x == y) even for NaN; gt and ge are lt and le swapped
+KERN_BINOP_F32(add, KERN_ADD, vf_add(x, y))
+KERN_BINOP_F32(sub, KERN_SUB, vf_sub(x, y))
+KERN_BINOP_F32(mul, KERN_MUL, vf_mul(x, y))
+KERN_BINOP_F32(div, KERN_DIV, vf_div(x, y))
+KERN_BINOP_F32(min, KERN_MIN, vf_min(x, y))
+KERN_BINOP_F32(max, KERN_MAX, vf_max(x, y))
+KERN_BINOP_F32(eq, KERN_EQ, vf_cmpeq(x, y))
+KERN_BINOP_F32(ne, KERN_NE, vf_sub(vf_set1(1.0f), vf_cmpeq(x, y)))
+KERN_BINOP_F32(lt, KERN_LT, vf_cmplt(x, y))
+KERN_BINOP_F32(le, KERN_LE, vf_cmple(x, y))
+KERN_BINOP_F32(gt, KERN_GT, vf_cmplt(y, x))
+KERN_BINOP_F32(ge, KERN_GE, vf_cmple(y, x))
+
+// Integers are totally ordered, so le is !(y < x)
+KERN_BINOP_I32(add, KERN_ADD, vi_add(x, y))
+KERN_BINOP_I32(sub, KERN_SUB, vi_sub(x, y))
+KERN_BINOP_I32(mul, KERN_MUL, vi_mullo(x, y))
+KERN_BINOP_I32(min, KERN_MIN, vi_min_i32(x, y))
+KERN_BINOP_I32(max, KERN_MAX, vi_max_i32(x, y))
+KERN_BINOP_I32(eq, KERN_EQ, vi_cmpeq(x, y))
+KERN_BINOP_I32(ne, KERN_NE, vi_sub(vi_set1(1), vi_cmpeq(x, y)))
+KERN_BINOP_I32(lt, KERN_LT, vi_cmplt_i32(x, y))
+KERN_BINOP_I32(le, KERN_LE, vi_sub(vi_set1(1), vi_cmplt_i32(y, x)))
+KERN_BINOP_I32(gt, KERN_GT, vi_cmplt_i32(y, x))
+KERN_BINOP_I32(ge, KERN_GE, vi_sub(vi_set1(1), vi_cmplt_i32(x, y)))
+
+KERN_BINOP_U32(add, KERN_ADD, vi_add(x, y))
+KERN_BINOP_U32(sub, KERN_SUB, vi_sub(x, y))
+KERN_BINOP_U32(mul, KERN_MUL, vi_mullo(x, y))
+KERN_BINOP_U32(min, KERN_MIN, vi_min_u32(x, y))
+KERN_BINOP_U32(max, KERN_MAX, vi_max_u32(x, y))
+KERN_BINOP_U32(eq, KERN_EQ, vi_cmpeq(x, y))
+KERN_BINOP_U32(ne, KERN_NE, vi_sub(vi_set1(1), vi_cmpeq(x, y)))
+KERN_BINOP_U32(lt, KERN_LT, vi_cmplt_u32(x, y))
+KERN_BINOP_U32(le, KERN_LE, vi_sub(vi_set1(1), vi_cmplt_u32(y, x)))
+KERN_BINOP_U32(gt, KERN_GT, vi_cmplt_u32(y, x))
+KERN_BINOP_U32(ge, KERN_GE, vi_sub(vi_set1(1), vi_cmplt_u32(x, y)))
+
+#define KERN_FILL_BINOPS(type)                       \
+  ops->binop_##type[KERN_ADD] = KERN_FN(add_##type); \
+  ops->binop_##type[KERN_SUB] = KERN_FN(sub_##type); \
+  ops->binop_##type[KERN_MUL] = KERN_FN(mul_##type); \
+  ops->binop_##type[KERN_MIN] = KERN_FN(min_##type); \
+  ops->binop_##type[KERN_MAX] = KERN_FN(max_##type); \
+  ops->binop_##type[KERN_EQ] = KERN_FN(eq_##type);   \
+  ops->binop_##type[KERN_NE] = KERN_FN(ne_##type);   \
+  ops->binop_##type[KERN_LT] = KERN_FN(lt_##type);   \
+  ops->binop_##type[KERN_LE] = KERN_FN(le_##type);   \
+  ops->binop_##type[KERN_GT] = KERN_FN(gt_##type);   \
+  ops->binop_##type[KERN_GE] = KERN_FN(ge_##type);
+
+void KERN_FN(kern_fill)(Kern_ops_t *ops)
+{
+  ops->isa = KERN_ISA;
+
+  ops->scale_f32 = KERN_FN(scale_f32);
+  ops->offset_f32 = KERN_FN(offset_f32);
+  ops->affine_f32 = KERN_FN(affine_f32);
+  ops->clip_f32 = KERN_FN(clip_f32);
+  ops->abs_f32 = KERN_FN(abs_f32);
+  ops->square_f32 = KERN_FN(square_f32);
+  ops->sqrt_f32 = KERN_FN(sqrt_f32);
+  ops->log10_f32 = KERN_FN(log10_f32);
+
+  ops->scale_i32 = KERN_FN(scale_i32);
+  ops->offset_i32 = KERN_FN(offset_i32);
+  ops->affine_i32 = KERN_FN(affine_i32);
+  ops->clip_i32 = KERN_FN(clip_i32);
+  ops->abs_i32 = KERN_FN(abs_i32);
+  ops->square_i32 = KERN_FN(square_i32);
+  ops->sqrt_i32 = KERN_FN(sqrt_i32);
+
+  ops->scale_u32 = KERN_FN(scale_u32);
+  ops->offset_u32 = KERN_FN(offset_u32);
+  ops->affine_u32 = KERN_FN(affine_u32);
+  ops->clip_u32 = KERN_FN(clip_u32);
+  ops->square_u32 = KERN_FN(square_u32);
+  ops->sqrt_u32 = KERN_FN(sqrt_u32);
+
+  ops->cast_i32_f32 = KERN_FN(cast_i32_f32);
+  ops->cast_u32_f32 = KERN_FN(cast_u32_f32);
+  ops->cast_f32_i32 = KERN_FN(cast_f32_i32);
+  ops->cast_f32_u32 = KERN_FN(cast_f32_u32);
+
+  ops->fir_f32 = KERN_FN(fir_f32);
+  ops->gauss_f32 = KERN_FN(gauss_f32);
+
+  KERN_FILL_BINOPS(f32)
+  KERN_FILL_BINOPS(i32)
+  KERN_FILL_BINOPS(u32)
+  ops->binop_f32[KERN_DIV] = KERN_FN(div_f32);
+  ops->binop_i32[KERN_DIV] = kern_binop_i32_scalar[KERN_DIV];
+  ops->binop_u32[KERN_DIV] = kern_binop_u32_scalar[KERN_DIV];
+
+  ops->osc_f32[KERN_WAVE_SINE] = KERN_FN(osc_sine);
+  ops->osc_f32[KERN_WAVE_SQUARE] = KERN_FN(osc_square);
+  ops->osc_f32[KERN_WAVE_SAW] = KERN_FN(osc_saw);
+  ops->osc_f32[KERN_WAVE_TRIANGLE] = KERN_FN(osc_triangle);
+}
@@ -0,0 +1,164 @@
+/* SSE2 kernels: 4 lanes. SSE2 lacks 32 bit multiply, min/max and abs, so
+ * those are composed from older instructions. */
+#include "kernels_impl.h"
+
+#if KERN_X86
+
+#include <float.h>
+#include <immintrin.h>
+
+#define KERN_SUFFIX sse2
+#define KERN_ISA KERN_ISA_SSE2
+#define KERN_TARGET __attribute__((target("sse2")))
+#define KERN_W 4
+
+#define VF __m128
+#define VI __m128i
+
+#define vf_loadu(p) _mm_loadu_ps(p)
+#define vf_storeu(p, v) _mm_storeu_ps((p), (v))
+#define vf_set1(x) _mm_set1_ps(x)
+#define vf_add(a, b) _mm_add_ps((a), (b))
+#define vf_sub(a, b) _mm_sub_ps((a), (b))
+#define vf_mul(a, b) _mm_mul_ps((a), (b))
+#define vf_div(a, b) _mm_div_ps((a), (b))
+#define vf_min(a, b) _mm_min_ps((a), (b))
+#define vf_max(a, b) _mm_max_ps((a), (b))
+#define vf_sqrt(a) _mm_sqrt_ps(a)
+#define vf_abs(a) _mm_and_ps((a), _mm_castsi128_ps(_mm_set1_epi32(0x7fffffff)))
+#define vf_as_vi(a) _mm_castps_si128(a)
+#define vi_as_vf(a) _mm_castsi128_ps(a)
+#define vf_from_i32(a) _mm_cvtepi32_ps(a)
+#define vf_to_i32(a) _mm_cvtps_epi32(a)
+#define vf_cmpeq(a, b) _mm_and_ps(_mm_cmpeq_ps((a), (b)), _mm_set1_ps(1.0f))
+#define vf_cmplt(a, b) _mm_and_ps(_mm_cmplt_ps((a), (b)), _mm_set1_ps(1.0f))
+#define vf_cmple(a, b) _mm_and_ps(_mm_cmple_ps((a), (b)), _mm_set1_ps(1.0f))
+
+#define vi_loadu(p) _mm_loadu_si128((const __m128i *) (p))
+#define vi_storeu(p, v) _mm_storeu_si128((__m128i *) (p), (v))
+#define vi_set1(x) _mm_set1_epi32(x)
+#define vi_add(a, b) _mm_add_epi32((a), (b))
+#define vi_sub(a, b) _mm_sub_epi32((a), (b))
+#define vi_and(a, b) _mm_and_si128((a), (b))
+#define vi_or(a, b) _mm_or_si128((a), (b))
+#define vi_xor(a, b) _mm_xor_si128((a), (b))
+#define vi_slli(a, n) _mm_slli_epi32((a), (n))
+#define vi_srli(a, n) _mm_srli_epi32((a), (n))
+#define vi_cmpeq(a, b) _mm_srli_epi32(_mm_cmpeq_epi32((a), (b)), 31)
+#define vi_cmplt_i32(a, b) _mm_srli_epi32(_mm_cmplt_epi32((a), (b)), 31)
+
+#define vi_mullo sse2_mullo_epi32
+#define vi_min_i32 sse2_min_epi32
+#define vi_max_i32 sse2_max_epi32
+#define vi_min_u32 sse2_min_epu32
+#define vi_max_u32 sse2_max_epu32
+#define vi_abs_i32 sse2_abs_epi32
+#define vi_sqrt_i32 sse2_sqrt_epi32
+#define vi_sqrt_u32 sse2_sqrt_epu32
+#define vi_cmplt_u32 sse2_cmplt_epu32
+#define vf_lt_select sse2_lt_select_ps
+#define vf_any_special sse2_any_special_ps
+#define vf_ge_select_i32 sse2_ge_select_epi32
+
+static inline KERN_TARGET __m128 sse2_lt_select_ps(__m128 a, __m128 b, __m128 t,
+                                                   __m128 f)
+{
+  __m128 m = _mm_cmplt_ps(a, b);
+  return _mm_or_ps(_mm_and_ps(m, t), _mm_andnot_ps(m, f));
+}
+
+static inline KERN_TARGET int sse2_any_special_ps(__m128 x)
+{
+  __m128 ok = _mm_and_ps(_mm_cmpge_ps(x, _mm_set1_ps(FLT_MIN)),
+                         _mm_cmple_ps(x, _mm_set1_ps(FLT_MAX)));
+  return _mm_movemask_ps(ok) != 0xf;
+}
+
+/* Low 32 bits of each product: even and odd lanes via 32x32->64 multiplies */
+static inline KERN_TARGET __m128i sse2_mullo_epi32(__m128i a, __m128i b)
+{
+  __m128i even = _mm_mul_epu32(a, b);
+  __m128i odd = _mm_mul_epu32(_mm_srli_epi64(a, 32), _mm_srli_epi64(b, 32));
+  return _mm_unpacklo_epi32(_mm_shuffle_epi32(even, _MM_SHUFFLE(0, 0, 2, 0)),
+                            _mm_shuffle_epi32(odd, _MM_SHUFFLE(0, 0, 2, 0)));
+}
+
+static inline KERN_TARGET __m128i sse2_select_epi32(__m128i m, __m128i t,
+                                                    __m128i f)
+{
+  return _mm_or_si128(_mm_and_si128(m, t), _mm_andnot_si128(m, f));
+}
+
+static inline KERN_TARGET __m128i sse2_ge_select_epi32(__m128 a, __m128 b,
+                                                       __m128i t, __m128i f)
+{
+  return sse2_select_epi32(_mm_castps_si128(_mm_cmpge_ps(a, b)), t, f);
+}
+
+static inline KERN_TARGET __m128i sse2_min_epi32(__m128i a, __m128i b)
+{
+  return sse2_select_epi32(_mm_cmpgt_epi32(a, b), b, a);
+}
+
+static inline KERN_TARGET __m128i sse2_max_epi32(__m128i a, __m128i b)
+{
+  return sse2_select_epi32(_mm_cmpgt_epi32(a, b), a, b);
+}
+
+/* Unsigned compares are signed compares with the sign bit flipped */
+static inline KERN_TARGET __m128i sse2_min_epu32(__m128i a, __m128i b)
+{
+  const __m128i bias = _mm_set1_epi32(INT32_MIN);
+  __m128i gt = _mm_cmpgt_epi32(_mm_xor_si128(a, bias), _mm_xor_si128(b, bias));
+  return sse2_select_epi32(gt, b, a);
+}
+
+static inline KERN_TARGET __m128i sse2_max_epu32(__m128i a, __m128i b)
+{
+  const __m128i bias = _mm_set1_epi32(INT32_MIN);
+  __m128i gt = _mm_cmpgt_epi32(_mm_xor_si128(a, bias), _mm_xor_si128(b, bias));
+  return sse2_select_epi32(gt, a, b);
+}
+
+static inline KERN_TARGET __m128i sse2_cmplt_epu32(__m128i a, __m128i b)
+{
+  const __m128i bias = _mm_set1_epi32(INT32_MIN);
+  __m128i lt = _mm_cmplt_epi32(_mm_xor_si128(a, bias), _mm_xor_si128(b, bias));
+  return _mm_srli_epi32(lt, 31);
+}
+
+static inline KERN_TARGET __m128i sse2_abs_epi32(__m128i a)
+{
+  __m128i sign = _mm_srai_epi32(a, 31);
+  return _mm_sub_epi32(_mm_xor_si128(a, sign), sign);
+}
+
+/* floor(sqrt()) of two doubles per half; results are at most 65535 */
+static inline KERN_TARGET __m128i sse2_sqrt_halves(__m128d lo, __m128d hi)
+{
+  __m128i r_lo = _mm_cvttpd_epi32(_mm_sqrt_pd(lo));
+  __m128i r_hi = _mm_cvttpd_epi32(_mm_sqrt_pd(hi));
+  return _mm_unpacklo_epi64(r_lo, r_hi);
+}
+
+static inline KERN_TARGET __m128i sse2_sqrt_epi32(__m128i a)
+{
+  a = sse2_max_epi32(a, _mm_setzero_si128());
+  return sse2_sqrt_halves(_mm_cvtepi32_pd(a), _mm_cvtepi32_pd(_mm_shuffle_epi32(
+                                                  a, _MM_SHUFFLE(1, 0, 3, 2))));
+}
+
+static inline KERN_TARGET __m128i sse2_sqrt_epu32(__m128i a)
+{
+  // Convert as signed with the sign bit flipped, then add 2^31 back
+  const __m128d two31 = _mm_set1_pd(2147483648.0);
+  a = _mm_xor_si128(a, _mm_set1_epi32(INT32_MIN));
+  __m128d lo = _mm_add_pd(_mm_cvtepi32_pd(a), two31);
+  __m128d hi = _mm_add_pd(
+      _mm_cvtepi32_pd(_mm_shuffle_epi32(a, _MM_SHUFFLE(1, 0, 3, 2))), two31);
+  return sse2_sqrt_halves(lo, hi);
+}
+
+#include "kernels_simd.h"
+
+#endif /* KERN_X86 */
@@ -1,6 +1,8 @@
 #include "map.h"
 #include <stdbool.h>
 #include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
 #include <time.h>
 #include "batch_buffer.h"
 #include "bperr.h"
@@ -8,24 +10,108 @@
 
 // Map filter preserves most properties by default
 
+/* Stateless and stateful maps share the worker and may fuse with each other */
+static bool map_is_map(const Filter_t* f)
+{
+  return f->filt_type == FILT_T_MAP || f->filt_type == FILT_T_MAP_STATE;
+}
+
+/* Apply one stage's map function. 't_ns' is the timestamp of in[0] */
+static inline Bp_EC map_stage_apply(Map_filt_t* s, const void* in, void* out,
+                                    size_t n, long long t_ns,
+                                    unsigned period_ns)
+{
+  if (s->map_state_fcn != NULL) {
+    return s->map_state_fcn(s->state, in, out, n, t_ns, period_ns);
+  }
+  return s->map_fcn(in, out, n);
+}
+
+/* Last stage of the fused chain starting at 'f' (f itself when not fused) */
+static Map_filt_t* map_chain_tail(Map_filt_t* f)
+{
+  while (f->fused_next != NULL) {
+    f = f->fused_next;
+  }
+  return f;
+}
+
+/* Run the map functions of 'f' and its fused stages back to back. Stages
+ * alternate between 'dst' and a scratch buffer so that the last one writes to
+ * 'dst' and no stage reads the buffer it writes. */
+static Bp_EC map_chain_apply(Map_filt_t* f, const void* src, void* dst,
+                             size_t n, long long t_ns, unsigned period_ns)
+{
+  if (f->fused_next == NULL) {
+    Bp_EC err = map_stage_apply(f, src, dst, n, t_ns, period_ns);
+    if (err == Bp_EC_OK) {
+      f->base.metrics.samples_processed += n;
+    }
+    return err;
+  }
+
+  size_t remaining = 0;  // Stages after the current one
+  for (Map_filt_t* s = f->fused_next; s != NULL; s = s->fused_next) {
+    remaining++;
+  }
+
+  const void* in = src;
+  for (Map_filt_t* s = f; s != NULL; s = s->fused_next, remaining--) {
+    void* out = (remaining % 2 == 0) ? dst : f->fused_scratch;
+    Bp_EC err = map_stage_apply(s, in, out, n, t_ns, period_ns);
+    if (err != Bp_EC_OK) {
+      return err;
+    }
+    s->base.metrics.samples_processed += n;
+    in = out;
+  }
+
+  return Bp_EC_OK;
+}
+
+/* Count a submitted output batch against every stage of the chain */
+static void map_chain_count_batch(Map_filt_t* f)
+{
+  for (Map_filt_t* s = f; s != NULL; s = s->fused_next) {
+    s->base.metrics.n_batches++;
+  }
+}
+
+/* Validate the chain starting at 'f' against its input and final sink */
+static bool map_chain_valid(Map_filt_t* f, Batch_buff_t* sink)
+{
+  SampleDtype_t dtype = f->base.input_buffers[0]->dtype;
+  if (!sink || dtype != sink->dtype || dtype == DTYPE_NDEF ||
+      dtype >= DTYPE_MAX) {
+    return false;
+  }
+  for (Map_filt_t* s = f; s != NULL; s = s->fused_next) {
+    if ((!s->map_fcn && !s->map_state_fcn) ||
+        s->base.input_buffers[0]->dtype != dtype) {
+      return false;
+    }
+  }
+  return true;
+}
+
 void* map_worker(void* arg)
 {
   Map_filt_t* f = (Map_filt_t*) arg;
   Batch_t *input = NULL, *output = NULL;
   Bp_EC err = Bp_EC_OK;
 
+  // Fused stages write straight to the last stage's sink
+  Batch_buff_t* sink = map_chain_tail(f)->base.sinks[0];
+
   // Validate all configuration at once
-  if (!f->base.sinks[0] || !f->map_fcn ||
-      f->base.input_buffers[0]->dtype != f->base.sinks[0]->dtype ||
-      f->base.input_buffers[0]->dtype == DTYPE_NDEF ||
-      f->base.input_buffers[0]->dtype >= DTYPE_MAX) {
+  if (!map_chain_valid(f, sink)) {
     f->base.worker_err_info.ec = Bp_EC_INVALID_CONFIG;
     return NULL;
   }
 
   // Cache frequently used values
   const size_t data_width = bb_getdatawidth(f->base.input_buffers[0]->dtype);
-  const size_t batch_size = bb_batch_size(f->base.sinks[0]);
+  const size_t batch_size = bb_batch_size(sink);
 
   // Main processing loop
   while (atomic_load(&f->base.running)) {
@@ -53,7 +139,7 @@ void* map_worker(void* arg)
 
     // Get new output batch if needed
     if (!output) {
-      output = bb_get_head(f->base.sinks[0]);
+      output = bb_get_head(sink);
       if (!output) break;  // No output buffer available
       output->head = 0;
     }
@@ -63,16 +149,16 @@ void* map_worker(void* arg)
 
     size_t n = MIN(input->head - f->input_consumed, batch_size - output->head);
     if (n > 0) {
-      err = f->map_fcn((char*) input->data + f->input_consumed * data_width,
-                       (char*) output->data + output->head * data_width, n);
+      err = map_chain_apply(
+          f, (char*) input->data + f->input_consumed * data_width,
+          (char*) output->data + output->head * data_width, n,
+          f->input_t_ns + f->input_consumed * f->input_period_ns,
+          f->input_period_ns);
       if (err != Bp_EC_OK) break;
 
       f->input_consumed += n;
       output->head += n;
 
-      // Update samples processed metric
-      f->base.metrics.samples_processed += n;
-
       // Preserve timing information
       if (output->head == n) {  // First samples in this batch
         // Calculate timestamp for the first consumed sample
@@ -84,11 +170,10 @@ void* map_worker(void* arg)
 
     // Submit output if batch is full
     if (output->head >= batch_size) {
-      err = bb_submit(f->base.sinks[0], f->base.timeout_us);
+      err = bb_submit(sink, f->base.timeout_us);
       if (err != Bp_EC_OK) break;
       output = NULL;  // Force getting a new output batch
-      f->base.metrics
-          .n_batches++;  // Increment batch count only when submitting
+      map_chain_count_batch(f);  // Count batches only when submitting
     }
   }
 
@@ -98,26 +183,169 @@ void* map_worker(void* arg)
     atomic_store(&f->base.running, false);  // Stop filter on error
   }
 
-  if (output && output->head > 0)
-    bb_submit(f->base.sinks[0], f->base.timeout_us);
+  if (output && output->head > 0) bb_submit(sink, f->base.timeout_us);
 
   return NULL;
 }
 
+/* Scheduler step. Partial output accumulates in the sink's head slot between
+ * steps, so the output must be an ordinary (single-producer) buffer. */
+static Bp_EC map_step(Filter_t* self)
+{
+  Map_filt_t* f = (Map_filt_t*) self;
+  Batch_buff_t* in = self->input_buffers[0];
+  Batch_buff_t* out = map_chain_tail(f)->base.sinks[0];
+  Bp_EC err = Bp_EC_OK;
+
+  if (!map_chain_valid(f, out) || out->multi_producer) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  const size_t data_width = bb_getdatawidth(in->dtype);
+  const size_t batch_size = bb_batch_size(out);
+
+  for (int i = 0; i < SCHED_STEP_BATCHES; i++) {
+    Batch_t* output = bb_get_head(out);
+    if (!f->output_open) {
+      output->head = 0;
+      output->ec = Bp_EC_OK;
+      f->output_open = true;
+    }
+
+    // Submit output if batch is full
+    if (output->head >= batch_size) {
+      if (!bb_has_space(out)) return Bp_EC_NOSPACE;
+      err = bb_submit(out, self->timeout_us);
+      if (err != Bp_EC_OK) return err;
+      f->output_open = false;
+      map_chain_count_batch(f);
+      continue;
+    }
+
+    if (bb_isempy_lockfree(in)) return Bp_EC_NOINPUT;
+    Batch_t* input = bb_get_tail(in, self->timeout_us, &err);
+    if (!input) return err;
+
+    if (input->ec == Bp_EC_COMPLETE) {
+      // Flush the partial batch, then pass completion downstream
+      if (output->head > 0) {
+        if (!bb_has_space(out)) return Bp_EC_NOSPACE;
+        err = bb_submit(out, self->timeout_us);
+        if (err != Bp_EC_OK) return err;
+        map_chain_count_batch(f);
+        output = bb_get_head(out);
+      }
+      if (!bb_has_space(out)) {
+        f->output_open = false;
+        return Bp_EC_NOSPACE;
+      }
+      output->ec = Bp_EC_COMPLETE;
+      output->head = 0;
+      err = bb_submit(out, self->timeout_us);
+      if (err != Bp_EC_OK) return err;
+      f->output_open = false;
+      bb_del_tail(in);
+      return Bp_EC_COMPLETE;
+    }
+
+    size_t n = MIN(input->head - f->input_consumed, batch_size - output->head);
+    if (n > 0) {
+      err = map_chain_apply(
+          f, (char*) input->data + f->input_consumed * data_width,
+          (char*) output->data + output->head * data_width, n,
+          input->t_ns + f->input_consumed * input->period_ns, input->period_ns);
+      if (err != Bp_EC_OK) return err;
+
+      if (output->head == 0) {  // First samples in this batch
+        output->t_ns = input->t_ns + f->input_consumed * input->period_ns;
+        output->period_ns = input->period_ns;
+      }
+      f->input_consumed += n;
+      output->head += n;
+    }
+
+    if (f->input_consumed >= input->head) {
+      err = bb_del_tail(in);
+      if (err != Bp_EC_OK) return err;
+      f->input_consumed = 0;
+    }
+  }
+
+  return Bp_EC_OK;
+}
+
 /* Map-specific operations */
 static Bp_EC map_flush(Filter_t* self)
 {
+  Batch_buff_t* sink = map_chain_tail((Map_filt_t*) self)->base.sinks[0];
+
   // Submit any pending output batches
-  if (self->sinks[0] != NULL) {
-    Batch_t* current_batch = bb_get_head(self->sinks[0]);
+  if (sink != NULL) {
+    Batch_t* current_batch = bb_get_head(sink);
     if (current_batch && current_batch->head > 0) {
-      return bb_submit(self->sinks[0], self->timeout_us);
+      return bb_submit(sink, self->timeout_us);
+    }
+  }
+
+  return Bp_EC_OK;
+}
+
+/* Fused stages are run by the chain's first stage - no thread of their own */
+static Bp_EC map_fused_start(Filter_t* self)
+{
+  if (atomic_load(&self->running)) {
+    return Bp_EC_ALREADY_RUNNING;
+  }
+  atomic_store(&self->running, true);
+  return Bp_EC_OK;
+}
+
+static Bp_EC map_fused_stop(Filter_t* self)
+{
+  if (!atomic_load(&self->running)) {
+    return Bp_EC_OK;
+  }
+  atomic_store(&self->running, false);
+
+  // Release the chain's worker if it is blocked on our sink
+  if (self->sinks[0] != NULL && !self->sinks[0]->multi_producer) {
+    bb_force_return_head(self->sinks[0], Bp_EC_FILTER_STOPPING);
+  }
+  return Bp_EC_OK;
+}
+
+static Bp_EC map_deinit(Filter_t* self)
+{
+  Map_filt_t* f = (Map_filt_t*) self;
+
+  free(f->fused_scratch);
+  f->fused_scratch = NULL;
+
+  free(f->state);
+  f->state = NULL;
+
+  // Do default deinit actions
+  for (int i = 0; i < self->n_input_buffers; i++) {
+    if (self->input_buffers[i]) {
+      bb_deinit(self->input_buffers[i]);
+      free(self->input_buffers[i]);
+      self->input_buffers[i] = NULL;
     }
   }
 
+  // Destroy mutex
+  pthread_mutex_destroy(&self->filter_mutex);
+
+  self->filt_type = FILT_T_NDEF;
   return Bp_EC_OK;
 }
 
+/* Whichever map function is set, for diagnostics */
+static void* map_fcn_ptr(Map_filt_t* f)
+{
+  return f->map_state_fcn ? (void*) f->map_state_fcn : (void*) f->map_fcn;
+}
+
 static Bp_EC map_describe(Filter_t* self, char* buffer, size_t buffer_size)
 {
   Map_filt_t* map = (Map_filt_t*) self;
@@ -132,7 +360,7 @@ static Bp_EC map_describe(Filter_t* self, char* buffer, size_t buffer_size)
            "  Map function: %p\n"
            "  Running: %s\n"
            "  Batches processed: %zu",
-           self->name, self->input_buffers[0]->dtype, (void*) map->map_fcn,
+           self->name, self->input_buffers[0]->dtype, map_fcn_ptr(map),
            self->running ? "true" : "false", self->metrics.n_batches);
 
   return Bp_EC_OK;
@@ -171,48 +399,76 @@ static Bp_EC map_dump_state(Filter_t* self, char* buffer, size_t buffer_size)
            "  Timeout: %lu us",
            self->name, self->filt_type, self->running ? "true" : "false",
            self->metrics.n_batches, bb_occupancy(self->input_buffers[0]),
-           self->sinks[0] ? bb_occupancy(self->sinks[0]) : 0,
-           (void*) map->map_fcn, self->data_width, self->timeout_us);
+           self->sinks[0] ? bb_occupancy(self->sinks[0]) : 0, map_fcn_ptr(map),
+           self->data_width, self->timeout_us);
 
   return Bp_EC_OK;
 }
 
 Bp_EC map_init(Map_filt_t* f, Map_config_t config)
 {
-  Core_filt_config_t core_config;
+  Core_filt_config_t core_config = {0};
   if (f == NULL) {
     return Bp_EC_INVALID_CONFIG;
   }
 
+  // Exactly one map function; initial state needs somewhere to go
+  if ((config.map_fcn == NULL) == (config.map_state_fcn == NULL) ||
+      (config.map_fcn != NULL && config.state_size > 0) ||
+      (config.state_init != NULL && config.state_size == 0)) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
   /* copy Batch Buffer config */
   core_config.buff_config = config.buff_config;
   core_config.worker = &map_worker;
+  core_config.step = &map_step;
 
   /* Map is always a 1->1 filter */
   core_config.n_inputs = 1;               // Map always has exactly one input
   core_config.max_supported_sinks = 1;    // Map always has exactly one output
-  core_config.filt_type = FILT_T_MAP;     // Filter type is always map
+  core_config.filt_type = FILT_T_MAP;     // Stateless unless set below
   core_config.size = sizeof(Map_filt_t);  // Size for inheritance
   core_config.name = config.name;
   core_config.timeout_us = config.timeout_us;
+  if (config.map_state_fcn != NULL) {
+    core_config.filt_type = FILT_T_MAP_STATE;
+  }
 
   Bp_EC err = filt_init(&f->base, core_config);
 
   if (err != Bp_EC_OK) {
     return err;
   }
-  if (config.map_fcn == NULL) {
-    return Bp_EC_INVALID_CONFIG;
-  }
+  f->state = NULL;
+
   f->map_fcn = config.map_fcn;
+  f->map_state_fcn = config.map_state_fcn;
+
+  // The state is allocated once here, so the worker never allocates for it
+  if (config.state_size > 0) {
+    f->state = calloc(1, config.state_size);
+    if (f->state == NULL) {
+      filt_deinit(&f->base);
+      return Bp_EC_MALLOC_FAIL;
+    }
+    if (config.state_init != NULL) {
+      memcpy(f->state, config.state_init, config.state_size);
+    }
+  }
 
   // Initialize partial consumption tracking
   f->input_consumed = 0;
   f->input_t_ns = 0;
   f->input_period_ns = 0;
+  f->output_open = false;
+  f->fused_next = NULL;
+  f->fused_head = NULL;
+  f->fused_scratch = NULL;
 
   // Override specific operations with map-specific implementations
   f->base.ops.flush = map_flush;
+  f->base.ops.deinit = map_deinit;
   f->base.ops.describe = map_describe;
   f->base.ops.get_stats = map_get_stats;
   f->base.ops.dump_state = map_dump_state;
@@ -247,3 +503,48 @@ Bp_EC map_init(Map_filt_t* f, Map_config_t config)
 
   return Bp_EC_OK;
 };
+
+Bp_EC map_fuse(Map_filt_t* up, Map_filt_t* down)
+{
+  if (up == NULL || down == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+  if (up == down || !map_is_map(&up->base) || !map_is_map(&down->base)) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  if (atomic_load(&up->base.running) || atomic_load(&down->base.running)) {
+    return Bp_EC_ALREADY_RUNNING;
+  }
+  // 'up' must feed 'down' directly, and each may be fused only once per side
+  if (up->base.sinks[0] != down->base.input_buffers[0] ||
+      up->fused_next != NULL || down->fused_head != NULL) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  if (up->base.input_buffers[0]->dtype != down->base.input_buffers[0]->dtype) {
+    return Bp_EC_DTYPE_MISMATCH;
+  }
+
+  // The chain's worker alternates stages through one batch of scratch
+  Map_filt_t* head = up->fused_head != NULL ? up->fused_head : up;
+  if (head->fused_scratch == NULL) {
+    Batch_buff_t* in = head->base.input_buffers[0];
+    head->fused_scratch =
+        malloc(bb_batch_size(in) * bb_getdatawidth(in->dtype));
+    if (head->fused_scratch == NULL) {
+      return Bp_EC_MALLOC_FAIL;
+    }
+  }
+  // 'down' no longer runs a chain of its own
+  free(down->fused_scratch);
+  down->fused_scratch = NULL;
+
+  up->fused_next = down;
+  for (Map_filt_t* s = down; s != NULL; s = s->fused_next) {
+    s->fused_head = head;
+    s->base.ops.start = map_fused_start;
+    s->base.ops.stop = map_fused_stop;
+    s->base.step = NULL;  // Never scheduled on its own
+  }
+
+  return Bp_EC_OK;
+}
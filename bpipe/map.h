@@ -7,14 +7,29 @@
 
 typedef Bp_EC (*Map_fcn_t)(const void* in, void* out, size_t n_samples);
 
+/* Stateful map function (FILT_T_MAP_STATE). 'state' is the filter's own
+ * scratchpad, allocated once at init and only touched by the filter's worker.
+ * 't_ns' is the timestamp of in[0]; samples are 'period_ns' apart. */
+typedef Bp_EC (*Map_state_fcn_t)(void* state, const void* in, void* out,
+                                 size_t n_samples, long long t_ns,
+                                 unsigned period_ns);
+
 typedef struct _Map_filt_t {
   Filter_t base;
   Map_fcn_t map_fcn;
+  Map_state_fcn_t map_state_fcn;  // Set instead of map_fcn for MAP_STATE
+  void* state;                    // map_state_fcn's scratchpad, or NULL
 
   // Internal state for tracking partial batch consumption
   size_t input_consumed;  // Number of samples consumed from current input batch
   long long input_t_ns;   // Timestamp of current input batch being processed
   unsigned input_period_ns;  // Period of current input batch
+  bool output_open;  // Sink head slot holds a partial batch (map_step only)
+
+  // Fusion (see map_fuse): stages after this one run in this filter's worker
+  struct _Map_filt_t* fused_next;  // Next stage run back-to-back, or NULL
+  struct _Map_filt_t* fused_head;  // Stage running this one, NULL if none
+  void* fused_scratch;             // One input batch between stages
 } Map_filt_t;
 
 typedef struct _Map_filt_config_t {
@@ -22,12 +37,77 @@ typedef struct _Map_filt_config_t {
   BatchBuffer_config buff_config;
   Map_fcn_t map_fcn;
   long timeout_us;
+
+  // Stateful variant: set map_state_fcn instead of map_fcn
+  Map_state_fcn_t map_state_fcn;
+  size_t state_size;       // Bytes of state to allocate, may be 0
+  const void* state_init;  // Copied into the state at init, NULL for zeros
 } Map_config_t;
 
+/* Initialise a map filter. Exactly one of map_fcn and map_state_fcn must be
+ * set; with map_state_fcn the filter type is FILT_T_MAP_STATE. */
 Bp_EC map_init(Map_filt_t* f, Map_config_t config);
 
+/* Fuse 'down' (and any stages already fused to it) into 'up', which must feed
+ * it directly. The worker of the chain's first stage then runs every map_fcn
+ * back-to-back on one batch and writes to the last stage's sink. The ring
+ * between them is no longer used and fused stages start no thread, but each
+ * stage still reports its own metrics. Stateless and stateful maps fuse alike.
+ * The chain's scratch batch is allocated here, never on the worker path.
+ * Both filters must be stopped.
+ * filt_stop() the last stage first, so a worker blocked on its sink wakes. */
+Bp_EC map_fuse(Map_filt_t* up, Map_filt_t* down);
+
 /* Example map functions */
 Bp_EC map_identity_f32(const void* in, void* out, size_t n_samples);
 Bp_EC map_identity_memcpy(const void* in, void* out, size_t n_samples);
 
+/* Built-in map functions, backed by the vectorised kernels in kernels.h */
+Bp_EC map_abs_f32(const void* in, void* out, size_t n_samples);
+Bp_EC map_square_f32(const void* in, void* out, size_t n_samples);
+Bp_EC map_sqrt_f32(const void* in, void* out, size_t n_samples);
+Bp_EC map_log10_f32(const void* in, void* out, size_t n_samples);
+Bp_EC map_abs_i32(const void* in, void* out, size_t n_samples);
+Bp_EC map_square_i32(const void* in, void* out, size_t n_samples);
+Bp_EC map_sqrt_i32(const void* in, void* out, size_t n_samples);
+Bp_EC map_square_u32(const void* in, void* out, size_t n_samples);
+Bp_EC map_sqrt_u32(const void* in, void* out, size_t n_samples);
+
+/* Built-in stateful map functions for the parameterised kernels. The state
+ * holds the parameters: pass one of these structs as state_init with
+ * state_size = sizeof(struct). Scale and offset are affine with b = 0 or
+ * a = 1. */
+typedef struct {
+  float a, b;  // out = a * in + b
+} Map_affine_f32_t;
+typedef struct {
+  int32_t a, b;
+} Map_affine_i32_t;
+typedef struct {
+  uint32_t a, b;
+} Map_affine_u32_t;
+
+typedef struct {
+  float lo, hi;  // out = min(max(in, lo), hi)
+} Map_clip_f32_t;
+typedef struct {
+  int32_t lo, hi;
+} Map_clip_i32_t;
+typedef struct {
+  uint32_t lo, hi;
+} Map_clip_u32_t;
+
+Bp_EC map_affine_f32(void* state, const void* in, void* out, size_t n_samples,
+                     long long t_ns, unsigned period_ns);
+Bp_EC map_affine_i32(void* state, const void* in, void* out, size_t n_samples,
+                     long long t_ns, unsigned period_ns);
+Bp_EC map_affine_u32(void* state, const void* in, void* out, size_t n_samples,
+                     long long t_ns, unsigned period_ns);
+Bp_EC map_clip_f32(void* state, const void* in, void* out, size_t n_samples,
+                   long long t_ns, unsigned period_ns);
+Bp_EC map_clip_i32(void* state, const void* in, void* out, size_t n_samples,
+                   long long t_ns, unsigned period_ns);
+Bp_EC map_clip_u32(void* state, const void* in, void* out, size_t n_samples,
+                   long long t_ns, unsigned period_ns);
+
 #endif /* MAP_H */
@@ -1,4 +1,5 @@
 #include <string.h>
+#include "kernels.h"
 #include "map.h"
 
 /* =============================================================================
@@ -29,4 +30,148 @@ Bp_EC map_identity_memcpy(const void* in, void* out, size_t n_samples)
   memcpy(out, in, n_samples * sizeof(float));
 
   return Bp_EC_OK;
-}
\ No newline at end of file
+}
+
+/* =============================================================================
+ * Built-in Map Functions
+ * =============================================================================
+ */
+
+Bp_EC map_abs_f32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_abs_f32((const float*) in, (float*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_square_f32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_square_f32((const float*) in, (float*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_sqrt_f32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_sqrt_f32((const float*) in, (float*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_log10_f32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_log10_f32((const float*) in, (float*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_abs_i32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_abs_i32((const int32_t*) in, (int32_t*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_square_i32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_square_i32((const int32_t*) in, (int32_t*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_sqrt_i32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_sqrt_i32((const int32_t*) in, (int32_t*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_square_u32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_square_u32((const uint32_t*) in, (uint32_t*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_sqrt_u32(const void* in, void* out, size_t n_samples)
+{
+  if (!in || !out) return Bp_EC_NULL_POINTER;
+
+  kern_sqrt_u32((const uint32_t*) in, (uint32_t*) out, n_samples);
+  return Bp_EC_OK;
+}
+
+/* =============================================================================
+ * Stateful Map Functions - parameters live in the filter state
+ * =============================================================================
+ */
+
+Bp_EC map_affine_f32(void* state, const void* in, void* out, size_t n_samples,
+                     long long t_ns, unsigned period_ns)
+{
+  if (!state || !in || !out) return Bp_EC_NULL_POINTER;
+
+  const Map_affine_f32_t* p = (const Map_affine_f32_t*) state;
+  kern_affine_f32((const float*) in, (float*) out, n_samples, p->a, p->b);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_affine_i32(void* state, const void* in, void* out, size_t n_samples,
+                     long long t_ns, unsigned period_ns)
+{
+  if (!state || !in || !out) return Bp_EC_NULL_POINTER;
+
+  const Map_affine_i32_t* p = (const Map_affine_i32_t*) state;
+  kern_affine_i32((const int32_t*) in, (int32_t*) out, n_samples, p->a, p->b);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_affine_u32(void* state, const void* in, void* out, size_t n_samples,
+                     long long t_ns, unsigned period_ns)
+{
+  if (!state || !in || !out) return Bp_EC_NULL_POINTER;
+
+  const Map_affine_u32_t* p = (const Map_affine_u32_t*) state;
+  kern_affine_u32((const uint32_t*) in, (uint32_t*) out, n_samples, p->a,
+                  p->b);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_clip_f32(void* state, const void* in, void* out, size_t n_samples,
+                   long long t_ns, unsigned period_ns)
+{
+  if (!state || !in || !out) return Bp_EC_NULL_POINTER;
+
+  const Map_clip_f32_t* p = (const Map_clip_f32_t*) state;
+  kern_clip_f32((const float*) in, (float*) out, n_samples, p->lo, p->hi);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_clip_i32(void* state, const void* in, void* out, size_t n_samples,
+                   long long t_ns, unsigned period_ns)
+{
+  if (!state || !in || !out) return Bp_EC_NULL_POINTER;
+
+  const Map_clip_i32_t* p = (const Map_clip_i32_t*) state;
+  kern_clip_i32((const int32_t*) in, (int32_t*) out, n_samples, p->lo, p->hi);
+  return Bp_EC_OK;
+}
+
+Bp_EC map_clip_u32(void* state, const void* in, void* out, size_t n_samples,
+                   long long t_ns, unsigned period_ns)
+{
+  if (!state || !in || !out) return Bp_EC_NULL_POINTER;
+
+  const Map_clip_u32_t* p = (const Map_clip_u32_t*) state;
+  kern_clip_u32((const uint32_t*) in, (uint32_t*) out, n_samples, p->lo,
+                p->hi);
+  return Bp_EC_OK;
+}
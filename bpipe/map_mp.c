@@ -0,0 +1,356 @@
+#define _GNU_SOURCE  // For sysconf // NOLINT(bugprone-reserved-identifier)
+#include "map_mp.h"
+#include <stdatomic.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include "batch_buffer.h"
+#include "utils.h"
+
+/* Map one input batch into its output slot, carrying the metadata across */
+static Bp_EC map_mp_process(MapMP_filt_t* f, const Batch_t* input,
+                            Batch_t* output)
+{
+  output->batch_id = input->batch_id;
+  output->t_ns = input->t_ns;
+  output->period_ns = input->period_ns;
+  output->meta = input->meta;
+  output->ec = input->ec;
+  output->head = input->head;
+
+  if (input->ec != Bp_EC_OK || input->head == 0) {
+    return Bp_EC_OK;
+  }
+  return f->map_fcn(input->data, output->data, input->head);
+}
+
+/* Commit the leading run of finished batches downstream, in order, with one
+ * head and one tail update. Called with 'lock' held. */
+static Bp_EC map_mp_retire(MapMP_filt_t* f)
+{
+  Batch_buff_t* in = f->base.input_buffers[0];
+  Batch_buff_t* out = f->base.sinks[0];
+  bool complete = false;
+  size_t n = 0;
+  size_t n_samples = 0;
+  size_t n_batches = 0;
+
+  while (f->retired + n < f->next_seq &&
+         f->done[(f->retired + n) % f->window]) {
+    f->done[(f->retired + n) % f->window] = false;
+
+    Batch_t* output = bb_get_head_at(out, n);
+    if (output->ec == Bp_EC_COMPLETE) {
+      complete = true;
+    } else {
+      n_samples += output->head;
+      n_batches++;
+    }
+    n++;
+  }
+  if (n == 0) {
+    return Bp_EC_OK;
+  }
+
+  // The input stays claimed: a restart maps these batches again
+  Bp_EC err = bb_commit_n(out, n, f->base.timeout_us);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+  bb_release_n(in, n);
+  f->retired += n;
+  f->base.metrics.samples_processed += n_samples;
+  f->base.metrics.n_batches += n_batches;
+
+  if (complete) {
+    atomic_store(&f->base.running, false);
+  }
+  return Bp_EC_OK;
+}
+
+/* Body of every pool thread */
+static void map_mp_run(MapMP_filt_t* f)
+{
+  Batch_buff_t* in = f->base.input_buffers[0];
+  Batch_buff_t* out = f->base.sinks[0];
+  Bp_EC err = Bp_EC_OK;
+
+  pthread_mutex_lock(&f->lock);
+  while (atomic_load(&f->base.running)) {
+    size_t in_flight = f->next_seq - f->retired;
+
+    // Claim the next batch if it has arrived and its output slot is free
+    if (!f->complete_seen && bb_occupancy_lockfree(in) > in_flight &&
+        bb_space(out) > in_flight) {
+      size_t seq = f->next_seq++;
+      const Batch_t* input = bb_get_tail_at(in, in_flight);
+      Batch_t* output = bb_get_head_at(out, in_flight);
+      if (input->ec == Bp_EC_COMPLETE) {
+        f->complete_seen = true;
+      }
+
+      pthread_mutex_unlock(&f->lock);
+      err = map_mp_process(f, input, output);
+      pthread_mutex_lock(&f->lock);
+
+      if (err != Bp_EC_OK) {
+        f->base.worker_err_info.ec = err;
+        atomic_store(&f->base.running, false);
+        break;
+      }
+      if (seq != f->retired) {
+        f->out_of_order++;
+      }
+      f->done[seq % f->window] = true;
+      err = map_mp_retire(f);
+      if (err != Bp_EC_OK) {
+        f->base.worker_err_info.ec = err;
+        atomic_store(&f->base.running, false);
+        break;
+      }
+      pthread_cond_broadcast(&f->progress);
+      continue;
+    }
+
+    // Another worker will report back - either with a result or new data
+    if (in_flight > 0 || f->waiting) {
+      pthread_cond_wait(&f->progress, &f->lock);
+      continue;
+    }
+
+    // Idle and nobody watching: wait for the buffers outside the lock
+    f->waiting = true;
+    pthread_mutex_unlock(&f->lock);
+    if (bb_occupancy_lockfree(in) == 0) {
+      bb_peek_n(in, 1, f->base.timeout_us, &err);
+    } else {
+      bb_reserve_n(out, 1, f->base.timeout_us, &err);
+    }
+    pthread_mutex_lock(&f->lock);
+    f->waiting = false;
+    pthread_cond_broadcast(&f->progress);
+
+    if (err == Bp_EC_TIMEOUT) {
+      err = Bp_EC_OK;
+      continue;
+    }
+    if (err != Bp_EC_OK) {
+      if (err != Bp_EC_STOPPED && err != Bp_EC_FILTER_STOPPING) {
+        f->base.worker_err_info.ec = err;
+      }
+      atomic_store(&f->base.running, false);
+      break;
+    }
+  }
+
+  // Release the rest of the pool
+  pthread_cond_broadcast(&f->progress);
+  pthread_mutex_unlock(&f->lock);
+}
+
+static void* map_mp_helper(void* arg)
+{
+  map_mp_run((MapMP_filt_t*) arg);
+  return NULL;
+}
+
+static void* map_mp_worker(void* arg)
+{
+  MapMP_filt_t* f = (MapMP_filt_t*) arg;
+  Batch_buff_t* in = f->base.input_buffers[0];
+  Batch_buff_t* out = f->base.sinks[0];
+
+  BP_WORKER_ASSERT(&f->base, out != NULL, Bp_EC_NO_SINK);
+  BP_WORKER_ASSERT(&f->base, !out->multi_producer, Bp_EC_INVALID_CONFIG);
+  BP_WORKER_ASSERT(&f->base, in->dtype == out->dtype, Bp_EC_DTYPE_MISMATCH);
+  BP_WORKER_ASSERT(&f->base, bb_batch_size(out) >= bb_batch_size(in),
+                   Bp_EC_CAPACITY_MISMATCH);
+
+  // Batches claimed but not retired before a stop are simply mapped again
+  pthread_mutex_lock(&f->lock);
+  f->next_seq = 0;
+  f->retired = 0;
+  f->waiting = false;
+  f->complete_seen = false;
+  memset(f->done, 0, f->window * sizeof(bool));
+  pthread_mutex_unlock(&f->lock);
+
+  size_t n_helpers = 0;
+  while (n_helpers + 1 < f->n_workers &&
+         pthread_create(&f->helpers[n_helpers], NULL, map_mp_helper, f) == 0) {
+    n_helpers++;
+  }
+
+  map_mp_run(f);
+
+  for (size_t i = 0; i < n_helpers; i++) {
+    pthread_join(f->helpers[i], NULL);
+  }
+
+  return NULL;
+}
+
+/* The pool clears 'running' itself on completion or error, so unlike the
+ * default stop this joins whenever a worker was started. */
+static Bp_EC map_mp_start(Filter_t* self)
+{
+  MapMP_filt_t* f = (MapMP_filt_t*) self;
+
+  if (f->started) {
+    return Bp_EC_ALREADY_RUNNING;
+  }
+
+  atomic_store(&self->running, true);
+  if (pthread_create(&self->worker_thread, NULL, self->worker, self) != 0) {
+    atomic_store(&self->running, false);
+    return Bp_EC_THREAD_CREATE_FAIL;
+  }
+  f->started = true;
+  return Bp_EC_OK;
+}
+
+static Bp_EC map_mp_stop(Filter_t* self)
+{
+  MapMP_filt_t* f = (MapMP_filt_t*) self;
+
+  if (!f->started) {
+    return Bp_EC_OK;
+  }
+  atomic_store(&self->running, false);
+
+  // Release the waiting worker, whichever buffer it is blocked on
+  Batch_buff_t* in = self->input_buffers[0];
+  bb_force_return_head(in, Bp_EC_FILTER_STOPPING);
+  bb_force_return_tail(in, Bp_EC_FILTER_STOPPING);
+  if (self->sinks[0] != NULL) {
+    bb_force_return_head(self->sinks[0], Bp_EC_FILTER_STOPPING);
+  }
+
+  if (pthread_join(self->worker_thread, NULL) != 0) {
+    return Bp_EC_THREAD_JOIN_FAIL;
+  }
+  f->started = false;
+  return Bp_EC_OK;
+}
+
+static Bp_EC map_mp_describe(Filter_t* self, char* buffer, size_t size)
+{
+  MapMP_filt_t* f = (MapMP_filt_t*) self;
+
+  snprintf(buffer, size,
+           "Parallel Map: %s\n"
+           "  Workers: %zu\n"
+           "  Batches processed: %zu\n"
+           "  Samples processed: %zu\n"
+           "  Reordered batches: %zu\n",
+           self->name, f->n_workers, self->metrics.n_batches,
+           self->metrics.samples_processed, f->out_of_order);
+  return Bp_EC_OK;
+}
+
+static Bp_EC map_mp_deinit(Filter_t* self)
+{
+  MapMP_filt_t* f = (MapMP_filt_t*) self;
+
+  free(f->helpers);
+  f->helpers = NULL;
+  free(f->done);
+  f->done = NULL;
+  pthread_cond_destroy(&f->progress);
+  pthread_mutex_destroy(&f->lock);
+
+  // Do default deinit actions
+  for (int i = 0; i < self->n_input_buffers; i++) {
+    if (self->input_buffers[i]) {
+      bb_deinit(self->input_buffers[i]);
+      free(self->input_buffers[i]);
+      self->input_buffers[i] = NULL;
+    }
+  }
+
+  // Destroy mutex
+  pthread_mutex_destroy(&self->filter_mutex);
+
+  self->filt_type = FILT_T_NDEF;
+  return Bp_EC_OK;
+}
+
+Bp_EC map_mp_init(MapMP_filt_t* f, MapMP_config_t config)
+{
+  if (f == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+  if (config.map_fcn == NULL) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  // Workers read batches past the tail, which only OVERFLOW_BLOCK leaves alone
+  if (config.buff_config.overflow_behaviour != OVERFLOW_BLOCK) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  Core_filt_config_t core_config = {
+      .name = config.name,
+      .filt_type = FILT_T_MAP_MP,
+      .size = sizeof(MapMP_filt_t),
+      .n_inputs = 1,
+      .max_supported_sinks = 1,
+      .buff_config = config.buff_config,
+      .timeout_us = config.timeout_us,
+      .worker = map_mp_worker};
+
+  Bp_EC err = filt_init(&f->base, core_config);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  f->map_fcn = config.map_fcn;
+  f->n_workers = config.n_workers;
+  if (f->n_workers == 0) {
+    long n_cpus = sysconf(_SC_NPROCESSORS_ONLN);
+    f->n_workers = n_cpus > 0 ? (size_t) n_cpus : 1;
+  }
+
+  f->window = bb_n_batches(f->base.input_buffers[0]);
+  f->helpers = calloc(f->n_workers, sizeof(pthread_t));
+  f->done = calloc(f->window, sizeof(bool));
+  if (f->helpers == NULL || f->done == NULL) {
+    free(f->helpers);
+    free(f->done);
+    filt_deinit(&f->base);
+    return Bp_EC_MALLOC_FAIL;
+  }
+
+  if (pthread_mutex_init(&f->lock, NULL) != 0) {
+    free(f->helpers);
+    free(f->done);
+    filt_deinit(&f->base);
+    return Bp_EC_MUTEX_INIT_FAIL;
+  }
+  if (pthread_cond_init(&f->progress, NULL) != 0) {
+    pthread_mutex_destroy(&f->lock);
+    free(f->helpers);
+    free(f->done);
+    filt_deinit(&f->base);
+    return Bp_EC_COND_INIT_FAIL;
+  }
+
+  f->next_seq = 0;
+  f->retired = 0;
+  f->waiting = false;
+  f->complete_seen = false;
+  f->out_of_order = 0;
+  f->started = false;
+
+  f->base.ops.start = map_mp_start;
+  f->base.ops.stop = map_mp_stop;
+  f->base.ops.describe = map_mp_describe;
+  f->base.ops.deinit = map_mp_deinit;
+
+  // Same contract as a passthrough: one output batch per input batch
+  prop_constraints_from_buffer_append(&f->base, &config.buff_config, true);
+  prop_set_output_behavior_for_buffer_filter(&f->base, &config.buff_config,
+                                             false, false);
+
+  return Bp_EC_OK;
+}
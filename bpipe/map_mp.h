@@ -0,0 +1,56 @@
+#ifndef MAP_MP_H
+#define MAP_MP_H
+
+#include <pthread.h>
+#include "bperr.h"
+#include "core.h"
+#include "map.h"
+
+/* Data-parallel map (FILT_T_MAP_MP).
+ *
+ * A pool of worker threads maps whole input batches concurrently. Each
+ * worker writes the output slot at the same position as its input batch, and
+ * batches are retired strictly in arrival order. batch_id, t_ns and period_ns
+ * therefore reach the sink unchanged and in sequence, however the work
+ * interleaves. Every input batch produces one output batch, so the sink's
+ * batch capacity must be at least the input's.
+ *
+ * The sink must be an ordinary (single-producer) buffer. The input buffer
+ * must use OVERFLOW_BLOCK: workers read batches beyond the tail while older
+ * ones are still being mapped, and OVERFLOW_DROP_TAIL would discard them
+ * from under the pool. map_mp_init() rejects any other overflow behaviour
+ * with Bp_EC_INVALID_CONFIG.
+ */
+
+typedef struct _MapMP_config_t {
+  const char* name;
+  BatchBuffer_config buff_config;
+  Map_fcn_t map_fcn;
+  long timeout_us;
+  size_t n_workers;  // 0 = one per online CPU
+} MapMP_config_t;
+
+typedef struct _MapMP_filt_t {
+  Filter_t base;
+  Map_fcn_t map_fcn;
+  size_t n_workers;
+  pthread_t* helpers;  // n_workers - 1 threads, plus the filter's own worker
+  bool started;        // Worker thread created and not yet joined
+
+  /* Reorder window, protected by 'lock'. Sequence numbers are free running.
+   * Batch 'seq' sits (seq - retired) slots past the input tail and the
+   * output head until it is retired. */
+  pthread_mutex_t lock;
+  pthread_cond_t progress;
+  size_t next_seq;      // Next batch to hand out
+  size_t retired;       // Batches committed downstream
+  bool* done;           // done[seq % window]: mapped, waiting for its turn
+  size_t window;        // Input ring capacity
+  bool waiting;         // A worker is blocked on the buffers
+  bool complete_seen;   // Completion batch handed out, stop claiming
+  size_t out_of_order;  // Batches finished before an older one
+} MapMP_filt_t;
+
+Bp_EC map_mp_init(MapMP_filt_t* f, MapMP_config_t config);
+
+#endif /* MAP_MP_H */
@@ -78,6 +78,61 @@ static void* passthrough_worker(void* arg)
   return NULL;
 }
 
+/* Scheduler step: move up to SCHED_STEP_BATCHES batches without blocking */
+static Bp_EC passthrough_step(Filter_t* self)
+{
+  Batch_buff_t* in = self->input_buffers[0];
+  Batch_buff_t* out = self->sinks[0];
+  Bp_EC err = Bp_EC_OK;
+
+  if (out == NULL) return Bp_EC_NO_SINK;
+  if (bb_isempy_lockfree(in)) return Bp_EC_NOINPUT;
+  if (!bb_has_space(out)) return Bp_EC_NOSPACE;
+
+  size_t n = bb_peek_n(in, SCHED_STEP_BATCHES, 0, &err);
+  if (err != Bp_EC_OK) return err;
+  // Another producer on a shared sink may have taken the space seen above
+  n = bb_try_reserve_n(out, n, &err);
+  if (err != Bp_EC_OK) return err;
+
+  size_t data_width = bb_getdatawidth(in->dtype);
+  bool complete = false;
+  size_t i;
+  for (i = 0; i < n && !complete; i++) {
+    Batch_t* input = bb_get_tail_at(in, i);
+    Batch_t* output = bb_get_head_at(out, i);
+
+    if (input->ec == Bp_EC_COMPLETE) {
+      output->ec = Bp_EC_COMPLETE;
+      output->head = 0;
+      complete = true;
+      continue;
+    }
+    if (input->ec != Bp_EC_OK) {
+      bb_commit_n(out, i, 0);
+      bb_release_n(in, i);
+      return input->ec;
+    }
+
+    output->batch_id = input->batch_id;
+    output->t_ns = input->t_ns;
+    output->period_ns = input->period_ns;
+    output->ec = input->ec;
+    output->head = input->head;
+    memcpy(output->data, input->data, input->head * data_width);
+
+    self->metrics.samples_processed += input->head;
+    self->metrics.n_batches++;
+  }
+
+  err = bb_commit_n(out, i, 0);
+  if (err != Bp_EC_OK) return err;
+  err = bb_release_n(in, i);
+  if (err != Bp_EC_OK) return err;
+
+  return complete ? Bp_EC_COMPLETE : Bp_EC_OK;
+}
+
 static Bp_EC passthrough_describe(Filter_t* self, char* buffer, size_t size)
 {
   snprintf(buffer, size,
@@ -138,7 +193,8 @@ Bp_EC passthrough_init(Passthrough_t* pt, Passthrough_config_t* config)
       .max_supported_sinks = 1,  // Hardcoded: passthrough has 1 output
       .buff_config = config->buff_config,
       .timeout_us = config->timeout_us,
-      .worker = passthrough_worker};
+      .worker = passthrough_worker,
+      .step = passthrough_step};
 
   // Initialize base filter
   Bp_EC err = filt_init(&pt->base, core_config);
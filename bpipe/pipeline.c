@@ -2,6 +2,7 @@
 #include <stdbool.h>
 #include <stdlib.h>
 #include <string.h>
+#include "map.h"
 
 /* Forward declarations */
 static Bp_EC pipeline_start(Filter_t* self);
@@ -11,6 +12,7 @@ static Bp_EC pipeline_sink_connect(Filter_t* self, size_t output_port,
                                    Batch_buff_t* sink);
 static Bp_EC pipeline_describe(Filter_t* self, char* buffer, size_t size);
 static bool pipeline_contains_filter(Pipeline_t* pipe, Filter_t* filter);
+static void pipeline_fuse_maps(Pipeline_t* pipe);
 static void* pipeline_worker(void* arg);
 
 Bp_EC pipeline_init(Pipeline_t* pipe, Pipeline_config_t config)
@@ -109,6 +111,11 @@ Bp_EC pipeline_init(Pipeline_t* pipe, Pipeline_config_t config)
     return Bp_EC_INVALID_CONFIG;
   }
 
+  pipe->n_fused = 0;
+  if (config.fuse_maps) {
+    pipeline_fuse_maps(pipe);
+  }
+
   /* Share input buffer with designated input filter (zero-copy) */
   /* First, clean up the allocated buffer from filt_init */
   if (pipe->base.input_buffers[0]) {
@@ -143,6 +150,41 @@ static bool pipeline_contains_filter(Pipeline_t* pipe, Filter_t* filter)
   return false;
 }
 
+/* Filters built by map_init(), stateless or stateful */
+static bool pipeline_is_map(const Filter_t* f)
+{
+  return f->filt_type == FILT_T_MAP || f->filt_type == FILT_T_MAP_STATE;
+}
+
+/* Fuse every Map -> Map connection where the upstream map has no other
+ * consumer and the downstream map no other producer. Chains longer than two
+ * are built up one connection at a time, in any order. */
+static void pipeline_fuse_maps(Pipeline_t* pipe)
+{
+  for (size_t i = 0; i < pipe->n_connections; i++) {
+    Filter_t* from = pipe->connections[i].from_filter;
+    Filter_t* to = pipe->connections[i].to_filter;
+
+    if (!pipeline_is_map(from) || !pipeline_is_map(to) ||
+        to == pipe->input_filter || from == pipe->output_filter) {
+      continue;
+    }
+
+    size_t n_out = 0, n_in = 0;
+    for (size_t j = 0; j < pipe->n_connections; j++) {
+      if (pipe->connections[j].from_filter == from) n_out++;
+      if (pipe->connections[j].to_filter == to) n_in++;
+    }
+    if (n_out != 1 || n_in != 1) {
+      continue;
+    }
+
+    if (map_fuse((Map_filt_t*) from, (Map_filt_t*) to) == Bp_EC_OK) {
+      pipe->n_fused++;
+    }
+  }
+}
+
 /* Pipeline leverages existing filter lifecycle management */
 static Bp_EC pipeline_start(Filter_t* self)
 {
@@ -179,6 +221,14 @@ static Bp_EC pipeline_stop(Filter_t* self)
   /* Signal stop */
   atomic_store(&pipe->base.running, false);
 
+  /* Fused maps first - this releases a chain worker blocked on their sink */
+  for (size_t i = pipe->n_filters; i > 0; i--) {
+    Filter_t* f = pipe->filters[i - 1];
+    if (pipeline_is_map(f) && ((Map_filt_t*) f)->fused_head != NULL) {
+      filt_stop(f);
+    }
+  }
+
   /* Stop internal filters in reverse order (for clean shutdown) */
   for (size_t i = pipe->n_filters; i > 0; i--) {
     filt_stop(pipe->filters[i - 1]);
@@ -28,6 +28,9 @@ typedef struct _Pipeline_config_t {
   size_t input_port;       /* Which port (default: 0) */
   Filter_t* output_filter; /* Which filter to expose as output */
   size_t output_port;      /* Which port (default: 0) */
+
+  /* Run each linear chain of Map filters in one worker (see map_fuse) */
+  bool fuse_maps;
 } Pipeline_config_t;
 
 /* External input mapping - maps external inputs to internal filter ports */
@@ -62,6 +65,9 @@ typedef struct _Pipeline_t {
   ExternalInputMapping_t external_input_mappings[MAX_INPUTS];
   size_t n_external_inputs;
 
+  /* Number of Map filters fused into an upstream Map */
+  size_t n_fused;
+
 } Pipeline_t;
 
 /* Standard bpipe2 initialization pattern */
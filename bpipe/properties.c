@@ -473,6 +473,20 @@ static void apply_behavior(Property_t* prop, const OutputBehavior_t* behavior,
         *prop = input_properties[input_idx].properties[behavior->property];
       }
       break;
+
+    case BEHAVIOR_OP_SCALE:
+      /* Scale the inherited value; unknown stays unknown */
+      if (prop->known && behavior->operand.ratio.den != 0) {
+        const uint64_t num = behavior->operand.ratio.num;
+        const uint64_t den = behavior->operand.ratio.den;
+        if (behavior->property == PROP_SAMPLE_PERIOD_NS ||
+            behavior->property == PROP_MAX_TOTAL_SAMPLES) {
+          prop->value.u64 = (prop->value.u64 * num + den / 2) / den;
+        } else {
+          prop->value.u32 = (uint32_t) ((prop->value.u32 * num + den / 2) / den);
+        }
+      }
+      break;
   }
 }
 
@@ -679,7 +693,9 @@ bool prop_append_behavior(Filter_t* filter, SignalProperty_t prop,
 
   /* Set operand based on property type (only if operand provided) */
   if (operand) {
-    if (prop == PROP_DATA_TYPE) {
+    if (op == BEHAVIOR_OP_SCALE) {
+      behavior->operand.ratio = *(const PropRatio_t*) operand;
+    } else if (prop == PROP_DATA_TYPE) {
       behavior->operand.dtype = *(const SampleDtype_t*) operand;
     } else if (prop == PROP_SAMPLE_PERIOD_NS) {
       behavior->operand.u64 = *(const uint64_t*) operand;
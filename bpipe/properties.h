@@ -51,8 +51,15 @@ typedef enum {
 typedef enum {
   BEHAVIOR_OP_SET,      /* Set property to fixed value */
   BEHAVIOR_OP_PRESERVE, /* Pass through unchanged (default) */
+  BEHAVIOR_OP_SCALE,    /* Multiply by a ratio, rounding to nearest */
 } BehaviorOp_t;
 
+/* Operand for BEHAVIOR_OP_SCALE: value * num / den */
+typedef struct {
+  uint32_t num;
+  uint32_t den;
+} PropRatio_t;
+
 /* Simple property storage */
 typedef struct {
   bool known;
@@ -108,6 +115,7 @@ typedef struct {
     SampleDtype_t dtype;
     uint32_t u32;
     uint64_t u64;
+    PropRatio_t ratio;
   } operand;
 } OutputBehavior_t;
 
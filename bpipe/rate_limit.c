@@ -0,0 +1,264 @@
+#define _POSIX_C_SOURCE 200809L  // For clock_nanosleep
+#include "rate_limit.h"
+#include <math.h>
+#include <stdatomic.h>
+#include <stdio.h>
+#include <string.h>
+#include <time.h>
+#include "batch_buffer.h"
+#include "utils.h"
+
+/* Sleep until 'deadline_ns' on CLOCK_MONOTONIC, in slices of at most the
+ * filter timeout so that a stop is noticed. Returns false if stopped. */
+static bool rate_limit_sleep_until(RateLimit_filt_t* f, long long deadline_ns)
+{
+  const long long slice_ns = (long long) f->base.timeout_us * 1000;
+
+  while (atomic_load(&f->base.running)) {
+    long long now = now_ns(CLOCK_MONOTONIC);
+    if (now >= deadline_ns) {
+      return true;
+    }
+    long long wake = deadline_ns;
+    if (slice_ns > 0 && now + slice_ns < deadline_ns) {
+      wake = now + slice_ns;
+    }
+    struct timespec ts = {.tv_sec = wake / 1000000000LL,
+                          .tv_nsec = wake % 1000000000LL};
+    // An interrupted sleep just goes round again
+    clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, &ts, NULL);
+  }
+  return false;
+}
+
+/* Wait until the bucket holds the batch's cost, then take it. Returns false
+ * if the filter was stopped while waiting. */
+static bool rate_limit_acquire(RateLimit_filt_t* f, const Batch_t* input)
+{
+  double rate = f->rate;
+  if (rate == 0.0) {
+    rate = f->speed * 1e9 / (double) input->period_ns;
+  }
+  const double unit_ns = 1e9 / rate;
+  const double burst_ns = f->burst * unit_ns;
+  const double cost =
+      f->unit == RATE_LIMIT_BATCHES ? 1.0 : (double) input->head;
+
+  long long now = now_ns(CLOCK_MONOTONIC);
+  long long taken_ns = now;
+  if (!f->started) {
+    f->empty_ns = (double) now - burst_ns;  // Start with a full bucket
+    f->started = true;
+  }
+
+  // A batch over the burst size waits for a full bucket
+  const long long release_ns =
+      (long long) ceil(f->empty_ns + MIN(cost, f->burst) * unit_ns);
+  if (release_ns > now) {
+    if (!rate_limit_sleep_until(f, release_ns)) {
+      return false;
+    }
+    now = now_ns(CLOCK_MONOTONIC);
+    taken_ns = release_ns;
+    uint64_t late_ns = (uint64_t) (now - release_ns);
+    f->n_waits++;
+    f->lateness_sum_ns += late_ns;
+    f->lateness_max_ns = MAX(f->lateness_max_ns, late_ns);
+  }
+
+  // Take the tokens at the time they were due rather than at the (late)
+  // wake-up, so that oversleeping does not push back later batches
+  f->empty_ns = MAX(f->empty_ns, (double) taken_ns - burst_ns) + cost * unit_ns;
+
+  if (f->first_release_ns == 0) {
+    f->first_release_ns = now;
+  } else {
+    f->units_after_first += cost;
+  }
+  f->last_release_ns = now;
+  return true;
+}
+
+static void* rate_limit_worker(void* arg)
+{
+  RateLimit_filt_t* f = (RateLimit_filt_t*) arg;
+  Batch_buff_t* in = f->base.input_buffers[0];
+  Batch_buff_t* sink = f->base.sinks[0];
+  Bp_EC err = Bp_EC_OK;
+
+  BP_WORKER_ASSERT(&f->base, sink != NULL, Bp_EC_NO_SINK);
+  BP_WORKER_ASSERT(&f->base, sink->dtype == in->dtype, Bp_EC_DTYPE_MISMATCH);
+  const size_t data_width = bb_getdatawidth(in->dtype);
+
+  while (atomic_load(&f->base.running)) {
+    Batch_t* input = bb_get_tail(in, f->base.timeout_us, &err);
+    if (!input) {
+      if (err == Bp_EC_TIMEOUT) continue;
+      break;
+    }
+
+    // Completion is passed on straight away, it carries no samples
+    if (input->ec == Bp_EC_COMPLETE) {
+      Batch_t* output = bb_get_head(sink);
+      output->ec = Bp_EC_COMPLETE;
+      output->head = 0;
+      bb_submit(sink, f->base.timeout_us);
+      bb_del_tail(in);
+      break;
+    }
+
+    BP_WORKER_ASSERT(&f->base, input->ec == Bp_EC_OK, input->ec);
+    BP_WORKER_ASSERT(&f->base, input->head <= bb_batch_size(sink),
+                     Bp_EC_CAPACITY_MISMATCH);
+    BP_WORKER_ASSERT(&f->base, f->rate > 0.0 || input->period_ns > 0,
+                     Bp_EC_INVALID_DATA);
+
+    if (input->head > 0 && !rate_limit_acquire(f, input)) {
+      break;  // Stopped while waiting
+    }
+
+    Batch_t* output = bb_get_head(sink);
+    output->batch_id = input->batch_id;
+    output->t_ns = input->t_ns;
+    output->period_ns = input->period_ns;
+    output->ec = input->ec;
+    output->head = input->head;
+    memcpy(output->data, input->data, input->head * data_width);
+
+    err = bb_submit(sink, f->base.timeout_us);
+    if (err == Bp_EC_FILTER_STOPPING) break;
+    BP_WORKER_ASSERT(&f->base, err == Bp_EC_OK, err);
+
+    f->base.metrics.samples_processed += input->head;
+    f->base.metrics.n_batches++;
+    bb_del_tail(in);
+  }
+
+  if (err != Bp_EC_OK && err != Bp_EC_STOPPED && err != Bp_EC_TIMEOUT &&
+      err != Bp_EC_FILTER_STOPPING) {
+    f->base.worker_err_info.ec = err;
+    atomic_store(&f->base.running, false);
+  }
+
+  return NULL;
+}
+
+static Bp_EC rate_limit_get_stats(Filter_t* self, void* stats_out)
+{
+  RateLimit_filt_t* f = (RateLimit_filt_t*) self;
+
+  if (stats_out == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  RateLimit_stats_t* stats = (RateLimit_stats_t*) stats_out;
+  stats->base = self->metrics;
+  long long elapsed_ns = f->last_release_ns - f->first_release_ns;
+  stats->achieved_rate =
+      elapsed_ns > 0 ? f->units_after_first * 1e9 / (double) elapsed_ns : 0.0;
+  stats->n_waits = f->n_waits;
+  stats->jitter_mean_ns = f->n_waits ? f->lateness_sum_ns / f->n_waits : 0;
+  stats->jitter_max_ns = f->lateness_max_ns;
+
+  return Bp_EC_OK;
+}
+
+static Bp_EC rate_limit_describe(Filter_t* self, char* buffer,
+                                 size_t buffer_size)
+{
+  RateLimit_filt_t* f = (RateLimit_filt_t*) self;
+
+  if (buffer == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  RateLimit_stats_t stats;
+  rate_limit_get_stats(self, &stats);
+  const char* unit = f->unit == RATE_LIMIT_BATCHES ? "batches" : "samples";
+
+  int written = snprintf(buffer, buffer_size, "Rate Limit: %s\n", self->name);
+  if (f->rate > 0.0) {
+    written +=
+        snprintf(buffer + written, buffer_size - written,
+                 "  Budget: %g %s/s, burst %g\n", f->rate, unit, f->burst);
+  } else {
+    written += snprintf(buffer + written, buffer_size - written,
+                        "  Budget: %gx real time, burst %g %s\n", f->speed,
+                        f->burst, unit);
+  }
+  snprintf(buffer + written, buffer_size - written,
+           "  Achieved: %.1f %s/s\n"
+           "  Jitter: mean %llu ns, max %llu ns\n"
+           "  Batches processed: %zu",
+           stats.achieved_rate, unit, (unsigned long long) stats.jitter_mean_ns,
+           (unsigned long long) stats.jitter_max_ns, self->metrics.n_batches);
+
+  return Bp_EC_OK;
+}
+
+Bp_EC rate_limit_init(RateLimit_filt_t* f, RateLimit_config_t config)
+{
+  if (f == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+
+  double speed = config.speed == 0.0 ? 1.0 : config.speed;
+  double burst = config.burst;
+  if (burst == 0.0) {
+    burst = config.unit == RATE_LIMIT_BATCHES
+                ? 1.0
+                : (double) (1UL << config.buff_config.batch_capacity_expo);
+  }
+  if (config.unit != RATE_LIMIT_SAMPLES && config.unit != RATE_LIMIT_BATCHES) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  // Real time pacing is defined by the samples' own period
+  if (config.rate == 0.0 && config.unit != RATE_LIMIT_SAMPLES) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  if (!(config.rate >= 0.0) || !(speed > 0.0) || !(burst > 0.0)) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  Core_filt_config_t core_config = {
+      .name = config.name,
+      .filt_type = FILT_T_RATE_LIMIT,
+      .size = sizeof(RateLimit_filt_t),
+      .n_inputs = 1,
+      .max_supported_sinks = 1,
+      .buff_config = config.buff_config,
+      .timeout_us = config.timeout_us,
+      .worker = rate_limit_worker,
+  };
+
+  Bp_EC err = filt_init(&f->base, core_config);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  f->unit = config.unit;
+  f->rate = config.rate;
+  f->speed = speed;
+  f->burst = burst;
+  f->started = false;
+  f->empty_ns = 0.0;
+  f->first_release_ns = 0;
+  f->last_release_ns = 0;
+  f->units_after_first = 0.0;
+  f->n_waits = 0;
+  f->lateness_sum_ns = 0;
+  f->lateness_max_ns = 0;
+
+  f->base.ops.describe = rate_limit_describe;
+  f->base.ops.get_stats = rate_limit_get_stats;
+
+  // Set input constraints based on buffer capacity
+  prop_constraints_from_buffer_append(&f->base, &config.buff_config, true);
+
+  // Batches pass through unchanged, partial ones included
+  prop_set_output_behavior_for_buffer_filter(&f->base, &config.buff_config,
+                                             false,   // passthrough (not adapt)
+                                             false);  // allows partial batches
+
+  return Bp_EC_OK;
+}
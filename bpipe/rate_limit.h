@@ -0,0 +1,71 @@
+#ifndef RATE_LIMIT_H
+#define RATE_LIMIT_H
+
+#include <stdbool.h>
+#include <stdint.h>
+#include "bperr.h"
+#include "core.h"
+
+/* Rate limit filter (FILT_T_RATE_LIMIT).
+ *
+ * Passes batches through unchanged, but no faster than a budget of samples
+ * or batches per second. The budget is a token bucket: tokens accrue at
+ * 'rate' up to 'burst', and a batch leaves once the bucket holds its cost
+ * (its sample count, or 1 per batch). A batch larger than the burst waits
+ * for a full bucket and leaves it in debt. The worker sleeps to each
+ * release time with clock_nanosleep(TIMER_ABSTIME) on CLOCK_MONOTONIC, so
+ * waiting costs no CPU and wake-up overshoot does not accumulate.
+ *
+ * With rate = 0 the budget follows the data instead: 'speed' times the
+ * stream's own sample rate, taken from each batch's period_ns. That
+ * replays recorded data at real time (speed 1) or N times real time.
+ */
+
+typedef enum _RateLimitUnit_e {
+  RATE_LIMIT_SAMPLES = 0,  // Cost of a batch is its sample count
+  RATE_LIMIT_BATCHES,      // Cost of a batch is 1
+} RateLimitUnit_e;
+
+typedef struct _RateLimit_config_t {
+  const char* name;
+  BatchBuffer_config buff_config;
+  RateLimitUnit_e unit;
+  double rate;   // Units per second, 0 = 'speed' times the stream's rate
+  double speed;  // Used when rate = 0, 0 = 1 (real time)
+  double burst;  // Bucket size in units, 0 = one full batch
+  long timeout_us;
+} RateLimit_config_t;
+
+/* Filled in by filt_get_stats() */
+typedef struct _RateLimit_stats_t {
+  Filt_metrics base;
+  double achieved_rate;     // Units per second since the first release
+  uint64_t n_waits;         // Batches held back for tokens
+  uint64_t jitter_mean_ns;  // Mean wake-up lateness of held batches
+  uint64_t jitter_max_ns;
+} RateLimit_stats_t;
+
+typedef struct _RateLimit_filt_t {
+  Filter_t base;
+  RateLimitUnit_e unit;
+  double rate;  // Units per second, 0 = from the stream
+  double speed;
+  double burst;  // Units
+
+  // Bucket state: the bucket held no tokens at empty_ns, and refills from
+  // there at 'rate' up to 'burst'
+  bool started;
+  double empty_ns;
+
+  // Reporting
+  long long first_release_ns;
+  long long last_release_ns;
+  double units_after_first;  // Released after the first batch
+  uint64_t n_waits;
+  uint64_t lateness_sum_ns;
+  uint64_t lateness_max_ns;
+} RateLimit_filt_t;
+
+Bp_EC rate_limit_init(RateLimit_filt_t* f, RateLimit_config_t config);
+
+#endif /* RATE_LIMIT_H */
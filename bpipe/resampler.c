@@ -0,0 +1,332 @@
+#include "resampler.h"
+#include <math.h>
+#include <stdbool.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "batch_buffer.h"
+#include "utils.h"
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+#define KAISER_BETA 8.0  // About 80 dB stopband
+
+static unsigned gcd_u(unsigned a, unsigned b)
+{
+  while (b != 0) {
+    unsigned r = a % b;
+    a = b;
+    b = r;
+  }
+  return a;
+}
+
+/* Zeroth order modified Bessel function of the first kind */
+static double bessel_i0(double x)
+{
+  double sum = 1.0, term = 1.0;
+  for (int k = 1; k < 50 && term > 1e-12 * sum; k++) {
+    term *= (x / (2.0 * k)) * (x / (2.0 * k));
+    sum += term;
+  }
+  return sum;
+}
+
+/* Design the L * taps prototype low-pass and split it into L banks.
+ *
+ * Output phase p convolves input samples n, n-1, ... with h[p], h[p + L],
+ * ...; bank p holds those coefficients reversed so that it lines up with
+ * the history, oldest sample first. */
+static void resampler_design(Resampler_filt_t* f, float cutoff)
+{
+  const size_t L = f->up, taps = f->taps, K = L * taps;
+  const double centre = (K - 1) / 2.0;
+  const double fc = 0.5 * cutoff / (f->up > f->down ? f->up : f->down);
+  double sum = 0.0;
+
+  for (size_t k = 0; k < K; k++) {
+    double x = k - centre;
+    double h = 2.0 * fc;
+    if (x != 0.0) {
+      h = sin(2.0 * M_PI * fc * x) / (M_PI * x);
+    }
+    if (K > 1) {
+      double r = x / centre;
+      h *= bessel_i0(KAISER_BETA * sqrt(fmax(0.0, 1.0 - r * r))) /
+           bessel_i0(KAISER_BETA);
+    }
+    size_t p = k % L, j = k / L;
+    f->coeffs[p * taps + (taps - 1 - j)] = (float) h;
+    sum += h;
+  }
+
+  // Each phase then has a DC gain of (close to) 1
+  const float norm = (float) (L / sum);
+  for (size_t k = 0; k < K; k++) {
+    f->coeffs[k] *= norm;
+  }
+}
+
+static inline void resampler_push(Resampler_filt_t* f, float x)
+{
+  f->history[f->hist_pos] = x;
+  f->history[f->hist_pos + f->taps] = x;
+  if (++f->hist_pos == f->taps) {
+    f->hist_pos = 0;
+  }
+}
+
+/* One output sample: a dot product of a bank with the contiguous history */
+static inline float resampler_output(const Resampler_filt_t* f)
+{
+  const float* bank = f->coeffs + (size_t) f->phase * f->taps;
+  const float* x = f->history + f->hist_pos;
+  float acc = 0.0f;
+  for (size_t i = 0; i < f->taps; i++) {
+    acc += bank[i] * x[i];
+  }
+  return acc;
+}
+
+/* Time of the next output: the newest input's time plus the output phase,
+ * less the prototype's group delay of (L * taps - 1) / 2 in 1/L steps */
+static inline long long resampler_output_t_ns(const Resampler_filt_t* f,
+                                              unsigned period_ns)
+{
+  long long offset = 2LL * f->phase - ((long long) f->up * f->taps - 1);
+  return f->newest_t_ns + offset * (long long) period_ns / (2LL * f->up);
+}
+
+static void* resampler_worker(void* arg)
+{
+  Resampler_filt_t* f = (Resampler_filt_t*) arg;
+  Batch_buff_t* in = f->base.input_buffers[0];
+  Batch_buff_t* sink = f->base.sinks[0];
+  Batch_t *input = NULL, *output = NULL;
+  Bp_EC err = Bp_EC_OK;
+  bool complete = false;
+
+  BP_WORKER_ASSERT(&f->base, sink != NULL, Bp_EC_NO_SINK);
+  BP_WORKER_ASSERT(&f->base, sink->dtype == DTYPE_FLOAT, Bp_EC_DTYPE_MISMATCH);
+
+  const size_t batch_size = bb_batch_size(sink);
+
+  while (atomic_load(&f->base.running)) {
+    // Get new input batch if needed
+    if (!input || f->input_consumed >= input->head) {
+      if (input) {
+        err = bb_del_tail(in);
+        if (err != Bp_EC_OK) break;
+      }
+
+      input = bb_get_tail(in, f->base.timeout_us, &err);
+      if (!input) {
+        if (err == Bp_EC_TIMEOUT) {
+          continue;  // Normal timeout, keep waiting for data
+        }
+        break;
+      }
+      f->input_consumed = 0;
+
+      if (input->ec == Bp_EC_COMPLETE) {
+        complete = true;
+        break;
+      }
+    }
+
+    // Get new output batch if needed
+    if (!output) {
+      output = bb_get_head(sink);
+      if (!output) {
+        err = Bp_EC_GET_HEAD_NULL;
+        break;
+      }
+      output->head = 0;
+      output->ec = Bp_EC_OK;
+    }
+
+    // Emit every output the history allows, then take the next input
+    const unsigned period_ns = (unsigned) input->period_ns;
+    const float* in_data = (const float*) input->data;
+    float* out_data = (float*) output->data;
+    while (output->head < batch_size) {
+      if (f->phase < f->up) {
+        if (output->head == 0) {  // First sample in this batch
+          output->t_ns = resampler_output_t_ns(f, period_ns);
+          output->period_ns =
+              (unsigned) (((uint64_t) period_ns * f->down + f->up / 2) / f->up);
+        }
+        out_data[output->head++] = resampler_output(f);
+        f->phase += f->down;
+      } else if (f->input_consumed < input->head) {
+        f->newest_t_ns =
+            input->t_ns + (long long) f->input_consumed * period_ns;
+        resampler_push(f, in_data[f->input_consumed++]);
+        f->phase -= f->up;
+        f->base.metrics.samples_processed++;
+      } else {
+        break;
+      }
+    }
+
+    // Submit output if batch is full
+    if (output->head >= batch_size) {
+      err = bb_submit(sink, f->base.timeout_us);
+      if (err != Bp_EC_OK) break;
+      output = NULL;
+      f->base.metrics.n_batches++;
+    }
+  }
+
+  // Flush the partial batch, then pass completion downstream
+  if (output && output->head > 0 &&
+      bb_submit(sink, f->base.timeout_us) == Bp_EC_OK) {
+    f->base.metrics.n_batches++;
+  }
+  if (complete) {
+    bb_del_tail(in);
+    Batch_t* done = bb_get_head(sink);
+    if (done != NULL) {
+      done->head = 0;
+      done->ec = Bp_EC_COMPLETE;
+      bb_submit(sink, f->base.timeout_us);
+    }
+    return NULL;
+  }
+
+  if (err != Bp_EC_OK && err != Bp_EC_STOPPED && err != Bp_EC_TIMEOUT) {
+    f->base.worker_err_info.ec = err;
+    atomic_store(&f->base.running, false);  // Stop filter on error
+  }
+
+  return NULL;
+}
+
+static Bp_EC resampler_describe(Filter_t* self, char* buffer,
+                                size_t buffer_size)
+{
+  Resampler_filt_t* f = (Resampler_filt_t*) self;
+
+  if (buffer == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  snprintf(buffer, buffer_size,
+           "Resampler Filter: %s\n"
+           "  Ratio: %u/%u\n"
+           "  Taps per phase: %zu\n"
+           "  Running: %s\n"
+           "  Batches processed: %zu",
+           self->name, f->up, f->down, f->taps,
+           self->running ? "true" : "false", self->metrics.n_batches);
+
+  return Bp_EC_OK;
+}
+
+static Bp_EC resampler_deinit(Filter_t* self)
+{
+  Resampler_filt_t* f = (Resampler_filt_t*) self;
+
+  free(f->coeffs);
+  f->coeffs = NULL;
+  free(f->history);
+  f->history = NULL;
+
+  // Do default deinit actions
+  for (int i = 0; i < self->n_input_buffers; i++) {
+    if (self->input_buffers[i]) {
+      bb_deinit(self->input_buffers[i]);
+      free(self->input_buffers[i]);
+      self->input_buffers[i] = NULL;
+    }
+  }
+
+  // Destroy mutex
+  pthread_mutex_destroy(&self->filter_mutex);
+
+  self->filt_type = FILT_T_NDEF;
+
+  return Bp_EC_OK;
+}
+
+Bp_EC resampler_init(Resampler_filt_t* f, Resampler_config_t config)
+{
+  if (f == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+  if (config.buff_config.dtype != DTYPE_FLOAT) {
+    return Bp_EC_TYPE_ERROR;
+  }
+
+  size_t taps =
+      config.taps_per_phase ? config.taps_per_phase : RESAMPLER_DEFAULT_TAPS;
+  float cutoff =
+      config.cutoff == 0.0f ? RESAMPLER_DEFAULT_CUTOFF : config.cutoff;
+  if (config.up == 0 || config.up > RESAMPLER_MAX_FACTOR || config.down == 0 ||
+      config.down > RESAMPLER_MAX_FACTOR || taps > RESAMPLER_MAX_TAPS ||
+      !(cutoff > 0.0f && cutoff <= 1.0f)) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+
+  Core_filt_config_t core_config = {
+      .name = config.name,
+      .filt_type = FILT_T_RESAMPLER,
+      .size = sizeof(Resampler_filt_t),
+      .n_inputs = 1,
+      .max_supported_sinks = 1,
+      .buff_config = config.buff_config,
+      .timeout_us = config.timeout_us,
+      .worker = resampler_worker,
+  };
+
+  Bp_EC err = filt_init(&f->base, core_config);
+  if (err != Bp_EC_OK) {
+    return err;
+  }
+
+  unsigned g = gcd_u(config.up, config.down);
+  f->up = config.up / g;
+  f->down = config.down / g;
+  f->taps = taps;
+  f->hist_pos = 0;
+  f->phase = f->up;  // Nothing to emit until the first input arrives
+  f->newest_t_ns = 0;
+  f->input_consumed = 0;
+
+  f->base.ops.deinit = resampler_deinit;
+  f->base.ops.describe = resampler_describe;
+
+  // Banks and history are sized here, so the worker never allocates
+  f->coeffs = calloc((size_t) f->up * taps, sizeof(float));
+  f->history = calloc(2 * taps, sizeof(float));
+  if (f->coeffs == NULL || f->history == NULL) {
+    resampler_deinit(&f->base);
+    return Bp_EC_MALLOC_FAIL;
+  }
+  resampler_design(f, cutoff);
+
+  // Input constraints come from the buffer; accepts partial batches
+  prop_constraints_from_buffer_append(&f->base, &config.buff_config, true);
+
+  SampleDtype_t dtype = DTYPE_FLOAT;
+  prop_append_behavior(&f->base, PROP_DATA_TYPE, BEHAVIOR_OP_SET, &dtype,
+                       OUTPUT_ALL);
+
+  // L/M times the rate is M/L times the period
+  PropRatio_t ratio = {.num = f->down, .den = f->up};
+  prop_append_behavior(&f->base, PROP_SAMPLE_PERIOD_NS, BEHAVIOR_OP_SCALE,
+                       &ratio, OUTPUT_ALL);
+
+  uint32_t min_batch = 1;
+  uint32_t max_batch = 1U << config.buff_config.batch_capacity_expo;
+  prop_append_behavior(&f->base, PROP_MIN_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &min_batch, OUTPUT_ALL);
+  prop_append_behavior(&f->base, PROP_MAX_BATCH_CAPACITY, BEHAVIOR_OP_SET,
+                       &max_batch, OUTPUT_ALL);
+
+  f->base.output_properties[0] = prop_propagate(NULL, 0, &f->base.contract, 0);
+
+  return Bp_EC_OK;
+}
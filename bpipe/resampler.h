@@ -0,0 +1,57 @@
+#ifndef RESAMPLER_H
+#define RESAMPLER_H
+
+#include <stdint.h>
+#include "bperr.h"
+#include "core.h"
+
+/* Rational resampler (FILT_T_RESAMPLER).
+ *
+ * Changes the sample rate of a float stream by up/down (L/M): 1.2 kHz to
+ * 1 kHz is up = 5, down = 6. Conceptually the input is zero-stuffed by L,
+ * low-pass filtered and decimated by M; the polyphase form computes only
+ * the outputs that are kept, each as one taps_per_phase long dot product
+ * against a precomputed coefficient bank. The banks and the history are
+ * allocated in resampler_init, so the worker never allocates.
+ *
+ * The low-pass is a Kaiser windowed sinc with its -6 dB point at 'cutoff'
+ * times the lower of the two Nyquist frequencies, and a DC gain of 1.
+ * Output timestamps are corrected for the filter's group delay, so an
+ * output sample carries the time of the input instant it represents. The
+ * output period is the input period scaled by M/L, rounded to the nearest
+ * nanosecond, and PROP_SAMPLE_PERIOD_NS is scaled to match.
+ *
+ * Integer streams can be converted with a cast filter first. On completion
+ * the outputs still waiting on later input (the filter tail) are dropped.
+ */
+
+#define RESAMPLER_MAX_FACTOR 1024
+#define RESAMPLER_MAX_TAPS 512
+#define RESAMPLER_DEFAULT_TAPS 32
+#define RESAMPLER_DEFAULT_CUTOFF 0.8f
+
+typedef struct _Resampler_config_t {
+  const char* name;
+  BatchBuffer_config buff_config;  // Input and output are DTYPE_FLOAT
+  unsigned up;                     // L, interpolation factor
+  unsigned down;                   // M, decimation factor
+  size_t taps_per_phase;           // 0 = RESAMPLER_DEFAULT_TAPS
+  float cutoff;  // Fraction of the lower Nyquist, 0 = default, <= 1
+  long timeout_us;
+} Resampler_config_t;
+
+typedef struct _Resampler_filt_t {
+  Filter_t base;
+  unsigned up, down;      // Reduced by their common divisor
+  size_t taps;            // Per phase
+  float* coeffs;          // 'up' banks of 'taps', oldest sample first
+  float* history;         // Last 'taps' inputs, written twice (2 * taps)
+  size_t hist_pos;        // Slot of the oldest input in the first copy
+  unsigned phase;         // Output position in units of 1/L input samples
+  long long newest_t_ns;  // Time of the newest input in the history
+  size_t input_consumed;  // Samples used from the current input batch
+} Resampler_filt_t;
+
+Bp_EC resampler_init(Resampler_filt_t* f, Resampler_config_t config);
+
+#endif /* RESAMPLER_H */
@@ -3,8 +3,13 @@
 #include <stdlib.h>
 #include <string.h>
 #include "bperr.h"
+#include "kernels.h"
 #include "utils.h"
 
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
 // Forward declarations
 static void* sample_aligner_worker(void* arg);
 static Bp_EC sample_aligner_start(Filter_t* self);
@@ -30,8 +35,9 @@ static size_t get_history_size_for_method(InterpolationMethod_e method)
 {
   switch (method) {
     case INTERP_NEAREST:
+      return 1;  // The nearest sample itself
     case INTERP_LINEAR:
-      return 2;  // Both methods need 2 points
+      return 2;  // Samples either side of the output
     case INTERP_CUBIC:
       return 4;  // 4 points for cubic interpolation
     case INTERP_SINC:
@@ -41,7 +47,272 @@ static size_t get_history_size_for_method(InterpolationMethod_e method)
   }
 }
 
-// TODO: Implement interpolation functions when needed
+/* Fractional delay taps for an output 'mu' (0 <= mu < 1) samples after
+ * input tap (n - 1) / 2. Fixed for the stream, since input and output share
+ * a period; only the phase differs. */
+static void compute_coeffs(SampleAligner_t* sa, double mu)
+{
+  const size_t n = sa->history_size;
+  float* c = sa->coeffs;
+
+  switch (sa->method) {
+    case INTERP_NEAREST:
+      c[0] = 1.0f;
+      break;
+    case INTERP_LINEAR:
+      c[0] = (float) (1.0 - mu);
+      c[1] = (float) mu;
+      break;
+    case INTERP_CUBIC: {
+      // Catmull-Rom spline through the 4 points around the output
+      double mu2 = mu * mu, mu3 = mu2 * mu;
+      c[0] = (float) (-0.5 * mu3 + mu2 - 0.5 * mu);
+      c[1] = (float) (1.5 * mu3 - 2.5 * mu2 + 1.0);
+      c[2] = (float) (-1.5 * mu3 + 2.0 * mu2 + 0.5 * mu);
+      c[3] = (float) (0.5 * mu3 - 0.5 * mu2);
+      break;
+    }
+    case INTERP_SINC: {
+      // Blackman windowed sinc, normalised to unity DC gain
+      const double half = n / 2.0;
+      const double fc = sa->sinc_cutoff;
+      double sum = 0.0;
+      for (size_t j = 0; j < n; j++) {
+        double d = (double) j - (double) ((n - 1) / 2) - mu;
+        double h = fc;
+        if (d != 0.0) {
+          h = sin(M_PI * fc * d) / (M_PI * d);
+        }
+        double w = 0.42 + 0.5 * cos(M_PI * d / half) +
+                   0.08 * cos(2.0 * M_PI * d / half);
+        c[j] = (float) (h * w);
+        sum += h * w;
+      }
+      for (size_t j = 0; j < n; j++) {
+        c[j] = (float) (c[j] / sum);
+      }
+      break;
+    }
+  }
+}
+
+/* Sample 'i' of 'src' into 'dst', both of the input dtype */
+static inline void copy_sample(const SampleAligner_t* sa, void* dst,
+                               const void* src, size_t i)
+{
+  size_t width = bb_getdatawidth(sa->base.input_buffers[0]->dtype);
+  memcpy(dst, (const char*) src + i * width, width);
+}
+
+/* Apply the taps to 'n' outputs; 'src' is the first tap of the first one */
+static void interpolate(const SampleAligner_t* sa, const void* src, void* dst,
+                        size_t n)
+{
+  const size_t taps = sa->history_size;
+  const SampleDtype_t dtype = sa->base.input_buffers[0]->dtype;
+
+  if (taps == 1) {
+    memcpy(dst, src, n * bb_getdatawidth(dtype));
+  } else if (dtype == DTYPE_FLOAT) {
+    kern_fir_f32((const float*) src, sa->coeffs, taps, (float*) dst, n);
+  } else if (dtype == DTYPE_I32) {
+    const int32_t* in = (const int32_t*) src;
+    for (size_t i = 0; i < n; i++) {
+      double acc = 0.0;
+      for (size_t j = 0; j < taps; j++) {
+        acc += sa->coeffs[j] * (double) in[i + j];
+      }
+      acc = fmin(fmax(nearbyint(acc), INT32_MIN), INT32_MAX);
+      ((int32_t*) dst)[i] = (int32_t) acc;
+    }
+  } else {
+    const uint32_t* in = (const uint32_t*) src;
+    for (size_t i = 0; i < n; i++) {
+      double acc = 0.0;
+      for (size_t j = 0; j < taps; j++) {
+        acc += sa->coeffs[j] * (double) in[i + j];
+      }
+      acc = fmin(fmax(nearbyint(acc), 0.0), UINT32_MAX);
+      ((uint32_t*) dst)[i] = (uint32_t) acc;
+    }
+  }
+}
+
+static Bp_EC submit_output(SampleAligner_t* sa, Batch_t** output)
+{
+  Bp_EC err = bb_submit(sa->base.sinks[0], sa->base.timeout_us);
+  if (err == Bp_EC_OK) {
+    sa->base.metrics.n_batches++;
+  }
+  *output = NULL;
+  return err;
+}
+
+/* Interpolate 'n' outputs into the sink, starting batches as needed */
+static Bp_EC emit_outputs(SampleAligner_t* sa, Batch_t** output,
+                          const void* src, size_t n)
+{
+  Batch_buff_t* sink = sa->base.sinks[0];
+  const size_t width = bb_getdatawidth(sink->dtype);
+  const size_t capacity = bb_batch_size(sink);
+
+  while (n > 0) {
+    if (*output == NULL) {
+      *output = bb_get_head(sink);
+      if (*output == NULL) {
+        return Bp_EC_GET_HEAD_NULL;
+      }
+      (*output)->head = 0;
+      (*output)->t_ns = sa->next_output_ns;
+      (*output)->period_ns = sa->period_ns;
+      (*output)->ec = Bp_EC_OK;
+    }
+
+    Batch_t* out = *output;
+    size_t count = MIN(n, capacity - out->head);
+    interpolate(sa, src, (char*) out->data + out->head * width, count);
+    out->head += count;
+    src = (const char*) src + count * width;
+    n -= count;
+    sa->next_output_ns += count * sa->period_ns;
+    sa->samples_interpolated += count;
+
+    if (out->head >= capacity) {
+      Bp_EC err = submit_output(sa, output);
+      if (err != Bp_EC_OK) {
+        return err;
+      }
+    }
+  }
+  return Bp_EC_OK;
+}
+
+/* Take in 'n' input samples and emit every output they complete, up to
+ * 'limit' outputs in total. Outputs whose taps reach back into the history
+ * are read from the history joined to the head of 'in'; the rest straight
+ * from 'in'. */
+static Bp_EC process_samples(SampleAligner_t* sa, Batch_t** output,
+                             const void* in, size_t n, uint64_t limit)
+{
+  const size_t taps = sa->history_size;
+  const size_t width = bb_getdatawidth(sa->base.input_buffers[0]->dtype);
+  const long long received = (long long) sa->samples_in;
+  const long long first = received - (long long) taps;  // history[0]
+  Bp_EC err = Bp_EC_OK;
+
+  // Output k needs inputs k + tap_offset ... k + tap_offset + taps - 1
+  long long k = (long long) sa->samples_interpolated;
+  long long k_end =
+      received + (long long) n - sa->tap_offset - (long long) taps + 1;
+  if (k_end > 0 && (uint64_t) k_end > limit) {
+    k_end = (long long) limit;
+  }
+  long long k_split = MIN(k_end, received - sa->tap_offset);
+
+  if (k < k_split) {
+    char* joined = (char*) sa->scratch;
+    memcpy(joined, sa->history_buffer, taps * width);
+    memcpy(joined + taps * width, in, MIN(n, taps - 1) * width);
+    err =
+        emit_outputs(sa, output, joined + (k + sa->tap_offset - first) * width,
+                     (size_t) (k_split - k));
+    if (err != Bp_EC_OK) return err;
+    k = k_split;
+  }
+  if (k < k_end) {
+    err = emit_outputs(
+        sa, output, (const char*) in + (k + sa->tap_offset - received) * width,
+        (size_t) (k_end - k));
+    if (err != Bp_EC_OK) return err;
+  }
+
+  // Keep the newest 'taps' samples
+  char* history = (char*) sa->history_buffer;
+  if (n >= taps) {
+    memcpy(history, (const char*) in + (n - taps) * width, taps * width);
+  } else {
+    memmove(history, history + n * width, (taps - n) * width);
+    memcpy(history + (taps - n) * width, in, n * width);
+  }
+  sa->samples_in += n;
+  sa->history_samples = MIN(sa->samples_in, taps);
+
+  return Bp_EC_OK;
+}
+
+/* Fix the taps from the first batch's phase and fill the history with the
+ * boundary's view of the samples before it */
+static void prepare_interpolation(SampleAligner_t* sa, const Batch_t* input)
+{
+  const size_t taps = sa->history_size;
+  const long long period = (long long) sa->period_ns;
+
+  // Output 0 sits 'delay' periods after input 0, with |delay| <= 1
+  long long delay_ns = (long long) sa->next_output_ns - input->t_ns;
+  long long whole = delay_ns < 0 ? -1 : delay_ns >= period ? 1 : 0;
+  double mu = (double) (delay_ns - whole * period) / (double) period;
+  if (sa->method == INTERP_NEAREST) {
+    whole += mu > 0.5 ? 1 : 0;
+    mu = 0.0;
+  }
+  sa->tap_offset = whole - (long long) ((taps - 1) / 2);
+  compute_coeffs(sa, mu);
+
+  // history[taps - 1 - j] stands for input -1 - j
+  for (size_t j = 0; j < taps; j++) {
+    char* dst =
+        (char*) sa->history_buffer +
+        (taps - 1 - j) * bb_getdatawidth(sa->base.input_buffers[0]->dtype);
+    switch (sa->boundary) {
+      case BOUNDARY_HOLD:
+        copy_sample(sa, dst, input->data, 0);
+        break;
+      case BOUNDARY_REFLECT:
+        copy_sample(sa, dst, input->data, MIN(j + 1, input->head - 1));
+        break;
+      case BOUNDARY_ZERO:
+        memset(dst, 0, bb_getdatawidth(sa->base.input_buffers[0]->dtype));
+        break;
+    }
+  }
+}
+
+/* Emit the outputs still waiting on samples past the end of the stream,
+ * padding it by the boundary rule, so there is one output per input */
+static Bp_EC flush_interpolation(SampleAligner_t* sa, Batch_t** output)
+{
+  const size_t taps = sa->history_size;
+  const size_t width = bb_getdatawidth(sa->base.input_buffers[0]->dtype);
+  const uint64_t total = sa->samples_in;
+  char* pad = (char*) sa->scratch + 2 * taps * width;
+
+  // pad[j] stands for input total + j; history[taps - 1] is the last input
+  for (size_t j = 0; j < taps; j++) {
+    switch (sa->boundary) {
+      case BOUNDARY_HOLD:
+        copy_sample(sa, pad + j * width, sa->history_buffer, taps - 1);
+        break;
+      case BOUNDARY_REFLECT:
+        copy_sample(sa, pad + j * width, sa->history_buffer,
+                    j + 2 <= taps ? taps - 2 - j : 0);
+        break;
+      case BOUNDARY_ZERO:
+        memset(pad + j * width, 0, width);
+        break;
+    }
+  }
+  return process_samples(sa, output, pad, taps, total);
+}
+
+static void free_interpolation_buffers(SampleAligner_t* sa)
+{
+  free(sa->history_buffer);
+  sa->history_buffer = NULL;
+  free(sa->scratch);
+  sa->scratch = NULL;
+  free(sa->coeffs);
+  sa->coeffs = NULL;
+}
 
 // Custom start operation
 static Bp_EC sample_aligner_start(Filter_t* self)
@@ -71,8 +342,12 @@ static Bp_EC sample_aligner_start(Filter_t* self)
   }
   sa->history_size = history_size;
 
+  // Everything the worker needs is allocated here, never per batch
   sa->history_buffer = calloc(history_size, sample_size);
-  if (!sa->history_buffer) {
+  sa->scratch = calloc(3 * history_size, sample_size);
+  sa->coeffs = calloc(history_size, sizeof(float));
+  if (!sa->history_buffer || !sa->scratch || !sa->coeffs) {
+    free_interpolation_buffers(sa);
     self->worker_err_info.ec = Bp_EC_ALLOC;
     self->worker_err_info.err_msg = "Failed to allocate history buffer";
     return Bp_EC_ALLOC;
@@ -83,8 +358,7 @@ static Bp_EC sample_aligner_start(Filter_t* self)
   if (pthread_create(&self->worker_thread, NULL, self->worker, (void*) self) !=
       0) {
     self->running = false;
-    free(sa->history_buffer);
-    sa->history_buffer = NULL;
+    free_interpolation_buffers(sa);
     return Bp_EC_THREAD_CREATE_FAIL;
   }
 
@@ -97,10 +371,7 @@ static Bp_EC sample_aligner_deinit(Filter_t* self)
   SampleAligner_t* sa = (SampleAligner_t*) self;
 
   // Free history buffer
-  if (sa->history_buffer) {
-    free(sa->history_buffer);
-    sa->history_buffer = NULL;
-  }
+  free_interpolation_buffers(sa);
 
   // Deinit input buffers
   for (int i = 0; i < self->n_input_buffers; i++) {
@@ -116,11 +387,12 @@ static Bp_EC sample_aligner_deinit(Filter_t* self)
   return Bp_EC_OK;
 }
 
-// Worker function - simplified implementation
+// Worker function
 static void* sample_aligner_worker(void* arg)
 {
   SampleAligner_t* sa = (SampleAligner_t*) arg;
   Filter_t* f = &sa->base;
+  Batch_t* output = NULL;
   Bp_EC err = Bp_EC_OK;
 
   while (f->running) {
@@ -135,13 +407,21 @@ static void* sample_aligner_worker(void* arg)
     // Check for completion
     if (input->ec == Bp_EC_COMPLETE) {
       bb_del_tail(f->input_buffers[0]);
-      // Propagate completion to sink
-      Batch_t* output = bb_get_head(f->sinks[0]);
+      // Interpolate up to the last input, then propagate completion to sink
+      if (sa->initialized) {
+        err = flush_interpolation(sa, &output);
+        BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
+      }
       if (output) {
-        output->ec = Bp_EC_COMPLETE;
-        output->head = 0;
+        err = submit_output(sa, &output);
+        BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
+      }
+      Batch_t* done = bb_get_head(f->sinks[0]);
+      if (done) {
+        done->ec = Bp_EC_COMPLETE;
+        done->head = 0;
         err = bb_submit(f->sinks[0], f->timeout_us);
-        BP_WORKER_ASSERT(f, input->ec == Bp_EC_OK, input->ec);
+        BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
       }
       break;
     }
@@ -149,6 +429,11 @@ static void* sample_aligner_worker(void* arg)
     // Validate input
     BP_WORKER_ASSERT(f, input->ec == Bp_EC_OK, input->ec);
     BP_WORKER_ASSERT(f, input->period_ns > 0, Bp_EC_INVALID_DATA);
+    if (input->head == 0) {
+      err = bb_del_tail(f->input_buffers[0]);
+      BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
+      continue;
+    }
 
     // Initialize on first batch
     if (!sa->initialized) {
@@ -177,37 +462,23 @@ static void* sample_aligner_worker(void* arg)
           break;
       }
 
+      prepare_interpolation(sa, input);
       sa->initialized = true;
     }
 
-    // Get output batch
-    Batch_t* output = bb_get_head(f->sinks[0]);
-    BP_WORKER_ASSERT(f, output != NULL, Bp_EC_NULL_POINTER);
-
-    // Simple passthrough with corrected timestamp
-    output->t_ns = sa->next_output_ns;
-    output->period_ns = sa->period_ns;
-    output->batch_id = input->batch_id;
-    output->ec = Bp_EC_OK;
-
-    // Copy data
-    size_t samples = input->head;
-    size_t output_capacity = (1 << f->sinks[0]->batch_capacity_expo);
-    size_t to_copy = MIN(samples, output_capacity);
-
-    memcpy(output->data, input->data,
-           to_copy * bb_getdatawidth(f->input_buffers[0]->dtype));
-    output->head = to_copy;
-
-    // Update state
-    sa->next_output_ns += to_copy * sa->period_ns;
-    sa->samples_interpolated += to_copy;
-    f->metrics.samples_processed += to_copy;
-    f->metrics.n_batches++;
-
-    // Submit output and consume input
-    err = bb_submit(f->sinks[0], f->timeout_us);
+    // History carries across batches, so the stream must stay regular
+    BP_WORKER_ASSERT(f, input->period_ns == sa->period_ns, Bp_EC_INVALID_DATA);
+
+    // Interpolate every output this batch completes
+    err = process_samples(sa, &output, input->data, input->head, UINT64_MAX);
     BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
+    f->metrics.samples_processed += input->head;
+
+    // Don't hold outputs back waiting for the next batch
+    if (output) {
+      err = submit_output(sa, &output);
+      BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
+    }
 
     err = bb_del_tail(f->input_buffers[0]);
     BP_WORKER_ASSERT(f, err == Bp_EC_OK, err);
@@ -260,10 +531,11 @@ static Bp_EC sample_aligner_describe(Filter_t* self, char* buffer, size_t size)
            "SampleAligner: %s\n"
            "  Method: %s\n"
            "  Alignment: %s\n"
+           "  Taps: %zu\n"
            "  Period: %lu ns\n"
            "  Samples interpolated: %lu\n"
            "  Max phase correction: %lu ns\n",
-           self->name, method_str, align_str, sa->period_ns,
+           self->name, method_str, align_str, sa->history_size, sa->period_ns,
            sa->samples_interpolated, sa->max_phase_correction_ns);
 
   return Bp_EC_OK;
@@ -280,6 +552,7 @@ static Bp_EC sample_aligner_get_stats(Filter_t* self, void* stats_out)
 Bp_EC sample_aligner_init(SampleAligner_t* f, SampleAligner_config_t config)
 {
   if (f == NULL) return Bp_EC_INVALID_CONFIG;
+  if (config.sinc_cutoff > 1.0f) return Bp_EC_INVALID_CONFIG;
 
   // Build core config
   Core_filt_config_t core_config = {
@@ -308,6 +581,10 @@ Bp_EC sample_aligner_init(SampleAligner_t* f, SampleAligner_config_t config)
   f->history_buffer = NULL;
   f->history_size = 0;
   f->history_samples = 0;
+  f->scratch = NULL;
+  f->coeffs = NULL;
+  f->tap_offset = 0;
+  f->samples_in = 0;
   f->samples_interpolated = 0;
   f->max_phase_correction_ns = 0;
   f->total_phase_correction_ns = 0;
@@ -60,9 +60,13 @@ typedef struct {
   bool initialized;         // First batch processed
 
   // Interpolation buffer
-  void* history_buffer;    // Previous samples for interpolation
-  size_t history_size;     // Based on method
+  void* history_buffer;    // Last history_size input samples, oldest first
+  size_t history_size;     // Interpolator taps, based on method
   size_t history_samples;  // Current samples in history
+  void* scratch;           // History joined to a batch head, then end padding
+  float* coeffs;           // Fractional delay taps, fixed by the first batch
+  long long tap_offset;    // Input index of output k's first tap, less k
+  uint64_t samples_in;     // Input samples received
 
   // Statistics
   uint64_t samples_interpolated;
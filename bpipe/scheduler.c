@@ -0,0 +1,417 @@
+#define _GNU_SOURCE  // For sysconf // NOLINT(bugprone-reserved-identifier)
+#include "scheduler.h"
+#include <stdatomic.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+#include "batch_buffer.h"
+#include "bperr.h"
+#include "core.h"
+
+/* Append a task to the run queue and wake one worker */
+static void sched_push(Scheduler_t *sched, Sched_task_t *task)
+{
+  pthread_mutex_lock(&sched->mutex);
+  task->next = NULL;
+  if (sched->queue_tail != NULL) {
+    sched->queue_tail->next = task;
+  } else {
+    sched->queue_head = task;
+  }
+  sched->queue_tail = task;
+  pthread_cond_signal(&sched->work_ready);
+  pthread_mutex_unlock(&sched->mutex);
+}
+
+/* Take the next task, blocking until one is queued. NULL once stopped. */
+static Sched_task_t *sched_pop(Scheduler_t *sched)
+{
+  Sched_task_t *task = NULL;
+
+  pthread_mutex_lock(&sched->mutex);
+  while (sched->queue_head == NULL && atomic_load(&sched->running)) {
+    pthread_cond_wait(&sched->work_ready, &sched->mutex);
+  }
+  if (atomic_load(&sched->running)) {
+    task = sched->queue_head;
+    sched->queue_head = task->next;
+    if (sched->queue_head == NULL) {
+      sched->queue_tail = NULL;
+    }
+  }
+  pthread_mutex_unlock(&sched->mutex);
+
+  return task;
+}
+
+/* Queue a parked task. Safe to call from any thread at any time.
+ *
+ * The notified flag closes the race with a step which has just found no
+ * input: either the worker sees the flag after parking the task, or this
+ * function sees the task parked. */
+static void sched_task_wake(Sched_task_t *task)
+{
+  atomic_store(&task->notified, true);
+
+  int expected = SCHED_TASK_IDLE;
+  if (atomic_load(&task->filter->running) &&
+      atomic_compare_exchange_strong(&task->state, &expected,
+                                     SCHED_TASK_QUEUED)) {
+    sched_push(task->sched, task);
+  }
+}
+
+/* Readiness hook for buffers with a single scheduled waiter */
+static void sched_buffer_ready(void *ctx, Batch_buff_t *buff)
+{
+  (void) buff;
+  sched_task_wake((Sched_task_t *) ctx);
+}
+
+/* Readiness hook for multi-producer sinks: wake every task writing to it */
+static void sched_shared_space_ready(void *ctx, Batch_buff_t *buff)
+{
+  Scheduler_t *sched = (Scheduler_t *) ctx;
+
+  for (size_t i = 0; i < sched->n_tasks; i++) {
+    Filter_t *f = sched->tasks[i]->filter;
+    for (size_t k = 0; k < MAX_SINKS; k++) {
+      if (f->sinks[k] == buff) {
+        sched_task_wake(sched->tasks[i]);
+        break;
+      }
+    }
+  }
+}
+
+/* Route the readiness events of a filter's buffers to its task */
+static void sched_attach(Sched_task_t *task)
+{
+  Filter_t *f = task->filter;
+
+  for (int i = 0; i < f->n_input_buffers; i++) {
+    Batch_buff_t *in = f->input_buffers[i];
+    if (in != NULL) {
+      in->on_not_empty_ctx = task;
+      atomic_store(&in->on_not_empty, sched_buffer_ready);
+    }
+  }
+
+  for (size_t i = 0; i < MAX_SINKS; i++) {
+    Batch_buff_t *out = f->sinks[i];
+    if (out == NULL) {
+      continue;
+    }
+    if (out->multi_producer) {
+      out->on_not_full_ctx = task->sched;
+      atomic_store(&out->on_not_full, sched_shared_space_ready);
+    } else {
+      out->on_not_full_ctx = task;
+      atomic_store(&out->on_not_full, sched_buffer_ready);
+    }
+  }
+}
+
+/* True if another running task of the scheduler writes to 'buff' */
+static bool sched_sink_shared(const Sched_task_t *task, const Batch_buff_t *buff)
+{
+  Scheduler_t *sched = task->sched;
+
+  for (size_t i = 0; i < sched->n_tasks; i++) {
+    Filter_t *f = sched->tasks[i]->filter;
+    if (sched->tasks[i] == task || !atomic_load(&f->running)) {
+      continue;
+    }
+    for (size_t k = 0; k < MAX_SINKS; k++) {
+      if (f->sinks[k] == buff) {
+        return true;
+      }
+    }
+  }
+  return false;
+}
+
+/* Remove a task's readiness hooks. A multi-producer sink's hook belongs to
+ * the scheduler, so it stays while other running producers still need it
+ * unless 'keep_shared' is false. */
+static void sched_detach(Sched_task_t *task, bool keep_shared)
+{
+  Filter_t *f = task->filter;
+
+  for (int i = 0; i < f->n_input_buffers; i++) {
+    Batch_buff_t *in = f->input_buffers[i];
+    if (in != NULL && in->on_not_empty_ctx == task) {
+      atomic_store(&in->on_not_empty, NULL);
+    }
+  }
+
+  for (size_t i = 0; i < MAX_SINKS; i++) {
+    Batch_buff_t *out = f->sinks[i];
+    if (out == NULL) {
+      continue;
+    }
+    if (out->on_not_full_ctx == task ||
+        (out->multi_producer && out->on_not_full_ctx == task->sched &&
+         !(keep_shared && sched_sink_shared(task, out)))) {
+      atomic_store(&out->on_not_full, NULL);
+    }
+  }
+}
+
+static void *sched_worker(void *arg)
+{
+  Scheduler_t *sched = (Scheduler_t *) arg;
+  Sched_task_t *task;
+
+  while ((task = sched_pop(sched)) != NULL) {
+    Filter_t *f = task->filter;
+
+    atomic_store(&task->state, SCHED_TASK_RUNNING);
+    atomic_store(&task->notified, false);
+    if (!atomic_load(&f->running)) {
+      atomic_store(&task->state, SCHED_TASK_IDLE);
+      continue;
+    }
+
+    long long t_start = now_ns(CLOCK_MONOTONIC);
+    Bp_EC rc = f->step(f);
+    atomic_fetch_add(&f->metrics.run_time_ns,
+                     (uint64_t) (now_ns(CLOCK_MONOTONIC) - t_start));
+    atomic_fetch_add(&f->metrics.n_runs, 1);
+
+    switch (rc) {
+      case Bp_EC_OK:
+        /* More work may be pending - go to the back of the queue */
+        atomic_store(&task->state, SCHED_TASK_QUEUED);
+        sched_push(sched, task);
+        break;
+
+      case Bp_EC_NOINPUT:
+      case Bp_EC_NOSPACE:
+        /* Park, unless a readiness event arrived while the step ran */
+        atomic_store(&task->state, SCHED_TASK_IDLE);
+        if (atomic_exchange(&task->notified, false)) {
+          sched_task_wake(task);
+        }
+        break;
+
+      case Bp_EC_COMPLETE:
+        atomic_store(&f->running, false);
+        atomic_store(&task->state, SCHED_TASK_IDLE);
+        break;
+
+      default:
+        f->worker_err_info.ec = rc;
+        atomic_store(&f->running, false);
+        atomic_store(&task->state, SCHED_TASK_IDLE);
+        break;
+    }
+  }
+
+  return NULL;
+}
+
+Bp_EC sched_init(Scheduler_t *sched, Scheduler_config_t config)
+{
+  if (sched == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  memset(sched, 0, sizeof(Scheduler_t));
+
+  strncpy(sched->name, config.name ? config.name : "scheduler",
+          sizeof(sched->name) - 1);
+  sched->name[sizeof(sched->name) - 1] = '\0';
+
+  sched->n_workers = config.n_workers;
+  if (sched->n_workers == 0) {
+    long n_cpus = sysconf(_SC_NPROCESSORS_ONLN);
+    sched->n_workers = n_cpus > 0 ? (size_t) n_cpus : 1;
+  }
+
+  sched->workers = calloc(sched->n_workers, sizeof(pthread_t));
+  if (sched->workers == NULL) {
+    return Bp_EC_MALLOC_FAIL;
+  }
+
+  if (pthread_mutex_init(&sched->mutex, NULL) != 0) {
+    free(sched->workers);
+    return Bp_EC_MUTEX_INIT_FAIL;
+  }
+
+  if (pthread_cond_init(&sched->work_ready, NULL) != 0) {
+    pthread_mutex_destroy(&sched->mutex);
+    free(sched->workers);
+    return Bp_EC_COND_INIT_FAIL;
+  }
+
+  atomic_store(&sched->running, false);
+  return Bp_EC_OK;
+}
+
+Bp_EC sched_deinit(Scheduler_t *sched)
+{
+  if (sched == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  sched_stop(sched);
+
+  for (size_t i = 0; i < sched->n_tasks; i++) {
+    sched_detach(sched->tasks[i], false);
+    sched->tasks[i]->filter->sched_task = NULL;
+    free(sched->tasks[i]);
+  }
+  free(sched->tasks);
+  free(sched->workers);
+
+  pthread_cond_destroy(&sched->work_ready);
+  pthread_mutex_destroy(&sched->mutex);
+
+  memset(sched, 0, sizeof(Scheduler_t));
+  return Bp_EC_OK;
+}
+
+Bp_EC sched_add(Scheduler_t *sched, Filter_t *filter)
+{
+  if (sched == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+  if (filter == NULL) {
+    return Bp_EC_NULL_FILTER;
+  }
+  if (filter->step == NULL) {
+    return Bp_EC_NOT_IMPLEMENTED;
+  }
+  if (filter->sched_task != NULL) {
+    return Bp_EC_ALREADY_REGISTERED;
+  }
+  /* The task table is read without locking while the workers run */
+  if (atomic_load(&sched->running) || atomic_load(&filter->running)) {
+    return Bp_EC_ALREADY_RUNNING;
+  }
+
+  if (sched->n_tasks == sched->tasks_capacity) {
+    size_t capacity = sched->tasks_capacity ? sched->tasks_capacity * 2 : 16;
+    Sched_task_t **tasks =
+        realloc(sched->tasks, capacity * sizeof(Sched_task_t *));
+    if (tasks == NULL) {
+      return Bp_EC_MALLOC_FAIL;
+    }
+    sched->tasks = tasks;
+    sched->tasks_capacity = capacity;
+  }
+
+  Sched_task_t *task = calloc(1, sizeof(Sched_task_t));
+  if (task == NULL) {
+    return Bp_EC_MALLOC_FAIL;
+  }
+  task->filter = filter;
+  task->sched = sched;
+  atomic_store(&task->state, SCHED_TASK_IDLE);
+  atomic_store(&task->notified, false);
+
+  sched->tasks[sched->n_tasks++] = task;
+  filter->sched_task = task;
+
+  return Bp_EC_OK;
+}
+
+Bp_EC sched_start(Scheduler_t *sched)
+{
+  if (sched == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+  if (atomic_load(&sched->running)) {
+    return Bp_EC_ALREADY_RUNNING;
+  }
+
+  atomic_store(&sched->running, true);
+
+  for (size_t i = 0; i < sched->n_workers; i++) {
+    if (pthread_create(&sched->workers[i], NULL, sched_worker, sched) != 0) {
+      /* Tear down the workers that did start */
+      pthread_mutex_lock(&sched->mutex);
+      atomic_store(&sched->running, false);
+      pthread_cond_broadcast(&sched->work_ready);
+      pthread_mutex_unlock(&sched->mutex);
+      for (size_t k = 0; k < i; k++) {
+        pthread_join(sched->workers[k], NULL);
+      }
+      return Bp_EC_THREAD_CREATE_FAIL;
+    }
+  }
+
+  /* Resume filters that were started while the workers were stopped */
+  for (size_t i = 0; i < sched->n_tasks; i++) {
+    sched_task_wake(sched->tasks[i]);
+  }
+
+  return Bp_EC_OK;
+}
+
+Bp_EC sched_stop(Scheduler_t *sched)
+{
+  if (sched == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+  if (!atomic_load(&sched->running)) {
+    return Bp_EC_OK;
+  }
+
+  pthread_mutex_lock(&sched->mutex);
+  atomic_store(&sched->running, false);
+  pthread_cond_broadcast(&sched->work_ready);
+  pthread_mutex_unlock(&sched->mutex);
+
+  for (size_t i = 0; i < sched->n_workers; i++) {
+    if (pthread_join(sched->workers[i], NULL) != 0) {
+      return Bp_EC_THREAD_JOIN_FAIL;
+    }
+  }
+
+  /* Park everything that was still queued */
+  pthread_mutex_lock(&sched->mutex);
+  for (Sched_task_t *t = sched->queue_head; t != NULL; t = t->next) {
+    atomic_store(&t->state, SCHED_TASK_IDLE);
+  }
+  sched->queue_head = NULL;
+  sched->queue_tail = NULL;
+  pthread_mutex_unlock(&sched->mutex);
+
+  return Bp_EC_OK;
+}
+
+Bp_EC sched_filter_start(Filter_t *filter)
+{
+  Sched_task_t *task = filter->sched_task;
+  if (task == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  sched_attach(task);
+  atomic_store(&filter->running, true);
+  sched_task_wake(task);
+
+  return Bp_EC_OK;
+}
+
+Bp_EC sched_filter_stop(Filter_t *filter)
+{
+  Sched_task_t *task = filter->sched_task;
+  if (task == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  atomic_store(&filter->running, false);
+  sched_detach(task, true);
+
+  /* Steps never block, so this wait is short */
+  const struct timespec poll = {.tv_nsec = 50000};  // 50us
+  while (atomic_load(&task->state) == SCHED_TASK_RUNNING) {
+    nanosleep(&poll, NULL);
+  }
+
+  return Bp_EC_OK;
+}
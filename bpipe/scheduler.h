@@ -0,0 +1,81 @@
+#ifndef BPIPE_SCHEDULER_H
+#define BPIPE_SCHEDULER_H
+
+#include "core.h"
+
+/* Cooperative scheduler.
+ *
+ * Runs filters that implement Step_t as run-to-yield tasks on a fixed pool of
+ * worker threads, instead of one blocking thread per filter. A task is queued
+ * when it is started, re-queued while its step makes progress, and parked when
+ * the step reports Bp_EC_NOINPUT or Bp_EC_NOSPACE. Parked tasks are woken by
+ * the readiness hooks of their input buffers (new batch) and sinks (free
+ * slot), so idle filters cost no CPU and no thread.
+ *
+ * Usage:
+ *   sched_init(&sched, config);
+ *   sched_add(&sched, &filter.base);   // before filt_start()
+ *   sched_start(&sched);
+ *   filt_start(&filter.base);          // queues the task
+ *   ...
+ *   filt_stop(&filter.base);           // waits for a running step to return
+ *   sched_stop(&sched);
+ *   sched_deinit(&sched);
+ *
+ * Filters that are not added keep their dedicated worker thread, and both
+ * kinds can be connected to each other freely.
+ */
+
+/* Task states */
+typedef enum _Sched_task_state {
+  SCHED_TASK_IDLE = 0, /* Parked (or not started) */
+  SCHED_TASK_QUEUED,   /* In the run queue */
+  SCHED_TASK_RUNNING,  /* step() executing on a worker */
+} Sched_task_state_t;
+
+typedef struct _Sched_task {
+  Filter_t *filter;
+  struct _Scheduler *sched;
+  _Atomic int state;        /* Sched_task_state_t */
+  _Atomic bool notified;    /* Readiness event seen while not parked */
+  struct _Sched_task *next; /* Run queue link */
+} Sched_task_t;
+
+typedef struct _Scheduler_config_t {
+  const char *name;
+  size_t n_workers; /* 0 = one per online CPU */
+} Scheduler_config_t;
+
+typedef struct _Scheduler {
+  char name[32];
+  size_t n_workers;
+  pthread_t *workers;
+  _Atomic bool running;
+
+  /* Registered tasks */
+  Sched_task_t **tasks;
+  size_t n_tasks;
+  size_t tasks_capacity;
+
+  /* FIFO run queue */
+  pthread_mutex_t mutex;
+  pthread_cond_t work_ready;
+  Sched_task_t *queue_head;
+  Sched_task_t *queue_tail;
+} Scheduler_t;
+
+Bp_EC sched_init(Scheduler_t *sched, Scheduler_config_t config);
+Bp_EC sched_deinit(Scheduler_t *sched);
+
+/* Hand a stopped filter to the scheduler. The filter must implement step. */
+Bp_EC sched_add(Scheduler_t *sched, Filter_t *filter);
+
+/* Start / stop the worker threads */
+Bp_EC sched_start(Scheduler_t *sched);
+Bp_EC sched_stop(Scheduler_t *sched);
+
+/* Called by filt_start() / filt_stop() for scheduled filters */
+Bp_EC sched_filter_start(Filter_t *filter);
+Bp_EC sched_filter_stop(Filter_t *filter);
+
+#endif /* BPIPE_SCHEDULER_H */
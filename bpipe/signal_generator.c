@@ -1,18 +1,27 @@
-#define _GNU_SOURCE  // For usleep // NOLINT(bugprone-reserved-identifier)
+#define _POSIX_C_SOURCE 200809L  // For clock_nanosleep
 #include "signal_generator.h"
 #include <math.h>
 #include <stdatomic.h>
 #include <stddef.h>
-#include <unistd.h>
+#include <string.h>
+#include <time.h>
 #include "batch_buffer.h"
 #include "bperr.h"
 #include "core.h"
+#include "kernels.h"
 #include "utils.h"
 
 #ifndef M_PI
 #define M_PI 3.14159265358979323846
 #endif
 
+// Upper bound on batches generated per output wakeup. Large enough to
+// amortise the handoff, small enough to keep first-batch latency low.
+#define SG_MAX_BURST_BATCHES 8
+
+// Samples per tone per pass in the fast multi-tone sum
+#define SG_TONE_CHUNK 256
+
 // Signal generator is a source filter - no input constraints needed
 // Output properties are set explicitly during initialization
 
@@ -75,10 +84,137 @@ static void generate_triangle(SignalGenerator_t* sg, float* samples, size_t n,
   }
 }
 
+// Indexed by WaveformType_e
+static const Kern_wave_t sg_kern_waves[] = {
+    [WAVEFORM_SINE] = KERN_WAVE_SINE,
+    [WAVEFORM_SQUARE] = KERN_WAVE_SQUARE,
+    [WAVEFORM_SAWTOOTH] = KERN_WAVE_SAW,
+    [WAVEFORM_TRIANGLE] = KERN_WAVE_TRIANGLE,
+};
+
+// Round a 64 bit phase to the kernels' 32 bits; wrapping is harmless
+static uint32_t phase_to_u32(uint64_t phase)
+{
+  return (uint32_t) ((phase + 0x80000000u) >> 32);
+}
+
+// Fraction of a cycle as a 64 bit phase
+static uint64_t cycles_to_phase(double cycles)
+{
+  double fraction = cycles - floor(cycles);
+  if (fraction >= 1.0) fraction = 0.0;  // Tiny negative cycles round up
+  return (uint64_t) ldexp(fraction, 64);
+}
+
+// Phase of a tone at start_time_ns. Whole seconds times the frequency is
+// split into an exact sum with fma(), so a start days or years in does not
+// cost precision.
+static uint64_t start_phase(const SignalGenerator_t* sg, double frequency_hz)
+{
+  double seconds = (double) (sg->start_time_ns / 1000000000ULL);
+  double rem_ns = (double) (sg->start_time_ns % 1000000000ULL);
+  double hi = frequency_hz * seconds;
+  double lo = fma(frequency_hz, seconds, -hi);
+  double cycles = (hi - floor(hi)) + lo + frequency_hz * 1e-9 * rem_ns +
+                  sg->initial_phase_rad / (2.0 * M_PI);
+  return cycles_to_phase(cycles);
+}
+
+// Generate from the phase accumulator. The batch's phase error is the
+// rounding of its start, plus n times that of the step: 2^-33 of a cycle
+// per sample, so under 1e-6 rad for a 1024 sample batch.
+static void generate_fast(SignalGenerator_t* sg, float* samples, size_t n)
+{
+  kern_osc_f32(sg_kern_waves[sg->waveform_type], phase_to_u32(sg->phase),
+               phase_to_u32(sg->phase_step), samples, n);
+  kern_affine_f32(samples, samples, n, (float) sg->amplitude,
+                  (float) sg->offset);
+  sg->phase += sg->phase_step * n;
+}
+
+// Generate Gaussian noise, white or pink. Both modes use the kernels.
+static void generate_noise(SignalGenerator_t* sg, float* samples, size_t n)
+{
+  kern_gauss_f32(&sg->rng, samples, n);
+  if (sg->waveform_type == WAVEFORM_PINK_NOISE) {
+    kern_pink_f32(&sg->pink, samples, samples, n);
+  }
+  kern_affine_f32(samples, samples, n, (float) sg->amplitude,
+                  (float) sg->offset);
+}
+
+// Generate linear chirp. The sweep restarts every chirp_period_s, counted
+// from t = 0 like the other waveforms' phase.
+static void generate_chirp(SignalGenerator_t* sg, float* samples, size_t n,
+                           uint64_t t_start_ns)
+{
+  const double sweep_hz_per_s =
+      (sg->chirp_end_hz - sg->frequency_hz) / sg->chirp_period_s;
+  for (size_t i = 0; i < n; i++) {
+    double t_s = (t_start_ns + i * sg->period_ns) * 1e-9;
+    double tau = fmod(t_s, sg->chirp_period_s);
+    double phase =
+        2.0 * M_PI * (sg->frequency_hz + 0.5 * sweep_hz_per_s * tau) * tau +
+        sg->initial_phase_rad;
+    samples[i] = sg->amplitude * sin(phase) + sg->offset;
+  }
+}
+
+// Generate multi-tone sum
+static void generate_multi_tone(SignalGenerator_t* sg, float* samples, size_t n,
+                                uint64_t t_start_ns)
+{
+  for (size_t i = 0; i < n; i++) {
+    double t_s = (t_start_ns + i * sg->period_ns) * 1e-9;
+    double sum = 0.0;
+    for (size_t k = 0; k < sg->n_tones; k++) {
+      sum +=
+          sg->tone_amplitudes[k] *
+          sin(2.0 * M_PI * sg->tone_freqs_hz[k] * t_s + sg->initial_phase_rad);
+    }
+    samples[i] = sg->amplitude * sum + sg->offset;
+  }
+}
+
+// Generate multi-tone sum from the phase accumulators, a chunk of each tone
+// at a time so the scratch fits on the stack
+static void generate_multi_tone_fast(SignalGenerator_t* sg, float* samples,
+                                     size_t n)
+{
+  float tone[SG_TONE_CHUNK];
+
+  for (size_t i = 0; i < n; i += SG_TONE_CHUNK) {
+    const size_t len = MIN(SG_TONE_CHUNK, n - i);
+    float* out = samples + i;
+    for (size_t k = 0; k < sg->n_tones; k++) {
+      uint64_t phase = sg->tone_phase[k] + sg->tone_phase_step[k] * i;
+      float gain = (float) (sg->amplitude * sg->tone_amplitudes[k]);
+      kern_osc_f32(KERN_WAVE_SINE, phase_to_u32(phase),
+                   phase_to_u32(sg->tone_phase_step[k]), tone, len);
+      if (k == 0) {
+        kern_scale_f32(tone, out, len, gain);
+      } else {
+        kern_scale_f32(tone, tone, len, gain);
+        kern_binop_f32(KERN_ADD, out, tone, out, len);
+      }
+    }
+  }
+  kern_offset_f32(samples, samples, n, (float) sg->offset);
+
+  for (size_t k = 0; k < sg->n_tones; k++) {
+    sg->tone_phase[k] += sg->tone_phase_step[k] * n;
+  }
+}
+
 // Generate waveform based on type
 static void generate_waveform(SignalGenerator_t* sg, float* samples, size_t n,
                               uint64_t t_start_ns)
 {
+  if (sg->mode == SG_MODE_FAST && sg->waveform_type <= WAVEFORM_TRIANGLE) {
+    generate_fast(sg, samples, n);
+    return;
+  }
+
   switch (sg->waveform_type) {
     case WAVEFORM_SINE:
       generate_sine(sg, samples, n, t_start_ns);
@@ -92,6 +228,57 @@ static void generate_waveform(SignalGenerator_t* sg, float* samples, size_t n,
     case WAVEFORM_TRIANGLE:
       generate_triangle(sg, samples, n, t_start_ns);
       break;
+    case WAVEFORM_WHITE_NOISE:
+    case WAVEFORM_PINK_NOISE:
+      generate_noise(sg, samples, n);
+      break;
+    case WAVEFORM_CHIRP:
+      generate_chirp(sg, samples, n, t_start_ns);
+      break;
+    case WAVEFORM_MULTI_TONE:
+      if (sg->mode == SG_MODE_FAST) {
+        generate_multi_tone_fast(sg, samples, n);
+      } else {
+        generate_multi_tone(sg, samples, n, t_start_ns);
+      }
+      break;
+  }
+}
+
+// Convert a batch generated as float to the output type, in place
+static void convert_output(SignalGenerator_t* sg, void* data, size_t n)
+{
+  switch (sg->dtype) {
+    case DTYPE_I32:
+      kern_cast_f32_i32((const float*) data, (int32_t*) data, n, 1.0f);
+      break;
+    case DTYPE_U32:
+      kern_cast_f32_u32((const float*) data, (uint32_t*) data, n, 1.0f);
+      break;
+    default:
+      break;
+  }
+}
+
+// Highest frequency the waveform contains, for the Nyquist check. Noise
+// has no frequency to check.
+static double highest_frequency(const SignalGenerator_t* sg)
+{
+  switch (sg->waveform_type) {
+    case WAVEFORM_WHITE_NOISE:
+    case WAVEFORM_PINK_NOISE:
+      return 0.0;
+    case WAVEFORM_CHIRP:
+      return MAX(sg->frequency_hz, sg->chirp_end_hz);
+    case WAVEFORM_MULTI_TONE: {
+      double highest = 0.0;
+      for (size_t k = 0; k < sg->n_tones; k++) {
+        highest = MAX(highest, sg->tone_freqs_hz[k]);
+      }
+      return highest;
+    }
+    default:
+      return sg->frequency_hz;
   }
 }
 
@@ -110,6 +297,34 @@ static void send_completion_to_sinks(Filter_t* filter)
   }
 }
 
+// Paced mode: wait for a batch's due time on CLOCK_MONOTONIC, recording it
+// as a miss if it is already late. Sleeps in slices of the filter timeout so
+// a stop is noticed. Returns false if stopped.
+static bool wait_for_deadline(SignalGenerator_t* sg, long long due_ns)
+{
+  const long long slice_ns = (long long) sg->base.timeout_us * 1000;
+
+  long long now = now_ns(CLOCK_MONOTONIC);
+  if (now > due_ns) {
+    sg->deadline_misses++;
+    sg->max_lateness_ns = MAX(sg->max_lateness_ns, (uint64_t) (now - due_ns));
+    return true;
+  }
+  while (now < due_ns) {
+    if (!atomic_load(&sg->base.running)) {
+      return false;
+    }
+    long long wake = due_ns;
+    if (slice_ns > 0 && now + slice_ns < due_ns) {
+      wake = now + slice_ns;
+    }
+    struct timespec ts = ts_from_ns(wake);
+    clock_nanosleep(CLOCK_MONOTONIC, TIMER_ABSTIME, &ts, NULL);
+    now = now_ns(CLOCK_MONOTONIC);
+  }
+  return true;
+}
+
 // Worker thread function
 void* signal_generator_worker(void* arg)
 {
@@ -123,54 +338,96 @@ void* signal_generator_worker(void* arg)
   // Check Nyquist frequency if configured
   if (!sg->allow_aliasing) {
     double nyquist_hz = 0.5e9 / sg->period_ns;
-    BP_WORKER_ASSERT(&sg->base, sg->frequency_hz <= nyquist_hz,
+    BP_WORKER_ASSERT(&sg->base, highest_frequency(sg) <= nyquist_hz,
                      Bp_EC_INVALID_CONFIG);
   }
+  BP_WORKER_ASSERT(&sg->base, sg->base.sinks[0]->dtype == sg->dtype,
+                   Bp_EC_DTYPE_MISMATCH);
 
-  // Initialize timing
+  // Initialize timing, the phases the exact mode has at the start, and the
+  // noise streams, so that a restart repeats the run
   sg->next_t_ns = sg->start_time_ns;
+  sg->phase = start_phase(sg, sg->frequency_hz);
+  for (size_t k = 0; k < sg->n_tones; k++) {
+    sg->tone_phase[k] = start_phase(sg, sg->tone_freqs_hz[k]);
+  }
+  kern_rng_seed(&sg->rng, sg->seed);
+  memset(&sg->pink, 0, sizeof(sg->pink));
+
+  Batch_buff_t* out = sg->base.sinks[0];
+
+  // Paced batches go one at a time, each on its own deadline, counted from
+  // when the first is ready. Timestamps on the real clock keep the sample
+  // spacing, only shifted to now.
+  const size_t max_burst = sg->paced ? 1 : SG_MAX_BURST_BATCHES;
+  long long pace_start_ns = -1;
+  long long t_shift_ns = 0;
+  if (sg->paced && sg->real_timestamps) {
+    t_shift_ns = now_ns(CLOCK_REALTIME) - (long long) sg->start_time_ns;
+  }
 
   while (atomic_load(&sg->base.running)) {
-    // Get output batch
-    Batch_t* output = bb_get_head(sg->base.sinks[0]);
-    if (!output) {
-      // Buffer full, wait and retry
-      usleep(1000);
-      continue;
+    // Reserve a run of free output slots, fill them, then publish them all
+    size_t n_reserved = bb_reserve_n(out, max_burst, sg->base.timeout_us, &err);
+    if (n_reserved == 0) {
+      // A ring that stays full only makes a paced batch late: keep waiting,
+      // and wait_for_deadline() counts the miss once there is room
+      if (sg->paced && err == Bp_EC_TIMEOUT) {
+        continue;
+      }
+      BP_WORKER_ASSERT(&sg->base, false, err);
     }
 
-    // Calculate samples to generate
-    size_t n_samples = bb_batch_size(sg->base.sinks[0]);
-    if (sg->max_samples) {
-      n_samples = MIN(n_samples, sg->max_samples - sg->samples_generated);
-    }
+    size_t n_filled = 0;
+    bool finished = false;
+    const uint64_t burst_t_ns = sg->next_t_ns;
+    while (n_filled < n_reserved && !finished) {
+      Batch_t* output = bb_get_head_at(out, n_filled);
 
-    // Set batch metadata
-    output->t_ns = sg->next_t_ns;
-    output->period_ns = sg->period_ns;
-    output->head = n_samples;
-    output->ec = Bp_EC_OK;
+      // Calculate samples to generate
+      size_t n_samples = bb_batch_size(out);
+      if (sg->max_samples) {
+        n_samples = MIN(n_samples, sg->max_samples - sg->samples_generated);
+      }
+
+      // Set batch metadata
+      output->t_ns = (long long) sg->next_t_ns + t_shift_ns;
+      output->period_ns = sg->period_ns;
+      output->head = n_samples;
+      output->ec = Bp_EC_OK;
+
+      // Generate waveform
+      float* samples = (float*) output->data;
+      generate_waveform(sg, samples, n_samples, sg->next_t_ns);
+      convert_output(sg, output->data, n_samples);
 
-    // Generate waveform
-    float* samples = (float*) output->data;
-    generate_waveform(sg, samples, n_samples, sg->next_t_ns);
+      // Update state
+      sg->next_t_ns += n_samples * sg->period_ns;
+      sg->samples_generated += n_samples;
+      sg->base.metrics.samples_processed += n_samples;
+      n_filled++;
 
-    // Update state
-    sg->next_t_ns += n_samples * sg->period_ns;
-    sg->samples_generated += n_samples;
+      finished = sg->max_samples && sg->samples_generated >= sg->max_samples;
+    }
 
-    // Submit batch
-    err = bb_submit(sg->base.sinks[0], sg->base.timeout_us);
+    if (sg->paced) {
+      long long offset_ns = (long long) (burst_t_ns - sg->start_time_ns);
+      if (pace_start_ns < 0) {
+        pace_start_ns = now_ns(CLOCK_MONOTONIC) - offset_ns;
+      } else if (!wait_for_deadline(sg, pace_start_ns + offset_ns)) {
+        break;  // Stopped while waiting
+      }
+    }
+
+    // Submit the burst
+    err = bb_commit_n(out, n_filled, sg->base.timeout_us);
     if (err != Bp_EC_OK) {
       BP_WORKER_ASSERT(&sg->base, false, err);
     }
-
-    // Update metrics
-    sg->base.metrics.samples_processed += n_samples;
-    sg->base.metrics.n_batches++;
+    sg->base.metrics.n_batches += n_filled;
 
     // Check termination after generating samples
-    if (sg->max_samples && sg->samples_generated >= sg->max_samples) {
+    if (finished) {
       atomic_store(&sg->base.running, false);
       break;
     }
@@ -182,6 +439,22 @@ void* signal_generator_worker(void* arg)
   return NULL;
 }
 
+static Bp_EC signal_generator_get_stats(Filter_t* self, void* stats_out)
+{
+  SignalGenerator_t* sg = (SignalGenerator_t*) self;
+
+  if (stats_out == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  SignalGenerator_stats_t* stats = (SignalGenerator_stats_t*) stats_out;
+  stats->base = self->metrics;
+  stats->deadline_misses = sg->deadline_misses;
+  stats->max_lateness_ns = sg->max_lateness_ns;
+
+  return Bp_EC_OK;
+}
+
 // Initialize signal generator
 Bp_EC signal_generator_init(SignalGenerator_t* sg,
                             SignalGenerator_config_t config)
@@ -191,14 +464,41 @@ Bp_EC signal_generator_init(SignalGenerator_t* sg,
   }
 
   // Validate configuration
-  if (config.frequency_hz <= 0) {
+  if (config.waveform_type < WAVEFORM_SINE ||
+      config.waveform_type > WAVEFORM_MULTI_TONE) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  bool is_noise = config.waveform_type == WAVEFORM_WHITE_NOISE ||
+                  config.waveform_type == WAVEFORM_PINK_NOISE;
+  if (config.waveform_type == WAVEFORM_MULTI_TONE) {
+    if (config.n_tones == 0 || config.n_tones > SG_MAX_TONES ||
+        config.tone_freqs_hz == NULL) {
+      return Bp_EC_INVALID_CONFIG;
+    }
+    for (size_t k = 0; k < config.n_tones; k++) {
+      if (!(config.tone_freqs_hz[k] > 0)) {
+        return Bp_EC_INVALID_CONFIG;
+      }
+    }
+  } else if (!is_noise && !(config.frequency_hz > 0)) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  if (config.waveform_type == WAVEFORM_CHIRP &&
+      (!(config.chirp_end_hz > 0) || !(config.chirp_period_s > 0))) {
     return Bp_EC_INVALID_CONFIG;
   }
   if (config.sample_period_ns == 0) {
     return Bp_EC_INVALID_CONFIG;
   }
-  if (config.waveform_type < WAVEFORM_SINE ||
-      config.waveform_type > WAVEFORM_TRIANGLE) {
+  if (config.buff_config.dtype != DTYPE_FLOAT &&
+      config.buff_config.dtype != DTYPE_I32 &&
+      config.buff_config.dtype != DTYPE_U32) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  if (config.mode != SG_MODE_EXACT && config.mode != SG_MODE_FAST) {
+    return Bp_EC_INVALID_CONFIG;
+  }
+  if (config.real_timestamps && !config.paced) {
     return Bp_EC_INVALID_CONFIG;
   }
 
@@ -230,9 +530,34 @@ Bp_EC signal_generator_init(SignalGenerator_t* sg,
   sg->max_samples = config.max_samples;
   sg->allow_aliasing = config.allow_aliasing;
   sg->start_time_ns = config.start_time_ns;
+  sg->mode = config.mode;
+  sg->paced = config.paced;
+  sg->real_timestamps = config.real_timestamps;
+
+  sg->phase_step =
+      cycles_to_phase(config.frequency_hz * 1e-9 * config.sample_period_ns);
+  sg->dtype = config.buff_config.dtype;
+  sg->seed = config.seed;
+  sg->chirp_end_hz = config.chirp_end_hz;
+  sg->chirp_period_s = config.chirp_period_s;
+  sg->n_tones =
+      config.waveform_type == WAVEFORM_MULTI_TONE ? config.n_tones : 0;
+  for (size_t k = 0; k < sg->n_tones; k++) {
+    sg->tone_freqs_hz[k] = config.tone_freqs_hz[k];
+    sg->tone_amplitudes[k] =
+        config.tone_amplitudes ? config.tone_amplitudes[k] : 1.0;
+    sg->tone_phase[k] = 0;
+    sg->tone_phase_step[k] =
+        cycles_to_phase(sg->tone_freqs_hz[k] * 1e-9 * config.sample_period_ns);
+  }
 
   // Initialize runtime state
   sg->next_t_ns = 0;
+  sg->phase = 0;
+  sg->deadline_misses = 0;
+  sg->max_lateness_ns = 0;
+
+  sg->base.ops.get_stats = signal_generator_get_stats;
   sg->samples_generated = 0;
 
   // Signal generator has no input constraints (source filter)
@@ -5,15 +5,28 @@
 #include <stdint.h>
 #include "batch_buffer.h"
 #include "core.h"
+#include "kernels.h"
+
+#define SG_MAX_TONES 16
 
 // Waveform types supported by the signal generator
 typedef enum {
-  WAVEFORM_SINE,      // sin(2π * f * t + φ)
-  WAVEFORM_SQUARE,    // ±1 square wave
-  WAVEFORM_SAWTOOTH,  // Linear ramp -1 to +1
-  WAVEFORM_TRIANGLE   // Linear up/down -1 to +1
+  WAVEFORM_SINE,         // sin(2π * f * t + φ)
+  WAVEFORM_SQUARE,       // ±1 square wave
+  WAVEFORM_SAWTOOTH,     // Linear ramp -1 to +1
+  WAVEFORM_TRIANGLE,     // Linear up/down -1 to +1
+  WAVEFORM_WHITE_NOISE,  // Gaussian, amplitude is the standard deviation
+  WAVEFORM_PINK_NOISE,   // Gaussian with a 1/f spectrum, likewise
+  WAVEFORM_CHIRP,        // Linear sweep frequency_hz to chirp_end_hz
+  WAVEFORM_MULTI_TONE    // Sum of sines at tone_freqs_hz
 } WaveformType_e;
 
+// How samples are computed
+typedef enum {
+  SG_MODE_EXACT,  // Each sample from its timestamp, in double precision
+  SG_MODE_FAST    // Integer phase accumulator and vectorised kernels
+} SignalGenMode_e;
+
 // Signal generator configuration
 typedef struct {
   const char* name;
@@ -26,7 +39,21 @@ typedef struct {
   double phase_rad;           // Initial phase [0, 2π]
   uint64_t sample_period_ns;  // Output sample period
 
-  // Output scaling
+  // Noise: the same seed gives the same samples
+  uint64_t seed;
+
+  // Chirp: sweeps up (or down) over chirp_period_s, then starts again
+  double chirp_end_hz;
+  double chirp_period_s;
+
+  // Multi-tone: tone k is tone_amplitudes[k] * sin(2π * f_k * t + φ), with
+  // NULL amplitudes meaning 1 each. The arrays are copied at init.
+  const double* tone_freqs_hz;
+  const double* tone_amplitudes;
+  size_t n_tones;  // 1 to SG_MAX_TONES
+
+  // Output scaling. DTYPE_I32 and DTYPE_U32 outputs round the scaled value
+  // to nearest and saturate.
   double amplitude;  // Peak amplitude (default 1.0)
   double offset;     // DC offset (default 0.0)
 
@@ -34,8 +61,24 @@ typedef struct {
   uint64_t max_samples;    // 0 = unlimited
   bool allow_aliasing;     // false = error if f > Nyquist
   uint64_t start_time_ns;  // Start timestamp (default 0)
+  SignalGenMode_e mode;    // Default SG_MODE_EXACT
+
+  // Real-time pacing: batch n leaves at start + n * batch period on
+  // CLOCK_MONOTONIC, where start is when the worker starts. A batch that
+  // is late (a full ring, say) leaves at once and counts as a deadline
+  // miss; the schedule itself never slips, so later batches catch up. A
+  // ring full for longer than timeout_us is waited out, not an error.
+  bool paced;
+  bool real_timestamps;  // Paced only: t_ns on CLOCK_REALTIME from the start
 } SignalGenerator_config_t;
 
+/* Filled in by filt_get_stats() */
+typedef struct {
+  Filt_metrics base;
+  uint64_t deadline_misses;  // Paced batches ready after their due time
+  uint64_t max_lateness_ns;  // Worst of those
+} SignalGenerator_stats_t;
+
 // Signal generator filter structure
 typedef struct {
   Filter_t base;  // MUST be first member
@@ -58,9 +101,38 @@ typedef struct {
   bool allow_aliasing;
   uint64_t start_time_ns;
 
-  // Note: Using double precision time-based calculation
-  // Phase accuracy degrades slowly over very long runs
-  // See documentation for expected accuracy bounds
+  // SG_MODE_EXACT evaluates each sample from its timestamp in double
+  // precision, so phase accuracy degrades slowly over very long runs.
+  // SG_MODE_FAST keeps the phase as a 64 bit fraction of a cycle, which
+  // wraps exactly and never degrades, and hands each batch to the
+  // oscillator kernels as a 32 bit phase and step (see kernels.h).
+  SignalGenMode_e mode;
+  uint64_t phase;       // Cycles * 2^64 at next_t_ns
+  uint64_t phase_step;  // Cycles * 2^64 per sample
+
+  SampleDtype_t dtype;
+
+  // Noise
+  uint64_t seed;
+  Kern_rng_t rng;
+  Kern_pink_t pink;
+
+  // Chirp
+  double chirp_end_hz;
+  double chirp_period_s;
+
+  // Multi-tone, with each tone's phase accumulator for SG_MODE_FAST
+  size_t n_tones;
+  double tone_freqs_hz[SG_MAX_TONES];
+  double tone_amplitudes[SG_MAX_TONES];
+  uint64_t tone_phase[SG_MAX_TONES];
+  uint64_t tone_phase_step[SG_MAX_TONES];
+
+  // Pacing
+  bool paced;
+  bool real_timestamps;
+  uint64_t deadline_misses;
+  uint64_t max_lateness_ns;
 } SignalGenerator_t;
 
 // Initialize signal generator
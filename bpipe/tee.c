@@ -1,15 +1,66 @@
 #include "tee.h"
 #include <string.h>
+#include "utils.h"
+
+/* Outputs receive a reference to the input batch unless copying was
+ * requested, the downstream consumer modifies its input in place, or the
+ * output may lag behind without holding up the tee. */
+static inline bool tee_output_shared(const Tee_filt_t* tee, size_t i,
+                                     const Batch_buff_t* sink)
+{
+  return !tee->copy_data && !sink->consumer_mutates &&
+         tee->policies[i].policy == TEE_BLOCK;
+}
+
+/* Apply output i's backpressure policy before delivering a batch to it.
+ * Returns false if the output skips the batch. */
+static bool tee_admit(Tee_filt_t* tee, size_t i, Batch_buff_t* sink)
+{
+  const TeeOutput_policy_t* p = &tee->policies[i];
+  size_t lag = bb_occupancy(sink);
+  tee->max_lag[i] = MAX(tee->max_lag[i], lag);
+
+  if (p->policy == TEE_BLOCK) {
+    return true;
+  }
+  if (p->policy == TEE_DROP_OLDEST || p->policy == TEE_BOUNDED_LAG) {
+    // Make room for this batch within the limit
+    size_t limit =
+        p->policy == TEE_BOUNDED_LAG ? p->max_lag : bb_n_batches(sink) - 1;
+    while (lag >= limit && bb_drop_tail(sink) == Bp_EC_OK) {
+      tee->dropped_batches[i]++;
+      lag--;
+    }
+  }
+  // Still at the limit or full: the consumer is reading the oldest
+  // (bb_drop_tail() will not take it from under it), or the policy is
+  // TEE_DROP_NEWEST. This batch is skipped rather than exceed max_lag.
+  if ((p->policy == TEE_BOUNDED_LAG && lag >= p->max_lag) ||
+      !bb_has_space(sink)) {
+    tee->dropped_batches[i]++;
+    return false;
+  }
+  return true;
+}
 
 static void* tee_worker(void* arg)
 {
   Tee_filt_t* tee = (Tee_filt_t*) arg;
   Filter_t* f = &tee->base;
+  Batch_buff_t* in = f->input_buffers[0];
+
+  for (size_t i = 0; i < tee->n_outputs && i < f->n_sinks; i++) {
+    BP_WORKER_ASSERT(f,
+                     !f->sinks[i] || !f->sinks[i]->multi_producer ||
+                         tee->policies[i].policy == TEE_BLOCK,
+                     Bp_EC_INVALID_CONFIG);
+  }
 
   while (f->running) {
     // Get input batch
     Bp_EC err;
-    Batch_t* input = bb_get_tail(f->input_buffers[0], f->timeout_us, &err);
+    Batch_t* input = tee->copy_data ? bb_get_tail(in, f->timeout_us, &err)
+                                    : bb_share_next(in, f->timeout_us, &err);
     if (!input) {
       if (err == Bp_EC_TIMEOUT) continue;
       // Handle completion or error
@@ -19,6 +70,18 @@ static void* tee_worker(void* arg)
     // Priority copy to output 0 first (hot path)
     for (size_t i = 0; i < tee->n_outputs && i < f->n_sinks; i++) {
       if (!f->sinks[i]) continue;
+      // Completion is always delivered, waiting for space if need be
+      if (input->ec == Bp_EC_OK && !tee_admit(tee, i, f->sinks[i])) continue;
+
+      if (tee_output_shared(tee, i, f->sinks[i])) {
+        // Zero-copy: output references the input slot until consumed
+        err = bb_share_submit(f->sinks[i], in, f->timeout_us);
+        if (err == Bp_EC_OK) {
+          tee->successful_writes[i]++;
+          tee->shared_writes[i]++;
+        }
+        continue;
+      }
 
       // Get output buffer (respects buffer's own timeout/overflow settings)
       Batch_t* output = bb_get_head(f->sinks[i]);
@@ -33,12 +96,13 @@ static void* tee_worker(void* arg)
       output->head = input->head;  // Number of samples
 
       // Deep copy data
-      size_t data_width = bb_getdatawidth(f->input_buffers[0]->dtype);
+      size_t data_width = bb_getdatawidth(in->dtype);
       size_t data_size = input->head * data_width;
       memcpy(output->data, input->data, data_size);
       output->t_ns = input->t_ns;
       output->period_ns = input->period_ns;
       output->batch_id = input->batch_id;
+      output->ec = input->ec;
 
       err = bb_submit(f->sinks[i], f->timeout_us);
       if (err == Bp_EC_OK) {
@@ -46,12 +110,17 @@ static void* tee_worker(void* arg)
       }
     }
 
-    // Remove input batch after distribution
-    bb_del_tail(f->input_buffers[0]);
-
     // Update metrics
     f->metrics.n_batches++;
     f->metrics.samples_processed += input->head;
+
+    // Remove input batch after distribution. In zero-copy mode the slot is
+    // only returned to the producer once every output has consumed it.
+    if (tee->copy_data) {
+      bb_del_tail(in);
+    } else {
+      bb_share_done(in);
+    }
   }
 
   // Shutdown: wait for all outputs to flush
@@ -61,6 +130,29 @@ static void* tee_worker(void* arg)
   return NULL;
 }
 
+static Bp_EC tee_get_stats(Filter_t* self, void* stats_out)
+{
+  Tee_filt_t* tee = (Tee_filt_t*) self;
+
+  if (stats_out == NULL) {
+    return Bp_EC_NULL_POINTER;
+  }
+
+  Tee_stats_t* stats = (Tee_stats_t*) stats_out;
+  memset(stats, 0, sizeof(*stats));
+  stats->base = self->metrics;
+  stats->n_outputs = tee->n_outputs;
+  for (size_t i = 0; i < tee->n_outputs; i++) {
+    stats->successful_writes[i] = tee->successful_writes[i];
+    stats->shared_writes[i] = tee->shared_writes[i];
+    stats->dropped_batches[i] = tee->dropped_batches[i];
+    stats->lag[i] = self->sinks[i] ? bb_occupancy(self->sinks[i]) : 0;
+    stats->max_lag[i] = tee->max_lag[i];
+  }
+
+  return Bp_EC_OK;
+}
+
 Bp_EC tee_init(Tee_filt_t* tee, Tee_config_t config)
 {
   // Validate inputs
@@ -90,10 +182,31 @@ Bp_EC tee_init(Tee_filt_t* tee, Tee_config_t config)
     }
   }
 
+  // A lag bound must leave room in the output's ring
+  for (size_t i = 0; config.output_policies && i < config.n_outputs; i++) {
+    const TeeOutput_policy_t* p = &config.output_policies[i];
+    size_t ring_batches = 1UL << config.output_configs[i].ring_capacity_expo;
+    if (p->policy < TEE_BLOCK || p->policy > TEE_BOUNDED_LAG) {
+      return Bp_EC_INVALID_CONFIG;
+    }
+    if (p->policy == TEE_BOUNDED_LAG &&
+        (p->max_lag == 0 || p->max_lag >= ring_batches)) {
+      return Bp_EC_INVALID_CONFIG;
+    }
+  }
+
   // Initialize tee-specific fields
   tee->copy_data = config.copy_data;
   tee->n_outputs = config.n_outputs;
+  memset(tee->policies, 0, sizeof(tee->policies));
+  if (config.output_policies) {
+    memcpy(tee->policies, config.output_policies,
+           config.n_outputs * sizeof(TeeOutput_policy_t));
+  }
   memset(tee->successful_writes, 0, sizeof(tee->successful_writes));
+  memset(tee->shared_writes, 0, sizeof(tee->shared_writes));
+  memset(tee->dropped_batches, 0, sizeof(tee->dropped_batches));
+  memset(tee->max_lag, 0, sizeof(tee->max_lag));
 
   // Initialize base filter
   Core_filt_config_t core_config = {
@@ -109,6 +222,8 @@ Bp_EC tee_init(Tee_filt_t* tee, Tee_config_t config)
   Bp_EC err = filt_init(&tee->base, core_config);
   if (err != Bp_EC_OK) return err;
 
+  tee->base.ops.get_stats = tee_get_stats;
+
   // Set input constraints based on buffer capacity
   prop_constraints_from_buffer_append(&tee->base, &config.buff_config, true);
 
@@ -4,20 +4,54 @@
 #include "bperr.h"
 #include "core.h"
 
+/* Per output backpressure. With TEE_BLOCK (the default) a full output holds
+ * up the tee, and with it every other output. The other policies never wait,
+ * so a slow branch only loses its own batches. Outputs with those policies
+ * get their own copy of each batch, as a shared one would hold a slot of the
+ * tee's input ring for as long as the branch lags. They apply to
+ * single-producer outputs. */
+typedef enum _TeePolicy_e {
+  TEE_BLOCK = 0,    // Wait up to timeout_us for space
+  TEE_DROP_NEWEST,  // Output full: it skips this batch
+  TEE_DROP_OLDEST,  // Output full: its oldest queued batch is dropped
+  TEE_BOUNDED_LAG,  // Oldest queued batches dropped to keep max_lag or fewer
+} TeePolicy_e;
+
+typedef struct _TeeOutput_policy_t {
+  TeePolicy_e policy;
+  size_t max_lag;  // Batches queued at the output, for TEE_BOUNDED_LAG
+} TeeOutput_policy_t;
+
 typedef struct _Tee_config_t {
   const char* name;                    // Filter name for debugging
   BatchBuffer_config buff_config;      // Input buffer configuration
   size_t n_outputs;                    // Number of output sinks (2-MAX_SINKS)
   BatchBuffer_config* output_configs;  // Array of output buffer configs
   long timeout_us;                     // Timeout for buffer operations
-  bool copy_data;                      // true=deep copy, false=reference only
+  bool copy_data;                      // true=deep copy, false=zero-copy refs
+  const TeeOutput_policy_t* output_policies;  // NULL = all TEE_BLOCK
 } Tee_config_t;
 
+/* Filled in by filt_get_stats() */
+typedef struct _Tee_stats_t {
+  Filt_metrics base;
+  size_t n_outputs;
+  size_t successful_writes[MAX_SINKS];
+  size_t shared_writes[MAX_SINKS];
+  size_t dropped_batches[MAX_SINKS];  // Skipped, or dropped from the queue
+  size_t lag[MAX_SINKS];              // Batches queued at the output now
+  size_t max_lag[MAX_SINKS];          // Most batches queued at a delivery
+} Tee_stats_t;
+
 typedef struct _Tee_filt_t {
   Filter_t base;
   bool copy_data;
   size_t n_outputs;
+  TeeOutput_policy_t policies[MAX_SINKS];
   size_t successful_writes[MAX_SINKS];  // Track successful writes per output
+  size_t shared_writes[MAX_SINKS];      // Writes delivered without a copy
+  size_t dropped_batches[MAX_SINKS];
+  size_t max_lag[MAX_SINKS];
 } Tee_filt_t;
 
 Bp_EC tee_init(Tee_filt_t* tee, Tee_config_t config);
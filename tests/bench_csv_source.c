@@ -0,0 +1,255 @@
+/* Throughput of the CSV source and of its number parser.
+ *
+ * Build and run with `make bench`. The source reads a generated sensor log,
+ * a timestamp and four float columns of which three are read, into float
+ * outputs drained by this thread: on its worker alone, then with 1 to 8
+ * parse threads. Parallel parsing only scales with free cores. A wide log,
+ * the same with 60 more columns that are never read, shows what unread
+ * columns cost. Loop mode is timed over several passes of the log, parsing
+ * each pass and replaying the first from memory. Reading the last 1/64 of
+ * the log as a time window is timed opening the log, a scan for the window,
+ * then with a seek index built and, opened again, loaded. The parser is
+ * timed against strtod on the same fields.
+ */
+#define _DEFAULT_SOURCE  // For mkstemp
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+#include "batch_buffer.h"
+#include "csv_parse.h"
+#include "csv_source.h"
+
+#define N_ROWS (4 << 20)
+#define N_COLUMNS 3
+#define N_WIDE_EXTRA 60
+#define N_WIDE_ROWS (N_ROWS / 8)
+#define N_LOOP_PASSES 5
+#define LOOP_CACHE_BYTES (256UL << 20)
+#define N_WINDOW_ROWS (N_ROWS / 64)
+#define INDEX_STRIDE 1024
+#define BATCH_CAPACITY_EXPO 12
+#define PERIOD_NS 1000ULL
+#define N_FIELDS (1 << 20)
+#define FIELD_WIDTH 16
+
+static double seconds_since(const struct timespec* t0)
+{
+  struct timespec t1;
+  clock_gettime(CLOCK_MONOTONIC, &t1);
+  return (double) (t1.tv_sec - t0->tv_sec) +
+         (double) (t1.tv_nsec - t0->tv_nsec) * 1e-9;
+}
+
+/* n_rows of the log, with n_extra unread columns after the temperature */
+static long write_log(const char* path, long n_rows, int n_extra)
+{
+  FILE* f = fopen(path, "w");
+  if (f == NULL) return -1;
+  fprintf(f, "ts_ns,accel_x,accel_y,accel_z,temperature");
+  for (int c = 0; c < n_extra; c++) fprintf(f, ",aux%d", c);
+  fprintf(f, "\n");
+  srand(1);
+  for (long i = 0; i < n_rows; i++) {
+    fprintf(f, "%llu,%.6f,%.6f,%.6f,%.3f", 1000000000ULL + i * PERIOD_NS,
+            (double) rand() / RAND_MAX - 0.5, (double) rand() / RAND_MAX - 0.5,
+            (double) rand() / RAND_MAX * 9.81,
+            20.0 + (double) (i % 1000) / 100);
+    for (int c = 0; c < n_extra; c++) {
+      fprintf(f, ",%d.%02d", c, (int) (i % 100));
+    }
+    fprintf(f, "\n");
+  }
+  long size = ftell(f);
+  fclose(f);
+  return size;
+}
+
+static CsvSource_config_t bench_config(const char* path)
+{
+  CsvSource_config_t config = {
+      .name = "bench_csv_source",
+      .file_path = path,
+      .delimiter = ',',
+      .has_header = true,
+      .ts_column_name = "ts_ns",
+      .data_column_names = {"accel_x", "accel_y", "accel_z", NULL},
+      .detect_regular_timing = true,
+      .timeout_us = 1000000};
+  return config;
+}
+
+/* Open the log and read n_rows, all the rows read or in loop mode as many as
+ * asked. Returns the elapsed seconds, or a negative value on failure. */
+static double run_source(CsvSource_config_t config, long n_rows)
+{
+  CsvSource_t source;
+  Batch_buff_t outputs[N_COLUMNS];
+  BatchBuffer_config buff_config = {.dtype = DTYPE_FLOAT,
+                                    .overflow_behaviour = OVERFLOW_BLOCK,
+                                    .ring_capacity_expo = 6,
+                                    .batch_capacity_expo = BATCH_CAPACITY_EXPO};
+
+  struct timespec t0;
+  clock_gettime(CLOCK_MONOTONIC, &t0);
+
+  if (csvsource_init(&source, config) != Bp_EC_OK) return -1;
+  for (int c = 0; c < N_COLUMNS; c++) {
+    if (bb_init(&outputs[c], "output", buff_config) != Bp_EC_OK) return -1;
+    if (filt_sink_connect(&source.base, c, &outputs[c]) != Bp_EC_OK) return -1;
+    if (bb_start(&outputs[c]) != Bp_EC_OK) return -1;
+  }
+
+  if (filt_start(&source.base) != Bp_EC_OK) return -1;
+
+  // The columns are batched in step, so drain them in step
+  uint64_t n_seen = 0;
+  bool done = false;
+  Bp_EC err = Bp_EC_OK;
+  while (!done && n_seen < (uint64_t) n_rows && err == Bp_EC_OK) {
+    for (int c = 0; c < N_COLUMNS && err == Bp_EC_OK; c++) {
+      Batch_t* batch = bb_get_tail(&outputs[c], 1000000, &err);
+      if (err != Bp_EC_OK) break;
+      done = batch->ec == Bp_EC_COMPLETE;
+      if (c == 0) n_seen += batch->head;
+      bb_del_tail(&outputs[c]);
+    }
+  }
+  double elapsed = seconds_since(&t0);
+
+  filt_stop(&source.base);
+  csvsource_destroy(&source);
+  for (int c = 0; c < N_COLUMNS; c++) {
+    bb_stop(&outputs[c]);
+    bb_deinit(&outputs[c]);
+  }
+
+  if (err != Bp_EC_OK || n_seen != (uint64_t) n_rows) return -1;
+  return elapsed;
+}
+
+static void time_parsers(void)
+{
+  static char fields[N_FIELDS][FIELD_WIDTH];
+  srand(2);
+  for (int i = 0; i < N_FIELDS; i++) {
+    snprintf(fields[i], FIELD_WIDTH, "%.6f", (double) rand() / RAND_MAX - 0.5);
+  }
+
+  struct timespec t0;
+  double sum = 0.0;
+  clock_gettime(CLOCK_MONOTONIC, &t0);
+  for (int i = 0; i < N_FIELDS; i++) {
+    double value;
+    csv_parse_f64(fields[i], fields[i] + strlen(fields[i]), &value);
+    sum += value;
+  }
+  double ours = seconds_since(&t0);
+
+  clock_gettime(CLOCK_MONOTONIC, &t0);
+  for (int i = 0; i < N_FIELDS; i++) {
+    sum -= strtod(fields[i], NULL);
+  }
+  double libc = seconds_since(&t0);
+
+  printf("\nParsing %d fields of the form -0.123456 (checksum %g)\n", N_FIELDS,
+         sum);
+  printf("%-14s %14s\n", "parser", "M fields/s");
+  printf("%-14s %14.1f\n", "csv_parse_f64", N_FIELDS / ours / 1e6);
+  printf("%-14s %14.1f\n", "strtod", N_FIELDS / libc / 1e6);
+}
+
+int main(void)
+{
+  char path[] = "/tmp/bench_csv_source_XXXXXX";
+  int fd = mkstemp(path);
+  if (fd < 0) {
+    fprintf(stderr, "could not create a temporary file\n");
+    return 1;
+  }
+  close(fd);
+
+  long size = write_log(path, N_ROWS, 0);
+  if (size < 0) {
+    fprintf(stderr, "could not write the log\n");
+    unlink(path);
+    return 1;
+  }
+
+  printf("CSV source: %d rows, %.1f MB, %d of 4 columns read\n", N_ROWS,
+         size / 1e6, N_COLUMNS);
+  printf("%-14s %14s %14s\n", "parse threads", "MB/s", "M rows/s");
+  static const size_t thread_counts[] = {0, 1, 2, 4, 8};
+  for (size_t t = 0; t < sizeof(thread_counts) / sizeof(thread_counts[0]);
+       t++) {
+    CsvSource_config_t config = bench_config(path);
+    config.n_parse_threads = thread_counts[t];
+    double elapsed = run_source(config, N_ROWS);
+    if (elapsed < 0) {
+      fprintf(stderr, "CSV source run failed\n");
+      unlink(path);
+      return 1;
+    }
+    printf("%-14zu %14.1f %14.2f\n", thread_counts[t], size / elapsed / 1e6,
+           N_ROWS / elapsed / 1e6);
+  }
+
+  printf("\nLoop mode, %d passes\n", N_LOOP_PASSES);
+  printf("%-14s %14s %14s\n", "passes", "MB/s", "M rows/s");
+  for (int cache = 0; cache < 2; cache++) {
+    CsvSource_config_t config = bench_config(path);
+    config.loop = true;
+    config.loop_cache_bytes = cache ? LOOP_CACHE_BYTES : 0;
+    double elapsed = run_source(config, (long) N_LOOP_PASSES * N_ROWS);
+    if (elapsed < 0) {
+      fprintf(stderr, "CSV source run failed\n");
+      unlink(path);
+      return 1;
+    }
+    printf("%-14s %14.1f %14.2f\n", cache ? "replayed" : "parsed",
+           N_LOOP_PASSES * size / elapsed / 1e6,
+           N_LOOP_PASSES * N_ROWS / elapsed / 1e6);
+  }
+
+  char index_path[sizeof(path) + 4];
+  snprintf(index_path, sizeof(index_path), "%s.idx", path);
+  printf("\nTime window, the last %d rows\n", N_WINDOW_ROWS);
+  printf("%-14s %14s\n", "found by", "ms");
+  static const char* const seeks[] = {"scan", "index built", "index loaded"};
+  for (int k = 0; k < 3; k++) {
+    CsvSource_config_t config = bench_config(path);
+    config.start_ns = 1000000000ULL + (N_ROWS - N_WINDOW_ROWS) * PERIOD_NS;
+    config.index_stride = k > 0 ? INDEX_STRIDE : 0;
+    double elapsed = run_source(config, N_WINDOW_ROWS);
+    if (elapsed < 0) {
+      fprintf(stderr, "CSV source run failed\n");
+      unlink(index_path);
+      unlink(path);
+      return 1;
+    }
+    printf("%-14s %14.1f\n", seeks[k], elapsed * 1e3);
+  }
+  unlink(index_path);
+
+  size = write_log(path, N_WIDE_ROWS, N_WIDE_EXTRA);
+  if (size < 0) {
+    fprintf(stderr, "could not write the wide log\n");
+    unlink(path);
+    return 1;
+  }
+  double elapsed = run_source(bench_config(path), N_WIDE_ROWS);
+  unlink(path);
+  if (elapsed < 0) {
+    fprintf(stderr, "CSV source run failed\n");
+    return 1;
+  }
+  printf("\nWide log: %d rows, %.1f MB, %d of %d columns read\n", N_WIDE_ROWS,
+         size / 1e6, N_COLUMNS, 4 + N_WIDE_EXTRA);
+  printf("%-14s %14s %14s\n", "parse threads", "MB/s", "M rows/s");
+  printf("%-14d %14.1f %14.2f\n", 0, size / elapsed / 1e6,
+         N_WIDE_ROWS / elapsed / 1e6);
+
+  time_parsers();
+  return 0;
+}
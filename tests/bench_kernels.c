@@ -0,0 +1,181 @@
+/* Per-kernel throughput of each available ISA against the scalar reference.
+ *
+ * Build and run with `make bench`. The working set fits in L1, so the
+ * numbers are compute bound: nanoseconds per sample, and the speedup over
+ * the scalar reference built with the same flags.
+ */
+#include <stdint.h>
+#include <stdio.h>
+#include <time.h>
+#include "kernels.h"
+
+#define N_SAMPLES 4096
+#define MIN_RUN_NS 20000000LL  // Repeat each kernel for at least 20ms
+
+static float f_in[N_SAMPLES];
+static float f_out[N_SAMPLES];
+static int32_t i_in[N_SAMPLES];
+static int32_t i_out[N_SAMPLES];
+static uint32_t u_in[N_SAMPLES];
+static uint32_t u_out[N_SAMPLES];
+static const float fir_taps[16] = {0.25f, 0.75f, 0.5f, 0.5f};
+static Kern_rng_t rng;
+
+typedef enum {
+  K_SCALE_F32,
+  K_OFFSET_F32,
+  K_AFFINE_F32,
+  K_CLIP_F32,
+  K_ABS_F32,
+  K_SQUARE_F32,
+  K_SQRT_F32,
+  K_LOG10_F32,
+  K_SCALE_I32,
+  K_OFFSET_I32,
+  K_AFFINE_I32,
+  K_CLIP_I32,
+  K_ABS_I32,
+  K_SQUARE_I32,
+  K_SQRT_I32,
+  K_SCALE_U32,
+  K_OFFSET_U32,
+  K_AFFINE_U32,
+  K_CLIP_U32,
+  K_SQUARE_U32,
+  K_SQRT_U32,
+  K_CAST_I32_F32,
+  K_CAST_U32_F32,
+  K_CAST_F32_I32,
+  K_CAST_F32_U32,
+  K_FIR2_F32,
+  K_FIR16_F32,
+  K_OSC_SINE_F32,
+  K_GAUSS_F32,
+  K_MAX,
+} kernel_id_t;
+
+static const char* kernel_names[K_MAX] = {
+    "scale_f32",    "offset_f32",   "affine_f32",   "clip_f32",
+    "abs_f32",      "square_f32",   "sqrt_f32",     "log10_f32",
+    "scale_i32",    "offset_i32",   "affine_i32",   "clip_i32",
+    "abs_i32",      "square_i32",   "sqrt_i32",     "scale_u32",
+    "offset_u32",   "affine_u32",   "clip_u32",     "square_u32",
+    "sqrt_u32",     "cast_i32_f32", "cast_u32_f32", "cast_f32_i32",
+    "cast_f32_u32", "fir2_f32",     "fir16_f32",    "osc_sine_f32",
+    "gauss_f32",
+};
+
+static void run_kernel(const Kern_ops_t* ops, kernel_id_t k)
+{
+  switch (k) {
+    case K_SCALE_F32: ops->scale_f32(f_in, f_out, N_SAMPLES, 1.5f); break;
+    case K_OFFSET_F32: ops->offset_f32(f_in, f_out, N_SAMPLES, 2.0f); break;
+    case K_AFFINE_F32:
+      ops->affine_f32(f_in, f_out, N_SAMPLES, 1.5f, 2.0f);
+      break;
+    case K_CLIP_F32: ops->clip_f32(f_in, f_out, N_SAMPLES, 10.f, 90.f); break;
+    case K_ABS_F32: ops->abs_f32(f_in, f_out, N_SAMPLES); break;
+    case K_SQUARE_F32: ops->square_f32(f_in, f_out, N_SAMPLES); break;
+    case K_SQRT_F32: ops->sqrt_f32(f_in, f_out, N_SAMPLES); break;
+    case K_LOG10_F32: ops->log10_f32(f_in, f_out, N_SAMPLES); break;
+    case K_SCALE_I32: ops->scale_i32(i_in, i_out, N_SAMPLES, 3); break;
+    case K_OFFSET_I32: ops->offset_i32(i_in, i_out, N_SAMPLES, 7); break;
+    case K_AFFINE_I32: ops->affine_i32(i_in, i_out, N_SAMPLES, 3, 7); break;
+    case K_CLIP_I32: ops->clip_i32(i_in, i_out, N_SAMPLES, -50, 50); break;
+    case K_ABS_I32: ops->abs_i32(i_in, i_out, N_SAMPLES); break;
+    case K_SQUARE_I32: ops->square_i32(i_in, i_out, N_SAMPLES); break;
+    case K_SQRT_I32: ops->sqrt_i32(i_in, i_out, N_SAMPLES); break;
+    case K_SCALE_U32: ops->scale_u32(u_in, u_out, N_SAMPLES, 3); break;
+    case K_OFFSET_U32: ops->offset_u32(u_in, u_out, N_SAMPLES, 7); break;
+    case K_AFFINE_U32: ops->affine_u32(u_in, u_out, N_SAMPLES, 3, 7); break;
+    case K_CLIP_U32: ops->clip_u32(u_in, u_out, N_SAMPLES, 10, 90); break;
+    case K_SQUARE_U32: ops->square_u32(u_in, u_out, N_SAMPLES); break;
+    case K_SQRT_U32: ops->sqrt_u32(u_in, u_out, N_SAMPLES); break;
+    case K_CAST_I32_F32:
+      ops->cast_i32_f32(i_in, f_out, N_SAMPLES, 1.0f / 32768);
+      break;
+    case K_CAST_U32_F32: ops->cast_u32_f32(u_in, f_out, N_SAMPLES, 1.0f); break;
+    case K_CAST_F32_I32: ops->cast_f32_i32(f_in, i_out, N_SAMPLES, 1.0f); break;
+    case K_CAST_F32_U32: ops->cast_f32_u32(f_in, u_out, N_SAMPLES, 1.0f); break;
+    case K_FIR2_F32:
+      ops->fir_f32(f_in, fir_taps, 2, f_out, N_SAMPLES - 15);
+      break;
+    case K_FIR16_F32:
+      ops->fir_f32(f_in, fir_taps, 16, f_out, N_SAMPLES - 15);
+      break;
+    case K_OSC_SINE_F32:
+      ops->osc_f32[KERN_WAVE_SINE](0, 0x01234567, f_out, N_SAMPLES);
+      break;
+    case K_GAUSS_F32: ops->gauss_f32(&rng, f_out, N_SAMPLES); break;
+    default: break;
+  }
+}
+
+static long long mono_ns(void)
+{
+  struct timespec ts;
+  clock_gettime(CLOCK_MONOTONIC, &ts);
+  return (long long) ts.tv_sec * 1000000000LL + ts.tv_nsec;
+}
+
+/* Nanoseconds per sample */
+static double time_kernel(const Kern_ops_t* ops, kernel_id_t k)
+{
+  size_t reps = 0;
+  long long start = mono_ns();
+  long long elapsed;
+
+  run_kernel(ops, k);  // Warm up
+  do {
+    for (int i = 0; i < 64; i++) {
+      run_kernel(ops, k);
+    }
+    reps += 64;
+    elapsed = mono_ns() - start;
+  } while (elapsed < MIN_RUN_NS);
+
+  return (double) elapsed / ((double) reps * N_SAMPLES);
+}
+
+int main(void)
+{
+  for (int i = 0; i < N_SAMPLES; i++) {
+    f_in[i] = 0.5f + (float) i * 0.025f;
+    i_in[i] = i * 37 - 50000;
+    u_in[i] = (uint32_t) i * 2654435761u;
+  }
+  kern_rng_seed(&rng, 1);
+
+  const Kern_ops_t* ops[KERN_ISA_MAX];
+  printf("Kernels: %d samples per call, dispatch selects %s\n", N_SAMPLES,
+         kern_isa_name(kern_ops()->isa));
+  printf("%-12s", "kernel");
+  for (int isa = 0; isa < KERN_ISA_MAX; isa++) {
+    ops[isa] = kern_ops_for((Kern_isa_t) isa);
+    if (ops[isa] != NULL) {
+      printf(" %19s", kern_isa_name((Kern_isa_t) isa));
+    }
+  }
+  printf("\n%-12s", "");
+  for (int isa = 0; isa < KERN_ISA_MAX; isa++) {
+    if (ops[isa] != NULL) {
+      printf(" %10s %8s", "ns/sample", "speedup");
+    }
+  }
+  printf("\n");
+
+  for (int k = 0; k < K_MAX; k++) {
+    double scalar_ns = time_kernel(ops[KERN_ISA_SCALAR], (kernel_id_t) k);
+    printf("%-12s", kernel_names[k]);
+    for (int isa = 0; isa < KERN_ISA_MAX; isa++) {
+      if (ops[isa] == NULL) continue;
+      double ns = isa == KERN_ISA_SCALAR
+                      ? scalar_ns
+                      : time_kernel(ops[isa], (kernel_id_t) k);
+      printf(" %10.3f %7.2fx", ns, scalar_ns / ns);
+    }
+    printf("\n");
+  }
+
+  return 0;
+}
@@ -0,0 +1,144 @@
+/* Throughput of the parallel map against its worker count.
+ *
+ * Build and run with `make bench`. Prints one line per worker count with
+ * the speedup over a single worker; on an otherwise idle machine the
+ * speedup should track the number of cores until the producer or the
+ * consumer becomes the bottleneck.
+ */
+#define _GNU_SOURCE  // For sysconf // NOLINT(bugprone-reserved-identifier)
+#include <math.h>
+#include <pthread.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+#include <unistd.h>
+#include "batch_buffer.h"
+#include "map_mp.h"
+
+#define BATCH_CAPACITY_EXPO 10
+#define BATCH_CAPACITY (1 << BATCH_CAPACITY_EXPO)
+#define N_BATCHES 2048
+#define WORK_PER_SAMPLE 16
+
+static const BatchBuffer_config bench_config = {
+    .dtype = DTYPE_FLOAT,
+    .overflow_behaviour = OVERFLOW_BLOCK,
+    .ring_capacity_expo = 6,
+    .batch_capacity_expo = BATCH_CAPACITY_EXPO,
+};
+
+/* A deliberately compute bound transform */
+static Bp_EC heavy_map(const void* in, void* out, size_t n_samples)
+{
+  const float* input = (const float*) in;
+  float* output = (float*) out;
+
+  for (size_t i = 0; i < n_samples; i++) {
+    float x = input[i];
+    for (int k = 0; k < WORK_PER_SAMPLE; k++) {
+      x = sinf(x) + 0.5f * cosf(x);
+    }
+    output[i] = x;
+  }
+  return Bp_EC_OK;
+}
+
+static void* producer(void* arg)
+{
+  Batch_buff_t* buff = (Batch_buff_t*) arg;
+
+  for (size_t b = 0; b < N_BATCHES; b++) {
+    Batch_t* batch = bb_get_head(buff);
+    float* data = (float*) batch->data;
+    for (int i = 0; i < BATCH_CAPACITY; i++) {
+      data[i] = (float) i * 0.001f;
+    }
+    batch->head = BATCH_CAPACITY;
+    batch->batch_id = b;
+    batch->t_ns = (long long) b * BATCH_CAPACITY;
+    batch->period_ns = 1;
+    batch->ec = Bp_EC_OK;
+    if (bb_submit(buff, 0) != Bp_EC_OK) return NULL;
+  }
+
+  Batch_t* batch = bb_get_head(buff);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  bb_submit(buff, 0);
+  return NULL;
+}
+
+/* Returns the elapsed seconds, or a negative value on failure */
+static double run(size_t n_workers)
+{
+  MapMP_filt_t f;
+  Batch_buff_t output;
+  MapMP_config_t config = {.name = "bench_map_mp",
+                           .buff_config = bench_config,
+                           .map_fcn = heavy_map,
+                           .timeout_us = 1000000,
+                           .n_workers = n_workers};
+
+  if (map_mp_init(&f, config) != Bp_EC_OK) return -1;
+  if (bb_init(&output, "output", bench_config) != Bp_EC_OK) return -1;
+  if (filt_sink_connect(&f.base, 0, &output) != Bp_EC_OK) return -1;
+  if (bb_start(&output) != Bp_EC_OK) return -1;
+
+  struct timespec t0, t1;
+  clock_gettime(CLOCK_MONOTONIC, &t0);
+
+  if (filt_start(&f.base) != Bp_EC_OK) return -1;
+  pthread_t producer_thread;
+  pthread_create(&producer_thread, NULL, producer, f.base.input_buffers[0]);
+
+  size_t n_seen = 0;
+  size_t next_id = 0;
+  Bp_EC err = Bp_EC_OK;
+  while (err == Bp_EC_OK) {
+    Batch_t* batch = bb_get_tail(&output, 0, &err);
+    if (err != Bp_EC_OK) break;
+    Bp_EC ec = batch->ec;
+    if (ec == Bp_EC_OK && batch->batch_id != next_id++) {
+      fprintf(stderr, "batch %zu out of order\n", batch->batch_id);
+      err = Bp_EC_INVALID_DATA;
+    }
+    bb_del_tail(&output);
+    if (ec == Bp_EC_COMPLETE) break;
+    n_seen++;
+  }
+
+  clock_gettime(CLOCK_MONOTONIC, &t1);
+
+  pthread_join(producer_thread, NULL);
+  filt_stop(&f.base);
+  filt_deinit(&f.base);
+  bb_deinit(&output);
+
+  if (err != Bp_EC_OK || n_seen != N_BATCHES) return -1;
+  return (double) (t1.tv_sec - t0.tv_sec) +
+         (double) (t1.tv_nsec - t0.tv_nsec) * 1e-9;
+}
+
+int main(void)
+{
+  long n_cpus = sysconf(_SC_NPROCESSORS_ONLN);
+  if (n_cpus < 1) n_cpus = 1;
+
+  printf("Parallel map: %d batches x %d samples, %ld CPUs online\n", N_BATCHES,
+         BATCH_CAPACITY, n_cpus);
+  printf("%8s %12s %14s %8s\n", "workers", "seconds", "Msamples/s", "speedup");
+
+  double baseline = 0;
+  for (size_t n = 1; n <= (size_t) n_cpus * 2; n *= 2) {
+    double secs = run(n);
+    if (secs < 0) {
+      fprintf(stderr, "run with %zu workers failed\n", n);
+      return 1;
+    }
+    if (n == 1) baseline = secs;
+    printf("%8zu %12.3f %14.2f %8.2f\n", n, secs,
+           (double) N_BATCHES * BATCH_CAPACITY / secs / 1e6, baseline / secs);
+  }
+
+  return 0;
+}
@@ -0,0 +1,185 @@
+/* Accuracy and throughput of the signal generator's exact and fast modes.
+ *
+ * Build and run with `make bench`. Throughput is end to end, generator into
+ * a buffer drained by this thread, for each waveform, and for noise into
+ * integer outputs. Accuracy is the worst
+ * sine error against a reference phase computed in integers, at the start of
+ * a run and at starts days and years in: the exact mode's double precision
+ * phase degrades with the timestamp, the fast mode's accumulator does not.
+ */
+#include <math.h>
+#include <stdio.h>
+#include <time.h>
+#include "batch_buffer.h"
+#include "signal_generator.h"
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+#define BATCH_CAPACITY_EXPO 12
+#define THROUGHPUT_SAMPLES (64ULL << 20)
+#define ACCURACY_SAMPLES (1ULL << 20)
+#define FREQUENCY_HZ 15625.0  // An exact 64000 ns cycle
+#define CYCLE_NS 64000ULL
+#define PERIOD_NS 1000ULL
+
+static const BatchBuffer_config bench_config = {
+    .dtype = DTYPE_FLOAT,
+    .overflow_behaviour = OVERFLOW_BLOCK,
+    .ring_capacity_expo = 6,
+    .batch_capacity_expo = BATCH_CAPACITY_EXPO,
+};
+
+static const char* waveform_names[] = {
+    "sine",  "square", "sawtooth", "triangle",
+    "white", "pink",   "chirp",    "8 tones",
+};
+
+static const double tone_freqs_hz[] = {1e3,  3e3,  7e3,  11e3,
+                                       13e3, 17e3, 19e3, 23e3};
+
+static SignalGenerator_config_t bench_generator(WaveformType_e waveform,
+                                                SignalGenMode_e mode,
+                                                uint64_t start_ns,
+                                                uint64_t n_samples)
+{
+  SignalGenerator_config_t config = {.name = "bench_signal_generator",
+                                     .buff_config = bench_config,
+                                     .timeout_us = 1000000,
+                                     .waveform_type = waveform,
+                                     .frequency_hz = FREQUENCY_HZ,
+                                     .chirp_end_hz = 4 * FREQUENCY_HZ,
+                                     .chirp_period_s = 0.01,
+                                     .tone_freqs_hz = tone_freqs_hz,
+                                     .n_tones = 8,
+                                     .sample_period_ns = PERIOD_NS,
+                                     .amplitude = 1.0,
+                                     .max_samples = n_samples,
+                                     .start_time_ns = start_ns,
+                                     .mode = mode};
+  return config;
+}
+
+/* Run a generator to completion. With max_error non-NULL, each sample is
+ * checked against the reference sine. Returns the elapsed seconds, or a
+ * negative value on failure. */
+static double run(SignalGenerator_config_t config, double* max_error)
+{
+  SignalGenerator_t sg;
+  Batch_buff_t output;
+  const uint64_t n_samples = config.max_samples;
+
+  if (signal_generator_init(&sg, config) != Bp_EC_OK) return -1;
+  if (bb_init(&output, "output", config.buff_config) != Bp_EC_OK) return -1;
+  if (filt_sink_connect(&sg.base, 0, &output) != Bp_EC_OK) return -1;
+  if (bb_start(&output) != Bp_EC_OK) return -1;
+
+  struct timespec t0, t1;
+  clock_gettime(CLOCK_MONOTONIC, &t0);
+  if (filt_start(&sg.base) != Bp_EC_OK) return -1;
+
+  uint64_t n_seen = 0;
+  double worst = 0.0;
+  Bp_EC err = Bp_EC_OK;
+  while (err == Bp_EC_OK) {
+    Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+    if (err != Bp_EC_OK) break;
+    if (batch->ec == Bp_EC_COMPLETE) {
+      bb_del_tail(&output);
+      break;
+    }
+    if (max_error != NULL) {
+      const float* data = (const float*) batch->data;
+      for (size_t i = 0; i < batch->head; i++) {
+        uint64_t t_ns = (uint64_t) batch->t_ns + i * PERIOD_NS;
+        double cycles = (double) (t_ns % CYCLE_NS) / CYCLE_NS;
+        worst = fmax(worst, fabs(data[i] - sin(2.0 * M_PI * cycles)));
+      }
+    }
+    n_seen += batch->head;
+    bb_del_tail(&output);
+  }
+
+  clock_gettime(CLOCK_MONOTONIC, &t1);
+
+  filt_stop(&sg.base);
+  filt_deinit(&sg.base);
+  bb_deinit(&output);
+
+  if (err != Bp_EC_OK || n_seen != n_samples) return -1;
+  if (max_error != NULL) *max_error = worst;
+  return (double) (t1.tv_sec - t0.tv_sec) +
+         (double) (t1.tv_nsec - t0.tv_nsec) * 1e-9;
+}
+
+int main(void)
+{
+  printf("Signal generator throughput: %llu samples, %d per batch\n",
+         THROUGHPUT_SAMPLES, 1 << BATCH_CAPACITY_EXPO);
+  printf("%-10s %14s %14s %8s\n", "waveform", "exact Ms/s", "fast Ms/s",
+         "speedup");
+  for (int w = WAVEFORM_SINE; w <= WAVEFORM_MULTI_TONE; w++) {
+    double exact =
+        run(bench_generator(w, SG_MODE_EXACT, 0, THROUGHPUT_SAMPLES), NULL);
+    double fast =
+        run(bench_generator(w, SG_MODE_FAST, 0, THROUGHPUT_SAMPLES), NULL);
+    if (exact < 0 || fast < 0) {
+      fprintf(stderr, "%s run failed\n", waveform_names[w]);
+      return 1;
+    }
+    printf("%-10s %14.1f %14.1f %8.2f\n", waveform_names[w],
+           THROUGHPUT_SAMPLES / exact / 1e6, THROUGHPUT_SAMPLES / fast / 1e6,
+           exact / fast);
+  }
+
+  printf("\nWhite noise into integer outputs\n");
+  printf("%-10s %14s\n", "dtype", "Ms/s");
+  static const struct {
+    const char* label;
+    SampleDtype_t dtype;
+  } int_outputs[] = {{"I32", DTYPE_I32}, {"U32", DTYPE_U32}};
+  for (size_t d = 0; d < 2; d++) {
+    SignalGenerator_config_t config = bench_generator(
+        WAVEFORM_WHITE_NOISE, SG_MODE_FAST, 0, THROUGHPUT_SAMPLES);
+    config.buff_config.dtype = int_outputs[d].dtype;
+    config.amplitude = 1e6;
+    config.offset = 1e9;
+    double elapsed = run(config, NULL);
+    if (elapsed < 0) {
+      fprintf(stderr, "%s noise run failed\n", int_outputs[d].label);
+      return 1;
+    }
+    printf("%-10s %14.1f\n", int_outputs[d].label,
+           THROUGHPUT_SAMPLES / elapsed / 1e6);
+  }
+
+  static const struct {
+    const char* label;
+    uint64_t start_ns;
+  } starts[] = {
+      {"0", 0},
+      {"1 hour", 3600ULL * 1000000000ULL},
+      {"11.6 days", 1000000000000000ULL},
+      {"1 year", 365ULL * 86400ULL * 1000000000ULL},
+  };
+
+  printf("\nSine max abs error over %llu samples, against an exact phase\n",
+         ACCURACY_SAMPLES);
+  printf("%-10s %14s %14s\n", "start", "exact", "fast");
+  for (size_t s = 0; s < sizeof(starts) / sizeof(starts[0]); s++) {
+    double exact_err, fast_err;
+    if (run(bench_generator(WAVEFORM_SINE, SG_MODE_EXACT, starts[s].start_ns,
+                            ACCURACY_SAMPLES),
+            &exact_err) < 0 ||
+        run(bench_generator(WAVEFORM_SINE, SG_MODE_FAST, starts[s].start_ns,
+                            ACCURACY_SAMPLES),
+            &fast_err) < 0) {
+      fprintf(stderr, "accuracy run from %s failed\n", starts[s].label);
+      return 1;
+    }
+    printf("%-10s %14.2e %14.2e\n", starts[s].label, exact_err, fast_err);
+  }
+
+  return 0;
+}
@@ -478,6 +478,470 @@ void test_drop_tail_concurrent(void)
   bb_deinit(&buff);
 }
 
+/* Stream batches between two threads under every waiting strategy */
+typedef struct {
+  Batch_buff_t* buff;
+  int n_batches;
+  Bp_EC result;
+} stream_args_t;
+
+static void* stream_producer(void* arg)
+{
+  stream_args_t* args = (stream_args_t*) arg;
+  for (int i = 0; i < args->n_batches; i++) {
+    Batch_t* batch = bb_get_head(args->buff);
+    batch->batch_id = i;
+    *BATCH_GET_SAMPLE_U32(batch, 0) = i;
+    args->result = bb_submit(args->buff, 0);
+    if (args->result != Bp_EC_OK) break;
+  }
+  return NULL;
+}
+
+void test_wait_strategies_stream(void)
+{
+  const WaitStrategy_t strategies[] = {
+      WAIT_STRATEGY_PARK, WAIT_STRATEGY_SPIN_PARK, WAIT_STRATEGY_SPIN};
+  const int n_batches = 256;
+
+  for (size_t s = 0; s < sizeof(strategies) / sizeof(strategies[0]); s++) {
+    Batch_buff_t buff;
+    BatchBuffer_config config = {.dtype = DTYPE_U32,
+                                 .overflow_behaviour = OVERFLOW_BLOCK,
+                                 .ring_capacity_expo = 2,
+                                 .batch_capacity_expo = 2,
+                                 .wait_strategy = strategies[s],
+                                 .spin_count = 64};
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buff, "STRATEGY", config));
+
+    pthread_t producer;
+    stream_args_t args = {&buff, n_batches, Bp_EC_OK};
+    TEST_ASSERT_EQUAL_INT(
+        0, pthread_create(&producer, NULL, stream_producer, &args));
+
+    for (int i = 0; i < n_batches; i++) {
+      Bp_EC err;
+      Batch_t* batch = bb_get_tail(&buff, 0, &err);
+      TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+      TEST_ASSERT_EQUAL_INT(i, batch->batch_id);
+      TEST_ASSERT_EQUAL_INT(i, *BATCH_GET_SAMPLE_U32(batch, 0));
+      TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_del_tail(&buff));
+    }
+
+    pthread_join(producer, NULL);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, args.result);
+    TEST_ASSERT_EQUAL_INT(0, atomic_load(&buff.waiters_not_empty));
+    TEST_ASSERT_EQUAL_INT(0, atomic_load(&buff.waiters_not_full));
+
+    bb_stop(&buff);
+    bb_deinit(&buff);
+  }
+}
+
+static void* spin_consumer(void* arg)
+{
+  stream_args_t* args = (stream_args_t*) arg;
+  (void) bb_get_tail(args->buff, 0, &args->result);
+  return NULL;
+}
+
+/* A busy-spinning consumer must still honour timeouts and bb_stop() */
+void test_spin_wait_timeout_and_stop(void)
+{
+  Batch_buff_t buff;
+  BatchBuffer_config config = {.dtype = DTYPE_U32,
+                               .overflow_behaviour = OVERFLOW_BLOCK,
+                               .ring_capacity_expo = 2,
+                               .batch_capacity_expo = 2,
+                               .wait_strategy = WAIT_STRATEGY_SPIN};
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buff, "SPIN", config));
+
+  Bp_EC err;
+  long long ts_before = now_ns(CLOCK_MONOTONIC);
+  TEST_ASSERT_NULL(bb_get_tail(&buff, 5000, &err));
+  long long elapsed_ns = now_ns(CLOCK_MONOTONIC) - ts_before;
+  TEST_ASSERT_EQUAL_INT(Bp_EC_TIMEOUT, err);
+  TEST_ASSERT_GREATER_OR_EQUAL(5000000, elapsed_ns);
+  TEST_ASSERT_LESS_THAN(7000000, elapsed_ns);
+
+  /* Blocked indefinitely until the buffer is stopped */
+  pthread_t consumer_thread;
+  stream_args_t args = {&buff, 0, Bp_EC_OK};
+  TEST_ASSERT_EQUAL_INT(
+      0, pthread_create(&consumer_thread, NULL, spin_consumer, &args));
+  struct timespec sleeptime = {.tv_nsec = 5000000};  // 5ms
+  nanosleep(&sleeptime, NULL);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_stop(&buff));
+  TEST_ASSERT_EQUAL_INT(0, pthread_join(consumer_thread, NULL));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_STOPPED, args.result);
+
+  bb_deinit(&buff);
+}
+
+/* Bulk reserve/commit and peek/release, including wraparound */
+void test_bulk_reserve_commit_peek_release(void)
+{
+  Bp_EC err;
+  uint32_t next_write = 0;
+  uint32_t next_read = 0;
+
+  for (int round = 0; round < 4; round++) {
+    /* Ask for more than fits - only the free slots are handed out */
+    size_t n = bb_reserve_n(&buff_block, 100, 1000, &err);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+    TEST_ASSERT_EQUAL_INT(ring_capacity, n);
+    for (size_t i = 0; i < n; i++) {
+      Batch_t* batch = bb_get_head_at(&buff_block, i);
+      batch->batch_id = next_write;
+      *BATCH_GET_SAMPLE_U32(batch, 0) = next_write++;
+    }
+
+    /* Nothing is visible until committed */
+    TEST_ASSERT_TRUE(bb_isempy_lockfree(&buff_block));
+    uint64_t total_before = atomic_load(&buff_block.producer.total_batches);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_commit_n(&buff_block, n, 0));
+    TEST_ASSERT_EQUAL_INT(ring_capacity, bb_occupancy(&buff_block));
+    TEST_ASSERT_EQUAL_UINT64(total_before + n,
+                             atomic_load(&buff_block.producer.total_batches));
+
+    /* Committing more than is free is refused */
+    TEST_ASSERT_EQUAL_INT(Bp_EC_NO_SPACE, bb_commit_n(&buff_block, 1, 0));
+    TEST_ASSERT_EQUAL_INT(0, bb_reserve_n(&buff_block, 1, 1000, &err));
+    TEST_ASSERT_EQUAL_INT(Bp_EC_TIMEOUT, err);
+
+    /* Drain in two uneven steps so the tail lands mid-ring */
+    size_t first = 3 + round;
+    size_t avail = bb_peek_n(&buff_block, first, 0, &err);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+    TEST_ASSERT_EQUAL_INT(first, avail);
+    for (size_t i = 0; i < avail; i++) {
+      Batch_t* batch = bb_get_tail_at(&buff_block, i);
+      TEST_ASSERT_EQUAL_INT(next_read, batch->batch_id);
+      TEST_ASSERT_EQUAL_INT(next_read++, *BATCH_GET_SAMPLE_U32(batch, 0));
+    }
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_release_n(&buff_block, avail));
+
+    avail = bb_peek_n(&buff_block, 100, 0, &err);
+    TEST_ASSERT_EQUAL_INT(ring_capacity - first, avail);
+    for (size_t i = 0; i < avail; i++) {
+      TEST_ASSERT_EQUAL_INT(next_read++,
+                            bb_get_tail_at(&buff_block, i)->batch_id);
+    }
+    TEST_ASSERT_EQUAL_INT(Bp_EC_BUFFER_EMPTY,
+                          bb_release_n(&buff_block, avail + 1));
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_release_n(&buff_block, avail));
+    TEST_ASSERT_TRUE(bb_isempy_lockfree(&buff_block));
+
+    TEST_ASSERT_EQUAL_INT(0, bb_peek_n(&buff_block, 1, 1000, &err));
+    TEST_ASSERT_EQUAL_INT(Bp_EC_TIMEOUT, err);
+  }
+
+  /* A full DROP_HEAD buffer hands out one slot and drops it on commit */
+  size_t n = bb_reserve_n(&buff_drop, 100, 0, &err);
+  TEST_ASSERT_EQUAL_INT(ring_capacity, n);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_commit_n(&buff_drop, n, 0));
+  TEST_ASSERT_EQUAL_INT(1, bb_reserve_n(&buff_drop, 100, 0, &err));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_commit_n(&buff_drop, 1, 0));
+  TEST_ASSERT_EQUAL_UINT64(1, atomic_load(&buff_drop.producer.dropped_batches));
+  TEST_ASSERT_EQUAL_INT(ring_capacity, bb_occupancy(&buff_drop));
+}
+
+static void* bulk_producer(void* arg)
+{
+  stream_args_t* args = (stream_args_t*) arg;
+  int i = 0;
+  while (i < args->n_batches) {
+    size_t n = bb_reserve_n(args->buff, args->n_batches - i, 0, &args->result);
+    if (n == 0) break;
+    for (size_t k = 0; k < n; k++) {
+      bb_get_head_at(args->buff, k)->batch_id = i++;
+    }
+    args->result = bb_commit_n(args->buff, n, 0);
+    if (args->result != Bp_EC_OK) break;
+  }
+  return NULL;
+}
+
+/* Bursts handed between threads arrive complete and in order */
+void test_bulk_stream(void)
+{
+  const int n_batches = 2000;
+  pthread_t producer;
+  stream_args_t args = {&buff_block, n_batches, Bp_EC_OK};
+  TEST_ASSERT_EQUAL_INT(0,
+                        pthread_create(&producer, NULL, bulk_producer, &args));
+
+  int expected = 0;
+  while (expected < n_batches) {
+    Bp_EC err;
+    size_t n = bb_peek_n(&buff_block, 5, 0, &err);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+    TEST_ASSERT_TRUE(n >= 1 && n <= 5);
+    for (size_t k = 0; k < n; k++) {
+      TEST_ASSERT_EQUAL_INT(expected++,
+                            bb_get_tail_at(&buff_block, k)->batch_id);
+    }
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_release_n(&buff_block, n));
+  }
+
+  pthread_join(producer, NULL);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, args.result);
+  TEST_ASSERT_EQUAL_UINT64(n_batches,
+                           atomic_load(&buff_block.producer.total_batches));
+}
+
+/* Several producers feeding one multi-producer buffer */
+#define N_FAN_IN_PRODUCERS 4
+
+typedef struct {
+  Batch_buff_t* buff;
+  uint32_t id;
+  uint32_t n_batches;
+  bool bulk;
+  Bp_EC result;
+} fan_in_args_t;
+
+static void* fan_in_producer(void* arg)
+{
+  fan_in_args_t* args = (fan_in_args_t*) arg;
+  uint32_t seq = 0;
+  while (seq < args->n_batches) {
+    if (args->bulk) {
+      size_t left = args->n_batches - seq;
+      size_t n =
+          bb_reserve_n(args->buff, left < 3 ? left : 3, 0, &args->result);
+      if (n == 0) break;
+      for (size_t k = 0; k < n; k++) {
+        bb_get_head_at(args->buff, k)->batch_id = (args->id << 16) | seq++;
+      }
+      args->result = bb_commit_n(args->buff, n, 0);
+    } else {
+      Batch_t* batch = bb_get_head(args->buff);
+      batch->batch_id = (args->id << 16) | seq++;
+      args->result = bb_submit(args->buff, 0);
+    }
+    if (args->result != Bp_EC_OK) break;
+  }
+  return NULL;
+}
+
+void test_multi_producer_fan_in(void)
+{
+  Batch_buff_t buff;
+  BatchBuffer_config config = {.dtype = DTYPE_U32,
+                               .overflow_behaviour = OVERFLOW_BLOCK,
+                               .ring_capacity_expo = 3,
+                               .batch_capacity_expo = 2,
+                               .multi_producer = true};
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buff, "FAN_IN", config));
+
+  const uint32_t n_batches = 500;
+  pthread_t threads[N_FAN_IN_PRODUCERS];
+  fan_in_args_t args[N_FAN_IN_PRODUCERS];
+  for (uint32_t p = 0; p < N_FAN_IN_PRODUCERS; p++) {
+    args[p] = (fan_in_args_t){&buff, p, n_batches, p % 2 == 1, Bp_EC_OK};
+    TEST_ASSERT_EQUAL_INT(
+        0, pthread_create(&threads[p], NULL, fan_in_producer, &args[p]));
+  }
+
+  /* Each producer's batches arrive complete and in order */
+  uint32_t next[N_FAN_IN_PRODUCERS] = {0};
+  for (uint32_t i = 0; i < N_FAN_IN_PRODUCERS * n_batches; i++) {
+    Bp_EC err;
+    Batch_t* batch = bb_get_tail(&buff, 1000000, &err);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+    uint32_t id = batch->batch_id >> 16;
+    TEST_ASSERT_LESS_THAN(N_FAN_IN_PRODUCERS, id);
+    TEST_ASSERT_EQUAL_INT(next[id]++, batch->batch_id & 0xffff);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_del_tail(&buff));
+  }
+
+  for (uint32_t p = 0; p < N_FAN_IN_PRODUCERS; p++) {
+    pthread_join(threads[p], NULL);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, args[p].result);
+    TEST_ASSERT_EQUAL_INT(n_batches, next[p]);
+  }
+  TEST_ASSERT_TRUE(bb_isempy_lockfree(&buff));
+  TEST_ASSERT_EQUAL_UINT64(N_FAN_IN_PRODUCERS * n_batches,
+                           atomic_load(&buff.producer.total_batches));
+
+  bb_stop(&buff);
+  bb_deinit(&buff);
+}
+
+/* Producers blocked on a full multi-producer buffer are released by stop */
+void test_multi_producer_stop(void)
+{
+  Batch_buff_t buff;
+  BatchBuffer_config config = {.dtype = DTYPE_U32,
+                               .overflow_behaviour = OVERFLOW_DROP_HEAD,
+                               .ring_capacity_expo = 2,
+                               .batch_capacity_expo = 2,
+                               .multi_producer = true};
+  /* Dropping is not supported with several producers */
+  TEST_ASSERT_EQUAL_INT(Bp_EC_INVALID_CONFIG, bb_init(&buff, "MPSC", config));
+  config.overflow_behaviour = OVERFLOW_BLOCK;
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buff, "MPSC", config));
+
+  /* Fill it, then start two producers which must block */
+  for (int i = 0; i < 3; i++) {
+    bb_get_head(&buff);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_submit(&buff, 0));
+  }
+  pthread_t threads[2];
+  fan_in_args_t args[2];
+  for (uint32_t p = 0; p < 2; p++) {
+    args[p] = (fan_in_args_t){&buff, p, 1, p == 1, Bp_EC_OK};
+    TEST_ASSERT_EQUAL_INT(
+        0, pthread_create(&threads[p], NULL, fan_in_producer, &args[p]));
+  }
+  struct timespec sleeptime = {.tv_nsec = 5000000};  // 5ms
+  nanosleep(&sleeptime, NULL);
+  TEST_ASSERT_EQUAL_INT(3, bb_occupancy(&buff));
+
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_stop(&buff));
+  for (uint32_t p = 0; p < 2; p++) {
+    TEST_ASSERT_EQUAL_INT(0, pthread_join(threads[p], NULL));
+    TEST_ASSERT_EQUAL_INT(Bp_EC_STOPPED, args[p].result);
+  }
+  TEST_ASSERT_EQUAL_INT(3, bb_occupancy(&buff));
+
+  bb_deinit(&buff);
+}
+
+/* A thread holding claims on BB_MAX_THREAD_CLAIMS buffers is told why it
+ * cannot claim on another, and can once it submits one */
+void test_multi_producer_claim_limit(void)
+{
+  Batch_buff_t buffs[BB_MAX_THREAD_CLAIMS + 1];
+  BatchBuffer_config config = {.dtype = DTYPE_U32,
+                               .overflow_behaviour = OVERFLOW_BLOCK,
+                               .ring_capacity_expo = 2,
+                               .batch_capacity_expo = 2,
+                               .multi_producer = true};
+  for (int i = 0; i <= BB_MAX_THREAD_CLAIMS; i++) {
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buffs[i], "MPSC", config));
+  }
+  for (int i = 0; i < BB_MAX_THREAD_CLAIMS; i++) {
+    bb_get_head(&buffs[i]);
+  }
+
+  Batch_buff_t* extra = &buffs[BB_MAX_THREAD_CLAIMS];
+  Bp_EC err;
+  TEST_ASSERT_EQUAL_INT(0, bb_reserve_n(extra, 1, 0, &err));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_CLAIM_LIMIT, err);
+  TEST_ASSERT_EQUAL_PTR(&extra->claim_failed, bb_get_head(extra));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_CLAIM_LIMIT, bb_submit(extra, 0));
+  TEST_ASSERT_TRUE(bb_isempy_lockfree(extra));
+
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_submit(&buffs[0], 0));
+  TEST_ASSERT_NOT_EQUAL(&extra->claim_failed, bb_get_head(extra));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_submit(extra, 0));
+  TEST_ASSERT_EQUAL_INT(1, bb_occupancy(extra));
+
+  for (int i = 1; i < BB_MAX_THREAD_CLAIMS; i++) {
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_submit(&buffs[i], 0));
+  }
+  for (int i = 0; i <= BB_MAX_THREAD_CLAIMS; i++) {
+    bb_stop(&buffs[i]);
+    bb_deinit(&buffs[i]);
+  }
+}
+
+void test_try_reserve_does_not_wait(void)
+{
+  BatchBuffer_config config = {.dtype = DTYPE_U32,
+                               .overflow_behaviour = OVERFLOW_BLOCK,
+                               .ring_capacity_expo = 2,
+                               .batch_capacity_expo = 2};
+  for (int mpsc = 0; mpsc < 2; mpsc++) {
+    Batch_buff_t buff;
+    config.multi_producer = mpsc;
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buff, "try", config));
+
+    Bp_EC err;
+    size_t n = bb_try_reserve_n(&buff, 64, &err);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+    TEST_ASSERT_EQUAL_INT(bb_space(&buff), n);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_commit_n(&buff, n, 0));
+
+    // Full: where bb_reserve_n(.., 0, ..) would wait forever
+    long long t_start = now_ns(CLOCK_MONOTONIC);
+    TEST_ASSERT_EQUAL_INT(0, bb_try_reserve_n(&buff, 1, &err));
+    TEST_ASSERT_EQUAL_INT(Bp_EC_NOSPACE, err);
+    TEST_ASSERT_TRUE(now_ns(CLOCK_MONOTONIC) - t_start < 10000000);
+
+    // A failed try holds no claim, so the next one sees the freed slot
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_release_n(&buff, 1));
+    TEST_ASSERT_EQUAL_INT(1, bb_try_reserve_n(&buff, 64, &err));
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, err);
+    TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_commit_n(&buff, 1, 0));
+    TEST_ASSERT_EQUAL_INT(n, bb_occupancy(&buff));
+
+    bb_stop(&buff);
+    bb_deinit(&buff);
+  }
+}
+
+static void submit_id(Batch_buff_t* buff, uint64_t id)
+{
+  Batch_t* batch = bb_get_head(buff);
+  batch->batch_id = id;
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_submit(buff, 0));
+}
+
+/* The producer cannot drop a batch the consumer is reading */
+void test_drop_tail_while_reading(void)
+{
+  Batch_buff_t buff;
+  BatchBuffer_config config = {.dtype = DTYPE_U32,
+                               .overflow_behaviour = OVERFLOW_DROP_TAIL,
+                               .ring_capacity_expo = 2,  // 3 usable
+                               .batch_capacity_expo = 2};
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buff, "READING", config));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_start(&buff));
+  for (int i = 0; i < 3; i++) {
+    submit_id(&buff, i);
+  }
+
+  // Held from bb_get_tail() to bb_del_tail(): a full buffer drops the new
+  // batch instead
+  Bp_EC err;
+  Batch_t* batch = bb_get_tail(&buff, 0, &err);
+  TEST_ASSERT_EQUAL_INT(0, batch->batch_id);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_NO_SPACE, bb_drop_tail(&buff));
+  submit_id(&buff, 3);
+  TEST_ASSERT_EQUAL_INT(1, atomic_load(&buff.producer.dropped_batches));
+  TEST_ASSERT_EQUAL_INT(0, batch->batch_id);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_del_tail(&buff));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_drop_tail(&buff));
+  TEST_ASSERT_EQUAL_INT(1, atomic_load(&buff.consumer.dropped_by_producer));
+
+  // From bb_peek_n() to bb_release_n()
+  TEST_ASSERT_EQUAL_INT(1, bb_peek_n(&buff, 4, 0, &err));
+  TEST_ASSERT_EQUAL_INT(2, bb_get_tail_at(&buff, 0)->batch_id);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_NO_SPACE, bb_drop_tail(&buff));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_release_n(&buff, 1));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_BUFFER_EMPTY, bb_drop_tail(&buff));
+
+  bb_stop(&buff);
+  bb_deinit(&buff);
+
+  // From bb_share_next() to bb_share_done(), on a buffer read by sharing
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_init(&buff, "SHARING", config));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_start(&buff));
+  submit_id(&buff, 0);
+  batch = bb_share_next(&buff, 0, &err);
+  TEST_ASSERT_EQUAL_INT(0, batch->batch_id);
+  TEST_ASSERT_EQUAL_INT(Bp_EC_NO_SPACE, bb_drop_tail(&buff));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_OK, bb_share_done(&buff));
+  TEST_ASSERT_TRUE(bb_isempy_lockfree(&buff));
+
+  bb_stop(&buff);
+  bb_deinit(&buff);
+}
+
 int main(int argc, char* argv[])
 {
   UNITY_BEGIN();
@@ -488,5 +952,14 @@ int main(int argc, char* argv[])
   RUN_TEST(test_empty_blocking_consume);
   RUN_TEST(test_overflow_drop_tail);
   RUN_TEST(test_drop_tail_concurrent);
+  RUN_TEST(test_wait_strategies_stream);
+  RUN_TEST(test_spin_wait_timeout_and_stop);
+  RUN_TEST(test_bulk_reserve_commit_peek_release);
+  RUN_TEST(test_bulk_stream);
+  RUN_TEST(test_multi_producer_fan_in);
+  RUN_TEST(test_multi_producer_stop);
+  RUN_TEST(test_multi_producer_claim_limit);
+  RUN_TEST(test_try_reserve_does_not_wait);
+  RUN_TEST(test_drop_tail_while_reading);
   return UNITY_END();
 }
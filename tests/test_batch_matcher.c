@@ -13,6 +13,8 @@ typedef struct {
   Filter_t sink;
   pthread_t source_thread;
   bool source_running;
+  Batch_buff_t out;  // Sink for tests that drain the matcher directly
+  bool out_initialised;
 } TestFixture;
 
 static TestFixture fixture;
@@ -77,6 +79,19 @@ void* test_source_worker(void* arg)
 
 void setUp(void) { memset(&fixture, 0, sizeof(fixture)); }
 
+/* Stop and deinit the matcher and its direct output, if initialised */
+static void deinit_matcher(void)
+{
+  if (fixture.matcher.base.filt_type != FILT_T_NDEF) {
+    CHECK_ERR(filt_stop(&fixture.matcher.base));
+    CHECK_ERR(filt_deinit(&fixture.matcher.base));
+  }
+  if (fixture.out_initialised) {
+    fixture.out_initialised = false;
+    CHECK_ERR(bb_deinit(&fixture.out));
+  }
+}
+
 void tearDown(void)
 {
   // Ensure threads are stopped
@@ -86,10 +101,7 @@ void tearDown(void)
   }
 
   // Deinit filters if initialized
-  if (fixture.matcher.base.worker != NULL) {
-    CHECK_ERR(filt_stop(&fixture.matcher.base));
-    CHECK_ERR(filt_deinit(&fixture.matcher.base));
-  }
+  deinit_matcher();
   if (fixture.source.worker != NULL) {
     CHECK_ERR(filt_deinit(&fixture.source));
   }
@@ -335,6 +347,105 @@ void test_input_already_matched(void)
   TEST_ASSERT_EQUAL(64, fixture.matcher.output_batch_samples);
 }
 
+/* Push 'n_batches' of 64 samples starting at sample 'first_sample' into the
+ * matcher, then completion, and drain its output buffer. Returns the number
+ * of output batches, checking every sample on the way. */
+static size_t run_aligned(Batch_buff_t* out, size_t first_sample,
+                          size_t n_batches, bool* shared)
+{
+  const uint64_t period_ns = 1000000;
+  Batch_buff_t* in = fixture.matcher.base.input_buffers[0];
+
+  CHECK_ERR(filt_sink_connect(&fixture.matcher.base, 0, out));
+  CHECK_ERR(bb_start(out));
+  CHECK_ERR(filt_start(&fixture.matcher.base));
+
+  for (size_t b = 0; b <= n_batches; b++) {
+    Batch_t* batch = bb_get_head(in);
+    size_t start = first_sample + b * 64;
+    batch->t_ns = start * period_ns;
+    batch->period_ns = period_ns;
+    batch->head = b < n_batches ? 64 : 0;
+    batch->ec = b < n_batches ? Bp_EC_OK : Bp_EC_COMPLETE;
+    for (size_t i = 0; i < batch->head; i++) {
+      ((float*) batch->data)[i] = (float) (start + i);
+    }
+    CHECK_ERR(bb_submit(in, 1000000));
+  }
+
+  size_t n_out = 0;
+  *shared = true;
+  while (true) {
+    Bp_EC err;
+    Batch_t* batch = bb_get_tail(out, 1000000, &err);
+    CHECK_ERR(err);
+    if (batch->ec == Bp_EC_COMPLETE) {
+      CHECK_ERR(bb_del_tail(out));
+      break;
+    }
+    uint64_t start = batch->t_ns / period_ns;
+    TEST_ASSERT_EQUAL(0, start % 64);  // On a boundary
+    TEST_ASSERT_EQUAL(n_out, batch->batch_id);
+    for (size_t i = 0; i < batch->head; i++) {
+      TEST_ASSERT_EQUAL_FLOAT((float) (start + i), ((float*) batch->data)[i]);
+    }
+    *shared = *shared && batch->share_origin == in;
+    n_out++;
+    CHECK_ERR(bb_del_tail(out));
+  }
+
+  CHECK_ERR(fixture.matcher.base.worker_err_info.ec);
+  CHECK_ERR(filt_stop(&fixture.matcher.base));
+  return n_out;
+}
+
+/* A matcher with an output of the same shape, both torn down by tearDown */
+static void init_aligned(const BatchMatcher_config_t* matcher_config)
+{
+  CHECK_ERR(batch_matcher_init(&fixture.matcher, *matcher_config));
+  CHECK_ERR(bb_init(&fixture.out, "aligned_out", matcher_config->buff_config));
+  fixture.out_initialised = true;
+}
+
+void test_aligned_batches_forwarded(void)
+{
+  BatchMatcher_config_t matcher_config = {
+      .name = "aligned_matcher",
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,  // 64 samples
+                      .ring_capacity_expo = 4,
+                      .overflow_behaviour = OVERFLOW_BLOCK}};
+  BatchMatcher_stats_t stats;
+  bool shared;
+
+  // Aligned input into a sink of the same size is handed on by reference
+  init_aligned(&matcher_config);
+  TEST_ASSERT_EQUAL(8, run_aligned(&fixture.out, 128, 8, &shared));
+  TEST_ASSERT_TRUE(shared);
+  CHECK_ERR(filt_get_stats(&fixture.matcher.base, &stats));
+  TEST_ASSERT_EQUAL(8, stats.batches_forwarded);
+  TEST_ASSERT_EQUAL(8 * 64, stats.samples_processed);
+  deinit_matcher();
+
+  // A sink that writes to its input gets a copy, still without the loop
+  init_aligned(&matcher_config);
+  fixture.out.consumer_mutates = true;
+  TEST_ASSERT_EQUAL(8, run_aligned(&fixture.out, 0, 8, &shared));
+  TEST_ASSERT_FALSE(shared);
+  CHECK_ERR(filt_get_stats(&fixture.matcher.base, &stats));
+  TEST_ASSERT_EQUAL(8, stats.batches_forwarded);
+  deinit_matcher();
+
+  // Input off the boundaries is repacked: samples 0-9 are skipped, and the
+  // trailing 10 go out as a partial batch at completion
+  init_aligned(&matcher_config);
+  TEST_ASSERT_EQUAL(8, run_aligned(&fixture.out, 10, 8, &shared));
+  TEST_ASSERT_FALSE(shared);
+  CHECK_ERR(filt_get_stats(&fixture.matcher.base, &stats));
+  TEST_ASSERT_EQUAL(0, stats.batches_forwarded);
+  TEST_ASSERT_EQUAL(54, stats.samples_skipped);
+}
+
 int main(void)
 {
   UNITY_BEGIN();
@@ -344,6 +455,7 @@ int main(void)
   RUN_TEST(test_no_sink_error);
   RUN_TEST(test_phase_validation);
   RUN_TEST(test_input_already_matched);
+  RUN_TEST(test_aligned_batches_forwarded);
 
   return UNITY_END();
 }
@@ -0,0 +1,291 @@
+#define _DEFAULT_SOURCE
+#include <math.h>
+#include <stdint.h>
+#include <string.h>
+#include "batch_buffer.h"
+#include "cast.h"
+#include "map.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#define BATCH_CAPACITY_EXPO 7  // 128 samples per input batch
+#define SINK_CAPACITY_EXPO 5   // 32 samples per output batch
+#define RING_CAPACITY_EXPO 4   // 15 batches in ring
+#define PERIOD_NS 1000
+
+static BatchBuffer_config buff_config(SampleDtype_t dtype, size_t batch_expo)
+{
+  BatchBuffer_config config = {
+      .dtype = dtype,
+      .overflow_behaviour = OVERFLOW_BLOCK,
+      .ring_capacity_expo = RING_CAPACITY_EXPO,
+      .batch_capacity_expo = batch_expo,
+  };
+  return config;
+}
+
+static Cast_config_t cast_config(SampleDtype_t in, SampleDtype_t out)
+{
+  Cast_config_t config = {
+      .name = "cast",
+      .buff_config = buff_config(in, BATCH_CAPACITY_EXPO),
+      .out_dtype = out,
+      .timeout_us = 10000,
+  };
+  return config;
+}
+
+static Cast_filt_t cast;
+static Batch_buff_t sink;
+
+/* Start 'cast' writing to a fresh sink of its output type */
+static void start_cast(Cast_config_t config)
+{
+  CHECK_ERR(cast_init(&cast, config));
+  CHECK_ERR(
+      bb_init(&sink, "sink", buff_config(config.out_dtype, SINK_CAPACITY_EXPO)));
+  CHECK_ERR(filt_sink_connect(&cast.base, 0, &sink));
+  CHECK_ERR(bb_start(&sink));
+  CHECK_ERR(filt_start(&cast.base));
+}
+
+static void stop_cast(void)
+{
+  CHECK_ERR(filt_stop(&cast.base));
+  CHECK_ERR(bb_stop(&sink));
+  CHECK_ERR(filt_deinit(&cast.base));
+  CHECK_ERR(bb_deinit(&sink));
+}
+
+/* Submit 'n' 32 bit samples from 'data' to the cast's input */
+static void submit(const void* data, size_t n, long long t_ns)
+{
+  Batch_t* batch = bb_get_head(cast.base.input_buffers[0]);
+  TEST_ASSERT_NOT_NULL(batch);
+  memcpy(batch->data, data, n * sizeof(int32_t));
+  batch->head = n;
+  batch->t_ns = t_ns;
+  batch->period_ns = PERIOD_NS;
+  batch->ec = Bp_EC_OK;
+  CHECK_ERR(bb_submit(cast.base.input_buffers[0], 1000000));
+}
+
+static void submit_complete(void)
+{
+  Batch_t* batch = bb_get_head(cast.base.input_buffers[0]);
+  TEST_ASSERT_NOT_NULL(batch);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  CHECK_ERR(bb_submit(cast.base.input_buffers[0], 1000000));
+}
+
+/* Read the next 'n' output samples into 'data', whatever the batching */
+static void receive(void* data, size_t n)
+{
+  size_t got = 0;
+  while (got < n) {
+    Bp_EC err;
+    Batch_t* batch = bb_get_tail(&sink, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_TRUE(got + batch->head <= n);
+    memcpy((char*) data + got * sizeof(int32_t), batch->data,
+           batch->head * sizeof(int32_t));
+    got += batch->head;
+    CHECK_ERR(bb_del_tail(&sink));
+  }
+}
+
+void setUp(void) {}
+
+void tearDown(void) {}
+
+void test_cast_init_validation(void)
+{
+  Cast_config_t config = cast_config(DTYPE_I32, DTYPE_FLOAT);
+  CHECK_ERR(cast_init(&cast, config));
+  TEST_ASSERT_EQUAL(FILT_T_CAST, cast.base.filt_type);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, cast.scale);  // 0 is taken as 1
+  CHECK_ERR(filt_deinit(&cast.base));
+
+  TEST_ASSERT_EQUAL(Bp_EC_NULL_FILTER, cast_init(NULL, config));
+
+  config.out_dtype = DTYPE_NDEF;
+  TEST_ASSERT_EQUAL(Bp_EC_TYPE_ERROR, cast_init(&cast, config));
+  config = cast_config(DTYPE_MAX, DTYPE_FLOAT);
+  TEST_ASSERT_EQUAL(Bp_EC_TYPE_ERROR, cast_init(&cast, config));
+
+  // Integer to integer casts take no scale
+  config = cast_config(DTYPE_I32, DTYPE_U32);
+  config.scale = 2.0f;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, cast_init(&cast, config));
+  config = cast_config(DTYPE_FLOAT, DTYPE_U32);
+  config.scale = NAN;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, cast_init(&cast, config));
+}
+
+/* The sink takes the output type, not the input type */
+void test_cast_sink_dtype(void)
+{
+  Batch_buff_t wrong;
+  CHECK_ERR(cast_init(&cast, cast_config(DTYPE_I32, DTYPE_FLOAT)));
+  CHECK_ERR(bb_init(&wrong, "wrong", buff_config(DTYPE_I32, 5)));
+  TEST_ASSERT_EQUAL(Bp_EC_DTYPE_MISMATCH,
+                    filt_sink_connect(&cast.base, 0, &wrong));
+  CHECK_ERR(bb_deinit(&wrong));
+  CHECK_ERR(filt_deinit(&cast.base));
+}
+
+/* I32 ADC counts to float volts, re-batched from 128 into 32 sample batches */
+void test_cast_i32_to_f32_scaled(void)
+{
+  Cast_config_t config = cast_config(DTYPE_I32, DTYPE_FLOAT);
+  config.scale = 1.0f / 32768.0f;
+  start_cast(config);
+
+  const size_t total = 300;
+  int32_t counts[128];
+  for (size_t s = 0; s < total; s += 128) {
+    size_t n = MIN(128, total - s);
+    for (size_t i = 0; i < n; i++) {
+      counts[i] = (int32_t) ((s + i) * 200) - 32768;
+    }
+    submit(counts, n, 5000 + s * PERIOD_NS);
+  }
+  submit_complete();
+
+  size_t seen = 0;
+  Bp_EC err;
+  while (seen < total) {
+    Batch_t* batch = bb_get_tail(&sink, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_EQUAL(5000 + seen * PERIOD_NS, batch->t_ns);
+    TEST_ASSERT_EQUAL(PERIOD_NS, batch->period_ns);
+    for (size_t i = 0; i < batch->head; i++) {
+      float expected = ((float) ((seen + i) * 200) - 32768.0f) / 32768.0f;
+      TEST_ASSERT_EQUAL_FLOAT(expected, ((float*) batch->data)[i]);
+    }
+    seen += batch->head;
+    CHECK_ERR(bb_del_tail(&sink));
+  }
+  TEST_ASSERT_EQUAL(total, seen);
+
+  Batch_t* batch = bb_get_tail(&sink, 1000000, &err);
+  CHECK_ERR(err);
+  TEST_ASSERT_EQUAL(Bp_EC_COMPLETE, batch->ec);
+  CHECK_ERR(bb_del_tail(&sink));
+
+  TEST_ASSERT_EQUAL(total, cast.base.metrics.samples_processed);
+  TEST_ASSERT_EQUAL(Bp_EC_OK, cast.base.worker_err_info.ec);
+  stop_cast();
+}
+
+void test_cast_f32_to_integers(void)
+{
+  const float in[] = {1.5f, -1.5f, 0.25f, NAN, 1e10f, -1e10f, 100.0f, 2.5f};
+  int32_t i_out[8];
+  uint32_t u_out[8];
+
+  Cast_config_t config = cast_config(DTYPE_FLOAT, DTYPE_I32);
+  config.scale = 2.0f;
+  start_cast(config);
+  submit(in, 8, 0);
+  submit_complete();  // Flushes the partial output batch
+  receive(i_out, 8);
+  stop_cast();
+
+  const int32_t i_expected[] = {3,         -3,        0,   0,
+                                INT32_MAX, INT32_MIN, 200, 5};
+  TEST_ASSERT_EQUAL_INT32_ARRAY(i_expected, i_out, 8);
+
+  start_cast(cast_config(DTYPE_FLOAT, DTYPE_U32));
+  submit(in, 8, 0);
+  submit_complete();
+  receive(u_out, 8);
+  stop_cast();
+
+  const uint32_t u_expected[] = {2, 0, 0, 0, UINT32_MAX, 0, 100, 2};
+  TEST_ASSERT_EQUAL_UINT32_ARRAY(u_expected, u_out, 8);
+}
+
+void test_cast_between_integers(void)
+{
+  const int32_t in[] = {-1, 0, 7, INT32_MIN, INT32_MAX};
+  uint32_t u_out[5];
+  int32_t i_out[5];
+
+  // Wrapping keeps the bits
+  start_cast(cast_config(DTYPE_I32, DTYPE_U32));
+  submit(in, 5, 0);
+  submit_complete();
+  receive(u_out, 5);
+  stop_cast();
+  const uint32_t wrapped[] = {UINT32_MAX, 0, 7, 0x80000000u, INT32_MAX};
+  TEST_ASSERT_EQUAL_UINT32_ARRAY(wrapped, u_out, 5);
+
+  Cast_config_t config = cast_config(DTYPE_I32, DTYPE_U32);
+  config.saturate = true;
+  start_cast(config);
+  submit(in, 5, 0);
+  submit_complete();
+  receive(u_out, 5);
+  stop_cast();
+  const uint32_t clamped[] = {0, 0, 7, 0, INT32_MAX};
+  TEST_ASSERT_EQUAL_UINT32_ARRAY(clamped, u_out, 5);
+
+  config = cast_config(DTYPE_U32, DTYPE_I32);
+  config.saturate = true;
+  start_cast(config);
+  submit(wrapped, 5, 0);
+  submit_complete();
+  receive(i_out, 5);
+  stop_cast();
+  const int32_t clamped_i[] = {INT32_MAX, 0, 7, INT32_MAX, INT32_MAX};
+  TEST_ASSERT_EQUAL_INT32_ARRAY(clamped_i, i_out, 5);
+}
+
+/* The output data type reaches downstream contracts */
+void test_cast_property_propagation(void)
+{
+  Map_filt_t up_i32, down_f32, down_i32;
+  Map_config_t map_config = {.name = "map",
+                             .buff_config =
+                                 buff_config(DTYPE_I32, BATCH_CAPACITY_EXPO),
+                             .map_fcn = map_abs_i32,
+                             .timeout_us = 10000};
+  CHECK_ERR(map_init(&up_i32, map_config));
+  CHECK_ERR(map_init(&down_i32, map_config));
+  map_config.buff_config.dtype = DTYPE_FLOAT;
+  map_config.map_fcn = map_abs_f32;
+  CHECK_ERR(map_init(&down_f32, map_config));
+
+  CHECK_ERR(cast_init(&cast, cast_config(DTYPE_I32, DTYPE_FLOAT)));
+  TEST_ASSERT_TRUE(cast.base.output_properties[0].properties[PROP_DATA_TYPE]
+                       .known);
+  TEST_ASSERT_EQUAL(
+      DTYPE_FLOAT,
+      cast.base.output_properties[0].properties[PROP_DATA_TYPE].value.dtype);
+
+  CHECK_ERR(filt_connect(&up_i32.base, 0, &cast.base, 0));
+  TEST_ASSERT_EQUAL(Bp_EC_PROPERTY_MISMATCH,
+                    filt_connect(&cast.base, 0, &down_i32.base, 0));
+  CHECK_ERR(filt_connect(&cast.base, 0, &down_f32.base, 0));
+
+  CHECK_ERR(filt_deinit(&up_i32.base));
+  CHECK_ERR(filt_deinit(&down_i32.base));
+  CHECK_ERR(filt_deinit(&down_f32.base));
+  CHECK_ERR(filt_deinit(&cast.base));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_cast_init_validation);
+  RUN_TEST(test_cast_sink_dtype);
+  RUN_TEST(test_cast_i32_to_f32_scaled);
+  RUN_TEST(test_cast_f32_to_integers);
+  RUN_TEST(test_cast_between_integers);
+  RUN_TEST(test_cast_property_propagation);
+
+  return UNITY_END();
+}
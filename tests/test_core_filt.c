@@ -216,6 +216,55 @@ void test_cascading_complete(void)
                                 "Filter should be stopped by sentinel");
 }
 
+void test_fan_in_shared_input(void)
+{
+  /* A second producer is refused on an ordinary buffer... */
+  CHECK_ERR(filt_sink_connect(&filt1, 0, &output));
+  TEST_ASSERT_EQUAL_INT(Bp_EC_CONNECTION_OCCUPIED,
+                        filt_sink_connect(&filt2, 0, &output));
+  CHECK_ERR(filt_sink_disconnect(&filt1, 0));
+
+  /* ...but accepted on a multi-producer one */
+  BatchBuffer_config shared_config = config;
+  shared_config.multi_producer = true;
+  Batch_buff_t shared;
+  CHECK_ERR(bb_init(&shared, "SHARED", shared_config));
+  CHECK_ERR(filt_sink_connect(&filt1, 0, &shared));
+  CHECK_ERR(filt_sink_connect(&filt2, 0, &shared));
+  TEST_ASSERT_EQUAL_INT(2, atomic_load(&shared.n_producers));
+  CHECK_ERR(filt_start(&filt1));
+  CHECK_ERR(filt_start(&filt2));
+
+  /* Tag each batch with its producer and sequence number */
+  Filter_t* producers[] = {&filt1, &filt2};
+  for (uint32_t i = 0; i < 4; i++) {
+    for (uint32_t p = 0; p < 2; p++) {
+      batch_in = bb_get_head(producers[p]->input_buffers[0]);
+      *((uint32_t*) batch_in->data) = (p << 16) | i;
+      CHECK_ERR(bb_submit(producers[p]->input_buffers[0], 1000));
+    }
+  }
+
+  /* Interleaving is arbitrary, per-producer order is preserved */
+  uint32_t next[2] = {0, 0};
+  for (int i = 0; i < 8; i++) {
+    batch_out = bb_get_tail(&shared, 100000, &err);
+    CHECK_ERR(err);
+    uint32_t tag = *((uint32_t*) batch_out->data);
+    TEST_ASSERT_EQUAL_INT(next[tag >> 16]++, tag & 0xffff);
+    CHECK_ERR(bb_del_tail(&shared));
+  }
+  TEST_ASSERT_EQUAL_INT(4, next[0]);
+  TEST_ASSERT_EQUAL_INT(4, next[1]);
+
+  CHECK_ERR(filt_stop(&filt1));
+  CHECK_ERR(filt_stop(&filt2));
+  CHECK_ERR(filt_sink_disconnect(&filt1, 0));
+  CHECK_ERR(filt_sink_disconnect(&filt2, 0));
+  TEST_ASSERT_EQUAL_INT(0, atomic_load(&shared.n_producers));
+  CHECK_ERR(bb_deinit(&shared));
+}
+
 void test_shutdown_with_data(void) {}
 
 int main(int argc, char* argv[])
@@ -226,5 +275,6 @@ int main(int argc, char* argv[])
   RUN_TEST(test_data_passthrough_single_thread);
   RUN_TEST(test_filter_cascade);
   RUN_TEST(test_cascading_complete);
+  RUN_TEST(test_fan_in_shared_input);
   return UNITY_END();
 }
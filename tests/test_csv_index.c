@@ -0,0 +1,182 @@
+#define _DEFAULT_SOURCE  // For truncate
+#include <dirent.h>
+#include <pthread.h>
+#include <stdio.h>
+#include <string.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#include "csv_index.h"
+#include "unity.h"
+
+#define TEST_DATA_DIR "tests/data/"
+#define INDEX_PATH TEST_DATA_DIR "test_csv_index.idx"
+
+static const CsvIndexKey_t key = {.file_size = 123456,
+                                  .mtime_ns = 1700000000123456789,
+                                  .stride = 64,
+                                  .ts_column = 2,
+                                  .delimiter = ','};
+
+/* Entries every 64 lines, 10 us apart, from 1 ms */
+static void fill_index(CsvIndex_t* index, size_t n_entries)
+{
+  memset(index, 0, sizeof(*index));
+  index->key = key;
+  for (size_t i = 0; i < n_entries; i++) {
+    CsvIndexEntry_t entry = {.t_ns = 1000000 + i * 10000,
+                             .offset = 20 + i * 1000,
+                             .line = 1 + i * 64};
+    TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_append(index, &entry));
+  }
+}
+
+void setUp(void) { mkdir(TEST_DATA_DIR, 0755); }
+
+void tearDown(void) { unlink(INDEX_PATH); }
+
+void test_index_seek(void)
+{
+  CsvIndex_t index;
+  fill_index(&index, 1000);
+  TEST_ASSERT_EQUAL(1000, index.n_entries);
+
+  // Before or at the first entry: scan from the first row
+  TEST_ASSERT_NULL(csv_index_seek(&index, 0));
+  TEST_ASSERT_NULL(csv_index_seek(&index, 1000000));
+
+  // The last entry strictly before the time
+  const CsvIndexEntry_t* entry = csv_index_seek(&index, 1000001);
+  TEST_ASSERT_EQUAL_PTR(&index.entries[0], entry);
+  entry = csv_index_seek(&index, 1000000 + 500 * 10000);
+  TEST_ASSERT_EQUAL_PTR(&index.entries[499], entry);
+  entry = csv_index_seek(&index, 1000000 + 500 * 10000 + 1);
+  TEST_ASSERT_EQUAL_PTR(&index.entries[500], entry);
+  entry = csv_index_seek(&index, UINT64_MAX);
+  TEST_ASSERT_EQUAL_PTR(&index.entries[999], entry);
+
+  csv_index_free(&index);
+  TEST_ASSERT_NULL(csv_index_seek(&index, UINT64_MAX));
+}
+
+void test_index_save_and_load(void)
+{
+  CsvIndex_t saved;
+  fill_index(&saved, 300);
+  TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_save(&saved, INDEX_PATH));
+
+  CsvIndex_t loaded = {0};
+  TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_load(&loaded, INDEX_PATH, &key));
+  TEST_ASSERT_EQUAL(saved.n_entries, loaded.n_entries);
+  TEST_ASSERT_TRUE(memcmp(saved.entries, loaded.entries,
+                          saved.n_entries * sizeof(CsvIndexEntry_t)) == 0);
+  csv_index_free(&loaded);
+
+  // An empty index is still an index
+  CsvIndex_t empty = {.key = key};
+  TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_save(&empty, INDEX_PATH));
+  TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_load(&loaded, INDEX_PATH, &key));
+  TEST_ASSERT_EQUAL(0, loaded.n_entries);
+  csv_index_free(&loaded);
+
+  csv_index_free(&saved);
+}
+
+void test_index_load_rejects_stale_and_damaged(void)
+{
+  CsvIndex_t index;
+  fill_index(&index, 100);
+  TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_save(&index, INDEX_PATH));
+
+  CsvIndex_t loaded = {0};
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_DATA,
+                    csv_index_load(&loaded, TEST_DATA_DIR "no_such.idx", &key));
+
+  // Any change to what the index was built from makes it stale
+  CsvIndexKey_t other = key;
+  other.mtime_ns++;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_DATA,
+                    csv_index_load(&loaded, INDEX_PATH, &other));
+  other = key;
+  other.stride = 32;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_DATA,
+                    csv_index_load(&loaded, INDEX_PATH, &other));
+  TEST_ASSERT_NULL(loaded.entries);
+
+  // Truncated, and with bytes after the entries
+  TEST_ASSERT_EQUAL(0, truncate(INDEX_PATH, 1000));
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_DATA,
+                    csv_index_load(&loaded, INDEX_PATH, &key));
+  TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_save(&index, INDEX_PATH));
+  FILE* f = fopen(INDEX_PATH, "ab");
+  TEST_ASSERT_NOT_NULL(f);
+  fputc(0, f);
+  fclose(f);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_DATA,
+                    csv_index_load(&loaded, INDEX_PATH, &key));
+  TEST_ASSERT_NULL(loaded.entries);
+
+  csv_index_free(&index);
+}
+
+#define N_SAVERS 4
+
+static void* save_index(void* arg)
+{
+  CsvIndex_t* index = arg;
+  for (int i = 0; i < 50; i++) {
+    if (csv_index_save(index, INDEX_PATH) != Bp_EC_OK) {
+      return arg;
+    }
+  }
+  return NULL;
+}
+
+void test_index_concurrent_saves(void)
+{
+  // Sources opening the same file at once each save the index
+  CsvIndex_t indexes[N_SAVERS];
+  pthread_t threads[N_SAVERS];
+  for (int i = 0; i < N_SAVERS; i++) {
+    fill_index(&indexes[i], 100 * (i + 1));
+    TEST_ASSERT_EQUAL(
+        0, pthread_create(&threads[i], NULL, save_index, &indexes[i]));
+  }
+  for (int i = 0; i < N_SAVERS; i++) {
+    void* failed;
+    TEST_ASSERT_EQUAL(0, pthread_join(threads[i], &failed));
+    TEST_ASSERT_NULL(failed);
+  }
+
+  // Whichever save landed last, the index is whole
+  CsvIndex_t loaded = {0};
+  TEST_ASSERT_EQUAL(Bp_EC_OK, csv_index_load(&loaded, INDEX_PATH, &key));
+  TEST_ASSERT_EQUAL(0, loaded.n_entries % 100);
+  CsvIndex_t* saved = &indexes[loaded.n_entries / 100 - 1];
+  TEST_ASSERT_TRUE(memcmp(saved->entries, loaded.entries,
+                          loaded.n_entries * sizeof(CsvIndexEntry_t)) == 0);
+  csv_index_free(&loaded);
+  for (int i = 0; i < N_SAVERS; i++) {
+    csv_index_free(&indexes[i]);
+  }
+
+  // No temporary files are left behind
+  DIR* dir = opendir(TEST_DATA_DIR);
+  TEST_ASSERT_NOT_NULL(dir);
+  struct dirent* entry;
+  while ((entry = readdir(dir)) != NULL) {
+    TEST_ASSERT_NULL(strstr(entry->d_name, "test_csv_index.idx."));
+  }
+  closedir(dir);
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_index_seek);
+  RUN_TEST(test_index_save_and_load);
+  RUN_TEST(test_index_load_rejects_stale_and_damaged);
+  RUN_TEST(test_index_concurrent_saves);
+
+  return UNITY_END();
+}
@@ -0,0 +1,188 @@
+#include <math.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include "csv_parse.h"
+#include "unity.h"
+
+static bool parse_f64(const char* s, double* out)
+{
+  return csv_parse_f64(s, s + strlen(s), out);
+}
+
+/* Bit-for-bit against strtod, which is correctly rounded */
+static void assert_f64_exact(const char* s)
+{
+  double value;
+  TEST_ASSERT_TRUE_MESSAGE(parse_f64(s, &value), s);
+  double expected = strtod(s, NULL);
+  TEST_ASSERT_TRUE_MESSAGE(memcmp(&value, &expected, sizeof(double)) == 0, s);
+}
+
+void setUp(void) {}
+
+void tearDown(void) {}
+
+void test_parse_u64(void)
+{
+  const char* s = "18446744073709551615";
+  uint64_t value;
+  TEST_ASSERT_TRUE(csv_parse_u64(s, s + strlen(s), &value));
+  TEST_ASSERT_EQUAL_UINT64(UINT64_MAX, value);
+
+  s = " +1000\t";
+  TEST_ASSERT_TRUE(csv_parse_u64(s, s + strlen(s), &value));
+  TEST_ASSERT_EQUAL_UINT64(1000, value);
+
+  // Only the given range is parsed, it need not be NUL terminated
+  s = "123456";
+  TEST_ASSERT_TRUE(csv_parse_u64(s, s + 3, &value));
+  TEST_ASSERT_EQUAL_UINT64(123, value);
+
+  static const char* invalid[] = {
+      "", " ", "18446744073709551616", "-1", "1.0", "12a", "1 2", "+",
+  };
+  for (size_t i = 0; i < sizeof(invalid) / sizeof(invalid[0]); i++) {
+    s = invalid[i];
+    TEST_ASSERT_FALSE_MESSAGE(csv_parse_u64(s, s + strlen(s), &value), s);
+  }
+}
+
+void test_parse_i64(void)
+{
+  const char* s = "-9223372036854775808";
+  int64_t value;
+  TEST_ASSERT_TRUE(csv_parse_i64(s, s + strlen(s), &value));
+  TEST_ASSERT_EQUAL_INT64(INT64_MIN, value);
+
+  s = "9223372036854775807";
+  TEST_ASSERT_TRUE(csv_parse_i64(s, s + strlen(s), &value));
+  TEST_ASSERT_EQUAL_INT64(INT64_MAX, value);
+
+  s = "-42";
+  TEST_ASSERT_TRUE(csv_parse_i64(s, s + strlen(s), &value));
+  TEST_ASSERT_EQUAL_INT64(-42, value);
+
+  static const char* invalid[] = {
+      "9223372036854775808", "-9223372036854775809", "-", "4.2", "0x10",
+  };
+  for (size_t i = 0; i < sizeof(invalid) / sizeof(invalid[0]); i++) {
+    s = invalid[i];
+    TEST_ASSERT_FALSE_MESSAGE(csv_parse_i64(s, s + strlen(s), &value), s);
+  }
+}
+
+void test_parse_f64_forms(void)
+{
+  static const char* forms[] = {
+      "0",   "-0",        "1",       "+1.5",    "-2.25",   ".5",
+      "5.",  "00012.500", "1e3",     "1E-3",    "-1.5e+2", "6.02214076e23",
+      "0.1", "0.000001",  "123.456", "  7.25 ", "1e22",    "9007199254740992",
+  };
+  for (size_t i = 0; i < sizeof(forms) / sizeof(forms[0]); i++) {
+    assert_f64_exact(forms[i]);
+  }
+
+  // Outside the direct path: long mantissas, extreme exponents, and ties
+  // that only a digit far past the 17th breaks
+  static const char* extremes[] = {
+      "1.7976931348623157e308",
+      "2.2250738585072014e-308",
+      "4.9406564584124654e-324",
+      "1e-310",
+      "1e308",
+      "1.5e-323",
+      "123456789012345678901234567890",
+      "0.000000000000000000000000000123456789012345678901",
+      "9007199254740993",
+      "9007199254740993.0000000000000000000000000000000000000001",
+      "1e23",
+      "8.98846567431158e307",
+  };
+  for (size_t i = 0; i < sizeof(extremes) / sizeof(extremes[0]); i++) {
+    assert_f64_exact(extremes[i]);
+  }
+
+  // A tie broken only past the digits strtod is handed directly
+  char tie[1024] = "9007199254740993.";
+  memset(tie + strlen(tie), '0', 900);
+  tie[17 + 900] = '1';
+  tie[17 + 901] = '\0';
+  assert_f64_exact(tie);
+
+  double value;
+
+  TEST_ASSERT_TRUE(parse_f64("-INF", &value));
+  TEST_ASSERT_TRUE(isinf(value) && value < 0);
+  TEST_ASSERT_TRUE(parse_f64("Infinity", &value));
+  TEST_ASSERT_TRUE(isinf(value) && value > 0);
+  TEST_ASSERT_TRUE(parse_f64("nan", &value));
+  TEST_ASSERT_TRUE(isnan(value));
+  TEST_ASSERT_TRUE(parse_f64("1e999", &value));
+  TEST_ASSERT_TRUE(isinf(value));
+  TEST_ASSERT_TRUE(parse_f64("1e-999", &value));
+  TEST_ASSERT_EQUAL_DOUBLE(0.0, value);
+
+  static const char* invalid[] = {
+      "", ".", "-", "e5", "1e", "1e+", "1.2.3", "1,5", "0x1p3", "infx", "12 3",
+  };
+  for (size_t i = 0; i < sizeof(invalid) / sizeof(invalid[0]); i++) {
+    TEST_ASSERT_FALSE_MESSAGE(parse_f64(invalid[i], &value), invalid[i]);
+  }
+}
+
+/* Sensor style values (up to 15 significant digits, small exponents) */
+void test_parse_f64_matches_strtod(void)
+{
+  char s[64];
+  srand(1234);
+  for (int i = 0; i < 100000; i++) {
+    double x = ((double) rand() / RAND_MAX - 0.5) *
+               pow(10.0, (double) (rand() % 13 - 6));
+
+    snprintf(s, sizeof(s), "%.6f", x);
+    assert_f64_exact(s);
+    snprintf(s, sizeof(s), "%.9e", x);
+    assert_f64_exact(s);
+  }
+}
+
+/* Any double printed at full precision reads back as itself */
+void test_parse_f64_round_trip(void)
+{
+  char s[64];
+  srand(4321);
+  for (int i = 0; i < 100000; i++) {
+    // Random bits: every exponent, subnormals included
+    uint64_t bits = 0;
+    for (int j = 0; j < 4; j++) {
+      bits = bits << 16 | (uint64_t) (rand() & 0xffff);
+    }
+    double x;
+    memcpy(&x, &bits, sizeof(x));
+    if (!isfinite(x)) continue;
+
+    snprintf(s, sizeof(s), "%.17g", x);
+    double value;
+    TEST_ASSERT_TRUE_MESSAGE(parse_f64(s, &value), s);
+    TEST_ASSERT_TRUE_MESSAGE(memcmp(&value, &x, sizeof(double)) == 0, s);
+    assert_f64_exact(s);
+
+    snprintf(s, sizeof(s), "%.16e", x);
+    assert_f64_exact(s);
+  }
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_parse_u64);
+  RUN_TEST(test_parse_i64);
+  RUN_TEST(test_parse_f64_forms);
+  RUN_TEST(test_parse_f64_matches_strtod);
+  RUN_TEST(test_parse_f64_round_trip);
+
+  return UNITY_END();
+}
@@ -857,6 +857,512 @@ void test_csv_source_worker_error_info(void)
   unlink(config.file_path);
 }
 
+/* Rows are parsed in place from the mapped file: CRLF line endings, blank
+ * lines, a last line with no newline, and integer outputs parsed as
+ * integers */
+void test_csv_source_in_place_parsing(void)
+{
+  CsvSource_t source;
+
+  const char* csv_content =
+      "ts_ns;unused;count;level\r\n"
+      "1000;x;-7;1.5e1\r\n"
+      "\r\n"
+      "2000;y;2147483647; -0.25\r\n"
+      "3000;z;12\r\n"  // Short row, skipped
+      "4000;w;3.9;1e-3";
+
+  CsvSource_config_t config = {
+      .name = "test_csv_in_place",
+      .file_path = TEST_DATA_DIR "in_place.csv",
+      .delimiter = ';',
+      .has_header = true,
+      .ts_column_name = "ts_ns",
+      .data_column_names = {"count", "level", NULL},
+      .skip_invalid = true,
+      .timeout_us = 100000};
+
+  create_test_csv(config.file_path, csv_content);
+  CHECK_ERR(csvsource_init(&source, config));
+
+  Batch_buff_t* counts = create_test_sink(DTYPE_I32, 6);
+  Batch_buff_t* levels = create_test_sink(DTYPE_FLOAT, 6);
+  CHECK_ERR(filt_sink_connect(&source.base, 0, counts));
+  CHECK_ERR(filt_sink_connect(&source.base, 1, levels));
+  CHECK_ERR(filt_start(&source.base));
+
+  int32_t expected_counts[] = {-7, 2147483647, 3};  // 3.9 truncates
+  float expected_levels[] = {15.0f, -0.25f, 0.001f};
+  uint64_t expected_ts[] = {1000, 2000, 4000};
+
+  for (int i = 0; i < 3; i++) {
+    Bp_EC read_err;
+    Batch_t* count = bb_get_tail(counts, 1000000, &read_err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+    Batch_t* level = bb_get_tail(levels, 1000000, &read_err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+
+    TEST_ASSERT_EQUAL(1, count->head);
+    TEST_ASSERT_EQUAL(expected_ts[i], count->t_ns);
+    TEST_ASSERT_EQUAL(expected_ts[i], level->t_ns);
+    TEST_ASSERT_EQUAL_INT32(expected_counts[i], ((int32_t*) count->data)[0]);
+    TEST_ASSERT_EQUAL_FLOAT(expected_levels[i], ((float*) level->data)[0]);
+
+    bb_del_tail(counts);
+    bb_del_tail(levels);
+  }
+
+  Bp_EC read_err;
+  Batch_t* done = bb_get_tail(counts, 1000000, &read_err);
+  TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+  TEST_ASSERT_EQUAL(Bp_EC_COMPLETE, done->ec);
+
+  filt_stop(&source.base);
+  TEST_ASSERT_EQUAL(Bp_EC_STOPPED, source.base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(6, source.current_line);
+
+  bb_stop(counts);
+  bb_stop(levels);
+  bb_deinit(counts);
+  bb_deinit(levels);
+  free(counts);
+  free(levels);
+  csvsource_destroy(&source);
+  unlink(config.file_path);
+}
+
+/* Everything a sink received from a run, for comparing two runs */
+typedef struct {
+  size_t n_batches;
+  uint64_t t_ns[512];
+  uint64_t period_ns[512];
+  size_t head[512];
+  float data[4096];
+  size_t n_samples;
+} CsvRun_t;
+
+static void run_to_completion(CsvSource_config_t config, CsvRun_t* run)
+{
+  CsvSource_t source;
+  memset(run, 0, sizeof(*run));
+
+  CHECK_ERR(csvsource_init(&source, config));
+  Batch_buff_t* sink = create_test_sink(DTYPE_FLOAT, 4);  // 16 samples
+  CHECK_ERR(filt_sink_connect(&source.base, 0, sink));
+  CHECK_ERR(filt_start(&source.base));
+
+  while (true) {
+    Bp_EC read_err;
+    Batch_t* batch = bb_get_tail(sink, 1000000, &read_err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+    if (batch->ec == Bp_EC_COMPLETE) {
+      bb_del_tail(sink);
+      break;
+    }
+    TEST_ASSERT_TRUE(run->n_batches < 512);
+    TEST_ASSERT_TRUE(run->n_samples + batch->head <= 4096);
+    run->t_ns[run->n_batches] = batch->t_ns;
+    run->period_ns[run->n_batches] = batch->period_ns;
+    run->head[run->n_batches] = batch->head;
+    memcpy(&run->data[run->n_samples], batch->data,
+           batch->head * sizeof(float));
+    run->n_samples += batch->head;
+    run->n_batches++;
+    bb_del_tail(sink);
+  }
+
+  filt_stop(&source.base);
+  TEST_ASSERT_EQUAL(Bp_EC_STOPPED, source.base.worker_err_info.ec);
+  bb_stop(sink);
+  bb_deinit(sink);
+  free(sink);
+  csvsource_destroy(&source);
+}
+
+/* Chunks far smaller than a batch put seams inside batches, inside timing
+ * runs and next to gaps and bad rows; the batches must not change */
+void test_csv_source_parallel_matches_sequential(void)
+{
+  CsvSource_config_t config = {.name = "test_csv_parallel",
+                               .file_path = TEST_DATA_DIR "parallel.csv",
+                               .delimiter = ',',
+                               .has_header = true,
+                               .ts_column_name = "ts_ns",
+                               .data_column_names = {"value", NULL},
+                               .detect_regular_timing = true,
+                               .skip_invalid = true,
+                               .timeout_us = 100000};
+
+  FILE* f = fopen(config.file_path, "w");
+  TEST_ASSERT_NOT_NULL(f);
+  fprintf(f, "ts_ns,value\n");
+  uint64_t t = 1000;
+  for (int i = 0; i < 1500; i++) {
+    t += (i % 97 == 0) ? 5000 : 1000;  // Gaps break the timing runs
+    if (i % 211 == 0) {
+      fprintf(f, "%llu,bad\n", (unsigned long long) t);
+    } else {
+      fprintf(f, "%llu,%d.5\n", (unsigned long long) t, i);
+    }
+  }
+  fclose(f);
+
+  static CsvRun_t sequential, parallel;
+  run_to_completion(config, &sequential);
+
+  size_t chunk_sizes[] = {1, 37, 400};
+  for (size_t c = 0; c < 3; c++) {
+    config.n_parse_threads = 3;
+    config.chunk_bytes = chunk_sizes[c];
+    run_to_completion(config, &parallel);
+
+    TEST_ASSERT_EQUAL(sequential.n_batches, parallel.n_batches);
+    TEST_ASSERT_EQUAL(sequential.n_samples, parallel.n_samples);
+    for (size_t b = 0; b < sequential.n_batches; b++) {
+      TEST_ASSERT_EQUAL(sequential.t_ns[b], parallel.t_ns[b]);
+      TEST_ASSERT_EQUAL(sequential.period_ns[b], parallel.period_ns[b]);
+      TEST_ASSERT_EQUAL(sequential.head[b], parallel.head[b]);
+    }
+    TEST_ASSERT_TRUE(memcmp(sequential.data, parallel.data,
+                            sequential.n_samples * sizeof(float)) == 0);
+  }
+
+  unlink(config.file_path);
+}
+
+/* Loop mode carries on through the chunks, and an invalid row stops the
+ * source where it would without parse threads */
+void test_csv_source_parallel_loop_and_error(void)
+{
+  CsvSource_t source;
+
+  const char* csv_content =
+      "ts_ns,value\n"
+      "1000,1.0\n"
+      "2000,2.0\n"
+      "3000,3.0\n";
+
+  CsvSource_config_t config = {.name = "test_csv_parallel_loop",
+                               .file_path = TEST_DATA_DIR "parallel_loop.csv",
+                               .delimiter = ',',
+                               .has_header = true,
+                               .ts_column_name = "ts_ns",
+                               .data_column_names = {"value", NULL},
+                               .loop = true,
+                               .timeout_us = 100000,
+                               .n_parse_threads = 2,
+                               .chunk_bytes = 8};
+
+  create_test_csv(config.file_path, csv_content);
+  CHECK_ERR(csvsource_init(&source, config));
+
+  Batch_buff_t* sink = create_test_sink(DTYPE_FLOAT, 0);  // 1 sample
+  CHECK_ERR(filt_sink_connect(&source.base, 0, sink));
+  CHECK_ERR(filt_start(&source.base));
+
+  for (int i = 0; i < 10; i++) {
+    Bp_EC read_err;
+    Batch_t* batch = bb_get_tail(sink, 1000000, &read_err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+    TEST_ASSERT_EQUAL(1000 * (i % 3 + 1), batch->t_ns);
+    TEST_ASSERT_FLOAT_WITHIN(0.001, i % 3 + 1, ((float*) batch->data)[0]);
+    bb_del_tail(sink);
+  }
+
+  filt_stop(&source.base);
+  TEST_ASSERT_EQUAL(Bp_EC_STOPPED, source.base.worker_err_info.ec);
+  bb_stop(sink);
+  bb_deinit(sink);
+  free(sink);
+  csvsource_destroy(&source);
+
+  create_test_csv(config.file_path,
+                  "ts_ns,value\n1000,1.0\n2000,2.0\n3000,oops\n4000,4.0\n");
+  config.loop = false;
+  CHECK_ERR(csvsource_init(&source, config));
+  sink = create_test_sink(DTYPE_FLOAT, 6);
+  CHECK_ERR(filt_sink_connect(&source.base, 0, sink));
+  CHECK_ERR(filt_start(&source.base));
+
+  // As without parse threads, the row still being batched is not flushed
+  Bp_EC read_err;
+  Batch_t* batch = bb_get_tail(sink, 1000000, &read_err);
+  TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+  TEST_ASSERT_EQUAL(1000, batch->t_ns);
+  bb_del_tail(sink);
+  usleep(100000);
+  TEST_ASSERT_FALSE(atomic_load(&source.base.running));
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_DATA, source.base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(4, source.current_line);
+
+  bb_stop(sink);
+  bb_deinit(sink);
+  free(sink);
+  csvsource_destroy(&source);
+  unlink(config.file_path);
+}
+
+/* Only the columns read are scanned and converted: fields past the last of
+ * them, and unread ones before it, may hold anything */
+void test_csv_source_column_projection(void)
+{
+  CsvSource_t source;
+
+  CsvSource_config_t config = {.name = "test_csv_projection",
+                               .file_path = TEST_DATA_DIR "projection.csv",
+                               .delimiter = ',',
+                               .has_header = true,
+                               .ts_column_name = "ts",
+                               .data_column_names = {"c5", "c1", "ts", NULL},
+                               .detect_regular_timing = true,
+                               .skip_invalid = true,
+                               .timeout_us = 100000};
+
+  // 62 columns, the timestamp third
+  FILE* f = fopen(config.file_path, "w");
+  TEST_ASSERT_NOT_NULL(f);
+  fprintf(f, "c0,c1,ts");
+  for (int c = 3; c < 62; c++) {
+    fprintf(f, ",c%d", c);
+  }
+  fprintf(f, "\n");
+  for (int row = 0; row < 4; row++) {
+    if (row == 2) {
+      fprintf(f, "x,1,2500,x,x\n");  // Ends before c5: skipped
+      continue;
+    }
+    fprintf(f, "junk,%d.5,%d,a b,,%d.25,not a number", row,
+            row < 2 ? 1000 * (row + 1) : 3000, row);
+    for (int c = 7; c < 62 - row; c++) {  // Rows may be short past c5
+      fprintf(f, ",?");
+    }
+    fprintf(f, "\n");
+  }
+  fclose(f);
+
+  CHECK_ERR(csvsource_init(&source, config));
+  TEST_ASSERT_EQUAL(6, source.n_scan_fields);
+  TEST_ASSERT_EQUAL(CSV_FIELD_DATA, source.field_actions[1]);
+  TEST_ASSERT_EQUAL(CSV_FIELD_TIMESTAMP | CSV_FIELD_DATA,
+                    source.field_actions[2]);
+  TEST_ASSERT_EQUAL(CSV_FIELD_DATA, source.field_actions[5]);
+  for (int c = 0; c < 62; c++) {
+    if (c != 1 && c != 2 && c != 5) {
+      TEST_ASSERT_EQUAL(CSV_FIELD_SKIP, source.field_actions[c]);
+    }
+  }
+
+  Batch_buff_t* sinks[3];
+  for (int i = 0; i < 3; i++) {
+    sinks[i] = create_test_sink(DTYPE_FLOAT, 4);
+    CHECK_ERR(filt_sink_connect(&source.base, i, sinks[i]));
+  }
+  CHECK_ERR(filt_start(&source.base));
+
+  static const float expected[3][3] = {
+      {0.25f, 1.25f, 3.25f}, {0.5f, 1.5f, 3.5f}, {1000, 2000, 3000}};
+  for (int i = 0; i < 3; i++) {
+    Bp_EC read_err;
+    Batch_t* batch = bb_get_tail(sinks[i], 1000000, &read_err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+    TEST_ASSERT_EQUAL(3, batch->head);
+    TEST_ASSERT_EQUAL(1000, batch->t_ns);
+    TEST_ASSERT_EQUAL_FLOAT_ARRAY(expected[i], (float*) batch->data, 3);
+    bb_del_tail(sinks[i]);
+  }
+
+  filt_stop(&source.base);
+  for (int i = 0; i < 3; i++) {
+    bb_stop(sinks[i]);
+    bb_deinit(sinks[i]);
+    free(sinks[i]);
+  }
+  csvsource_destroy(&source);
+  unlink(config.file_path);
+}
+
+/* The first n_batches a looping source sends, and whether it replayed from
+ * its cache */
+static void read_loop(CsvSource_config_t config, CsvRun_t* run,
+                      size_t n_batches, bool* cached)
+{
+  CsvSource_t source;
+  memset(run, 0, sizeof(*run));
+
+  CHECK_ERR(csvsource_init(&source, config));
+  Batch_buff_t* sink = create_test_sink(DTYPE_FLOAT, 2);  // 4 samples
+  CHECK_ERR(filt_sink_connect(&source.base, 0, sink));
+  CHECK_ERR(filt_start(&source.base));
+
+  for (; run->n_batches < n_batches; run->n_batches++) {
+    Bp_EC read_err;
+    Batch_t* batch = bb_get_tail(sink, 1000000, &read_err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, read_err);
+    run->t_ns[run->n_batches] = batch->t_ns;
+    run->period_ns[run->n_batches] = batch->period_ns;
+    run->head[run->n_batches] = batch->head;
+    memcpy(&run->data[run->n_samples], batch->data,
+           batch->head * sizeof(float));
+    run->n_samples += batch->head;
+    bb_del_tail(sink);
+  }
+
+  filt_stop(&source.base);
+  TEST_ASSERT_EQUAL(Bp_EC_STOPPED, source.base.worker_err_info.ec);
+  *cached = source.cached;
+  bb_stop(sink);
+  bb_deinit(sink);
+  free(sink);
+  csvsource_destroy(&source);
+}
+
+/* Replaying the parsed file from memory sends what reading it again would,
+ * and a file too big for the cache is read again */
+void test_csv_source_loop_cache(void)
+{
+  CsvSource_config_t config = {.name = "test_csv_loop_cache",
+                               .file_path = TEST_DATA_DIR "loop_cache.csv",
+                               .delimiter = ',',
+                               .has_header = true,
+                               .ts_column_name = "ts_ns",
+                               .data_column_names = {"value", NULL},
+                               .detect_regular_timing = true,
+                               .loop = true,
+                               .skip_invalid = true,
+                               .timeout_us = 100000};
+
+  // 7 lines: a gap, a bad row and a blank line; 5 rows of 12 bytes parsed
+  create_test_csv(config.file_path,
+                  "ts_ns,value\n"
+                  "1000,1.0\n"
+                  "2000,2.0\n"
+                  "5000,5.0\n"
+                  "6000,bad\n"
+                  "\n"
+                  "6000,6.0\n"
+                  "7000,7.0\n");
+
+  static CsvRun_t streamed, replayed;
+  bool cached;
+  read_loop(config, &streamed, 12, &cached);
+  TEST_ASSERT_FALSE(cached);
+
+  config.loop_cache_bytes = 7 * 12;
+  read_loop(config, &replayed, 12, &cached);
+  TEST_ASSERT_TRUE(cached);
+
+  TEST_ASSERT_EQUAL(streamed.n_samples, replayed.n_samples);
+  for (size_t b = 0; b < streamed.n_batches; b++) {
+    TEST_ASSERT_EQUAL(streamed.t_ns[b], replayed.t_ns[b]);
+    TEST_ASSERT_EQUAL(streamed.period_ns[b], replayed.period_ns[b]);
+    TEST_ASSERT_EQUAL(streamed.head[b], replayed.head[b]);
+  }
+  TEST_ASSERT_EQUAL_FLOAT_ARRAY(streamed.data, replayed.data,
+                                streamed.n_samples);
+
+  // Each pass starts a batch at the first row, as the timestamps go back
+  TEST_ASSERT_EQUAL(1000, replayed.t_ns[0]);
+  TEST_ASSERT_EQUAL(5000, replayed.t_ns[1]);
+  TEST_ASSERT_EQUAL(1000, replayed.t_ns[2]);
+
+  // One line short of the cap: streamed
+  config.loop_cache_bytes = 7 * 12 - 1;
+  read_loop(config, &replayed, 12, &cached);
+  TEST_ASSERT_FALSE(cached);
+  TEST_ASSERT_EQUAL_FLOAT_ARRAY(streamed.data, replayed.data,
+                                streamed.n_samples);
+
+  unlink(config.file_path);
+}
+
+static void write_window_log(const char* path, int n_rows)
+{
+  FILE* f = fopen(path, "w");
+  TEST_ASSERT_NOT_NULL(f);
+  fprintf(f, "ts_ns,value\n");
+  for (int i = 0; i < n_rows; i++) {
+    if (i % 101 == 50) {
+      fprintf(f, "\n%d,bad\n", 1000 * (i + 1));  // Blank and invalid lines
+    }
+    fprintf(f, "%d,%d\n", 1000 * (i + 1), i);
+  }
+  fclose(f);
+}
+
+/* A time window gives the same rows whether it is found by a scan, with a
+ * newly built index, or with the index saved by an earlier open */
+void test_csv_source_time_window(void)
+{
+  CsvSource_config_t config = {.name = "test_csv_window",
+                               .file_path = TEST_DATA_DIR "window.csv",
+                               .delimiter = ',',
+                               .has_header = true,
+                               .ts_column_name = "ts_ns",
+                               .data_column_names = {"value", NULL},
+                               .detect_regular_timing = true,
+                               .skip_invalid = true,
+                               .timeout_us = 100000,
+                               .start_ns = 250500,
+                               .end_ns = 400000};
+  const char* index_path = TEST_DATA_DIR "window.csv.idx";
+  unlink(index_path);
+  write_window_log(config.file_path, 1000);
+
+  static CsvRun_t run;
+  for (int pass = 0; pass < 3; pass++) {
+    config.index_stride = pass == 0 ? 0 : 16;
+    CsvSource_t source;
+    CHECK_ERR(csvsource_init(&source, config));
+    TEST_ASSERT_EQUAL(pass == 2, source.index_loaded);
+    TEST_ASSERT_EQUAL(pass > 0, access(index_path, F_OK) == 0);
+    csvsource_destroy(&source);
+
+    // Rows 250 to 399, less the invalid one
+    run_to_completion(config, &run);
+    TEST_ASSERT_EQUAL(150, run.n_samples);
+    TEST_ASSERT_EQUAL(251000, run.t_ns[0]);
+    for (size_t i = 0; i < run.n_samples; i++) {
+      TEST_ASSERT_EQUAL_FLOAT(250 + i, run.data[i]);
+    }
+  }
+
+  // Errors still give the file's line numbers: the bad row after the 300
+  // good ones, the header and three blank and invalid pairs is line 308
+  write_window_log(config.file_path, 300);
+  FILE* f = fopen(config.file_path, "a");
+  TEST_ASSERT_NOT_NULL(f);
+  fprintf(f, "301000,oops\n");
+  fclose(f);
+  config.skip_invalid = false;
+  config.start_ns = 300500;
+  config.end_ns = 0;
+
+  CsvSource_t source;
+  CHECK_ERR(csvsource_init(&source, config));
+  TEST_ASSERT_FALSE(source.index_loaded);  // The file changed
+  TEST_ASSERT_EQUAL(307, source.current_line);
+  Batch_buff_t* sink = create_test_sink(DTYPE_FLOAT, 4);
+  CHECK_ERR(filt_sink_connect(&source.base, 0, sink));
+  CHECK_ERR(filt_start(&source.base));
+  usleep(100000);
+  TEST_ASSERT_FALSE(atomic_load(&source.base.running));
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_DATA, source.base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(308, source.current_line);
+
+  bb_stop(sink);
+  bb_deinit(sink);
+  free(sink);
+  csvsource_destroy(&source);
+
+  // An end before the start is a configuration error
+  config.start_ns = 5000;
+  config.end_ns = 4000;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, csvsource_init(&source, config));
+
+  unlink(index_path);
+  unlink(config.file_path);
+}
+
 int main(void)
 {
   UNITY_BEGIN();
@@ -872,6 +1378,12 @@ int main(void)
   RUN_TEST(test_csv_source_loop_mode);
   RUN_TEST(test_csv_source_skip_invalid_rows);
   RUN_TEST(test_csv_source_multi_channel);
+  RUN_TEST(test_csv_source_in_place_parsing);
+  RUN_TEST(test_csv_source_parallel_matches_sequential);
+  RUN_TEST(test_csv_source_parallel_loop_and_error);
+  RUN_TEST(test_csv_source_column_projection);
+  RUN_TEST(test_csv_source_loop_cache);
+  RUN_TEST(test_csv_source_time_window);
 
   // New error path tests
   RUN_TEST(test_csv_source_line_too_long);
@@ -0,0 +1,272 @@
+#define _DEFAULT_SOURCE
+#include <math.h>
+#include <string.h>
+#include <time.h>
+#include "batch_buffer.h"
+#include "batch_matcher.h"
+#include "elementwise.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#define BATCH_CAPACITY_EXPO 7  // 128 samples per batch
+#define RING_CAPACITY_EXPO 4   // 15 batches in ring
+#define BATCH_CAPACITY (1 << BATCH_CAPACITY_EXPO)
+#define PERIOD_NS 1000
+
+static BatchBuffer_config buff_config(SampleDtype_t dtype)
+{
+  BatchBuffer_config config = {
+      .dtype = dtype,
+      .overflow_behaviour = OVERFLOW_BLOCK,
+      .ring_capacity_expo = RING_CAPACITY_EXPO,
+      .batch_capacity_expo = BATCH_CAPACITY_EXPO,
+  };
+  return config;
+}
+
+/* Submit 'n' float samples valued first, first + step, ... to 'buff' */
+static void submit_ramp(Batch_buff_t* buff, size_t n, long long t_ns,
+                        float first, float step)
+{
+  Batch_t* batch = bb_get_head(buff);
+  TEST_ASSERT_NOT_NULL(batch);
+  for (size_t i = 0; i < n; i++) {
+    ((float*) batch->data)[i] = first + step * (float) i;
+  }
+  batch->head = n;
+  batch->t_ns = t_ns;
+  batch->period_ns = PERIOD_NS;
+  batch->ec = Bp_EC_OK;
+  CHECK_ERR(bb_submit(buff, 1000000));
+}
+
+static void submit_complete(Batch_buff_t* buff)
+{
+  Batch_t* batch = bb_get_head(buff);
+  TEST_ASSERT_NOT_NULL(batch);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  CHECK_ERR(bb_submit(buff, 1000000));
+}
+
+void setUp(void) {}
+
+void tearDown(void) {}
+
+void test_elementwise_init_validation(void)
+{
+  Elementwise_filt_t f;
+  Elementwise_config_t config = {.name = "ew",
+                                 .buff_config = buff_config(DTYPE_FLOAT),
+                                 .n_inputs = 3,
+                                 .op = KERN_ADD,
+                                 .timeout_us = 10000};
+
+  CHECK_ERR(elementwise_init(&f, config));
+  TEST_ASSERT_EQUAL(FILT_T_MISO_ELEMENTWISE, f.base.filt_type);
+  TEST_ASSERT_EQUAL(3, f.base.n_input_buffers);
+  CHECK_ERR(filt_deinit(&f.base));
+
+  TEST_ASSERT_EQUAL(Bp_EC_NULL_FILTER, elementwise_init(NULL, config));
+
+  config.n_inputs = 1;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, elementwise_init(&f, config));
+  config.n_inputs = MAX_INPUTS + 1;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, elementwise_init(&f, config));
+
+  // Comparisons take exactly two inputs
+  config.n_inputs = 3;
+  config.op = KERN_GE;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, elementwise_init(&f, config));
+  config.op = KERN_BINOP_MAX;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, elementwise_init(&f, config));
+
+  config.op = KERN_ADD;
+  config.buff_config.dtype = DTYPE_NDEF;
+  TEST_ASSERT_EQUAL(Bp_EC_TYPE_ERROR, elementwise_init(&f, config));
+}
+
+/* Inputs arriving in different batch sizes are combined sample by sample,
+ * and completion ends the stream */
+void test_elementwise_three_input_fold(void)
+{
+  Elementwise_filt_t f;
+  Elementwise_config_t config = {.name = "ew_sub",
+                                 .buff_config = buff_config(DTYPE_FLOAT),
+                                 .n_inputs = 3,
+                                 .op = KERN_SUB,
+                                 .timeout_us = 10000};
+  CHECK_ERR(elementwise_init(&f, config));
+
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", buff_config(DTYPE_FLOAT)));
+  CHECK_ERR(filt_sink_connect(&f.base, 0, &output));
+  CHECK_ERR(bb_start(&output));
+  CHECK_ERR(filt_start(&f.base));
+
+  // 300 samples each: a = 10 * i, b = i, c = 1, in 3 different batchings
+  const size_t total = 300;
+  const size_t chunk[3] = {100, 64, 128};
+  for (int in = 0; in < 3; in++) {
+    for (size_t s = 0; s < total; s += chunk[in]) {
+      size_t n = MIN(chunk[in], total - s);
+      float first = in == 0 ? 10.0f * s : in == 1 ? (float) s : 1.0f;
+      float step = in == 0 ? 10.0f : in == 1 ? 1.0f : 0.0f;
+      submit_ramp(f.base.input_buffers[in], n, s * PERIOD_NS, first, step);
+    }
+  }
+  submit_complete(f.base.input_buffers[1]);
+
+  // (a - b) - c = 9i - 1, in full output batches then a partial one
+  size_t seen = 0;
+  Bp_EC err;
+  while (seen < total) {
+    Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_EQUAL(MIN(BATCH_CAPACITY, total - seen), batch->head);
+    TEST_ASSERT_EQUAL(seen * PERIOD_NS, batch->t_ns);
+    TEST_ASSERT_EQUAL(PERIOD_NS, batch->period_ns);
+    for (size_t i = 0; i < batch->head; i++) {
+      TEST_ASSERT_EQUAL_FLOAT(9.0f * (seen + i) - 1.0f,
+                              ((float*) batch->data)[i]);
+    }
+    seen += batch->head;
+    CHECK_ERR(bb_del_tail(&output));
+  }
+
+  Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+  CHECK_ERR(err);
+  TEST_ASSERT_EQUAL(Bp_EC_COMPLETE, batch->ec);
+  CHECK_ERR(bb_del_tail(&output));
+
+  CHECK_ERR(filt_stop(&f.base));
+  TEST_ASSERT_EQUAL(Bp_EC_OK, f.base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(total, f.base.metrics.samples_processed);
+  CHECK_ERR(bb_stop(&output));
+  CHECK_ERR(filt_deinit(&f.base));
+  CHECK_ERR(bb_deinit(&output));
+}
+
+void test_elementwise_phase_error(void)
+{
+  Elementwise_filt_t f;
+  Elementwise_config_t config = {.name = "ew_phase",
+                                 .buff_config = buff_config(DTYPE_FLOAT),
+                                 .n_inputs = 2,
+                                 .op = KERN_ADD,
+                                 .timeout_us = 10000};
+  CHECK_ERR(elementwise_init(&f, config));
+
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", buff_config(DTYPE_FLOAT)));
+  CHECK_ERR(filt_sink_connect(&f.base, 0, &output));
+  CHECK_ERR(bb_start(&output));
+  CHECK_ERR(filt_start(&f.base));
+
+  // Second input starts one sample later
+  submit_ramp(f.base.input_buffers[0], 16, 0, 0.0f, 1.0f);
+  submit_ramp(f.base.input_buffers[1], 16, PERIOD_NS, 0.0f, 1.0f);
+
+  for (int i = 0; i < 100 && atomic_load(&f.base.running); i++) {
+    struct timespec ts = {0, 1000000};
+    nanosleep(&ts, NULL);
+  }
+  TEST_ASSERT_FALSE(atomic_load(&f.base.running));
+  TEST_ASSERT_EQUAL(Bp_EC_PHASE_ERROR, f.base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(0, bb_occupancy(&output));
+
+  CHECK_ERR(filt_stop(&f.base));
+  CHECK_ERR(bb_stop(&output));
+  CHECK_ERR(filt_deinit(&f.base));
+  CHECK_ERR(bb_deinit(&output));
+}
+
+/* Two BatchMatchers writing straight into the comparison's input rings */
+void test_elementwise_compare_after_batch_matcher(void)
+{
+  Elementwise_filt_t ge;
+  Elementwise_config_t config = {.name = "ge",
+                                 .buff_config = buff_config(DTYPE_FLOAT),
+                                 .n_inputs = 2,
+                                 .op = KERN_GE,
+                                 .timeout_us = 10000};
+  CHECK_ERR(elementwise_init(&ge, config));
+
+  BatchMatcher_t matchers[2];
+  for (int i = 0; i < 2; i++) {
+    BatchMatcher_config_t matcher_config = {
+        .name = "matcher", .buff_config = buff_config(DTYPE_FLOAT)};
+    CHECK_ERR(batch_matcher_init(&matchers[i], matcher_config));
+    CHECK_ERR(
+        filt_sink_connect(&matchers[i].base, 0, ge.base.input_buffers[i]));
+    TEST_ASSERT_EQUAL(BATCH_CAPACITY, matchers[i].output_batch_samples);
+  }
+
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", buff_config(DTYPE_FLOAT)));
+  CHECK_ERR(filt_sink_connect(&ge.base, 0, &output));
+  CHECK_ERR(bb_start(&output));
+  CHECK_ERR(filt_start(&ge.base));
+  CHECK_ERR(filt_start(&matchers[0].base));
+  CHECK_ERR(filt_start(&matchers[1].base));
+
+  // A sine against a sawtooth carrier, in 50 and 96 sample batches
+  const size_t total = 2 * BATCH_CAPACITY;
+  for (size_t s = 0; s < total; s += 50) {
+    Batch_t* batch = bb_get_head(matchers[0].base.input_buffers[0]);
+    size_t n = MIN(50, total - s);
+    for (size_t i = 0; i < n; i++) {
+      ((float*) batch->data)[i] = sinf(0.05f * (float) (s + i));
+    }
+    batch->head = n;
+    batch->t_ns = s * PERIOD_NS;
+    batch->period_ns = PERIOD_NS;
+    CHECK_ERR(bb_submit(matchers[0].base.input_buffers[0], 1000000));
+  }
+  for (size_t s = 0; s < total; s += 96) {
+    size_t n = MIN(96, total - s);
+    Batch_t* batch = bb_get_head(matchers[1].base.input_buffers[0]);
+    for (size_t i = 0; i < n; i++) {
+      ((float*) batch->data)[i] = (float) ((s + i) % 20) / 10.0f - 1.0f;
+    }
+    batch->head = n;
+    batch->t_ns = s * PERIOD_NS;
+    batch->period_ns = PERIOD_NS;
+    CHECK_ERR(bb_submit(matchers[1].base.input_buffers[0], 1000000));
+  }
+
+  Bp_EC err;
+  for (size_t s = 0; s < total; s += BATCH_CAPACITY) {
+    Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_EQUAL(BATCH_CAPACITY, batch->head);
+    TEST_ASSERT_EQUAL(s * PERIOD_NS, batch->t_ns);
+    for (size_t i = 0; i < BATCH_CAPACITY; i++) {
+      float a = sinf(0.05f * (float) (s + i));
+      float b = (float) ((s + i) % 20) / 10.0f - 1.0f;
+      TEST_ASSERT_EQUAL_FLOAT(a >= b ? 1.0f : 0.0f, ((float*) batch->data)[i]);
+    }
+    CHECK_ERR(bb_del_tail(&output));
+  }
+
+  CHECK_ERR(filt_stop(&matchers[0].base));
+  CHECK_ERR(filt_stop(&matchers[1].base));
+  CHECK_ERR(filt_stop(&ge.base));
+  CHECK_ERR(bb_stop(&output));
+  CHECK_ERR(filt_deinit(&matchers[0].base));
+  CHECK_ERR(filt_deinit(&matchers[1].base));
+  CHECK_ERR(filt_deinit(&ge.base));
+  CHECK_ERR(bb_deinit(&output));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_elementwise_init_validation);
+  RUN_TEST(test_elementwise_three_input_fold);
+  RUN_TEST(test_elementwise_phase_error);
+  RUN_TEST(test_elementwise_compare_after_batch_matcher);
+
+  return UNITY_END();
+}
@@ -0,0 +1,278 @@
+#define _DEFAULT_SOURCE
+#include <math.h>
+#include <stdint.h>
+#include <string.h>
+#include "batch_buffer.h"
+#include "fft.h"
+#include "fir.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#define BATCH_CAPACITY_EXPO 7  // 128 samples per input batch
+#define SINK_CAPACITY_EXPO 6   // 64 samples per output batch
+#define RING_CAPACITY_EXPO 7   // Room for a whole test stream
+#define PERIOD_NS 1000000
+#define STREAM_MAX 10000
+
+static Fir_filt_t fir;
+static Batch_buff_t sink;
+static float stream_in[STREAM_MAX];
+static float stream_out[STREAM_MAX];
+static float taps_buf[1024];
+
+static BatchBuffer_config buff_config(size_t batch_expo)
+{
+  BatchBuffer_config config = {
+      .dtype = DTYPE_FLOAT,
+      .overflow_behaviour = OVERFLOW_BLOCK,
+      .ring_capacity_expo = RING_CAPACITY_EXPO,
+      .batch_capacity_expo = batch_expo,
+  };
+  return config;
+}
+
+static Fir_config_t fir_config(const float* coeffs, size_t n_taps,
+                               FirMethod_e method)
+{
+  Fir_config_t config = {
+      .name = "fir",
+      .buff_config = buff_config(BATCH_CAPACITY_EXPO),
+      .coeffs = coeffs,
+      .n_taps = n_taps,
+      .method = method,
+      .timeout_us = 10000,
+  };
+  return config;
+}
+
+/* Deterministic noise in [-1, 1) */
+static float noise(uint32_t* state)
+{
+  *state = *state * 1664525u + 1013904223u;
+  return (float) (*state >> 8) / (float) (1u << 23) - 1.0f;
+}
+
+/* Stream 'total' samples of stream_in through the filter in batches of
+ * 'chunk', checking output timing, and return the number of outputs */
+static size_t run_stream(Fir_config_t config, size_t total, size_t chunk)
+{
+  CHECK_ERR(fir_init(&fir, config));
+  CHECK_ERR(bb_init(&sink, "sink", buff_config(SINK_CAPACITY_EXPO)));
+  CHECK_ERR(filt_sink_connect(&fir.base, 0, &sink));
+  CHECK_ERR(bb_start(&sink));
+  CHECK_ERR(filt_start(&fir.base));
+
+  Batch_buff_t* input = fir.base.input_buffers[0];
+  for (size_t s = 0; s < total; s += chunk) {
+    Batch_t* batch = bb_get_head(input);
+    TEST_ASSERT_NOT_NULL(batch);
+    batch->head = MIN(chunk, total - s);
+    memcpy(batch->data, stream_in + s, batch->head * sizeof(float));
+    batch->t_ns = (long long) s * PERIOD_NS;
+    batch->period_ns = PERIOD_NS;
+    batch->ec = Bp_EC_OK;
+    CHECK_ERR(bb_submit(input, 1000000));
+  }
+  Batch_t* batch = bb_get_head(input);
+  TEST_ASSERT_NOT_NULL(batch);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  CHECK_ERR(bb_submit(input, 1000000));
+
+  size_t seen = 0;
+  Bp_EC err;
+  while (true) {
+    Batch_t* out = bb_get_tail(&sink, 1000000, &err);
+    CHECK_ERR(err);
+    if (out->ec == Bp_EC_COMPLETE) {
+      CHECK_ERR(bb_del_tail(&sink));
+      break;
+    }
+    // Causal: each output carries its input's timestamp
+    TEST_ASSERT_EQUAL(PERIOD_NS, out->period_ns);
+    TEST_ASSERT_EQUAL_INT64((long long) seen * PERIOD_NS, out->t_ns);
+    TEST_ASSERT_TRUE(seen + out->head <= STREAM_MAX);
+    memcpy(stream_out + seen, out->data, out->head * sizeof(float));
+    seen += out->head;
+    CHECK_ERR(bb_del_tail(&sink));
+  }
+
+  TEST_ASSERT_EQUAL(Bp_EC_OK, fir.base.worker_err_info.ec);
+  CHECK_ERR(filt_stop(&fir.base));
+  CHECK_ERR(bb_stop(&sink));
+  CHECK_ERR(filt_deinit(&fir.base));
+  CHECK_ERR(bb_deinit(&sink));
+  return seen;
+}
+
+/* Every output against a double precision convolution of stream_in */
+static void check_convolution(const float* h, size_t n_taps, size_t total,
+                              float tolerance)
+{
+  for (size_t n = 0; n < total; n++) {
+    double acc = 0.0;
+    for (size_t j = 0; j < n_taps && j <= n; j++) {
+      acc += (double) h[j] * stream_in[n - j];
+    }
+    TEST_ASSERT_FLOAT_WITHIN(tolerance, acc, stream_out[n]);
+  }
+}
+
+void setUp(void) {}
+
+void tearDown(void) {}
+
+void test_fir_init_validation(void)
+{
+  const float h[3] = {0.25f, 0.5f, 0.25f};
+
+  CHECK_ERR(fir_init(&fir, fir_config(h, 3, FIR_METHOD_AUTO)));
+  TEST_ASSERT_EQUAL(FILT_T_OVERLAP_BATCHES, fir.base.filt_type);
+  TEST_ASSERT_EQUAL(FIR_METHOD_DIRECT, fir.method);
+  CHECK_ERR(filt_deinit(&fir.base));
+
+  CHECK_ERR(fir_init(&fir, fir_config(taps_buf, 1024, FIR_METHOD_AUTO)));
+  TEST_ASSERT_EQUAL(FIR_METHOD_FFT, fir.method);
+  TEST_ASSERT_EQUAL(4096, fir.fft.n);
+  CHECK_ERR(filt_deinit(&fir.base));
+
+  Fir_config_t config = fir_config(h, 3, FIR_METHOD_AUTO);
+  TEST_ASSERT_EQUAL(Bp_EC_NULL_FILTER, fir_init(NULL, config));
+  config.buff_config.dtype = DTYPE_I32;
+  TEST_ASSERT_EQUAL(Bp_EC_TYPE_ERROR, fir_init(&fir, config));
+
+  config = fir_config(NULL, 3, FIR_METHOD_AUTO);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, fir_init(&fir, config));
+  config = fir_config(h, 0, FIR_METHOD_AUTO);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, fir_init(&fir, config));
+  config = fir_config(h, 3, FIR_METHOD_FFT);
+  config.fft_size = 12;  // Not a power of two
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, fir_init(&fir, config));
+  config.fft_size = 4;  // Shorter than twice the kernel
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, fir_init(&fir, config));
+}
+
+/* The transform matches a direct DFT, and the inverse undoes it times n */
+void test_fft_matches_dft(void)
+{
+  enum { N = 32 };
+  float data[2 * N], x[2 * N];
+  uint32_t state = 1;
+  for (size_t j = 0; j < 2 * N; j++) {
+    x[j] = data[j] = noise(&state);
+  }
+
+  Fft_plan_t plan;
+  CHECK_ERR(fft_plan_init(&plan, N));
+  fft_forward(&plan, data);
+  for (size_t k = 0; k < N; k++) {
+    double re = 0.0, im = 0.0;
+    for (size_t j = 0; j < N; j++) {
+      double a = -2.0 * M_PI * (double) (j * k) / N;
+      re += x[2 * j] * cos(a) - x[2 * j + 1] * sin(a);
+      im += x[2 * j] * sin(a) + x[2 * j + 1] * cos(a);
+    }
+    TEST_ASSERT_FLOAT_WITHIN(1e-4, re, data[2 * k]);
+    TEST_ASSERT_FLOAT_WITHIN(1e-4, im, data[2 * k + 1]);
+  }
+
+  fft_inverse(&plan, data);
+  for (size_t j = 0; j < 2 * N; j++) {
+    TEST_ASSERT_FLOAT_WITHIN(1e-4, x[j], data[j] / N);
+  }
+  fft_plan_deinit(&plan);
+
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, fft_plan_init(&plan, 24));
+}
+
+/* An impulse brings out the kernel, across batch boundaries */
+void test_fir_impulse_response(void)
+{
+  const float h[5] = {1.0f, -2.0f, 3.0f, -4.0f, 5.0f};
+  const FirMethod_e methods[] = {FIR_METHOD_DIRECT, FIR_METHOD_FFT};
+
+  for (size_t m = 0; m < 2; m++) {
+    memset(stream_in, 0, sizeof(stream_in));
+    stream_in[2] = 1.0f;  // Response straddles the first batch boundary
+    size_t seen = run_stream(fir_config(h, 5, methods[m]), 40, 3);
+    TEST_ASSERT_EQUAL(40, seen);
+    for (size_t n = 0; n < seen; n++) {
+      float expected = n >= 2 && n < 7 ? h[n - 2] : 0.0f;
+      TEST_ASSERT_FLOAT_WITHIN(1e-5, expected, stream_out[n]);
+    }
+  }
+}
+
+/* Direct form and overlap-save agree with the convolution for batch sizes
+ * both shorter and longer than the kernel */
+void test_fir_direct_and_fft_match(void)
+{
+  uint32_t state = 7;
+  const size_t n_taps = 37, total = 1000;
+  for (size_t j = 0; j < n_taps; j++) {
+    taps_buf[j] = noise(&state) / 8.0f;
+  }
+  for (size_t n = 0; n < total; n++) {
+    stream_in[n] = noise(&state);
+  }
+
+  const size_t chunks[] = {128, 29, 5};
+  for (size_t c = 0; c < 3; c++) {
+    Fir_config_t config = fir_config(taps_buf, n_taps, FIR_METHOD_DIRECT);
+    TEST_ASSERT_EQUAL(total, run_stream(config, total, chunks[c]));
+    check_convolution(taps_buf, n_taps, total, 1e-5f);
+
+    config.method = FIR_METHOD_FFT;
+    TEST_ASSERT_EQUAL(total, run_stream(config, total, chunks[c]));
+    check_convolution(taps_buf, n_taps, total, 1e-4f);
+  }
+}
+
+/* A 1024 tap channel filter runs by overlap-save and keeps its accuracy */
+void test_fir_long_kernel(void)
+{
+  uint32_t state = 3;
+  const size_t n_taps = 1024, total = STREAM_MAX;  // One full pair of blocks
+  for (size_t j = 0; j < n_taps; j++) {
+    taps_buf[j] = noise(&state) / 64.0f;
+  }
+  for (size_t n = 0; n < total; n++) {
+    stream_in[n] = noise(&state);
+  }
+
+  size_t seen =
+      run_stream(fir_config(taps_buf, n_taps, FIR_METHOD_AUTO), total, 128);
+  TEST_ASSERT_EQUAL(total, seen);
+  check_convolution(taps_buf, n_taps, total, 1e-4f);
+}
+
+void test_fir_property_propagation(void)
+{
+  const float h[2] = {0.5f, 0.5f};
+  CHECK_ERR(fir_init(&fir, fir_config(h, 2, FIR_METHOD_AUTO)));
+
+  PropertyTable_t upstream = prop_table_init();
+  prop_set_sample_rate_hz(&upstream, 1000);
+  PropertyTable_t downstream =
+      prop_propagate(&upstream, 1, &fir.base.contract, 0);
+
+  uint64_t period;
+  TEST_ASSERT_TRUE(prop_get_sample_period(&downstream, &period));
+  TEST_ASSERT_EQUAL_UINT64(1000000, period);
+
+  CHECK_ERR(filt_deinit(&fir.base));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_fir_init_validation);
+  RUN_TEST(test_fft_matches_dft);
+  RUN_TEST(test_fir_impulse_response);
+  RUN_TEST(test_fir_direct_and_fft_match);
+  RUN_TEST(test_fir_long_kernel);
+  RUN_TEST(test_fir_property_propagation);
+
+  return UNITY_END();
+}
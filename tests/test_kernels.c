@@ -0,0 +1,694 @@
+#include <float.h>
+#include <math.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+#include "kernels.h"
+#include "map.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#ifndef M_PI
+#define M_PI 3.14159265358979323846
+#endif
+
+/* Long enough for a few full AVX-512 vectors plus every tail length */
+#define N_MAX 67
+#define OFFSET_MAX 3  // Misalign the buffers by up to this many samples
+
+static float f_in[N_MAX + OFFSET_MAX];
+static float f_ref[N_MAX + OFFSET_MAX];
+static float f_out[N_MAX + OFFSET_MAX];
+static int32_t i_in[N_MAX + OFFSET_MAX];
+static int32_t i_ref[N_MAX + OFFSET_MAX];
+static int32_t i_out[N_MAX + OFFSET_MAX];
+static uint32_t u_in[N_MAX + OFFSET_MAX];
+static uint32_t u_ref[N_MAX + OFFSET_MAX];
+static uint32_t u_out[N_MAX + OFFSET_MAX];
+
+// Second operands for the binary operations
+static float f_in2[N_MAX + OFFSET_MAX];
+static int32_t i_in2[N_MAX + OFFSET_MAX];
+static uint32_t u_in2[N_MAX + OFFSET_MAX];
+
+static const Kern_ops_t* ref;
+
+static uint32_t lcg_next(uint32_t* state)
+{
+  *state = *state * 1664525u + 1013904223u;
+  return *state;
+}
+
+/* Mostly ordinary values, with the awkward ones sprinkled through */
+static void fill_operand(uint32_t seed, float* f, int32_t* iv, uint32_t* u)
+{
+  static const float f_special[] = {0.0f,     -0.0f,   1.0f,    -1.0f,
+                                    INFINITY, -INFINITY, NAN,   FLT_MIN,
+                                    1e-40f,   FLT_MAX, 0.5f,    1e30f};
+  static const int32_t i_special[] = {0, -1, 1, INT32_MIN, INT32_MAX, 46340,
+                                      46341};
+  static const uint32_t u_special[] = {0u, 1u, UINT32_MAX, 0x80000000u,
+                                       65535u, 65536u};
+
+  for (size_t i = 0; i < N_MAX + OFFSET_MAX; i++) {
+    uint32_t r = lcg_next(&seed);
+    if (r % 7 == 0) {
+      f[i] = f_special[r % (sizeof(f_special) / sizeof(f_special[0]))];
+      iv[i] = i_special[r % (sizeof(i_special) / sizeof(i_special[0]))];
+      u[i] = u_special[r % (sizeof(u_special) / sizeof(u_special[0]))];
+    } else {
+      f[i] = ((float) (r >> 8) / (float) (1u << 24) - 0.25f) * 1000.0f;
+      iv[i] = (int32_t) lcg_next(&seed);
+      u[i] = lcg_next(&seed);
+    }
+  }
+}
+
+/* Bit-exact, except that any NaN matches any NaN */
+static void check_f32(const char* what, const float* expected,
+                      const float* actual, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    if (isnan(expected[i]) && isnan(actual[i])) continue;
+    uint32_t e, a;
+    memcpy(&e, &expected[i], sizeof(e));
+    memcpy(&a, &actual[i], sizeof(a));
+    TEST_ASSERT_EQUAL_HEX32_MESSAGE(e, a, what);
+  }
+}
+
+/* Unity's array asserts reject n == 0, which is a case worth covering */
+static void check_i32(const char* what, const int32_t* expected,
+                      const int32_t* actual, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    TEST_ASSERT_EQUAL_INT32_MESSAGE(expected[i], actual[i], what);
+  }
+}
+
+static void check_u32(const char* what, const uint32_t* expected,
+                      const uint32_t* actual, size_t n)
+{
+  for (size_t i = 0; i < n; i++) {
+    TEST_ASSERT_EQUAL_HEX32_MESSAGE(expected[i], actual[i], what);
+  }
+}
+
+#define FOR_EACH_CASE(ops, body)                                   \
+  for (size_t n = 0; n <= N_MAX; n++) {                            \
+    for (size_t off = 0; off <= OFFSET_MAX; off++) {               \
+      char what[96];                                               \
+      snprintf(what, sizeof(what), "%s n=%zu offset=%zu",          \
+               kern_isa_name((ops)->isa), n, off);                 \
+      body                                                         \
+    }                                                              \
+  }
+
+static void check_f32_kernels(const Kern_ops_t* ops)
+{
+  FOR_EACH_CASE(ops, {
+    const float* in = f_in + off;
+    float* out = f_out + OFFSET_MAX - off;
+
+    ref->scale_f32(in, f_ref, n, 2.5f);
+    ops->scale_f32(in, out, n, 2.5f);
+    check_f32(what, f_ref, out, n);
+
+    ref->offset_f32(in, f_ref, n, -3.25f);
+    ops->offset_f32(in, out, n, -3.25f);
+    check_f32(what, f_ref, out, n);
+
+    ref->affine_f32(in, f_ref, n, 0.1f, 7.0f);
+    ops->affine_f32(in, out, n, 0.1f, 7.0f);
+    check_f32(what, f_ref, out, n);
+
+    ref->clip_f32(in, f_ref, n, -100.0f, 100.0f);
+    ops->clip_f32(in, out, n, -100.0f, 100.0f);
+    check_f32(what, f_ref, out, n);
+
+    ref->abs_f32(in, f_ref, n);
+    ops->abs_f32(in, out, n);
+    check_f32(what, f_ref, out, n);
+
+    ref->square_f32(in, f_ref, n);
+    ops->square_f32(in, out, n);
+    check_f32(what, f_ref, out, n);
+
+    ref->sqrt_f32(in, f_ref, n);
+    ops->sqrt_f32(in, out, n);
+    check_f32(what, f_ref, out, n);
+  })
+}
+
+static void check_i32_kernels(const Kern_ops_t* ops)
+{
+  FOR_EACH_CASE(ops, {
+    const int32_t* in = i_in + off;
+    int32_t* out = i_out + OFFSET_MAX - off;
+
+    ref->scale_i32(in, i_ref, n, -7);
+    ops->scale_i32(in, out, n, -7);
+    check_i32(what, i_ref, out, n);
+
+    ref->offset_i32(in, i_ref, n, 1000003);
+    ops->offset_i32(in, out, n, 1000003);
+    check_i32(what, i_ref, out, n);
+
+    ref->affine_i32(in, i_ref, n, 3, -5);
+    ops->affine_i32(in, out, n, 3, -5);
+    check_i32(what, i_ref, out, n);
+
+    ref->clip_i32(in, i_ref, n, -1000000, 2000000);
+    ops->clip_i32(in, out, n, -1000000, 2000000);
+    check_i32(what, i_ref, out, n);
+
+    ref->abs_i32(in, i_ref, n);
+    ops->abs_i32(in, out, n);
+    check_i32(what, i_ref, out, n);
+
+    ref->square_i32(in, i_ref, n);
+    ops->square_i32(in, out, n);
+    check_i32(what, i_ref, out, n);
+
+    ref->sqrt_i32(in, i_ref, n);
+    ops->sqrt_i32(in, out, n);
+    check_i32(what, i_ref, out, n);
+  })
+}
+
+static void check_u32_kernels(const Kern_ops_t* ops)
+{
+  FOR_EACH_CASE(ops, {
+    const uint32_t* in = u_in + off;
+    uint32_t* out = u_out + OFFSET_MAX - off;
+
+    ref->scale_u32(in, u_ref, n, 0x9e3779b9u);
+    ops->scale_u32(in, out, n, 0x9e3779b9u);
+    check_u32(what, u_ref, out, n);
+
+    ref->offset_u32(in, u_ref, n, 0xfffffff0u);
+    ops->offset_u32(in, out, n, 0xfffffff0u);
+    check_u32(what, u_ref, out, n);
+
+    ref->affine_u32(in, u_ref, n, 5u, 11u);
+    ops->affine_u32(in, out, n, 5u, 11u);
+    check_u32(what, u_ref, out, n);
+
+    // Bounds either side of the sign bit catch signed comparisons
+    ref->clip_u32(in, u_ref, n, 1000u, 0x90000000u);
+    ops->clip_u32(in, out, n, 1000u, 0x90000000u);
+    check_u32(what, u_ref, out, n);
+
+    ref->square_u32(in, u_ref, n);
+    ops->square_u32(in, out, n);
+    check_u32(what, u_ref, out, n);
+
+    ref->sqrt_u32(in, u_ref, n);
+    ops->sqrt_u32(in, out, n);
+    check_u32(what, u_ref, out, n);
+  })
+}
+
+/* Specials are common enough that equal pairs and zero divisors occur */
+static void fill_inputs(uint32_t seed)
+{
+  fill_operand(seed, f_in, i_in, u_in);
+  fill_operand(seed * 7 + 1, f_in2, i_in2, u_in2);
+}
+
+static void check_binops(const Kern_ops_t* ops)
+{
+  for (int op = 0; op < KERN_BINOP_MAX; op++) {
+    FOR_EACH_CASE(ops, {
+      strncat(what, " ", sizeof(what) - strlen(what) - 1);
+      strncat(what, kern_binop_name((Kern_binop_t) op),
+              sizeof(what) - strlen(what) - 1);
+
+      ref->binop_f32[op](f_in + off, f_in2 + off, f_ref, n);
+      ops->binop_f32[op](f_in + off, f_in2 + off, f_out + OFFSET_MAX - off, n);
+      check_f32(what, f_ref, f_out + OFFSET_MAX - off, n);
+
+      ref->binop_i32[op](i_in + off, i_in2 + off, i_ref, n);
+      ops->binop_i32[op](i_in + off, i_in2 + off, i_out + OFFSET_MAX - off, n);
+      check_i32(what, i_ref, i_out + OFFSET_MAX - off, n);
+
+      ref->binop_u32[op](u_in + off, u_in2 + off, u_ref, n);
+      ops->binop_u32[op](u_in + off, u_in2 + off, u_out + OFFSET_MAX - off, n);
+      check_u32(what, u_ref, u_out + OFFSET_MAX - off, n);
+
+      // Equal operands, including NaN == NaN
+      ref->binop_f32[op](f_in + off, f_in + off, f_ref, n);
+      ops->binop_f32[op](f_in + off, f_in + off, f_out + OFFSET_MAX - off, n);
+      check_f32(what, f_ref, f_out + OFFSET_MAX - off, n);
+
+      ref->binop_i32[op](i_in + off, i_in + off, i_ref, n);
+      ops->binop_i32[op](i_in + off, i_in + off, i_out + OFFSET_MAX - off, n);
+      check_i32(what, i_ref, i_out + OFFSET_MAX - off, n);
+    })
+  }
+}
+
+/* Scales that keep values in range, push them past 2^31 and 2^32, and flip
+ * their sign */
+static void check_casts(const Kern_ops_t* ops)
+{
+  static const float scales[] = {1.0f, 3.0517578e-5f, 1e7f, -1.0f};
+
+  for (size_t s = 0; s < sizeof(scales) / sizeof(scales[0]); s++) {
+    const float k = scales[s];
+    FOR_EACH_CASE(ops, {
+      ref->cast_i32_f32(i_in + off, f_ref, n, k);
+      ops->cast_i32_f32(i_in + off, f_out + OFFSET_MAX - off, n, k);
+      check_f32(what, f_ref, f_out + OFFSET_MAX - off, n);
+
+      ref->cast_u32_f32(u_in + off, f_ref, n, k);
+      ops->cast_u32_f32(u_in + off, f_out + OFFSET_MAX - off, n, k);
+      check_f32(what, f_ref, f_out + OFFSET_MAX - off, n);
+
+      ref->cast_f32_i32(f_in + off, i_ref, n, k);
+      ops->cast_f32_i32(f_in + off, i_out + OFFSET_MAX - off, n, k);
+      check_i32(what, i_ref, i_out + OFFSET_MAX - off, n);
+
+      ref->cast_f32_u32(f_in + off, u_ref, n, k);
+      ops->cast_f32_u32(f_in + off, u_out + OFFSET_MAX - off, n, k);
+      check_u32(what, u_ref, u_out + OFFSET_MAX - off, n);
+    })
+  }
+}
+
+static void check_fir(const Kern_ops_t* ops)
+{
+  static const float taps2[] = {0.75f, 0.25f};
+  static const float taps7[] = {-0.1f, 0.2f, 0.5f, 1.0f, 0.5f, 0.2f, -0.1f};
+  static const struct {
+    const float* c;
+    size_t taps;
+  } filters[] = {{taps2, 1}, {taps2, 2}, {taps7, 4}, {taps7, 7}};
+
+  for (size_t k = 0; k < sizeof(filters) / sizeof(filters[0]); k++) {
+    const float* c = filters[k].c;
+    const size_t taps = filters[k].taps;
+    FOR_EACH_CASE(ops, {
+      if (n + taps - 1 > N_MAX) continue;  // Reads past the n outputs
+      ref->fir_f32(f_in + off, c, taps, f_ref, n);
+      ops->fir_f32(f_in + off, c, taps, f_out + OFFSET_MAX - off, n);
+      check_f32(what, f_ref, f_out + OFFSET_MAX - off, n);
+    })
+  }
+}
+
+/* Phases and steps that wrap within a vector, and the fold points */
+static void check_osc(const Kern_ops_t* ops)
+{
+  static const uint32_t phases[] = {0, 0x3fffffff, 0x7ffffff0, 0xfffffff8};
+  static const uint32_t steps[] = {1, 0x01234567, 0x40000000, 0xfedcba98};
+
+  for (int wave = 0; wave < KERN_WAVE_MAX; wave++) {
+    for (size_t k = 0; k < sizeof(phases) / sizeof(phases[0]); k++) {
+      FOR_EACH_CASE(ops, {
+        ref->osc_f32[wave](phases[k], steps[k], f_ref, n);
+        ops->osc_f32[wave](phases[k], steps[k], f_out + off, n);
+        check_f32(what, f_ref, f_out + off, n);
+      })
+    }
+  }
+}
+
+/* Same samples and the same stream states after, for every row split */
+static void check_gauss(const Kern_ops_t* ops)
+{
+  Kern_rng_t rng_ref, rng_out;
+  kern_rng_seed(&rng_ref, 99);
+  kern_rng_seed(&rng_out, 99);
+
+  FOR_EACH_CASE(ops, {
+    ref->gauss_f32(&rng_ref, f_ref, n);
+    ops->gauss_f32(&rng_out, f_out + off, n);
+    check_f32(what, f_ref, f_out + off, n);
+    TEST_ASSERT_EQUAL_INT32_MESSAGE(
+        0, memcmp(&rng_ref, &rng_out, sizeof(rng_ref)), what);
+  })
+}
+
+void setUp(void)
+{
+  ref = kern_ops_for(KERN_ISA_SCALAR);
+  fill_inputs(12345);
+}
+
+void tearDown(void) {}
+
+void test_kernels_dispatch(void)
+{
+  const Kern_ops_t* best = kern_ops();
+  TEST_ASSERT_NOT_NULL(ref);
+  TEST_ASSERT_NOT_NULL(best);
+
+  // The dispatched table is the widest supported one
+  for (int isa = best->isa + 1; isa < KERN_ISA_MAX; isa++) {
+    TEST_ASSERT_NULL(kern_ops_for((Kern_isa_t) isa));
+  }
+  TEST_ASSERT_EQUAL_PTR(best, kern_ops_for(best->isa));
+  TEST_ASSERT_NULL(kern_ops_for(KERN_ISA_MAX));
+  TEST_ASSERT_EQUAL_STRING("scalar", kern_isa_name(KERN_ISA_SCALAR));
+}
+
+/* Every available ISA matches the scalar reference, for every tail length
+ * and alignment */
+void test_kernels_match_reference(void)
+{
+  for (int isa = KERN_ISA_SSE2; isa < KERN_ISA_MAX; isa++) {
+    const Kern_ops_t* ops = kern_ops_for((Kern_isa_t) isa);
+    if (ops == NULL) continue;
+    check_f32_kernels(ops);
+    check_i32_kernels(ops);
+    check_u32_kernels(ops);
+    check_binops(ops);
+    check_casts(ops);
+    check_fir(ops);
+    check_osc(ops);
+    check_gauss(ops);
+  }
+}
+
+/* The scalar references define the semantics the vector variants match */
+void test_kernels_binop_semantics(void)
+{
+  const float fa[] = {1.0f, NAN, -0.0f, 2.0f, 3.0f};
+  const float fb[] = {2.0f, 1.0f, 0.0f, NAN, 3.0f};
+  float f[5];
+
+  kern_binop_f32(KERN_MIN, fa, fb, f, 5);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, f[0]);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, f[1]);  // NaN operand gives b
+  TEST_ASSERT_TRUE(isnan(f[3]));
+  kern_binop_f32(KERN_GE, fa, fb, f, 5);
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, f[0]);
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, f[1]);  // Comparisons with NaN are false...
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, f[2]);  // ...and -0 == +0
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, f[4]);
+  kern_binop_f32(KERN_NE, fa, fb, f, 5);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, f[1]);  // ...except !=
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, f[4]);
+
+  const int32_t ia[] = {7, -7, INT32_MIN, 5, -3};
+  const int32_t ib[] = {2, 2, -1, 0, -3};
+  int32_t i[5];
+  kern_binop_i32(KERN_DIV, ia, ib, i, 5);
+  TEST_ASSERT_EQUAL_INT32(3, i[0]);
+  TEST_ASSERT_EQUAL_INT32(-3, i[1]);  // Truncates toward zero
+  TEST_ASSERT_EQUAL_INT32(INT32_MIN, i[2]);
+  TEST_ASSERT_EQUAL_INT32(0, i[3]);
+  kern_binop_i32(KERN_LE, ia, ib, i, 5);
+  TEST_ASSERT_EQUAL_INT32(0, i[0]);
+  TEST_ASSERT_EQUAL_INT32(1, i[1]);
+  TEST_ASSERT_EQUAL_INT32(1, i[4]);
+
+  // Unsigned comparisons across the sign bit
+  const uint32_t ua[] = {0x80000000u, 1u};
+  const uint32_t ub[] = {1u, 0x80000000u};
+  uint32_t u[2];
+  kern_binop_u32(KERN_GT, ua, ub, u, 2);
+  TEST_ASSERT_EQUAL_UINT32(1u, u[0]);
+  TEST_ASSERT_EQUAL_UINT32(0u, u[1]);
+
+  TEST_ASSERT_EQUAL_STRING("ge", kern_binop_name(KERN_GE));
+  TEST_ASSERT_EQUAL_STRING("unknown", kern_binop_name(KERN_BINOP_MAX));
+}
+
+void test_kernels_cast_semantics(void)
+{
+  const float f[] = {2.5f,    3.5f,          -2.5f,        -0.4f,
+                     NAN,     2147483520.0f, 2147483648.0f, -3e9f,
+                     3e9f,    4294967040.0f, 5e9f,          INFINITY};
+  int32_t i[12];
+  uint32_t u[12];
+
+  for (int isa = KERN_ISA_SCALAR; isa < KERN_ISA_MAX; isa++) {
+    const Kern_ops_t* ops = kern_ops_for((Kern_isa_t) isa);
+    if (ops == NULL) continue;
+
+    // Round half to even, saturate, and NaN gives 0
+    ops->cast_f32_i32(f, i, 12, 1.0f);
+    TEST_ASSERT_EQUAL_INT32(2, i[0]);
+    TEST_ASSERT_EQUAL_INT32(4, i[1]);
+    TEST_ASSERT_EQUAL_INT32(-2, i[2]);
+    TEST_ASSERT_EQUAL_INT32(0, i[3]);
+    TEST_ASSERT_EQUAL_INT32(0, i[4]);
+    TEST_ASSERT_EQUAL_INT32(2147483520, i[5]);
+    TEST_ASSERT_EQUAL_INT32(INT32_MAX, i[6]);
+    TEST_ASSERT_EQUAL_INT32(INT32_MIN, i[7]);
+    TEST_ASSERT_EQUAL_INT32(INT32_MAX, i[11]);
+
+    ops->cast_f32_u32(f, u, 12, 1.0f);
+    TEST_ASSERT_EQUAL_UINT32(0u, u[2]);  // Negatives clamp to 0
+    TEST_ASSERT_EQUAL_UINT32(0u, u[4]);
+    TEST_ASSERT_EQUAL_UINT32(2147483648u, u[6]);
+    TEST_ASSERT_EQUAL_UINT32(3000000000u, u[8]);
+    TEST_ASSERT_EQUAL_UINT32(4294967040u, u[9]);
+    TEST_ASSERT_EQUAL_UINT32(UINT32_MAX, u[10]);
+    TEST_ASSERT_EQUAL_UINT32(UINT32_MAX, u[11]);
+
+    // Scaling happens before rounding
+    ops->cast_f32_i32(f, i, 4, 10.0f);
+    TEST_ASSERT_EQUAL_INT32(25, i[0]);
+    TEST_ASSERT_EQUAL_INT32(-4, i[3]);
+
+    const uint32_t big[] = {UINT32_MAX, 16777217u, 0u, 65536u};
+    float g[4];
+    ops->cast_u32_f32(big, g, 4, 1.0f);
+    TEST_ASSERT_EQUAL_FLOAT(4294967296.0f, g[0]);
+    TEST_ASSERT_EQUAL_FLOAT(16777216.0f, g[1]);  // Ties to even
+    TEST_ASSERT_EQUAL_FLOAT(0.0f, g[2]);
+
+    const int32_t adc[] = {-32768, 16384, 0, 32767};
+    ops->cast_i32_f32(adc, g, 4, 1.0f / 32768.0f);
+    TEST_ASSERT_EQUAL_FLOAT(-1.0f, g[0]);
+    TEST_ASSERT_EQUAL_FLOAT(0.5f, g[1]);
+  }
+}
+
+void test_kernels_log10(void)
+{
+  for (int isa = KERN_ISA_SCALAR; isa < KERN_ISA_MAX; isa++) {
+    const Kern_ops_t* ops = kern_ops_for((Kern_isa_t) isa);
+    if (ops == NULL) continue;
+
+    FOR_EACH_CASE(ops, {
+      const float* in = f_in + off;
+      float* out = f_out + OFFSET_MAX - off;
+
+      ops->log10_f32(in, out, n);
+      for (size_t i = 0; i < n; i++) {
+        float expected = log10f(in[i]);
+        if (isnan(expected) || isinf(expected)) {
+          check_f32(what, &expected, &out[i], 1);
+        } else {
+          TEST_ASSERT_FLOAT_WITHIN_MESSAGE(2e-7f + 4e-7f * fabsf(expected),
+                                           expected, out[i], what);
+        }
+      }
+    })
+
+    // A dense sweep across the mantissa, including both sides of 1.0
+    float x[N_MAX];
+    float y[N_MAX];
+    for (float base = 0.01f; base < 1000.0f; base *= 1.37f) {
+      for (size_t i = 0; i < N_MAX; i++) {
+        x[i] = base * (1.0f + (float) i / N_MAX);
+      }
+      ops->log10_f32(x, y, N_MAX);
+      for (size_t i = 0; i < N_MAX; i++) {
+        float expected = log10f(x[i]);
+        TEST_ASSERT_FLOAT_WITHIN(2e-7f + 4e-7f * fabsf(expected), expected,
+                                 y[i]);
+      }
+    }
+  }
+}
+
+/* Input and output may be the same buffer */
+void test_kernels_in_place(void)
+{
+  const Kern_ops_t* ops = kern_ops();
+
+  memcpy(f_out, f_in, sizeof(f_in));
+  ref->affine_f32(f_in, f_ref, N_MAX, -2.0f, 0.5f);
+  ops->affine_f32(f_out, f_out, N_MAX, -2.0f, 0.5f);
+  check_f32("in place", f_ref, f_out, N_MAX);
+
+  memcpy(i_out, i_in, sizeof(i_in));
+  ref->clip_i32(i_in, i_ref, N_MAX, -50, 50);
+  ops->clip_i32(i_out, i_out, N_MAX, -50, 50);
+  TEST_ASSERT_EQUAL_INT32_ARRAY(i_ref, i_out, N_MAX);
+
+  // Binary operations may write over either operand
+  memcpy(f_out, f_in, sizeof(f_in));
+  ref->binop_f32[KERN_SUB](f_in, f_in2, f_ref, N_MAX);
+  ops->binop_f32[KERN_SUB](f_out, f_in2, f_out, N_MAX);
+  check_f32("in place a", f_ref, f_out, N_MAX);
+
+  memcpy(u_out, u_in2, sizeof(u_in2));
+  ref->binop_u32[KERN_LT](u_in, u_in2, u_ref, N_MAX);
+  ops->binop_u32[KERN_LT](u_in, u_out, u_out, N_MAX);
+  check_u32("in place b", u_ref, u_out, N_MAX);
+}
+
+void test_kernels_fir(void)
+{
+  const float in[] = {1.0f, 2.0f, 4.0f, 8.0f, 16.0f, 32.0f, 64.0f, 128.0f,
+                      256.0f, 512.0f, 1024.0f, 2048.0f, 4096.0f, 8192.0f,
+                      16384.0f, 32768.0f, 65536.0f, 131072.0f};
+  const float c[] = {0.5f, 0.25f, 1.0f};
+  float out[18];
+
+  // Each output reads 'taps' inputs forward from its own index
+  kern_fir_f32(in, c, 3, out, 16);
+  for (size_t i = 0; i < 16; i++) {
+    TEST_ASSERT_EQUAL_FLOAT(in[i] * 0.5f + in[i + 1] * 0.25f + in[i + 2],
+                            out[i]);
+  }
+
+  // In place, out overwrites samples that no later output reads
+  memcpy(out, in, sizeof(in));
+  kern_fir_f32(out, c, 3, out, 16);
+  TEST_ASSERT_EQUAL_FLOAT(0.5f + 0.5f + 4.0f, out[0]);
+  TEST_ASSERT_EQUAL_FLOAT(16384.0f + 16384.0f + 131072.0f, out[15]);
+}
+
+/* Against libm over a whole cycle, and the exact values at the quarters */
+void test_kernels_osc(void)
+{
+  enum { N = 4096 };
+  static float out[N];
+  const uint32_t step = 0x100000;  // 4096 samples per cycle
+
+  kern_osc_f32(KERN_WAVE_SINE, 0, step, out, N);
+  for (size_t i = 0; i < N; i++) {
+    TEST_ASSERT_FLOAT_WITHIN(3e-7f, sin(2.0 * M_PI * i / N), out[i]);
+  }
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, out[0]);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, out[N / 4]);
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, out[N / 2]);
+  TEST_ASSERT_EQUAL_FLOAT(-1.0f, out[3 * N / 4]);
+
+  kern_osc_f32(KERN_WAVE_SQUARE, 0, step, out, N);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, out[0]);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f, out[N / 2 - 1]);
+  TEST_ASSERT_EQUAL_FLOAT(-1.0f, out[N / 2]);
+
+  kern_osc_f32(KERN_WAVE_SAW, 0, step, out, N);
+  for (size_t i = 0; i < N; i++) {
+    TEST_ASSERT_EQUAL_FLOAT(2.0f * i / N - 1.0f, out[i]);
+  }
+
+  kern_osc_f32(KERN_WAVE_TRIANGLE, 0, step, out, N);
+  TEST_ASSERT_EQUAL_FLOAT(-1.0f, out[0]);
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, out[N / 4]);
+  TEST_ASSERT_FLOAT_WITHIN(1e-6f, 1.0f, out[N / 2]);
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, out[3 * N / 4]);
+
+  // The phase wraps rather than saturating
+  kern_osc_f32(KERN_WAVE_SAW, 0xffffffffu - step + 1, step, out, 2);
+  TEST_ASSERT_EQUAL_FLOAT(1.0f - 2.0f / N, out[0]);
+  TEST_ASSERT_EQUAL_FLOAT(-1.0f, out[1]);
+}
+
+static double lag1_correlation(const float* x, size_t n)
+{
+  double sum = 0.0, sum_sq = 0.0;
+  for (size_t i = 0; i < n; i++) {
+    sum += x[i] * (double) x[i + 1];
+    sum_sq += x[i] * (double) x[i];
+  }
+  return sum / sum_sq;
+}
+
+/* Unit variance, the normal's share within 1 and 2 sigma, and white or
+ * strongly correlated */
+void test_kernels_noise(void)
+{
+  enum { N = 1 << 20 };
+  static float out[N + 1];
+  Kern_rng_t rng;
+  Kern_pink_t pink = {0};
+
+  kern_rng_seed(&rng, 1);
+  kern_gauss_f32(&rng, out, N + 1);
+  double sum = 0.0, sum_sq = 0.0;
+  size_t in_1sigma = 0, in_2sigma = 0;
+  for (size_t i = 0; i < N; i++) {
+    sum += out[i];
+    sum_sq += out[i] * (double) out[i];
+    in_1sigma += fabsf(out[i]) < 1.0f;
+    in_2sigma += fabsf(out[i]) < 2.0f;
+  }
+  TEST_ASSERT_DOUBLE_WITHIN(0.005, 0.0, sum / N);
+  TEST_ASSERT_DOUBLE_WITHIN(0.01, 1.0, sum_sq / N);
+  TEST_ASSERT_DOUBLE_WITHIN(0.003, 0.6827, (double) in_1sigma / N);
+  TEST_ASSERT_DOUBLE_WITHIN(0.002, 0.9545, (double) in_2sigma / N);
+  TEST_ASSERT_DOUBLE_WITHIN(0.005, 0.0, lag1_correlation(out, N));
+
+  // A different seed is a different sequence
+  float first = out[0];
+  kern_rng_seed(&rng, 2);
+  kern_gauss_f32(&rng, out, 1);
+  TEST_ASSERT_TRUE(out[0] != first);
+
+  kern_rng_seed(&rng, 1);
+  kern_gauss_f32(&rng, out, N + 1);
+  kern_pink_f32(&pink, out, out, N + 1);
+  sum_sq = 0.0;
+  for (size_t i = 0; i < N; i++) {
+    sum_sq += out[i] * (double) out[i];
+  }
+  TEST_ASSERT_DOUBLE_WITHIN(0.1, 1.0, sum_sq / N);
+  TEST_ASSERT_TRUE(lag1_correlation(out, N) > 0.5);
+}
+
+void test_map_builtin_fcns(void)
+{
+  const float in[] = {4.0f, -9.0f, 0.25f, 100.0f, 2.0f};
+  float out[5];
+
+  CHECK_ERR(map_sqrt_f32(in, out, 5));
+  TEST_ASSERT_EQUAL_FLOAT(2.0f, out[0]);
+  TEST_ASSERT_TRUE(isnan(out[1]));
+  TEST_ASSERT_EQUAL_FLOAT(0.5f, out[2]);
+
+  CHECK_ERR(map_abs_f32(in, out, 5));
+  TEST_ASSERT_EQUAL_FLOAT(9.0f, out[1]);
+
+  CHECK_ERR(map_log10_f32(in, out, 5));
+  TEST_ASSERT_FLOAT_WITHIN(1e-6f, 2.0f, out[3]);
+
+  const int32_t i_vals[] = {-3, 17, 0, 99};
+  int32_t i_res[4];
+  CHECK_ERR(map_square_i32(i_vals, i_res, 4));
+  TEST_ASSERT_EQUAL_INT32(9, i_res[0]);
+  CHECK_ERR(map_sqrt_i32(i_vals, i_res, 4));
+  TEST_ASSERT_EQUAL_INT32(0, i_res[0]);
+  TEST_ASSERT_EQUAL_INT32(4, i_res[1]);
+  TEST_ASSERT_EQUAL_INT32(9, i_res[3]);
+
+  TEST_ASSERT_EQUAL(Bp_EC_NULL_POINTER, map_sqrt_f32(NULL, out, 5));
+  TEST_ASSERT_EQUAL(Bp_EC_NULL_POINTER, map_sqrt_u32(in, NULL, 5));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_kernels_dispatch);
+  RUN_TEST(test_kernels_match_reference);
+  RUN_TEST(test_kernels_binop_semantics);
+  RUN_TEST(test_kernels_cast_semantics);
+  RUN_TEST(test_kernels_log10);
+  RUN_TEST(test_kernels_in_place);
+  RUN_TEST(test_kernels_fir);
+  RUN_TEST(test_kernels_osc);
+  RUN_TEST(test_kernels_noise);
+  RUN_TEST(test_map_builtin_fcns);
+
+  return UNITY_END();
+}
@@ -98,6 +98,39 @@ void tearDown(void)
   // Cleanup after each test
 }
 
+/* Stateful map: single-pole low-pass y += alpha * (x - y). Also checks that
+ * the timestamps handed in follow on from the previous call. */
+typedef struct {
+  float alpha;
+  float y;
+  long long next_t_ns;
+  size_t n_calls;
+  size_t t_ns_errors;
+} Lowpass_state_t;
+
+static Bp_EC test_lowpass_map(void* state, const void* in, void* out,
+                              size_t n_samples, long long t_ns,
+                              unsigned period_ns)
+{
+  if (!state || !in || !out) return Bp_EC_NULL_POINTER;
+
+  Lowpass_state_t* s = (Lowpass_state_t*) state;
+  const float* input = (const float*) in;
+  float* output = (float*) out;
+
+  if (s->n_calls++ > 0 && t_ns != s->next_t_ns) {
+    s->t_ns_errors++;
+  }
+  s->next_t_ns = t_ns + (long long) n_samples * period_ns;
+
+  for (size_t i = 0; i < n_samples; i++) {
+    s->y += s->alpha * (input[i] - s->y);
+    output[i] = s->y;
+  }
+
+  return Bp_EC_OK;
+}
+
 /* Test 1: Initialization & Configuration */
 void test_map_init_valid_config(void)
 {
@@ -640,6 +673,246 @@ void test_chained_transforms(void)
   CHECK_ERR(bb_deinit(&output_buffer));
 }
 
+/* Test: Fused scale -> offset -> scale chain runs in one worker */
+void test_fused_chain(void)
+{
+  Map_filt_t stages[3];
+  Map_fcn_t fcns[3] = {test_scale_map, test_offset_map, test_scale_map};
+  for (int i = 0; i < 3; i++) {
+    Map_config_t config = {.name = "test_fused",
+                           .buff_config = test_config,
+                           .map_fcn = fcns[i],
+                           .timeout_us = 10000};
+    CHECK_ERR(map_init(&stages[i], config));
+  }
+
+  Batch_buff_t output_buffer;
+  CHECK_ERR(bb_init(&output_buffer, "test_output", test_config));
+  CHECK_ERR(
+      filt_sink_connect(&stages[0].base, 0, stages[1].base.input_buffers[0]));
+  CHECK_ERR(
+      filt_sink_connect(&stages[1].base, 0, stages[2].base.input_buffers[0]));
+  CHECK_ERR(filt_sink_connect(&stages[2].base, 0, &output_buffer));
+
+  // Fuse the tail pair first, then prepend the head
+  CHECK_ERR(map_fuse(&stages[1], &stages[2]));
+  CHECK_ERR(map_fuse(&stages[0], &stages[1]));
+  TEST_ASSERT_EQUAL_PTR(&stages[0], stages[2].fused_head);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, map_fuse(&stages[0], &stages[1]));
+
+  for (int i = 0; i < 3; i++) {
+    CHECK_ERR(filt_start(&stages[i].base));
+  }
+
+  const int n_batches = 4;
+  for (int b = 0; b < n_batches; b++) {
+    Batch_t* input_batch = bb_get_head(stages[0].base.input_buffers[0]);
+    for (int i = 0; i < BATCH_CAPACITY; i++) {
+      *((float*) input_batch->data + i) = (float) (b * BATCH_CAPACITY + i);
+    }
+    input_batch->head = BATCH_CAPACITY;
+    input_batch->t_ns = 0;
+    input_batch->period_ns = 1;
+    CHECK_ERR(bb_submit(stages[0].base.input_buffers[0], 10000));
+  }
+
+  // ((x * 2) + 100) * 2, with nothing passing through the fused rings
+  Bp_EC err;
+  for (int b = 0; b < n_batches; b++) {
+    Batch_t* output_batch = bb_get_tail(&output_buffer, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_EQUAL(BATCH_CAPACITY, output_batch->head);
+    for (int i = 0; i < BATCH_CAPACITY; i++) {
+      float x = (float) (b * BATCH_CAPACITY + i);
+      TEST_ASSERT_EQUAL_FLOAT((x * 2.0f + 100.0f) * 2.0f,
+                              *((float*) output_batch->data + i));
+    }
+    CHECK_ERR(bb_del_tail(&output_buffer));
+  }
+  TEST_ASSERT_EQUAL(0, bb_occupancy(stages[1].base.input_buffers[0]));
+  TEST_ASSERT_EQUAL(0, bb_occupancy(stages[2].base.input_buffers[0]));
+
+  for (int i = 2; i >= 0; i--) {
+    CHECK_ERR(filt_stop(&stages[i].base));
+  }
+
+  // Each stage still reports its own metrics
+  for (int i = 0; i < 3; i++) {
+    Filt_metrics stats;
+    CHECK_ERR(filt_get_stats(&stages[i].base, &stats));
+    TEST_ASSERT_EQUAL(n_batches, stats.n_batches);
+    TEST_ASSERT_EQUAL(n_batches * BATCH_CAPACITY, stats.samples_processed);
+  }
+  CHECK_ERR(bb_stop(&output_buffer));
+  for (int i = 0; i < 3; i++) {
+    CHECK_ERR(filt_deinit(&stages[i].base));
+  }
+  CHECK_ERR(bb_deinit(&output_buffer));
+}
+
+void test_map_state_init(void)
+{
+  Map_filt_t filter;
+  Lowpass_state_t init = {.alpha = 0.5f, .y = 3.0f};
+  Map_config_t config = {.name = "test_map_state",
+                         .buff_config = test_config,
+                         .map_state_fcn = test_lowpass_map,
+                         .state_size = sizeof(init),
+                         .state_init = &init,
+                         .timeout_us = 10000};
+
+  CHECK_ERR(map_init(&filter, config));
+  TEST_ASSERT_EQUAL(FILT_T_MAP_STATE, filter.base.filt_type);
+  TEST_ASSERT_EQUAL_PTR(test_lowpass_map, filter.map_state_fcn);
+  TEST_ASSERT_NULL(filter.map_fcn);
+
+  // The state is a private copy of state_init
+  TEST_ASSERT_NOT_NULL(filter.state);
+  TEST_ASSERT_NOT_EQUAL(&init, filter.state);
+  TEST_ASSERT_EQUAL_FLOAT(3.0f, ((Lowpass_state_t*) filter.state)->y);
+  CHECK_ERR(filt_deinit(&filter.base));
+  TEST_ASSERT_NULL(filter.state);
+
+  // Without state_init the state starts zeroed
+  config.state_init = NULL;
+  CHECK_ERR(map_init(&filter, config));
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, ((Lowpass_state_t*) filter.state)->y);
+  CHECK_ERR(filt_deinit(&filter.base));
+
+  // Both map functions
+  config.map_fcn = test_identity_map;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, map_init(&filter, config));
+
+  // Stateless map with a state
+  config.map_state_fcn = NULL;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, map_init(&filter, config));
+
+  // Initial state with nowhere to put it
+  config.map_fcn = NULL;
+  config.map_state_fcn = test_lowpass_map;
+  config.state_size = 0;
+  config.state_init = &init;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, map_init(&filter, config));
+}
+
+/* Test: State carries across batches, and the callback sees each chunk's
+ * timestamp when input and output batch sizes differ */
+void test_map_state_across_batches(void)
+{
+  Map_filt_t filter;
+  BatchBuffer_config small_config = test_config;
+  small_config.batch_capacity_expo = SMALL_BATCH_CAPACITY_EXPO;
+  Lowpass_state_t init = {.alpha = 0.25f};
+  Map_config_t config = {.name = "test_lowpass",
+                         .buff_config = test_config,
+                         .map_state_fcn = test_lowpass_map,
+                         .state_size = sizeof(init),
+                         .state_init = &init,
+                         .timeout_us = 10000};
+
+  CHECK_ERR(map_init(&filter, config));
+
+  // Output batches of 16 split every 256 sample input batch
+  Batch_buff_t output_buffer;
+  CHECK_ERR(bb_init(&output_buffer, "test_output", small_config));
+  CHECK_ERR(filt_sink_connect(&filter.base, 0, &output_buffer));
+  CHECK_ERR(bb_start(&output_buffer));
+  CHECK_ERR(filt_start(&filter.base));
+
+  const int n_batches = 2;
+  const unsigned period_ns = 1000;
+  for (int b = 0; b < n_batches; b++) {
+    Batch_t* input_batch = bb_get_head(filter.base.input_buffers[0]);
+    for (int i = 0; i < BATCH_CAPACITY; i++) {
+      *((float*) input_batch->data + i) = (i % 32) < 16 ? 1.0f : -1.0f;
+    }
+    input_batch->head = BATCH_CAPACITY;
+    input_batch->t_ns = 5000 + (long long) b * BATCH_CAPACITY * period_ns;
+    input_batch->period_ns = period_ns;
+    CHECK_ERR(bb_submit(filter.base.input_buffers[0], 10000));
+  }
+
+  const size_t small_batch = 1 << SMALL_BATCH_CAPACITY_EXPO;
+  float y = 0.0f;
+  Bp_EC err;
+  for (size_t k = 0; k < n_batches * BATCH_CAPACITY / small_batch; k++) {
+    Batch_t* output_batch = bb_get_tail(&output_buffer, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_EQUAL(small_batch, output_batch->head);
+    TEST_ASSERT_EQUAL(5000 + (long long) (k * small_batch) * period_ns,
+                      output_batch->t_ns);
+    for (size_t i = 0; i < small_batch; i++) {
+      float x = ((k * small_batch + i) % 32) < 16 ? 1.0f : -1.0f;
+      y += 0.25f * (x - y);
+      TEST_ASSERT_EQUAL_FLOAT(y, *((float*) output_batch->data + i));
+    }
+    CHECK_ERR(bb_del_tail(&output_buffer));
+  }
+
+  CHECK_ERR(filt_stop(&filter.base));
+
+  Lowpass_state_t* state = (Lowpass_state_t*) filter.state;
+  TEST_ASSERT_EQUAL(n_batches * BATCH_CAPACITY / small_batch, state->n_calls);
+  TEST_ASSERT_EQUAL(0, state->t_ns_errors);
+
+  CHECK_ERR(bb_stop(&output_buffer));
+  CHECK_ERR(filt_deinit(&filter.base));
+  CHECK_ERR(bb_deinit(&output_buffer));
+}
+
+/* Test: Built-in stateful affine fused after a stateless map */
+void test_map_state_fused_affine(void)
+{
+  Map_filt_t scale, affine;
+  Map_affine_f32_t params = {.a = 0.5f, .b = -1.0f};
+  Map_config_t scale_config = {.name = "test_scale",
+                               .buff_config = test_config,
+                               .map_fcn = test_scale_map,
+                               .timeout_us = 10000};
+  Map_config_t affine_config = {.name = "test_affine",
+                                .buff_config = test_config,
+                                .map_state_fcn = map_affine_f32,
+                                .state_size = sizeof(params),
+                                .state_init = &params,
+                                .timeout_us = 10000};
+
+  CHECK_ERR(map_init(&scale, scale_config));
+  CHECK_ERR(map_init(&affine, affine_config));
+
+  Batch_buff_t output_buffer;
+  CHECK_ERR(bb_init(&output_buffer, "test_output", test_config));
+  CHECK_ERR(filt_sink_connect(&scale.base, 0, affine.base.input_buffers[0]));
+  CHECK_ERR(filt_sink_connect(&affine.base, 0, &output_buffer));
+  CHECK_ERR(map_fuse(&scale, &affine));
+
+  CHECK_ERR(filt_start(&scale.base));
+  CHECK_ERR(filt_start(&affine.base));
+
+  Batch_t* input_batch = bb_get_head(scale.base.input_buffers[0]);
+  for (int i = 0; i < BATCH_CAPACITY; i++) {
+    *((float*) input_batch->data + i) = (float) i;
+  }
+  input_batch->head = BATCH_CAPACITY;
+  CHECK_ERR(bb_submit(scale.base.input_buffers[0], 10000));
+
+  // (x * 2) * 0.5 - 1
+  Bp_EC err;
+  Batch_t* output_batch = bb_get_tail(&output_buffer, 1000000, &err);
+  CHECK_ERR(err);
+  for (int i = 0; i < BATCH_CAPACITY; i++) {
+    TEST_ASSERT_EQUAL_FLOAT((float) i - 1.0f,
+                            *((float*) output_batch->data + i));
+  }
+  CHECK_ERR(bb_del_tail(&output_buffer));
+
+  CHECK_ERR(filt_stop(&affine.base));
+  CHECK_ERR(filt_stop(&scale.base));
+  CHECK_ERR(bb_stop(&output_buffer));
+  CHECK_ERR(filt_deinit(&scale.base));
+  CHECK_ERR(filt_deinit(&affine.base));
+  CHECK_ERR(bb_deinit(&output_buffer));
+}
+
 /* Test: Buffer wraparound with small buffers */
 void test_buffer_wraparound(void)
 {
@@ -1004,11 +1277,15 @@ int main(void)
   RUN_TEST(test_map_init_valid_config);
   RUN_TEST(test_map_init_null_filter);
   RUN_TEST(test_map_init_null_function);
+  RUN_TEST(test_map_state_init);
 
   // Functional tests
   RUN_TEST(test_single_threaded_linear_ramp);
   RUN_TEST(test_scale_transform);
   RUN_TEST(test_chained_transforms);
+  RUN_TEST(test_fused_chain);
+  RUN_TEST(test_map_state_across_batches);
+  RUN_TEST(test_map_state_fused_affine);
   RUN_TEST(test_buffer_wraparound);
 
   // Multi-threaded tests
@@ -0,0 +1,199 @@
+#define _DEFAULT_SOURCE
+#include <pthread.h>
+#include <stdbool.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+#include "batch_buffer.h"
+#include "map_mp.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#define BATCH_CAPACITY_EXPO 6
+#define BATCH_CAPACITY (1 << BATCH_CAPACITY_EXPO)
+#define N_BATCHES 64
+
+static const BatchBuffer_config test_config = {
+    .dtype = DTYPE_FLOAT,
+    .overflow_behaviour = OVERFLOW_BLOCK,
+    .ring_capacity_expo = 4,
+    .batch_capacity_expo = BATCH_CAPACITY_EXPO,
+};
+
+/* Doubles each sample. Every fourth batch is slow, so later batches finish
+ * first and must be held back. */
+static Bp_EC slow_scale_map(const void* in, void* out, size_t n_samples)
+{
+  const float* input = (const float*) in;
+  float* output = (float*) out;
+
+  if (((int) input[0] / BATCH_CAPACITY) % 4 == 0) {
+    usleep(2000);
+  }
+  for (size_t i = 0; i < n_samples; i++) {
+    output[i] = input[i] * 2.0f;
+  }
+  return Bp_EC_OK;
+}
+
+static Bp_EC failing_map(const void* in, void* out, size_t n_samples)
+{
+  (void) in;
+  (void) out;
+  (void) n_samples;
+  return Bp_EC_INVALID_CONFIG;
+}
+
+typedef struct {
+  Batch_buff_t* buff;
+  size_t n_batches;
+} feeder_args_t;
+
+static void* feeder(void* arg)
+{
+  feeder_args_t* a = (feeder_args_t*) arg;
+
+  for (size_t b = 0; b < a->n_batches; b++) {
+    Batch_t* batch = bb_get_head(a->buff);
+    for (int i = 0; i < BATCH_CAPACITY; i++) {
+      ((float*) batch->data)[i] = (float) (b * BATCH_CAPACITY + i);
+    }
+    batch->head = BATCH_CAPACITY;
+    batch->batch_id = b;
+    batch->t_ns = (long long) b * BATCH_CAPACITY * 1000;
+    batch->period_ns = 1000;
+    batch->ec = Bp_EC_OK;
+    if (bb_submit(a->buff, 1000000) != Bp_EC_OK) return NULL;
+  }
+
+  Batch_t* batch = bb_get_head(a->buff);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  bb_submit(a->buff, 1000000);
+  return NULL;
+}
+
+void setUp(void) {}
+
+void tearDown(void) {}
+
+void test_map_mp_init_validation(void)
+{
+  MapMP_filt_t f;
+  MapMP_config_t config = {.name = "mp",
+                           .buff_config = test_config,
+                           .map_fcn = NULL,
+                           .timeout_us = 1000,
+                           .n_workers = 2};
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, map_mp_init(&f, config));
+
+  config.map_fcn = slow_scale_map;
+  config.buff_config.overflow_behaviour = OVERFLOW_DROP_TAIL;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, map_mp_init(&f, config));
+  config.buff_config.overflow_behaviour = OVERFLOW_DROP_HEAD;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, map_mp_init(&f, config));
+
+  config.buff_config.overflow_behaviour = OVERFLOW_BLOCK;
+  config.n_workers = 0;
+  CHECK_ERR(map_mp_init(&f, config));
+  TEST_ASSERT_EQUAL(FILT_T_MAP_MP, f.base.filt_type);
+  TEST_ASSERT_GREATER_OR_EQUAL(1, f.n_workers);
+  CHECK_ERR(filt_deinit(&f.base));
+}
+
+/* Batches finishing out of order still reach the sink in input order */
+void test_map_mp_preserves_order(void)
+{
+  MapMP_filt_t f;
+  MapMP_config_t config = {.name = "mp",
+                           .buff_config = test_config,
+                           .map_fcn = slow_scale_map,
+                           .timeout_us = 100000,
+                           .n_workers = 4};
+  CHECK_ERR(map_mp_init(&f, config));
+
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", test_config));
+  CHECK_ERR(filt_sink_connect(&f.base, 0, &output));
+  CHECK_ERR(filt_start(&f.base));
+
+  feeder_args_t args = {.buff = f.base.input_buffers[0],
+                        .n_batches = N_BATCHES};
+  pthread_t feeder_thread;
+  TEST_ASSERT_EQUAL(0, pthread_create(&feeder_thread, NULL, feeder, &args));
+
+  Bp_EC err;
+  for (size_t b = 0; b < N_BATCHES; b++) {
+    Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, batch->ec);
+    TEST_ASSERT_EQUAL(b, batch->batch_id);
+    TEST_ASSERT_EQUAL(b * BATCH_CAPACITY * 1000, batch->t_ns);
+    TEST_ASSERT_EQUAL(1000, batch->period_ns);
+    TEST_ASSERT_EQUAL(BATCH_CAPACITY, batch->head);
+    for (int i = 0; i < BATCH_CAPACITY; i++) {
+      TEST_ASSERT_EQUAL_FLOAT((float) (b * BATCH_CAPACITY + i) * 2.0f,
+                              ((float*) batch->data)[i]);
+    }
+    CHECK_ERR(bb_del_tail(&output));
+  }
+  Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+  CHECK_ERR(err);
+  TEST_ASSERT_EQUAL(Bp_EC_COMPLETE, batch->ec);
+  CHECK_ERR(bb_del_tail(&output));
+
+  pthread_join(feeder_thread, NULL);
+  CHECK_ERR(filt_stop(&f.base));
+  CHECK_ERR(f.base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(N_BATCHES, f.base.metrics.n_batches);
+  TEST_ASSERT_EQUAL(N_BATCHES * BATCH_CAPACITY,
+                    f.base.metrics.samples_processed);
+  TEST_ASSERT_GREATER_THAN(0, f.out_of_order);
+
+  CHECK_ERR(filt_deinit(&f.base));
+  CHECK_ERR(bb_deinit(&output));
+}
+
+/* A failing map function stops the filter and reports the error */
+void test_map_mp_error(void)
+{
+  MapMP_filt_t f;
+  MapMP_config_t config = {.name = "mp",
+                           .buff_config = test_config,
+                           .map_fcn = failing_map,
+                           .timeout_us = 100000,
+                           .n_workers = 3};
+  CHECK_ERR(map_mp_init(&f, config));
+
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", test_config));
+  CHECK_ERR(filt_sink_connect(&f.base, 0, &output));
+  CHECK_ERR(filt_start(&f.base));
+
+  Batch_t* batch = bb_get_head(f.base.input_buffers[0]);
+  batch->head = BATCH_CAPACITY;
+  batch->ec = Bp_EC_OK;
+  CHECK_ERR(bb_submit(f.base.input_buffers[0], 1000));
+
+  for (int i = 0; i < 100 && atomic_load(&f.base.running); i++) {
+    usleep(1000);
+  }
+  TEST_ASSERT_FALSE(atomic_load(&f.base.running));
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, f.base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(0, bb_occupancy(&output));
+
+  CHECK_ERR(filt_stop(&f.base));
+  CHECK_ERR(filt_deinit(&f.base));
+  CHECK_ERR(bb_deinit(&output));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_map_mp_init_validation);
+  RUN_TEST(test_map_mp_preserves_order);
+  RUN_TEST(test_map_mp_error);
+
+  return UNITY_END();
+}
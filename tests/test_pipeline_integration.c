@@ -170,7 +170,7 @@ void tearDown(void) {}
  *
  * Pipeline: SignalGenerator -> Pipeline[Map1 -> Map2] -> TestSink
  */
-void test_pipeline_linear_data_flow(void)
+static void run_linear_data_flow(bool fuse_maps)
 {
   /* Create signal generator */
   SignalGenerator_t sig_gen;
@@ -223,10 +223,12 @@ void test_pipeline_linear_data_flow(void)
                                        .input_filter = &scaler.base,
                                        .input_port = 0,
                                        .output_filter = &offset.base,
-                                       .output_port = 0};
+                                       .output_port = 0,
+                                       .fuse_maps = fuse_maps};
 
   Pipeline_t pipeline;
   CHECK_ERR(pipeline_init(&pipeline, pipeline_config));
+  TEST_ASSERT_EQUAL(fuse_maps ? 1 : 0, pipeline.n_fused);
 
   /* Connect signal generator to pipeline */
   CHECK_ERR(
@@ -280,6 +282,12 @@ void test_pipeline_linear_data_flow(void)
   }
   pthread_mutex_unlock(&sink.mutex);
 
+  /* A fused stage accounts for every sample its chain head processed */
+  if (fuse_maps) {
+    TEST_ASSERT_EQUAL(scaler.base.metrics.samples_processed,
+                      offset.base.metrics.samples_processed);
+  }
+
   /* Stop buffer lifecycle */
   CHECK_ERR(bb_stop(pipeline.base.input_buffers[0]));
   CHECK_ERR(bb_stop(sink.base.input_buffers[0]));
@@ -292,6 +300,11 @@ void test_pipeline_linear_data_flow(void)
   filt_deinit(&offset.base);
 }
 
+void test_pipeline_linear_data_flow(void) { run_linear_data_flow(false); }
+
+/* Same pipeline with the two maps fused into one worker */
+void test_pipeline_fused_linear_data_flow(void) { run_linear_data_flow(true); }
+
 /**
  * Test data flow through a DAG pipeline with branching
  *
@@ -691,6 +704,7 @@ int main(void)
 {
   UNITY_BEGIN();
   RUN_TEST(test_pipeline_linear_data_flow);
+  RUN_TEST(test_pipeline_fused_linear_data_flow);
   RUN_TEST(test_pipeline_dag_data_flow);
   RUN_TEST(test_pipeline_nested);
   RUN_TEST(test_pipeline_external_output_connection);
@@ -192,6 +192,33 @@ void test_property_propagation_preserve(void)
   TEST_ASSERT_EQUAL(48000, rate);
 }
 
+void test_property_propagation_scale(void)
+{
+  PropertyTable_t upstream = prop_table_init();
+  prop_set_sample_rate_hz(&upstream, 1200);  // 833333 ns
+
+  // Resample by 5/6: the period grows by 6/5
+  OutputBehavior_t behaviors[] = {{PROP_SAMPLE_PERIOD_NS,
+                                   BEHAVIOR_OP_SCALE,
+                                   OUTPUT_ALL,
+                                   {.ratio = {.num = 6, .den = 5}}}};
+
+  FilterContract_t contract = {.input_constraints = NULL,
+                               .n_input_constraints = 0,
+                               .output_behaviors = behaviors,
+                               .n_output_behaviors = 1};
+
+  PropertyTable_t downstream = prop_propagate(&upstream, 1, &contract, 0);
+
+  uint64_t period;
+  TEST_ASSERT_TRUE(prop_get_sample_period(&downstream, &period));
+  TEST_ASSERT_EQUAL_UINT64(1000000, period);  // 999999.6 rounds up
+
+  // Unknown stays unknown
+  downstream = prop_propagate(NULL, 0, &contract, 0);
+  TEST_ASSERT_FALSE(prop_get_sample_period(&downstream, &period));
+}
+
 void test_buffer_config_properties(void)
 {
   // Test with full batches only (supports_partial_batches = false)
@@ -961,6 +988,7 @@ int main(void)
   // Property propagation
   RUN_TEST(test_property_propagation_set);
   RUN_TEST(test_property_propagation_preserve);
+  RUN_TEST(test_property_propagation_scale);
 
   // Integration with existing code
   RUN_TEST(test_buffer_config_properties);
@@ -0,0 +1,249 @@
+#define _DEFAULT_SOURCE
+#include <stdint.h>
+#include <string.h>
+#include <time.h>
+#include "batch_buffer.h"
+#include "rate_limit.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#define BATCH_CAPACITY_EXPO 7  // 128 samples per batch
+#define RING_CAPACITY_EXPO 6   // 63 batches in ring
+#define PERIOD_NS 100000       // 10 kHz stream
+
+static RateLimit_filt_t rl;
+static Batch_buff_t sink;
+
+static RateLimit_config_t rate_limit_config(RateLimitUnit_e unit, double rate,
+                                            double burst)
+{
+  RateLimit_config_t config = {
+      .name = "rate_limit",
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .overflow_behaviour = OVERFLOW_BLOCK,
+                      .ring_capacity_expo = RING_CAPACITY_EXPO,
+                      .batch_capacity_expo = BATCH_CAPACITY_EXPO},
+      .unit = unit,
+      .rate = rate,
+      .burst = burst,
+      .timeout_us = 10000,
+  };
+  return config;
+}
+
+static double cpu_s(void)
+{
+  struct timespec ts;
+  clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &ts);
+  return ts.tv_sec + ts.tv_nsec * 1e-9;
+}
+
+/* Push 'n_batches' of 'batch_samples' through the filter and wait for them
+ * all to come out. Returns the wall time taken, in seconds. */
+static double run_batches(RateLimit_config_t config, size_t n_batches,
+                          size_t batch_samples, double* cpu_used_s)
+{
+  CHECK_ERR(rate_limit_init(&rl, config));
+  CHECK_ERR(bb_init(&sink, "sink", config.buff_config));
+  CHECK_ERR(filt_sink_connect(&rl.base, 0, &sink));
+  CHECK_ERR(bb_start(&sink));
+
+  Batch_buff_t* input = rl.base.input_buffers[0];
+  for (size_t b = 0; b < n_batches; b++) {
+    Batch_t* batch = bb_get_head(input);
+    TEST_ASSERT_NOT_NULL(batch);
+    for (size_t i = 0; i < batch_samples; i++) {
+      ((float*) batch->data)[i] = (float) (b * batch_samples + i);
+    }
+    batch->head = batch_samples;
+    batch->t_ns = (long long) (b * batch_samples) * PERIOD_NS;
+    batch->period_ns = PERIOD_NS;
+    batch->ec = Bp_EC_OK;
+    CHECK_ERR(bb_submit(input, 1000000));
+  }
+  Batch_t* batch = bb_get_head(input);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  CHECK_ERR(bb_submit(input, 1000000));
+
+  double cpu_start = cpu_s();
+  long long start = now_ns(CLOCK_MONOTONIC);
+  CHECK_ERR(filt_start(&rl.base));
+
+  size_t seen = 0;
+  Bp_EC err;
+  while (true) {
+    Batch_t* out = bb_get_tail(&sink, 2000000, &err);
+    CHECK_ERR(err);
+    if (out->ec == Bp_EC_COMPLETE) {
+      CHECK_ERR(bb_del_tail(&sink));
+      break;
+    }
+    // Data and timing pass through untouched
+    TEST_ASSERT_EQUAL_INT64((long long) seen * PERIOD_NS, out->t_ns);
+    TEST_ASSERT_EQUAL_FLOAT((float) seen, ((float*) out->data)[0]);
+    seen += out->head;
+    CHECK_ERR(bb_del_tail(&sink));
+  }
+  double elapsed = (now_ns(CLOCK_MONOTONIC) - start) * 1e-9;
+  if (cpu_used_s != NULL) {
+    *cpu_used_s = cpu_s() - cpu_start;
+  }
+
+  TEST_ASSERT_EQUAL(n_batches * batch_samples, seen);
+  TEST_ASSERT_EQUAL(Bp_EC_OK, rl.base.worker_err_info.ec);
+  CHECK_ERR(filt_stop(&rl.base));
+  CHECK_ERR(bb_stop(&sink));
+  CHECK_ERR(bb_deinit(&sink));
+  return elapsed;
+}
+
+void setUp(void) {}
+
+void tearDown(void)
+{
+  if (rl.base.filt_type != FILT_T_NDEF) {
+    filt_deinit(&rl.base);
+  }
+}
+
+void test_rate_limit_init_validation(void)
+{
+  CHECK_ERR(rate_limit_init(&rl, rate_limit_config(RATE_LIMIT_SAMPLES, 0, 0)));
+  TEST_ASSERT_EQUAL(FILT_T_RATE_LIMIT, rl.base.filt_type);
+  TEST_ASSERT_EQUAL_DOUBLE(1.0, rl.speed);    // Real time by default
+  TEST_ASSERT_EQUAL_DOUBLE(128.0, rl.burst);  // One full batch
+  CHECK_ERR(filt_deinit(&rl.base));
+
+  RateLimit_config_t config = rate_limit_config(RATE_LIMIT_BATCHES, 10, 0);
+  CHECK_ERR(rate_limit_init(&rl, config));
+  TEST_ASSERT_EQUAL_DOUBLE(1.0, rl.burst);
+  CHECK_ERR(filt_deinit(&rl.base));
+
+  TEST_ASSERT_EQUAL(Bp_EC_NULL_FILTER, rate_limit_init(NULL, config));
+  config = rate_limit_config(RATE_LIMIT_SAMPLES, -1, 0);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, rate_limit_init(&rl, config));
+  config = rate_limit_config(RATE_LIMIT_SAMPLES, 100, -5);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, rate_limit_init(&rl, config));
+  config = rate_limit_config(RATE_LIMIT_SAMPLES, 0, 0);
+  config.speed = -2;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, rate_limit_init(&rl, config));
+  // Real time pacing needs a sample budget
+  config = rate_limit_config(RATE_LIMIT_BATCHES, 0, 0);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, rate_limit_init(&rl, config));
+}
+
+/* 20 batches of 100 samples at 20k samples/s, one batch of burst: a batch
+ * every 5 ms, while sleeping rather than spinning */
+void test_rate_limit_samples_budget(void)
+{
+  double cpu_used;
+  double elapsed = run_batches(
+      rate_limit_config(RATE_LIMIT_SAMPLES, 20000, 100), 20, 100, &cpu_used);
+
+  TEST_ASSERT_TRUE(elapsed >= 0.095);
+  TEST_ASSERT_TRUE(elapsed < 0.2);
+  TEST_ASSERT_TRUE(cpu_used < elapsed / 2);
+
+  RateLimit_stats_t stats;
+  CHECK_ERR(filt_get_stats(&rl.base, &stats));
+  TEST_ASSERT_EQUAL(20, stats.base.n_batches);
+  TEST_ASSERT_EQUAL(19, stats.n_waits);  // The first goes on the full bucket
+  TEST_ASSERT_FLOAT_WITHIN(2000, 20000, stats.achieved_rate);
+  TEST_ASSERT_TRUE(stats.jitter_max_ns >= stats.jitter_mean_ns);
+  TEST_ASSERT_TRUE(stats.jitter_mean_ns < 5000000);
+}
+
+/* A batch budget ignores batch size */
+void test_rate_limit_batches_budget(void)
+{
+  double elapsed =
+      run_batches(rate_limit_config(RATE_LIMIT_BATCHES, 200, 1), 10, 64, NULL);
+  TEST_ASSERT_TRUE(elapsed >= 0.045);
+  TEST_ASSERT_TRUE(elapsed < 0.15);
+
+  RateLimit_stats_t stats;
+  CHECK_ERR(filt_get_stats(&rl.base, &stats));
+  TEST_ASSERT_FLOAT_WITHIN(20, 200, stats.achieved_rate);
+}
+
+/* The burst allowance lets a backlog through at once */
+void test_rate_limit_burst(void)
+{
+  double elapsed = run_batches(
+      rate_limit_config(RATE_LIMIT_SAMPLES, 1000, 1000), 10, 100, NULL);
+  TEST_ASSERT_TRUE(elapsed < 0.05);  // 1 s if it were paced
+
+  RateLimit_stats_t stats;
+  CHECK_ERR(filt_get_stats(&rl.base, &stats));
+  TEST_ASSERT_EQUAL(0, stats.n_waits);
+}
+
+/* With no rate, the budget is a multiple of the stream's own 10 kHz */
+void test_rate_limit_real_time_multiple(void)
+{
+  RateLimit_config_t config = rate_limit_config(RATE_LIMIT_SAMPLES, 0, 50);
+  config.speed = 0.1;  // A tenth of real time, so 50 ms per batch
+  double elapsed = run_batches(config, 4, 50, NULL);
+  TEST_ASSERT_TRUE(elapsed >= 0.15);
+  TEST_ASSERT_TRUE(elapsed < 0.3);
+
+  RateLimit_stats_t stats;
+  CHECK_ERR(filt_get_stats(&rl.base, &stats));
+  TEST_ASSERT_FLOAT_WITHIN(100, 1000, stats.achieved_rate);
+}
+
+/* Stopping is not held up by a long wait for tokens */
+void test_rate_limit_stop_while_waiting(void)
+{
+  RateLimit_config_t config = rate_limit_config(RATE_LIMIT_BATCHES, 0.1, 1);
+  CHECK_ERR(rate_limit_init(&rl, config));
+  CHECK_ERR(bb_init(&sink, "sink", config.buff_config));
+  CHECK_ERR(filt_sink_connect(&rl.base, 0, &sink));
+  CHECK_ERR(bb_start(&sink));
+  CHECK_ERR(filt_start(&rl.base));
+
+  Batch_buff_t* input = rl.base.input_buffers[0];
+  for (size_t b = 0; b < 2; b++) {  // The second waits 10 s
+    Batch_t* batch = bb_get_head(input);
+    batch->head = 1;
+    batch->t_ns = (long long) b * PERIOD_NS;
+    batch->period_ns = PERIOD_NS;
+    batch->ec = Bp_EC_OK;
+    CHECK_ERR(bb_submit(input, 1000000));
+  }
+  struct timespec settle = {0, 20000000};
+  nanosleep(&settle, NULL);
+
+  long long start = now_ns(CLOCK_MONOTONIC);
+  CHECK_ERR(filt_stop(&rl.base));
+  TEST_ASSERT_TRUE(now_ns(CLOCK_MONOTONIC) - start < 500000000LL);
+  CHECK_ERR(bb_stop(&sink));
+  CHECK_ERR(bb_deinit(&sink));
+  TEST_ASSERT_EQUAL(1, rl.base.metrics.n_batches);
+}
+
+void test_rate_limit_describe(void)
+{
+  char buffer[256];
+  CHECK_ERR(
+      rate_limit_init(&rl, rate_limit_config(RATE_LIMIT_SAMPLES, 5000, 0)));
+  CHECK_ERR(filt_describe(&rl.base, buffer, sizeof(buffer)));
+  TEST_ASSERT_NOT_NULL(strstr(buffer, "5000 samples/s"));
+  TEST_ASSERT_NOT_NULL(strstr(buffer, "Jitter"));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_rate_limit_init_validation);
+  RUN_TEST(test_rate_limit_samples_budget);
+  RUN_TEST(test_rate_limit_batches_budget);
+  RUN_TEST(test_rate_limit_burst);
+  RUN_TEST(test_rate_limit_real_time_multiple);
+  RUN_TEST(test_rate_limit_stop_while_waiting);
+  RUN_TEST(test_rate_limit_describe);
+
+  return UNITY_END();
+}
@@ -0,0 +1,226 @@
+#define _DEFAULT_SOURCE
+#include <math.h>
+#include <stdint.h>
+#include <string.h>
+#include "batch_buffer.h"
+#include "resampler.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#define BATCH_CAPACITY_EXPO 7  // 128 samples per input batch
+#define SINK_CAPACITY_EXPO 6   // 64 samples per output batch
+#define RING_CAPACITY_EXPO 5   // 31 batches in ring
+#define PERIOD_1200HZ_NS 833333
+
+static BatchBuffer_config buff_config(size_t batch_expo)
+{
+  BatchBuffer_config config = {
+      .dtype = DTYPE_FLOAT,
+      .overflow_behaviour = OVERFLOW_BLOCK,
+      .ring_capacity_expo = RING_CAPACITY_EXPO,
+      .batch_capacity_expo = batch_expo,
+  };
+  return config;
+}
+
+static Resampler_config_t resampler_config(unsigned up, unsigned down)
+{
+  Resampler_config_t config = {
+      .name = "resampler",
+      .buff_config = buff_config(BATCH_CAPACITY_EXPO),
+      .up = up,
+      .down = down,
+      .timeout_us = 10000,
+  };
+  return config;
+}
+
+static Resampler_filt_t rs;
+static Batch_buff_t sink;
+
+static void start_resampler(Resampler_config_t config)
+{
+  CHECK_ERR(resampler_init(&rs, config));
+  CHECK_ERR(bb_init(&sink, "sink", buff_config(SINK_CAPACITY_EXPO)));
+  CHECK_ERR(filt_sink_connect(&rs.base, 0, &sink));
+  CHECK_ERR(bb_start(&sink));
+  CHECK_ERR(filt_start(&rs.base));
+}
+
+static void stop_resampler(void)
+{
+  CHECK_ERR(filt_stop(&rs.base));
+  CHECK_ERR(bb_stop(&sink));
+  CHECK_ERR(filt_deinit(&rs.base));
+  CHECK_ERR(bb_deinit(&sink));
+}
+
+/* Submit 'total' samples of 'signal' in full input batches, then complete */
+static void submit_signal(float (*signal)(long long t_ns), size_t total,
+                          unsigned period_ns)
+{
+  for (size_t s = 0; s < total; s += 128) {
+    Batch_t* batch = bb_get_head(rs.base.input_buffers[0]);
+    TEST_ASSERT_NOT_NULL(batch);
+    size_t n = MIN(128, total - s);
+    for (size_t i = 0; i < n; i++) {
+      ((float*) batch->data)[i] = signal((long long) (s + i) * period_ns);
+    }
+    batch->head = n;
+    batch->t_ns = (long long) s * period_ns;
+    batch->period_ns = period_ns;
+    batch->ec = Bp_EC_OK;
+    CHECK_ERR(bb_submit(rs.base.input_buffers[0], 1000000));
+  }
+
+  Batch_t* batch = bb_get_head(rs.base.input_buffers[0]);
+  TEST_ASSERT_NOT_NULL(batch);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  CHECK_ERR(bb_submit(rs.base.input_buffers[0], 1000000));
+}
+
+/* Drain the sink, checking every output after 'settle_ns' against 'signal'
+ * at the output's own timestamp. Returns the number of outputs. */
+static size_t check_output(float (*signal)(long long t_ns), long long settle_ns,
+                           unsigned expected_period_ns, float tolerance)
+{
+  size_t seen = 0;
+  long long next_t_ns = 0;
+  Bp_EC err;
+  while (true) {
+    Batch_t* batch = bb_get_tail(&sink, 1000000, &err);
+    CHECK_ERR(err);
+    if (batch->ec == Bp_EC_COMPLETE) {
+      CHECK_ERR(bb_del_tail(&sink));
+      break;
+    }
+    TEST_ASSERT_EQUAL(expected_period_ns, batch->period_ns);
+    if (seen > 0) {  // Batches follow on, less the period's rounding
+      TEST_ASSERT_INT64_WITHIN(1 << SINK_CAPACITY_EXPO, next_t_ns, batch->t_ns);
+    }
+    for (size_t i = 0; i < batch->head; i++) {
+      long long t_ns = batch->t_ns + (long long) i * batch->period_ns;
+      if (t_ns >= settle_ns) {
+        TEST_ASSERT_FLOAT_WITHIN(tolerance, signal(t_ns),
+                                 ((float*) batch->data)[i]);
+      }
+    }
+    seen += batch->head;
+    next_t_ns = batch->t_ns + (long long) batch->head * batch->period_ns;
+    CHECK_ERR(bb_del_tail(&sink));
+  }
+  return seen;
+}
+
+static float sine_100hz(long long t_ns)
+{
+  return (float) sin(2.0 * M_PI * 100.0 * (double) t_ns * 1e-9);
+}
+
+static float dc(long long t_ns)
+{
+  (void) t_ns;
+  return 0.75f;
+}
+
+void setUp(void) {}
+
+void tearDown(void) {}
+
+void test_resampler_init_validation(void)
+{
+  Resampler_config_t config = resampler_config(10, 12);
+  CHECK_ERR(resampler_init(&rs, config));
+  TEST_ASSERT_EQUAL(FILT_T_RESAMPLER, rs.base.filt_type);
+  TEST_ASSERT_EQUAL(5, rs.up);  // Reduced to lowest terms
+  TEST_ASSERT_EQUAL(6, rs.down);
+  TEST_ASSERT_EQUAL(RESAMPLER_DEFAULT_TAPS, rs.taps);
+  CHECK_ERR(filt_deinit(&rs.base));
+
+  TEST_ASSERT_EQUAL(Bp_EC_NULL_FILTER, resampler_init(NULL, config));
+
+  config.buff_config.dtype = DTYPE_I32;
+  TEST_ASSERT_EQUAL(Bp_EC_TYPE_ERROR, resampler_init(&rs, config));
+
+  config = resampler_config(0, 6);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, resampler_init(&rs, config));
+  config = resampler_config(5, RESAMPLER_MAX_FACTOR + 1);
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, resampler_init(&rs, config));
+  config = resampler_config(5, 6);
+  config.taps_per_phase = RESAMPLER_MAX_TAPS + 1;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, resampler_init(&rs, config));
+  config = resampler_config(5, 6);
+  config.cutoff = 1.5f;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, resampler_init(&rs, config));
+}
+
+/* A 1.2 kHz sensor brought down to 1 kHz keeps its tone and its timing */
+void test_resampler_1200_to_1000hz(void)
+{
+  start_resampler(resampler_config(5, 6));
+
+  const size_t total = 2400;  // Two seconds
+  submit_signal(sine_100hz, total, PERIOD_1200HZ_NS);
+
+  // The timestamps are group delay corrected, so outputs line up with the
+  // input signal once the history has filled (32 inputs, about 27 ms)
+  size_t seen = check_output(sine_100hz, 40000000, 1000000, 2e-3f);
+  TEST_ASSERT_UINT_WITHIN(1, total * 5 / 6, seen);
+  TEST_ASSERT_EQUAL(total, rs.base.metrics.samples_processed);
+  TEST_ASSERT_EQUAL(Bp_EC_OK, rs.base.worker_err_info.ec);
+
+  stop_resampler();
+}
+
+/* Upsampling by 3/2 has a DC gain of 1 in every phase */
+void test_resampler_dc_gain(void)
+{
+  Resampler_config_t config = resampler_config(3, 2);
+  config.taps_per_phase = 16;
+  start_resampler(config);
+
+  const size_t total = 600;
+  submit_signal(dc, total, 1000000);
+
+  size_t seen = check_output(dc, 20000000, 666667, 1e-3f);
+  TEST_ASSERT_UINT_WITHIN(1, total * 3 / 2, seen);
+
+  stop_resampler();
+}
+
+/* The output period seen by downstream contracts is scaled by M/L */
+void test_resampler_property_propagation(void)
+{
+  CHECK_ERR(resampler_init(&rs, resampler_config(5, 6)));
+
+  // Unknown upstream rate stays unknown
+  uint64_t period;
+  TEST_ASSERT_FALSE(
+      prop_get_sample_period(&rs.base.output_properties[0], &period));
+
+  PropertyTable_t upstream = prop_table_init();
+  prop_set_sample_rate_hz(&upstream, 1200);
+  PropertyTable_t downstream =
+      prop_propagate(&upstream, 1, &rs.base.contract, 0);
+  TEST_ASSERT_TRUE(prop_get_sample_period(&downstream, &period));
+  TEST_ASSERT_EQUAL_UINT64(1000000, period);
+
+  uint32_t rate;
+  TEST_ASSERT_TRUE(prop_get_sample_rate_hz(&downstream, &rate));
+  TEST_ASSERT_EQUAL(1000, rate);
+
+  CHECK_ERR(filt_deinit(&rs.base));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_resampler_init_validation);
+  RUN_TEST(test_resampler_1200_to_1000hz);
+  RUN_TEST(test_resampler_dc_gain);
+  RUN_TEST(test_resampler_property_propagation);
+
+  return UNITY_END();
+}
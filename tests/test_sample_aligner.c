@@ -447,6 +447,157 @@ void test_with_batch_matcher(void)
   TEST_ASSERT_TRUE(fixture.aligner.samples_interpolated > 0);
 }
 
+/* Run 'total' samples of signal(t) through the aligner in odd sized
+ * batches, with the input 'offset_ns' off the grid, and collect the output */
+#define STREAM_MAX 512
+static double stream_out[STREAM_MAX];
+static uint64_t stream_t_ns[STREAM_MAX];
+
+static size_t run_stream(SampleAligner_config_t config, uint64_t offset_ns,
+                         size_t total, double (*signal)(double t_s))
+{
+  const size_t batch_size = 7;  // Taps straddle most batch boundaries
+  Batch_buff_t sink;
+  CHECK_ERR(sample_aligner_init(&fixture.aligner, config));
+  CHECK_ERR(bb_init(&sink, "sink", config.buff_config));
+  CHECK_ERR(filt_sink_connect(&fixture.aligner.base, 0, &sink));
+  CHECK_ERR(bb_start(&sink));
+  CHECK_ERR(filt_start(&fixture.aligner.base));
+
+  Batch_buff_t* input_buf = fixture.aligner.base.input_buffers[0];
+  SampleDtype_t dtype = config.buff_config.dtype;
+  for (size_t s = 0; s < total; s += batch_size) {
+    Batch_t* batch = bb_get_head(input_buf);
+    TEST_ASSERT_NOT_NULL(batch);
+    batch->t_ns = offset_ns + s * fixture.test_period_ns;
+    batch->period_ns = fixture.test_period_ns;
+    batch->head = MIN(batch_size, total - s);
+    batch->ec = Bp_EC_OK;
+    for (size_t i = 0; i < batch->head; i++) {
+      double v = signal((batch->t_ns + i * batch->period_ns) / 1e9);
+      if (dtype == DTYPE_FLOAT) {
+        ((float*) batch->data)[i] = (float) v;
+      } else {
+        ((int32_t*) batch->data)[i] = (int32_t) lrint(v);
+      }
+    }
+    CHECK_ERR(bb_submit(input_buf, 1000000));
+  }
+  Batch_t* batch = bb_get_head(input_buf);
+  TEST_ASSERT_NOT_NULL(batch);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  CHECK_ERR(bb_submit(input_buf, 1000000));
+
+  size_t seen = 0;
+  Bp_EC err;
+  while (true) {
+    Batch_t* batch = bb_get_tail(&sink, 1000000, &err);
+    CHECK_ERR(err);
+    if (batch->ec == Bp_EC_COMPLETE) break;
+    TEST_ASSERT_EQUAL(fixture.test_period_ns, batch->period_ns);
+    for (size_t i = 0; i < batch->head; i++) {
+      TEST_ASSERT_TRUE(seen < STREAM_MAX);
+      stream_t_ns[seen] = batch->t_ns + i * batch->period_ns;
+      stream_out[seen++] = dtype == DTYPE_FLOAT ? ((float*) batch->data)[i]
+                                                : ((int32_t*) batch->data)[i];
+    }
+    CHECK_ERR(bb_del_tail(&sink));
+  }
+  CHECK_ERR(bb_del_tail(&sink));
+
+  CHECK_ERR(filt_stop(&fixture.aligner.base));
+  CHECK_ERR(bb_stop(&sink));
+  CHECK_ERR(bb_deinit(&sink));
+  return seen;
+}
+
+static double ramp(double t_s) { return t_s * 1000.0; }  // One per sample
+
+/* Integer counts for inputs half a period off the grid */
+static double count(double t_s) { return t_s * 1000.0 - 0.5; }
+
+static double tone(double t_s) { return sin(2.0 * M_PI * 10.0 * t_s); }
+
+static SampleAligner_config_t stream_config(InterpolationMethod_e method,
+                                            AlignmentStrategy_e alignment)
+{
+  SampleAligner_config_t config = {
+      .name = "stream",
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 4,  // 16 samples
+                      .ring_capacity_expo = 6,
+                      .overflow_behaviour = OVERFLOW_BLOCK},
+      .timeout_us = 1000000,
+      .method = method,
+      .alignment = alignment,
+      .boundary = BOUNDARY_HOLD};
+  return config;
+}
+
+/* One output per input on the grid, and linear interpolation of a ramp is
+ * exact, so every output carries the ramp's value at its own time */
+void test_linear_is_sample_exact(void)
+{
+  const size_t total = 100;
+  size_t seen = run_stream(stream_config(INTERP_LINEAR, ALIGN_BACKWARD), 250000,
+                           total, ramp);
+  TEST_ASSERT_EQUAL(total, seen);
+
+  for (size_t k = 0; k < seen; k++) {
+    TEST_ASSERT_EQUAL(k * fixture.test_period_ns, stream_t_ns[k]);
+  }
+  // Output 0 is before input 0, so holds it
+  TEST_ASSERT_EQUAL_FLOAT(0.25f, stream_out[0]);
+  for (size_t k = 1; k < seen; k++) {
+    TEST_ASSERT_FLOAT_WITHIN(1e-4, ramp(stream_t_ns[k] / 1e9), stream_out[k]);
+  }
+}
+
+/* Each method tracks a 10 Hz tone away from the stream ends */
+void test_interpolation_accuracy(void)
+{
+  const struct {
+    InterpolationMethod_e method;
+    size_t sinc_taps;
+    double tolerance;
+  } cases[] = {
+      {INTERP_NEAREST, 0, 0.04},  // Up to half a period of phase error
+      {INTERP_LINEAR, 0, 6e-4},
+      {INTERP_CUBIC, 0, 2e-5},
+      {INTERP_SINC, 16, 2e-3},
+  };
+  const size_t total = 200;
+
+  for (size_t c = 0; c < sizeof(cases) / sizeof(cases[0]); c++) {
+    setUp();
+    SampleAligner_config_t config =
+        stream_config(cases[c].method, ALIGN_FORWARD);
+    config.sinc_taps = cases[c].sinc_taps;
+    size_t seen = run_stream(config, 600000, total, tone);
+    TEST_ASSERT_EQUAL(total, seen);
+    for (size_t k = 8; k + 8 < seen; k++) {
+      TEST_ASSERT_FLOAT_WITHIN(cases[c].tolerance, tone(stream_t_ns[k] / 1e9),
+                               stream_out[k]);
+    }
+    tearDown();
+  }
+}
+
+void test_integer_interpolation(void)
+{
+  SampleAligner_config_t config = stream_config(INTERP_LINEAR, ALIGN_BACKWARD);
+  config.buff_config.dtype = DTYPE_I32;
+  const size_t total = 50;
+  size_t seen = run_stream(config, 500000, total, count);
+  TEST_ASSERT_EQUAL(total, seen);
+
+  // Each output is half way between two counts, and rounds to even
+  for (size_t k = 1; k < seen; k++) {
+    TEST_ASSERT_EQUAL_INT32(nearbyint(k - 0.5), (int32_t) stream_out[k]);
+  }
+}
+
 int main(void)
 {
   UNITY_BEGIN();
@@ -456,6 +607,9 @@ int main(void)
   RUN_TEST(test_alignment_strategies);
   RUN_TEST(test_non_numeric_data_rejection);
   RUN_TEST(test_with_batch_matcher);
+  RUN_TEST(test_linear_is_sample_exact);
+  RUN_TEST(test_interpolation_accuracy);
+  RUN_TEST(test_integer_interpolation);
 
   return UNITY_END();
 }
\ No newline at end of file
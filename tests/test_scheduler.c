@@ -0,0 +1,350 @@
+#define _DEFAULT_SOURCE
+#include <pthread.h>
+#include <stdbool.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+#include "batch_buffer.h"
+#include "map.h"
+#include "passthrough.h"
+#include "scheduler.h"
+#include "test_utils.h"
+#include "unity.h"
+
+#define N_CHAIN 32
+#define N_BATCHES 200
+#define BATCH_CAPACITY_EXPO 6
+#define BATCH_CAPACITY (1 << BATCH_CAPACITY_EXPO)
+
+static const BatchBuffer_config small_config = {
+    .dtype = DTYPE_FLOAT,
+    .overflow_behaviour = OVERFLOW_BLOCK,
+    .ring_capacity_expo = 3,  // 7 batches - plenty of backpressure
+    .batch_capacity_expo = BATCH_CAPACITY_EXPO,
+};
+
+typedef struct {
+  Batch_buff_t* buff;
+  size_t n_batches;
+  size_t batch_head;  // samples per batch
+} feeder_args_t;
+
+/* Writes n_batches ramps into 'buff', then a completion batch */
+static void* feeder(void* arg)
+{
+  feeder_args_t* a = (feeder_args_t*) arg;
+  float value = 0.0f;
+
+  for (size_t i = 0; i < a->n_batches; i++) {
+    Batch_t* batch = bb_get_head(a->buff);
+    for (size_t k = 0; k < a->batch_head; k++) {
+      ((float*) batch->data)[k] = value++;
+    }
+    batch->head = a->batch_head;
+    batch->batch_id = i;
+    batch->t_ns = (long long) i * 1000;
+    batch->period_ns = 1;
+    batch->ec = Bp_EC_OK;
+    if (bb_submit(a->buff, 1000000) != Bp_EC_OK) return NULL;
+  }
+
+  Batch_t* batch = bb_get_head(a->buff);
+  batch->head = 0;
+  batch->ec = Bp_EC_COMPLETE;
+  bb_submit(a->buff, 1000000);
+  return NULL;
+}
+
+static Bp_EC scale_map(const void* in, void* out, size_t n_samples)
+{
+  for (size_t i = 0; i < n_samples; i++) {
+    ((float*) out)[i] = ((const float*) in)[i] * 2.0f;
+  }
+  return Bp_EC_OK;
+}
+
+static void* dummy_worker(void* arg)
+{
+  (void) arg;
+  return NULL;
+}
+
+void setUp(void) {}
+
+void tearDown(void) {}
+
+/* Only filters with a step function can be scheduled, and only once */
+void test_sched_add_validation(void)
+{
+  Scheduler_t sched;
+  CHECK_ERR(sched_init(&sched, (Scheduler_config_t){.n_workers = 1}));
+
+  Filter_t legacy;
+  Core_filt_config_t config = {.name = "legacy",
+                               .filt_type = FILT_T_MAP,
+                               .size = sizeof(Filter_t),
+                               .n_inputs = 1,
+                               .max_supported_sinks = 1,
+                               .buff_config = small_config,
+                               .timeout_us = 1000,
+                               .worker = dummy_worker};
+  CHECK_ERR(filt_init(&legacy, config));
+  TEST_ASSERT_EQUAL(Bp_EC_NOT_IMPLEMENTED, sched_add(&sched, &legacy));
+
+  Passthrough_t pt;
+  memset(&pt, 0, sizeof(pt));
+  Passthrough_config_t pt_config = {
+      .name = "pt", .buff_config = small_config, .timeout_us = 1000};
+  CHECK_ERR(passthrough_init(&pt, &pt_config));
+  CHECK_ERR(sched_add(&sched, &pt.base));
+  TEST_ASSERT_EQUAL(Bp_EC_ALREADY_REGISTERED, sched_add(&sched, &pt.base));
+
+  CHECK_ERR(sched_deinit(&sched));
+  TEST_ASSERT_NULL(pt.base.sched_task);
+  CHECK_ERR(filt_deinit(&pt.base));
+  CHECK_ERR(filt_deinit(&legacy));
+}
+
+/* A long passthrough chain on two workers keeps every batch, in order */
+void test_sched_passthrough_chain(void)
+{
+  Scheduler_t sched;
+  CHECK_ERR(sched_init(&sched, (Scheduler_config_t){.name = "chain",
+                                                     .n_workers = 2}));
+
+  static Passthrough_t chain[N_CHAIN];
+  memset(chain, 0, sizeof(chain));
+  Passthrough_config_t pt_config = {
+      .name = "pt", .buff_config = small_config, .timeout_us = 1000};
+  for (int i = 0; i < N_CHAIN; i++) {
+    CHECK_ERR(passthrough_init(&chain[i], &pt_config));
+    CHECK_ERR(sched_add(&sched, &chain[i].base));
+  }
+  for (int i = 0; i + 1 < N_CHAIN; i++) {
+    CHECK_ERR(filt_sink_connect(&chain[i].base, 0,
+                                chain[i + 1].base.input_buffers[0]));
+  }
+
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", small_config));
+  CHECK_ERR(filt_sink_connect(&chain[N_CHAIN - 1].base, 0, &output));
+
+  CHECK_ERR(sched_start(&sched));
+  for (int i = 0; i < N_CHAIN; i++) {
+    CHECK_ERR(filt_start(&chain[i].base));
+  }
+
+  feeder_args_t args = {.buff = chain[0].base.input_buffers[0],
+                        .n_batches = N_BATCHES,
+                        .batch_head = BATCH_CAPACITY};
+  pthread_t feeder_thread;
+  TEST_ASSERT_EQUAL(0, pthread_create(&feeder_thread, NULL, feeder, &args));
+
+  Bp_EC err;
+  float expected = 0.0f;
+  for (size_t i = 0; i < N_BATCHES; i++) {
+    Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+    CHECK_ERR(err);
+    TEST_ASSERT_EQUAL(Bp_EC_OK, batch->ec);
+    TEST_ASSERT_EQUAL(i, batch->batch_id);
+    TEST_ASSERT_EQUAL(BATCH_CAPACITY, batch->head);
+    for (size_t k = 0; k < batch->head; k++, expected++) {
+      TEST_ASSERT_EQUAL_FLOAT(expected, ((float*) batch->data)[k]);
+    }
+    CHECK_ERR(bb_del_tail(&output));
+  }
+  Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+  CHECK_ERR(err);
+  TEST_ASSERT_EQUAL(Bp_EC_COMPLETE, batch->ec);
+  CHECK_ERR(bb_del_tail(&output));
+
+  pthread_join(feeder_thread, NULL);
+
+  for (int i = 0; i < N_CHAIN; i++) {
+    TEST_ASSERT_EQUAL(N_BATCHES, chain[i].base.metrics.n_batches);
+    TEST_ASSERT_GREATER_THAN(0, chain[i].base.metrics.n_runs);
+    TEST_ASSERT_GREATER_THAN(0, chain[i].base.metrics.run_time_ns);
+    CHECK_ERR(filt_stop(&chain[i].base));
+    CHECK_ERR(chain[i].base.worker_err_info.ec);
+  }
+
+  CHECK_ERR(sched_deinit(&sched));
+  for (int i = 0; i < N_CHAIN; i++) {
+    CHECK_ERR(filt_deinit(&chain[i].base));
+  }
+  CHECK_ERR(bb_deinit(&output));
+}
+
+/* A scheduled map feeding a threaded passthrough: partial input batches are
+ * packed into full outputs and the remainder is flushed on completion. */
+void test_sched_mixed_map_pipeline(void)
+{
+  Scheduler_t sched;
+  CHECK_ERR(sched_init(&sched, (Scheduler_config_t){.n_workers = 1}));
+
+  Map_filt_t scale;
+  CHECK_ERR(map_init(&scale, (Map_config_t){.name = "scale",
+                                            .buff_config = small_config,
+                                            .map_fcn = scale_map,
+                                            .timeout_us = 1000}));
+  CHECK_ERR(sched_add(&sched, &scale.base));
+
+  Passthrough_t pt;
+  memset(&pt, 0, sizeof(pt));
+  Passthrough_config_t pt_config = {
+      .name = "threaded", .buff_config = small_config, .timeout_us = 1000};
+  CHECK_ERR(passthrough_init(&pt, &pt_config));
+
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", small_config));
+  CHECK_ERR(filt_sink_connect(&scale.base, 0, pt.base.input_buffers[0]));
+  CHECK_ERR(filt_sink_connect(&pt.base, 0, &output));
+
+  CHECK_ERR(sched_start(&sched));
+  CHECK_ERR(filt_start(&scale.base));
+  CHECK_ERR(filt_start(&pt.base));
+
+  /* 50 batches of 40 samples = 2000 samples = 31 full outputs + 16 */
+  const size_t n_in = 50, in_head = 40;
+  const size_t n_samples = n_in * in_head;
+  feeder_args_t args = {.buff = scale.base.input_buffers[0],
+                        .n_batches = n_in,
+                        .batch_head = in_head};
+  pthread_t feeder_thread;
+  TEST_ASSERT_EQUAL(0, pthread_create(&feeder_thread, NULL, feeder, &args));
+
+  Bp_EC err;
+  size_t n_seen = 0;
+  for (;;) {
+    Batch_t* batch = bb_get_tail(&output, 1000000, &err);
+    CHECK_ERR(err);
+    if (batch->ec == Bp_EC_COMPLETE) break;
+    TEST_ASSERT_EQUAL(Bp_EC_OK, batch->ec);
+    for (size_t k = 0; k < batch->head; k++, n_seen++) {
+      TEST_ASSERT_EQUAL_FLOAT((float) n_seen * 2.0f,
+                              ((float*) batch->data)[k]);
+    }
+    CHECK_ERR(bb_del_tail(&output));
+  }
+  CHECK_ERR(bb_del_tail(&output));
+  TEST_ASSERT_EQUAL(n_samples, n_seen);
+
+  pthread_join(feeder_thread, NULL);
+  TEST_ASSERT_EQUAL(n_samples, scale.base.metrics.samples_processed);
+  TEST_ASSERT_EQUAL(n_samples / BATCH_CAPACITY + 1,
+                    scale.base.metrics.n_batches);
+  TEST_ASSERT_FALSE(atomic_load(&scale.base.running));  // completed
+
+  CHECK_ERR(filt_stop(&scale.base));
+  CHECK_ERR(filt_stop(&pt.base));
+  CHECK_ERR(scale.base.worker_err_info.ec);
+  CHECK_ERR(sched_deinit(&sched));
+  CHECK_ERR(filt_deinit(&scale.base));
+  CHECK_ERR(filt_deinit(&pt.base));
+  CHECK_ERR(bb_deinit(&output));
+}
+
+/* Idle filters park without a thread and stop promptly */
+void test_sched_stop_idle(void)
+{
+  Scheduler_t sched;
+  CHECK_ERR(sched_init(&sched, (Scheduler_config_t){.n_workers = 4}));
+
+  Passthrough_t pt;
+  memset(&pt, 0, sizeof(pt));
+  Passthrough_config_t pt_config = {
+      .name = "idle", .buff_config = small_config, .timeout_us = 1000};
+  CHECK_ERR(passthrough_init(&pt, &pt_config));
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "output", small_config));
+  CHECK_ERR(filt_sink_connect(&pt.base, 0, &output));
+  CHECK_ERR(sched_add(&sched, &pt.base));
+
+  CHECK_ERR(sched_start(&sched));
+  CHECK_ERR(filt_start(&pt.base));
+  TEST_ASSERT_EQUAL(Bp_EC_ALREADY_RUNNING, filt_start(&pt.base));
+
+  usleep(10000);
+  TEST_ASSERT_TRUE(atomic_load(&pt.base.running));
+  TEST_ASSERT_EQUAL(SCHED_TASK_IDLE, atomic_load(&pt.base.sched_task->state));
+  size_t n_runs = pt.base.metrics.n_runs;
+  usleep(10000);
+  TEST_ASSERT_EQUAL(n_runs, pt.base.metrics.n_runs);  // no busy polling
+
+  CHECK_ERR(filt_stop(&pt.base));
+  TEST_ASSERT_FALSE(atomic_load(&pt.base.running));
+  CHECK_ERR(sched_stop(&sched));
+  CHECK_ERR(sched_deinit(&sched));
+  CHECK_ERR(filt_deinit(&pt.base));
+  CHECK_ERR(bb_deinit(&output));
+}
+
+/* A shared sink keeps its hook while any producer runs, and loses it once the
+ * producers stop and the scheduler is gone */
+void test_sched_deinit_mpsc_sink(void)
+{
+  Scheduler_t sched;
+  CHECK_ERR(sched_init(&sched, (Scheduler_config_t){.n_workers = 2}));
+
+  BatchBuffer_config shared_config = small_config;
+  shared_config.multi_producer = true;
+  Batch_buff_t output;
+  CHECK_ERR(bb_init(&output, "shared", shared_config));
+
+  Passthrough_t pt[2];
+  memset(pt, 0, sizeof(pt));
+  for (int i = 0; i < 2; i++) {
+    Passthrough_config_t pt_config = {
+        .name = "producer", .buff_config = small_config, .timeout_us = 1000};
+    CHECK_ERR(passthrough_init(&pt[i], &pt_config));
+    CHECK_ERR(filt_sink_connect(&pt[i].base, 0, &output));
+    CHECK_ERR(sched_add(&sched, &pt[i].base));
+  }
+
+  CHECK_ERR(sched_start(&sched));
+  for (int i = 0; i < 2; i++) {
+    CHECK_ERR(filt_start(&pt[i].base));
+    Batch_t* batch = bb_get_head(pt[i].base.input_buffers[0]);
+    batch->head = BATCH_CAPACITY;
+    batch->ec = Bp_EC_OK;
+    CHECK_ERR(bb_submit(pt[i].base.input_buffers[0], 1000000));
+  }
+  for (int spins = 0; bb_occupancy(&output) < 2 && spins < 1000; spins++) {
+    usleep(1000);
+  }
+  TEST_ASSERT_EQUAL(2, bb_occupancy(&output));
+
+  CHECK_ERR(filt_stop(&pt[0].base));
+  TEST_ASSERT_NOT_NULL(atomic_load(&output.on_not_full));
+
+  CHECK_ERR(filt_stop(&pt[1].base));
+  CHECK_ERR(sched_deinit(&sched));
+  TEST_ASSERT_NULL(atomic_load(&output.on_not_full));
+
+  /* Draining the sink must not call back into the dead scheduler */
+  size_t n_drained = 0;
+  Bp_EC err;
+  while (bb_get_tail(&output, 1000, &err) != NULL) {
+    CHECK_ERR(bb_del_tail(&output));
+    n_drained++;
+  }
+  TEST_ASSERT_EQUAL(2, n_drained);
+
+  for (int i = 0; i < 2; i++) {
+    CHECK_ERR(filt_deinit(&pt[i].base));
+  }
+  CHECK_ERR(bb_deinit(&output));
+}
+
+int main(void)
+{
+  UNITY_BEGIN();
+
+  RUN_TEST(test_sched_add_validation);
+  RUN_TEST(test_sched_passthrough_chain);
+  RUN_TEST(test_sched_mixed_map_pipeline);
+  RUN_TEST(test_sched_stop_idle);
+  RUN_TEST(test_sched_deinit_mpsc_sink);
+
+  return UNITY_END();
+}
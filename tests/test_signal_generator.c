@@ -3,7 +3,9 @@
  *
  * This test suite validates the signal generator implementation including:
  * - Basic initialization and configuration
- * - Waveform generation accuracy (sine, square, sawtooth, triangle)
+ * - Waveform generation accuracy (sine, square, sawtooth, triangle, noise,
+ *   chirp and multi-tone)
+ * - Integer output types
  * - Phase continuity across batch boundaries
  * - Nyquist frequency validation
  * - Proper error handling and worker thread lifecycle
@@ -13,6 +15,7 @@
  * proper error handling through the CHECK_ERR macro.
  */
 
+#define _DEFAULT_SOURCE  // For usleep
 #include <math.h>
 #include <pthread.h>
 #include <stdlib.h>
@@ -577,6 +580,601 @@ void test_all_waveforms(void)
   }
 }
 
+/**
+ * run_capture: Run a generator into a fresh TestSink until it completes
+ *
+ * The caller frees the sink with test_sink_deinit().
+ */
+static void run_capture(SignalGenerator_config_t config, TestSink_t* sink)
+{
+  SignalGenerator_t sg;
+
+  CHECK_ERR(signal_generator_init(&sg, config));
+  CHECK_ERR(test_sink_init(sink, "test_sink", config.max_samples));
+  CHECK_ERR(filt_sink_connect(&sg.base, 0, sink->base.input_buffers[0]));
+
+  CHECK_ERR(filt_start(&sg.base));
+  CHECK_ERR(filt_start(&sink->base));
+
+  pthread_join(sg.base.worker_thread, NULL);
+  pthread_join(sink->base.worker_thread, NULL);
+
+  CHECK_ERR(sg.base.worker_err_info.ec);
+  CHECK_ERR(sink->base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(config.max_samples, sink->captured_samples);
+
+  CHECK_ERR(filt_deinit(&sg.base));
+}
+
+/**
+ * Test: Fast Mode Matches Exact Mode
+ * Intent: Verify that the phase accumulator mode produces the same waveforms
+ * as the exact mode, including phase, amplitude and offset. Validates:
+ *   - Sine and triangle agree to float precision at every sample
+ *   - Square and sawtooth agree everywhere except, at most, a sample that
+ *     lands on a discontinuity
+ *   - Invalid modes are rejected
+ */
+void test_fast_mode_matches_exact(void)
+{
+  const size_t n = 4000;
+  WaveformType_e waveforms[] = {WAVEFORM_SINE, WAVEFORM_SQUARE,
+                                WAVEFORM_SAWTOOTH, WAVEFORM_TRIANGLE};
+
+  for (int w = 0; w < 4; w++) {
+    SignalGenerator_config_t config = {
+        .name = "fast_test",
+        .waveform_type = waveforms[w],
+        .frequency_hz = 1234.5,
+        .phase_rad = 0.3,
+        .sample_period_ns = 20833,  // ~48 kHz
+        .amplitude = 2.0,
+        .offset = 0.5,
+        .max_samples = n,
+        .start_time_ns = 5000000,
+        .timeout_us = 100000,
+        .buff_config = {.dtype = DTYPE_FLOAT,
+                        .batch_capacity_expo = 6,
+                        .ring_capacity_expo = 4}};
+    TestSink_t exact, fast;
+
+    run_capture(config, &exact);
+    config.mode = SG_MODE_FAST;
+    run_capture(config, &fast);
+
+    size_t mismatches = 0;
+    for (size_t i = 0; i < n; i++) {
+      if (fabsf(exact.captured_data[i] - fast.captured_data[i]) > 2e-5f) {
+        mismatches++;
+      }
+    }
+    TEST_ASSERT_TRUE(mismatches <= (w == 1 || w == 2 ? 1 : 0));
+
+    test_sink_deinit(&exact);
+    test_sink_deinit(&fast);
+  }
+
+  SignalGenerator_t sg;
+  SignalGenerator_config_t config = {.frequency_hz = 100.0,
+                                     .sample_period_ns = 1000000,
+                                     .mode = (SignalGenMode_e) 7};
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+}
+
+/**
+ * Test: Fast Mode Long-Run Phase Accuracy
+ * Intent: Verify that the phase accumulator does not lose precision far into
+ * a run. Starts 11.6 days in, where the exact mode's double precision phase
+ * is already off by ~1e-5 rad, and checks against a reference phase computed
+ * in integers. Validates:
+ *   - The start phase is exact despite the large timestamp
+ *   - Every sample is within the sine kernel's accuracy of the reference
+ */
+void test_fast_mode_long_run(void)
+{
+  const size_t n = 8192;
+  const uint64_t start_ns = 1000000000000000ULL + 123456789ULL;
+  const uint64_t cycle_ns = 64000;  // 15625 Hz
+  SignalGenerator_config_t config = {
+      .name = "long_run",
+      .waveform_type = WAVEFORM_SINE,
+      .frequency_hz = 15625.0,
+      .sample_period_ns = 1000,  // 1 MHz
+      .amplitude = 1.0,
+      .max_samples = n,
+      .start_time_ns = start_ns,
+      .mode = SG_MODE_FAST,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t sink;
+
+  run_capture(config, &sink);
+  for (size_t i = 0; i < n; i++) {
+    uint64_t t_ns = start_ns + i * config.sample_period_ns;
+    double cycles = (double) (t_ns % cycle_ns) / cycle_ns;
+    TEST_ASSERT_FLOAT_WITHIN(5e-7f, sin(2.0 * M_PI * cycles),
+                             sink.captured_data[i]);
+  }
+  test_sink_deinit(&sink);
+}
+
+/**
+ * run_paced: Run a paced generator into a TestSink, optionally starting the
+ * sink 'sink_delay_ms' late so that the generator backs up on a full ring.
+ * Returns the generator's stats and the wall time the run took.
+ */
+static double run_paced(SignalGenerator_config_t config, TestSink_t* sink,
+                        int sink_delay_ms, SignalGenerator_stats_t* stats)
+{
+  SignalGenerator_t sg;
+
+  CHECK_ERR(signal_generator_init(&sg, config));
+  CHECK_ERR(test_sink_init(sink, "test_sink", config.max_samples));
+  CHECK_ERR(filt_sink_connect(&sg.base, 0, sink->base.input_buffers[0]));
+
+  long long start = now_ns(CLOCK_MONOTONIC);
+  CHECK_ERR(filt_start(&sg.base));
+  usleep(sink_delay_ms * 1000);
+  CHECK_ERR(filt_start(&sink->base));
+
+  pthread_join(sg.base.worker_thread, NULL);
+  pthread_join(sink->base.worker_thread, NULL);
+  double elapsed = (now_ns(CLOCK_MONOTONIC) - start) * 1e-9;
+
+  CHECK_ERR(sg.base.worker_err_info.ec);
+  CHECK_ERR(sink->base.worker_err_info.ec);
+  TEST_ASSERT_EQUAL(config.max_samples, sink->captured_samples);
+  CHECK_ERR(filt_get_stats(&sg.base, stats));
+  CHECK_ERR(filt_deinit(&sg.base));
+  return elapsed;
+}
+
+/**
+ * Test: Paced Mode
+ * Intent: Verify that paced mode releases batches on their wall-clock
+ * schedule instead of as fast as the ring allows. Validates:
+ *   - 10 batches of 64 samples at 10 kHz take 9 batch periods (57.6 ms)
+ *   - No deadlines are missed with a sink that keeps up
+ *   - The samples and timestamps are those of the unpaced generator
+ */
+void test_paced_mode(void)
+{
+  SignalGenerator_config_t config = {
+      .name = "paced",
+      .waveform_type = WAVEFORM_SAWTOOTH,
+      .frequency_hz = 100.0,
+      .sample_period_ns = 100000,  // 10 kHz, 6.4 ms per batch
+      .amplitude = 1.0,
+      .max_samples = 640,
+      .paced = true,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t sink;
+  SignalGenerator_stats_t stats;
+
+  double elapsed = run_paced(config, &sink, 0, &stats);
+  TEST_ASSERT_TRUE(elapsed >= 0.057);
+  TEST_ASSERT_TRUE(elapsed < 0.2);
+  TEST_ASSERT_EQUAL(10, stats.base.n_batches);
+  TEST_ASSERT_EQUAL(0, stats.deadline_misses);
+
+  TEST_ASSERT_EQUAL(0, sink.first_t_ns);
+  TEST_ASSERT_EQUAL(639 * 100000, sink.last_t_ns);
+  TEST_ASSERT_FLOAT_WITHIN(1e-6, -1.0, sink.captured_data[0]);
+  TEST_ASSERT_FLOAT_WITHIN(1e-6, -0.98, sink.captured_data[1]);
+  test_sink_deinit(&sink);
+
+  // Real clock timestamps need pacing
+  SignalGenerator_t sg;
+  config.paced = false;
+  config.real_timestamps = true;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+}
+
+/**
+ * Test: Paced Mode Deadline Misses
+ * Intent: Verify that batches held up by a full ring count as deadline
+ * misses, and that the schedule does not slip. Validates:
+ *   - Starting the sink 80 ms late gives misses: its 15 batch ring is full
+ *     after 48 ms, so the next batch is over 20 ms late
+ *   - The run still ends on schedule, as the late batches catch up
+ */
+void test_paced_deadline_misses(void)
+{
+  SignalGenerator_config_t config = {
+      .name = "paced",
+      .waveform_type = WAVEFORM_SINE,
+      .frequency_hz = 1000.0,
+      .sample_period_ns = 50000,  // 20 kHz, 3.2 ms per batch
+      .amplitude = 1.0,
+      .max_samples = 64 * 40,  // 125 ms of schedule
+      .paced = true,
+      .timeout_us = 200000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t sink;
+  SignalGenerator_stats_t stats;
+
+  double elapsed = run_paced(config, &sink, 80, &stats);
+  TEST_ASSERT_TRUE(stats.deadline_misses > 0);
+  TEST_ASSERT_TRUE(stats.max_lateness_ns > 20000000);
+  TEST_ASSERT_TRUE(elapsed >= 0.124);
+  TEST_ASSERT_TRUE(elapsed < 0.25);
+  test_sink_deinit(&sink);
+}
+
+/**
+ * Test: Paced Mode With A Stalled Sink
+ * Intent: Verify that a ring full for longer than the filter timeout only
+ * makes paced batches late. Validates:
+ *   - Starting the sink 150 ms late, with a 20 ms timeout, the generator
+ *     waits the full ring out instead of stopping with Bp_EC_TIMEOUT
+ *   - Every sample still arrives, and the held up batch is a miss of over
+ *     the 100 ms the ring stayed full
+ */
+void test_paced_stalled_sink(void)
+{
+  SignalGenerator_config_t config = {
+      .name = "paced",
+      .waveform_type = WAVEFORM_SINE,
+      .frequency_hz = 1000.0,
+      .sample_period_ns = 50000,  // 20 kHz, 3.2 ms per batch
+      .amplitude = 1.0,
+      .max_samples = 64 * 40,
+      .paced = true,
+      .timeout_us = 20000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t sink;
+  SignalGenerator_stats_t stats;
+
+  double elapsed = run_paced(config, &sink, 150, &stats);
+  TEST_ASSERT_EQUAL(40, stats.base.n_batches);
+  TEST_ASSERT_TRUE(stats.deadline_misses > 0);
+  TEST_ASSERT_TRUE(stats.max_lateness_ns > 90000000);
+  TEST_ASSERT_TRUE(elapsed >= 0.15);
+  test_sink_deinit(&sink);
+}
+
+/**
+ * Test: Paced Mode With Real Clock Timestamps
+ * Intent: Verify that real_timestamps moves t_ns onto CLOCK_REALTIME while
+ * keeping the sample spacing. Validates:
+ *   - The first timestamp is within a second of the real clock
+ *   - The last is exactly (n - 1) sample periods after it
+ */
+void test_paced_real_timestamps(void)
+{
+  SignalGenerator_config_t config = {
+      .name = "paced",
+      .waveform_type = WAVEFORM_SINE,
+      .frequency_hz = 1000.0,
+      .sample_period_ns = 10000,  // 100 kHz
+      .amplitude = 1.0,
+      .max_samples = 256,
+      .paced = true,
+      .real_timestamps = true,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t sink;
+  SignalGenerator_stats_t stats;
+
+  long long before = now_ns(CLOCK_REALTIME);
+  run_paced(config, &sink, 0, &stats);
+  TEST_ASSERT_TRUE((long long) sink.first_t_ns >= before);
+  TEST_ASSERT_TRUE((long long) sink.first_t_ns < before + 1000000000LL);
+  TEST_ASSERT_EQUAL(sink.first_t_ns + 255 * 10000, sink.last_t_ns);
+  test_sink_deinit(&sink);
+}
+
+/**
+ * Test: White and Pink Noise
+ * Intent: Verify the Gaussian noise sources. Validates:
+ *   - The same seed repeats the same samples, a different seed does not
+ *   - White noise has the configured offset as mean, amplitude as standard
+ *     deviation, and no correlation between neighbouring samples
+ *   - Pink noise keeps roughly the same level but is strongly correlated
+ */
+void test_noise_generation(void)
+{
+  const size_t n = 1 << 15;
+  SignalGenerator_config_t config = {
+      .name = "noise",
+      .waveform_type = WAVEFORM_WHITE_NOISE,
+      .sample_period_ns = 1000,
+      .amplitude = 2.0,
+      .offset = 1.0,
+      .max_samples = n,
+      .seed = 42,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t first, again, other;
+
+  run_capture(config, &first);
+  run_capture(config, &again);
+  config.seed = 43;
+  run_capture(config, &other);
+
+  TEST_ASSERT_EQUAL_INT32(
+      0, memcmp(first.captured_data, again.captured_data, n * sizeof(float)));
+  TEST_ASSERT_NOT_EQUAL(
+      0, memcmp(first.captured_data, other.captured_data, n * sizeof(float)));
+
+  double mean = 0.0, var = 0.0, lag1 = 0.0;
+  for (size_t i = 0; i < n; i++) mean += first.captured_data[i];
+  mean /= n;
+  for (size_t i = 0; i < n; i++) {
+    double d = first.captured_data[i] - mean;
+    var += d * d;
+    if (i > 0) lag1 += d * (first.captured_data[i - 1] - mean);
+  }
+  TEST_ASSERT_FLOAT_WITHIN(0.05, 1.0, mean);
+  TEST_ASSERT_FLOAT_WITHIN(0.1, 2.0, sqrt(var / n));
+  TEST_ASSERT_FLOAT_WITHIN(0.03, 0.0, lag1 / var);
+  test_sink_deinit(&first);
+  test_sink_deinit(&again);
+  test_sink_deinit(&other);
+
+  config.waveform_type = WAVEFORM_PINK_NOISE;
+  config.offset = 0.0;
+  run_capture(config, &first);
+  var = 0.0;
+  lag1 = 0.0;
+  for (size_t i = 0; i < n; i++) {
+    var += first.captured_data[i] * first.captured_data[i];
+    if (i > 0) lag1 += first.captured_data[i] * first.captured_data[i - 1];
+  }
+  TEST_ASSERT_FLOAT_WITHIN(1.0, 2.0, sqrt(var / n));
+  TEST_ASSERT_TRUE(lag1 / var > 0.5);
+  test_sink_deinit(&first);
+}
+
+/**
+ * Test: Chirp Generation
+ * Intent: Verify the linear chirp sweeps from frequency_hz to chirp_end_hz
+ * and restarts each chirp_period_s. Validates:
+ *   - Zero crossings in the first and last tenth of a sweep match the
+ *     instantaneous frequency there
+ *   - The second sweep repeats the first
+ */
+void test_chirp_generation(void)
+{
+  const size_t n = 20000;  // Two 100 ms sweeps at 100 kHz
+  SignalGenerator_config_t config = {
+      .name = "chirp",
+      .waveform_type = WAVEFORM_CHIRP,
+      .frequency_hz = 1000.0,
+      .chirp_end_hz = 5000.0,
+      .chirp_period_s = 0.1,
+      .sample_period_ns = 10000,
+      .amplitude = 1.0,
+      .max_samples = n,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t sink;
+
+  run_capture(config, &sink);
+  // Mean frequency over the first and last 10 ms: 1200 Hz and 4800 Hz
+  TEST_ASSERT_FLOAT_WITHIN(60, 1200,
+                           estimate_frequency(sink.captured_data, 1000, 10000));
+  TEST_ASSERT_FLOAT_WITHIN(
+      60, 4800, estimate_frequency(sink.captured_data + 9000, 1000, 10000));
+  for (size_t i = 0; i < n / 2; i++) {
+    TEST_ASSERT_FLOAT_WITHIN(1e-5, sink.captured_data[i],
+                             sink.captured_data[i + n / 2]);
+  }
+  test_sink_deinit(&sink);
+}
+
+/**
+ * Test: Multi-Tone Generation
+ * Intent: Verify the multi-tone sum in both modes. Validates:
+ *   - Exact mode output is the weighted sum of the tones
+ *   - Fast mode agrees with exact mode to float precision
+ *   - NULL amplitudes weight every tone 1
+ */
+void test_multi_tone_generation(void)
+{
+  const size_t n = 3000;
+  const double freqs[] = {440.0, 1000.0, 3100.0};
+  const double amps[] = {1.0, 0.5, 0.25};
+  SignalGenerator_config_t config = {
+      .name = "tones",
+      .waveform_type = WAVEFORM_MULTI_TONE,
+      .tone_freqs_hz = freqs,
+      .tone_amplitudes = amps,
+      .n_tones = 3,
+      .phase_rad = 0.2,
+      .sample_period_ns = 20833,
+      .amplitude = 2.0,
+      .offset = -0.5,
+      .max_samples = n,
+      .start_time_ns = 1000000,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  TestSink_t exact, fast;
+
+  run_capture(config, &exact);
+  config.mode = SG_MODE_FAST;
+  run_capture(config, &fast);
+  for (size_t i = 0; i < n; i++) {
+    double t_s = (config.start_time_ns + i * config.sample_period_ns) * 1e-9;
+    double sum = 0.0;
+    for (size_t k = 0; k < 3; k++) {
+      sum += amps[k] * sin(2.0 * M_PI * freqs[k] * t_s + config.phase_rad);
+    }
+    TEST_ASSERT_FLOAT_WITHIN(1e-5, 2.0 * sum - 0.5, exact.captured_data[i]);
+    TEST_ASSERT_FLOAT_WITHIN(1e-5, exact.captured_data[i],
+                             fast.captured_data[i]);
+  }
+  test_sink_deinit(&exact);
+  test_sink_deinit(&fast);
+
+  config.tone_amplitudes = NULL;
+  config.n_tones = 1;
+  config.amplitude = 1.0;
+  config.offset = 0.0;
+  run_capture(config, &fast);
+  double t0_s = config.start_time_ns * 1e-9;
+  TEST_ASSERT_FLOAT_WITHIN(1e-6,
+                           sin(2.0 * M_PI * freqs[0] * t0_s + config.phase_rad),
+                           fast.captured_data[0]);
+  test_sink_deinit(&fast);
+}
+
+/**
+ * Test: Integer Output
+ * Intent: Verify DTYPE_I32 and DTYPE_U32 outputs, drained straight from the
+ * generator's sink buffer. Validates:
+ *   - Samples are the float waveform rounded to nearest
+ *   - Values past the type's range saturate instead of wrapping
+ *   - A sink of another dtype is a worker error
+ */
+void test_integer_output(void)
+{
+  const SampleDtype_t dtypes[] = {DTYPE_I32, DTYPE_U32};
+
+  for (int d = 0; d < 2; d++) {
+    SignalGenerator_config_t config = {
+        .name = "int_out",
+        .waveform_type = WAVEFORM_SAWTOOTH,
+        .frequency_hz = 1000.0,
+        .sample_period_ns = 10000,  // 100 samples per cycle
+        .amplitude = 3e9,           // Saturates at both ends
+        .offset = d == 0 ? 0.0 : 1e9,
+        .max_samples = 200,
+        .timeout_us = 100000,
+        .buff_config = {.dtype = dtypes[d],
+                        .batch_capacity_expo = 6,
+                        .ring_capacity_expo = 4}};
+    SignalGenerator_t sg;
+    Batch_buff_t out;
+    Bp_EC err;
+
+    CHECK_ERR(signal_generator_init(&sg, config));
+    CHECK_ERR(bb_init(&out, "int_sink", config.buff_config));
+    CHECK_ERR(filt_sink_connect(&sg.base, 0, &out));
+    CHECK_ERR(bb_start(&out));
+    CHECK_ERR(filt_start(&sg.base));
+
+    size_t seen = 0;
+    while (true) {
+      Batch_t* batch = bb_get_tail(&out, 1000000, &err);
+      CHECK_ERR(err);
+      if (batch->ec == Bp_EC_COMPLETE) {
+        bb_del_tail(&out);
+        break;
+      }
+      for (size_t i = 0; i < batch->head; i++, seen++) {
+        double x = -1.0 + 0.02 * (seen % 100);
+        double want = rint(config.amplitude * x + config.offset);
+        if (d == 0) {
+          want = fmin(fmax(want, INT32_MIN), INT32_MAX);
+          TEST_ASSERT_FLOAT_WITHIN(256, want, ((int32_t*) batch->data)[i]);
+        } else {
+          want = fmin(fmax(want, 0), UINT32_MAX);
+          TEST_ASSERT_FLOAT_WITHIN(256, want, ((uint32_t*) batch->data)[i]);
+        }
+      }
+      bb_del_tail(&out);
+    }
+    TEST_ASSERT_EQUAL(200, seen);
+    pthread_join(sg.base.worker_thread, NULL);
+    CHECK_ERR(sg.base.worker_err_info.ec);
+    CHECK_ERR(filt_deinit(&sg.base));
+    CHECK_ERR(bb_stop(&out));
+    CHECK_ERR(bb_deinit(&out));
+  }
+
+  // Float samples into an integer buffer would be misread
+  SignalGenerator_config_t config = {
+      .name = "mismatch",
+      .waveform_type = WAVEFORM_SINE,
+      .frequency_hz = 100.0,
+      .sample_period_ns = 1000000,
+      .amplitude = 1.0,
+      .max_samples = 64,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_I32,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+  SignalGenerator_t sg;
+  TestSink_t sink;
+  CHECK_ERR(signal_generator_init(&sg, config));
+  CHECK_ERR(test_sink_init(&sink, "float_sink", 64));
+  CHECK_ERR(filt_sink_connect(&sg.base, 0, sink.base.input_buffers[0]));
+  CHECK_ERR(filt_start(&sg.base));
+  pthread_join(sg.base.worker_thread, NULL);
+  TEST_ASSERT_EQUAL(Bp_EC_DTYPE_MISMATCH, sg.base.worker_err_info.ec);
+  CHECK_ERR(filt_deinit(&sg.base));
+  test_sink_deinit(&sink);
+}
+
+/**
+ * Test: New Waveform Validation
+ * Intent: Verify the configuration checks of the noise, chirp and multi-tone
+ * waveforms and the output dtype. Validates:
+ *   - Noise needs no frequency
+ *   - Chirps need an end frequency and a sweep period
+ *   - Multi-tone needs 1 to SG_MAX_TONES tones, all with positive frequency
+ *   - Only float, I32 and U32 outputs are accepted
+ */
+void test_new_waveform_validation(void)
+{
+  SignalGenerator_t sg;
+  const double freqs[] = {100.0, -5.0};
+  SignalGenerator_config_t config = {
+      .name = "validation",
+      .waveform_type = WAVEFORM_WHITE_NOISE,
+      .sample_period_ns = 1000000,
+      .amplitude = 1.0,
+      .timeout_us = 100000,
+      .buff_config = {.dtype = DTYPE_FLOAT,
+                      .batch_capacity_expo = 6,
+                      .ring_capacity_expo = 4}};
+
+  CHECK_ERR(signal_generator_init(&sg, config));
+  CHECK_ERR(filt_deinit(&sg.base));
+
+  config.waveform_type = WAVEFORM_CHIRP;
+  config.frequency_hz = 10.0;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+  config.chirp_end_hz = 100.0;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+  config.chirp_period_s = 1.0;
+  CHECK_ERR(signal_generator_init(&sg, config));
+  CHECK_ERR(filt_deinit(&sg.base));
+
+  config.waveform_type = WAVEFORM_MULTI_TONE;
+  config.tone_freqs_hz = freqs;
+  config.n_tones = 0;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+  config.n_tones = SG_MAX_TONES + 1;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+  config.n_tones = 2;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+  config.n_tones = 1;
+  CHECK_ERR(signal_generator_init(&sg, config));
+  CHECK_ERR(filt_deinit(&sg.base));
+
+  config.buff_config.dtype = DTYPE_NDEF;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, signal_generator_init(&sg, config));
+}
+
 int main(void)
 {
   UNITY_BEGIN();
@@ -587,6 +1185,17 @@ int main(void)
   RUN_TEST(test_phase_continuity);
   RUN_TEST(test_nyquist_validation);
   RUN_TEST(test_all_waveforms);
+  RUN_TEST(test_fast_mode_matches_exact);
+  RUN_TEST(test_fast_mode_long_run);
+  RUN_TEST(test_paced_mode);
+  RUN_TEST(test_paced_deadline_misses);
+  RUN_TEST(test_paced_stalled_sink);
+  RUN_TEST(test_paced_real_timestamps);
+  RUN_TEST(test_noise_generation);
+  RUN_TEST(test_chirp_generation);
+  RUN_TEST(test_multi_tone_generation);
+  RUN_TEST(test_integer_output);
+  RUN_TEST(test_new_waveform_validation);
 
   return UNITY_END();
 }
@@ -784,6 +784,317 @@ void test_tee_pipeline_integration(void)
   printf("Pipeline integration test passed!\n");
 }
 
+// Test 10: Zero-copy fan-out with reference counted input slots
+void test_tee_zero_copy_shared(void)
+{
+  printf("\n=== Testing Zero-Copy Shared Outputs ===\n");
+
+  BatchBuffer_config out_configs[3];
+  for (int i = 0; i < 3; i++) {
+    out_configs[i] = (BatchBuffer_config){.dtype = DTYPE_FLOAT,
+                                          .batch_capacity_expo = 6,
+                                          .ring_capacity_expo = 4,
+                                          .overflow_behaviour = OVERFLOW_BLOCK};
+  }
+
+  Tee_config_t config = {.name = "test_zero_copy",
+                         .buff_config = out_configs[0],
+                         .n_outputs = 3,
+                         .output_configs = out_configs,
+                         .timeout_us = 1000,
+                         .copy_data = false};
+
+  Tee_filt_t tee;
+  CHECK_ERR(tee_init(&tee, config));
+
+  Batch_buff_t outputs[3];
+  for (int i = 0; i < 3; i++) {
+    CHECK_ERR(bb_init(&outputs[i], "shared_out", out_configs[i]));
+    CHECK_ERR(filt_sink_connect(&tee.base, i, &outputs[i]));
+  }
+  // Output 2 modifies data in place and must get a private copy
+  outputs[2].consumer_mutates = true;
+
+  Batch_buff_t* input = tee.base.input_buffers[0];
+  CHECK_ERR(filt_start(&tee.base));
+
+  uint32_t counter = 0;
+  fill_sequential_data(input, &counter, 5);
+  nanosleep(&ts_100ms, NULL);
+
+  // Shared outputs alias the input ring rather than owning a copy
+  Bp_EC err;
+  Batch_t* shared = bb_get_tail(&outputs[0], 1000, &err);
+  CHECK_ERR(err);
+  TEST_ASSERT_TRUE((char*) shared->data >= (char*) input->data_ring);
+  TEST_ASSERT_TRUE((char*) shared->data <
+                   (char*) input->data_ring +
+                       bb_n_batches(input) * bb_batch_size(input) *
+                           sizeof(float));
+  Batch_t* copied = bb_get_tail(&outputs[2], 1000, &err);
+  CHECK_ERR(err);
+  TEST_ASSERT_NULL(copied->share_origin);
+
+  // Input slots stay reserved until every shared output has consumed them
+  TEST_ASSERT_EQUAL(5, bb_occupancy(input));
+  verify_sequence(&outputs[2], 0, 320);
+  verify_sequence(&outputs[0], 0, 320);
+  TEST_ASSERT_EQUAL(5, bb_occupancy(input));
+  verify_sequence(&outputs[1], 0, 320);
+  TEST_ASSERT_EQUAL(0, bb_occupancy(input));
+
+  TEST_ASSERT_EQUAL(5, tee.shared_writes[0]);
+  TEST_ASSERT_EQUAL(5, tee.shared_writes[1]);
+  TEST_ASSERT_EQUAL(0, tee.shared_writes[2]);
+  for (int i = 0; i < 3; i++) {
+    TEST_ASSERT_EQUAL(5, tee.successful_writes[i]);
+  }
+
+  // Released slots are reused as the input ring wraps
+  for (int round = 0; round < 2; round++) {
+    uint32_t start = counter;
+    fill_sequential_data(input, &counter, 10);
+    nanosleep(&ts_10ms, NULL);
+    for (int i = 0; i < 3; i++) {
+      verify_sequence(&outputs[i], start, 640);
+    }
+    TEST_ASSERT_EQUAL(0, bb_occupancy(input));
+  }
+
+  CHECK_ERR(filt_stop(&tee.base));
+  for (int i = 0; i < 3; i++) {
+    CHECK_ERR(bb_stop(&outputs[i]));
+  }
+  CHECK_ERR(filt_deinit(&tee.base));
+  for (int i = 0; i < 3; i++) {
+    CHECK_ERR(bb_deinit(&outputs[i]));
+  }
+
+  printf("Zero-copy shared output test passed!\n");
+}
+
+// Test 11: Per output backpressure policies isolate slow outputs
+void test_tee_backpressure_policies(void)
+{
+  printf("\n=== Testing Per-Output Backpressure Policies ===\n");
+
+  BatchBuffer_config out_configs[4];
+  for (int i = 0; i < 4; i++) {
+    out_configs[i] = (BatchBuffer_config){.dtype = DTYPE_FLOAT,
+                                          .batch_capacity_expo = 6,
+                                          .ring_capacity_expo = 3,  // 7 usable
+                                          .overflow_behaviour = OVERFLOW_BLOCK};
+  }
+  TeeOutput_policy_t policies[4] = {{.policy = TEE_BLOCK},
+                                    {.policy = TEE_DROP_NEWEST},
+                                    {.policy = TEE_BOUNDED_LAG, .max_lag = 3},
+                                    {.policy = TEE_DROP_OLDEST}};
+
+  // A blocked output would hold the tee up for a second per batch
+  Tee_config_t config = {.name = "test_policies",
+                         .buff_config = out_configs[0],
+                         .n_outputs = 4,
+                         .output_configs = out_configs,
+                         .timeout_us = 1000000,
+                         .copy_data = false,
+                         .output_policies = policies};
+
+  Tee_filt_t tee;
+  CHECK_ERR(tee_init(&tee, config));
+
+  Batch_buff_t outputs[4];
+  for (int i = 0; i < 4; i++) {
+    CHECK_ERR(bb_init(&outputs[i], "policy_out", out_configs[i]));
+    CHECK_ERR(filt_sink_connect(&tee.base, i, &outputs[i]));
+  }
+  Batch_buff_t* input = tee.base.input_buffers[0];
+  CHECK_ERR(filt_start(&tee.base));
+
+  // Only output 0 is read. It must see every batch, on time, while the
+  // others fill up and fall behind.
+  uint32_t counter = 0;
+  for (int round = 0; round < 4; round++) {
+    uint32_t start = counter;
+    fill_sequential_data(input, &counter, 5);
+    nanosleep(&ts_10ms, NULL);
+    verify_sequence(&outputs[0], start, 320);
+  }
+
+  Tee_stats_t stats;
+  CHECK_ERR(filt_get_stats(&tee.base, &stats));
+  TEST_ASSERT_EQUAL(4, stats.n_outputs);
+  TEST_ASSERT_EQUAL(20, stats.base.n_batches);
+  TEST_ASSERT_EQUAL(20, stats.successful_writes[0]);
+  TEST_ASSERT_EQUAL(20, stats.shared_writes[0]);
+  TEST_ASSERT_EQUAL(0, stats.dropped_batches[0]);
+
+  // Drop newest keeps the first 7 batches
+  TEST_ASSERT_EQUAL(7, stats.successful_writes[1]);
+  TEST_ASSERT_EQUAL(0, stats.shared_writes[1]);  // Lagging outputs copy
+  TEST_ASSERT_EQUAL(13, stats.dropped_batches[1]);
+  TEST_ASSERT_EQUAL(7, stats.lag[1]);
+  TEST_ASSERT_EQUAL(7, stats.max_lag[1]);
+  verify_sequence(&outputs[1], 0, 7 * 64);
+
+  // Bounded lag keeps the last 3
+  TEST_ASSERT_EQUAL(20, stats.successful_writes[2]);
+  TEST_ASSERT_EQUAL(17, stats.dropped_batches[2]);
+  TEST_ASSERT_EQUAL(3, stats.lag[2]);
+  TEST_ASSERT_EQUAL(3, stats.max_lag[2]);
+  verify_sequence(&outputs[2], 17 * 64, 3 * 64);
+
+  // Drop oldest keeps the last 7
+  TEST_ASSERT_EQUAL(20, stats.successful_writes[3]);
+  TEST_ASSERT_EQUAL(13, stats.dropped_batches[3]);
+  TEST_ASSERT_EQUAL(7, stats.lag[3]);
+  verify_sequence(&outputs[3], 13 * 64, 7 * 64);
+
+  CHECK_ERR(filt_stop(&tee.base));
+  for (int i = 0; i < 4; i++) {
+    CHECK_ERR(bb_stop(&outputs[i]));
+  }
+  CHECK_ERR(filt_deinit(&tee.base));
+  for (int i = 0; i < 4; i++) {
+    CHECK_ERR(bb_deinit(&outputs[i]));
+  }
+
+  // A lag bound has to fit in the output's ring
+  policies[2].max_lag = 0;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, tee_init(&tee, config));
+  policies[2].max_lag = 8;
+  TEST_ASSERT_EQUAL(Bp_EC_INVALID_CONFIG, tee_init(&tee, config));
+
+  printf("Backpressure policy test passed!\n");
+}
+
+/* A batch the consumer is reading is never dropped from under it: the tee
+ * drops the new batches instead until it is done. */
+void test_tee_drop_oldest_while_reading(void)
+{
+  BatchBuffer_config in_config = {.dtype = DTYPE_FLOAT,
+                                  .batch_capacity_expo = 6,
+                                  .ring_capacity_expo = 4,
+                                  .overflow_behaviour = OVERFLOW_BLOCK};
+  BatchBuffer_config out_configs[2] = {in_config, in_config};
+  out_configs[0].ring_capacity_expo = 2;  // 3 usable
+  // Output 1 only makes up the numbers, and is never read
+  TeeOutput_policy_t policies[2] = {{.policy = TEE_DROP_OLDEST},
+                                    {.policy = TEE_DROP_NEWEST}};
+  Tee_config_t config = {.name = "test_drop_reading",
+                         .buff_config = in_config,
+                         .n_outputs = 2,
+                         .output_configs = out_configs,
+                         .timeout_us = 1000000,
+                         .output_policies = policies};
+
+  Tee_filt_t tee;
+  CHECK_ERR(tee_init(&tee, config));
+  Batch_buff_t output, unread;
+  CHECK_ERR(bb_init(&output, "reading_out", out_configs[0]));
+  CHECK_ERR(bb_init(&unread, "unread_out", out_configs[1]));
+  CHECK_ERR(filt_sink_connect(&tee.base, 0, &output));
+  CHECK_ERR(filt_sink_connect(&tee.base, 1, &unread));
+  Batch_buff_t* input = tee.base.input_buffers[0];
+  CHECK_ERR(filt_start(&tee.base));
+
+  uint32_t counter = 0;
+  fill_sequential_data(input, &counter, 3);
+  nanosleep(&ts_10ms, NULL);
+
+  // Hold the oldest batch while the tee keeps delivering
+  Bp_EC err;
+  Batch_t* held = bb_get_tail(&output, 10000, &err);
+  CHECK_ERR(err);
+  fill_sequential_data(input, &counter, 10);
+  nanosleep(&ts_10ms, NULL);
+  for (size_t i = 0; i < held->head; i++) {
+    TEST_ASSERT_EQUAL_FLOAT((float) i, ((float*) held->data)[i]);
+  }
+  CHECK_ERR(bb_del_tail(&output));
+
+  Tee_stats_t stats;
+  CHECK_ERR(filt_get_stats(&tee.base, &stats));
+  TEST_ASSERT_EQUAL(10, stats.dropped_batches[0]);
+  TEST_ASSERT_EQUAL(0, atomic_load(&output.consumer.dropped_by_producer));
+
+  // Nothing was skipped, and once released the oldest go again
+  verify_sequence(&output, 64, 2 * 64);
+  fill_sequential_data(input, &counter, 5);
+  nanosleep(&ts_10ms, NULL);
+  verify_sequence(&output, 15 * 64, 3 * 64);
+  CHECK_ERR(filt_get_stats(&tee.base, &stats));
+  TEST_ASSERT_EQUAL(12, stats.dropped_batches[0]);
+
+  CHECK_ERR(filt_stop(&tee.base));
+  CHECK_ERR(bb_stop(&output));
+  CHECK_ERR(bb_stop(&unread));
+  CHECK_ERR(filt_deinit(&tee.base));
+  CHECK_ERR(bb_deinit(&output));
+  CHECK_ERR(bb_deinit(&unread));
+}
+
+/* A held oldest batch cannot be dropped, so a bounded-lag output skips new
+ * batches rather than queue past max_lag */
+void test_tee_bounded_lag_while_reading(void)
+{
+  BatchBuffer_config in_config = {.dtype = DTYPE_FLOAT,
+                                  .batch_capacity_expo = 6,
+                                  .ring_capacity_expo = 4,
+                                  .overflow_behaviour = OVERFLOW_BLOCK};
+  BatchBuffer_config out_configs[2] = {in_config, in_config};
+  out_configs[0].ring_capacity_expo = 3;  // 7 usable, well above max_lag
+  TeeOutput_policy_t policies[2] = {{.policy = TEE_BOUNDED_LAG, .max_lag = 2},
+                                    {.policy = TEE_DROP_NEWEST}};
+  Tee_config_t config = {.name = "test_lag_reading",
+                         .buff_config = in_config,
+                         .n_outputs = 2,
+                         .output_configs = out_configs,
+                         .timeout_us = 1000000,
+                         .output_policies = policies};
+
+  Tee_filt_t tee;
+  CHECK_ERR(tee_init(&tee, config));
+  Batch_buff_t output, unread;
+  CHECK_ERR(bb_init(&output, "lag_out", out_configs[0]));
+  CHECK_ERR(bb_init(&unread, "unread_out", out_configs[1]));
+  CHECK_ERR(filt_sink_connect(&tee.base, 0, &output));
+  CHECK_ERR(filt_sink_connect(&tee.base, 1, &unread));
+  Batch_buff_t* input = tee.base.input_buffers[0];
+  CHECK_ERR(filt_start(&tee.base));
+
+  uint32_t counter = 0;
+  fill_sequential_data(input, &counter, 2);
+  nanosleep(&ts_10ms, NULL);
+
+  // Hold the oldest batch: the lag stays at the limit
+  Bp_EC err;
+  Batch_t* held = bb_get_tail(&output, 10000, &err);
+  CHECK_ERR(err);
+  fill_sequential_data(input, &counter, 5);
+  nanosleep(&ts_10ms, NULL);
+  TEST_ASSERT_EQUAL(2, bb_occupancy(&output));
+  TEST_ASSERT_EQUAL_FLOAT(0.0f, ((float*) held->data)[0]);
+  CHECK_ERR(bb_del_tail(&output));
+
+  Tee_stats_t stats;
+  CHECK_ERR(filt_get_stats(&tee.base, &stats));
+  TEST_ASSERT_EQUAL(5, stats.dropped_batches[0]);
+  TEST_ASSERT_EQUAL(2, stats.max_lag[0]);
+
+  // Once released, delivery resumes
+  verify_sequence(&output, 64, 64);
+  fill_sequential_data(input, &counter, 2);
+  nanosleep(&ts_10ms, NULL);
+  verify_sequence(&output, 7 * 64, 2 * 64);
+
+  CHECK_ERR(filt_stop(&tee.base));
+  CHECK_ERR(bb_stop(&output));
+  CHECK_ERR(bb_stop(&unread));
+  CHECK_ERR(filt_deinit(&tee.base));
+  CHECK_ERR(bb_deinit(&output));
+  CHECK_ERR(bb_deinit(&unread));
+}
+
 int main(void)
 {
   UNITY_BEGIN();
@@ -797,6 +1108,10 @@ int main(void)
   RUN_TEST(test_tee_invalid_config);
   RUN_TEST(test_tee_batch_size_validation);
   RUN_TEST(test_tee_pipeline_integration);
+  RUN_TEST(test_tee_zero_copy_shared);
+  RUN_TEST(test_tee_backpressure_policies);
+  RUN_TEST(test_tee_drop_oldest_while_reading);
+  RUN_TEST(test_tee_bounded_lag_while_reading);
 
   return UNITY_END();
 }